@@ -15,6 +15,8 @@ import sys
 from pathlib import Path
 import pandas as pd
 
+from real_data_cache import ColumnarDataCache, cache_enabled
+
 class RealDataEnforcer:
     """Enforces the golden rule: NO SYNTHETIC DATA EVER"""
     
@@ -27,6 +29,17 @@ class RealDataEnforcer:
         'nzd_usd', 'usd_cad', 'usd_chf', 'usd_jpy', 'xau_usd'
     ]
     
+    _cache = None
+    
+    @staticmethod
+    def _get_cache():
+        """Columnar cache for MASTER_DATASET_ROOT, or None if disabled (REAL_DATA_CACHE=0)"""
+        if not cache_enabled():
+            return None
+        if RealDataEnforcer._cache is None:
+            RealDataEnforcer._cache = ColumnarDataCache(RealDataEnforcer.MASTER_DATASET_ROOT)
+        return RealDataEnforcer._cache
+    
     @staticmethod
     def load_real_data(pair: str, timeframe: str) -> pd.DataFrame:
         """
@@ -81,12 +94,17 @@ class RealDataEnforcer:
             print("=" * 80)
             sys.exit(1)
         
-        # Load the REAL data
+        # Load the REAL data (columnar cache of the CSV first, CSV parse on miss)
         try:
-            df = pd.read_csv(data_file)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df.set_index('timestamp', inplace=True)
-            df.columns = df.columns.str.lower()
+            cache = RealDataEnforcer._get_cache()
+            df = cache.load(pair, timeframe, data_file) if cache is not None else None
+            from_cache = df is not None
+            
+            if df is None:
+                df = pd.read_csv(data_file)
+                df['timestamp'] = pd.to_datetime(df['timestamp'])
+                df.set_index('timestamp', inplace=True)
+                df.columns = df.columns.str.lower()
             
             # Verify data quality
             required_columns = ['open', 'high', 'low', 'close', 'volume']
@@ -101,7 +119,11 @@ class RealDataEnforcer:
                 print("=" * 80)
                 sys.exit(1)
             
-            print(f"[REAL DATA] Loaded {len(df):,} candles for {pair.upper()} {timeframe}")
+            if cache is not None and not from_cache:
+                cache.store(pair, timeframe, data_file, df)
+            
+            source = "cache" if from_cache else "csv"
+            print(f"[REAL DATA] Loaded {len(df):,} candles for {pair.upper()} {timeframe} ({source})")
             print(f"  Period: {df.index.min()} to {df.index.max()}")
             
             return df
@@ -14,6 +14,8 @@ from typing import Dict, List, Any, Optional, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+from exit_resolver import resolve_signal_exits
+
 class AdvancedValidationFramework:
     def __init__(self, enhanced_data_dir="data/enhanced"):
         self.enhanced_data_dir = enhanced_data_dir
@@ -136,12 +138,18 @@ class AdvancedValidationFramework:
         """Simulate trades with realistic transaction costs and slippage"""
         trades = []
         
-        for signal in signals:
-            entry_idx = data.index.get_loc(signal['timestamp'])
+        # Resolve every exit in one vectorized pass (stops/targets trigger on the close)
+        close = data['Close'].to_numpy(dtype=np.float64)
+        exits = resolve_signal_exits(data.index, signals, close, close, close)
+        
+        for signal, exit_info in zip(signals, exits):
+            # Trades that never reach their stop or target are not counted
+            if exit_info is None or exit_info[2] not in ('STOP_LOSS', 'TAKE_PROFIT'):
+                continue
+            
+            exit_idx, exit_price, exit_reason = exit_info
             entry_price = signal['entry_price']
             direction = signal['direction']
-            stop_loss = signal['stop_loss']
-            take_profit = signal['take_profit']
             
             # Add slippage (0.5 pips for major pairs, 1 pip for others)
             slippage = 0.00005 if 'JPY' not in str(signal.get('pair', '')) else 0.0001
@@ -150,81 +158,25 @@ class AdvancedValidationFramework:
             else:
                 entry_price -= slippage
             
-            # Simulate trade progression
-            for i in range(entry_idx + 1, len(data)):
-                current_price = data.iloc[i]['Close']
-                
-                if direction == 'BUY':
-                    if current_price <= stop_loss:
-                        # Calculate transaction costs (2 pips round trip)
-                        transaction_cost = 0.0002 if 'JPY' not in str(signal.get('pair', '')) else 0.00002
-                        net_pips = (stop_loss - entry_price - transaction_cost) * 10000
-                        
-                        trades.append({
-                            'entry_time': signal['timestamp'],
-                            'exit_time': data.index[i],
-                            'entry_price': entry_price,
-                            'exit_price': stop_loss,
-                            'direction': direction,
-                            'status': 'LOSS',
-                            'pips': net_pips,
-                            'strategy': signal['strategy'],
-                            'confidence': signal['confidence'],
-                            'transaction_cost': transaction_cost
-                        })
-                        break
-                    elif current_price >= take_profit:
-                        transaction_cost = 0.0002 if 'JPY' not in str(signal.get('pair', '')) else 0.00002
-                        net_pips = (take_profit - entry_price - transaction_cost) * 10000
-                        
-                        trades.append({
-                            'entry_time': signal['timestamp'],
-                            'exit_time': data.index[i],
-                            'entry_price': entry_price,
-                            'exit_price': take_profit,
-                            'direction': direction,
-                            'status': 'WIN',
-                            'pips': net_pips,
-                            'strategy': signal['strategy'],
-                            'confidence': signal['confidence'],
-                            'transaction_cost': transaction_cost
-                        })
-                        break
-                else:  # SELL
-                    if current_price >= stop_loss:
-                        transaction_cost = 0.0002 if 'JPY' not in str(signal.get('pair', '')) else 0.00002
-                        net_pips = (entry_price - stop_loss - transaction_cost) * 10000
-                        
-                        trades.append({
-                            'entry_time': signal['timestamp'],
-                            'exit_time': data.index[i],
-                            'entry_price': entry_price,
-                            'exit_price': stop_loss,
-                            'direction': direction,
-                            'status': 'LOSS',
-                            'pips': net_pips,
-                            'strategy': signal['strategy'],
-                            'confidence': signal['confidence'],
-                            'transaction_cost': transaction_cost
-                        })
-                        break
-                    elif current_price <= take_profit:
-                        transaction_cost = 0.0002 if 'JPY' not in str(signal.get('pair', '')) else 0.00002
-                        net_pips = (entry_price - take_profit - transaction_cost) * 10000
-                        
-                        trades.append({
-                            'entry_time': signal['timestamp'],
-                            'exit_time': data.index[i],
-                            'entry_price': entry_price,
-                            'exit_price': take_profit,
-                            'direction': direction,
-                            'status': 'WIN',
-                            'pips': net_pips,
-                            'strategy': signal['strategy'],
-                            'confidence': signal['confidence'],
-                            'transaction_cost': transaction_cost
-                        })
-                        break
+            # Calculate transaction costs (2 pips round trip)
+            transaction_cost = 0.0002 if 'JPY' not in str(signal.get('pair', '')) else 0.00002
+            if direction == 'BUY':
+                net_pips = (exit_price - entry_price - transaction_cost) * 10000
+            else:
+                net_pips = (entry_price - exit_price - transaction_cost) * 10000
+            
+            trades.append({
+                'entry_time': signal['timestamp'],
+                'exit_time': data.index[exit_idx],
+                'entry_price': entry_price,
+                'exit_price': exit_price,
+                'direction': direction,
+                'status': 'WIN' if exit_reason == 'TAKE_PROFIT' else 'LOSS',
+                'pips': net_pips,
+                'strategy': signal['strategy'],
+                'confidence': signal['confidence'],
+                'transaction_cost': transaction_cost
+            })
         
         return trades
     
@@ -24,6 +24,9 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+import indicators
+from news_blackout import BlackoutIndex, news_multiplier
+
 # Fix Windows console encoding
 if sys.platform == 'win32':
     import codecs
@@ -69,6 +72,11 @@ class DynamicSpreadModel:
     
     def __init__(self):
         self.base_spreads: Dict[str, float] = {}
+        self.default_spreads = {
+            'EUR_USD': 0.8, 'GBP_USD': 1.2, 'USD_JPY': 0.9,
+            'AUD_USD': 1.0, 'USD_CAD': 1.2, 'NZD_USD': 1.3,
+            'XAU_USD': 0.50
+        }
         self.session_multipliers = {
             TradingSession.LONDON: 1.0,
             TradingSession.NY: 1.0,
@@ -125,12 +133,7 @@ class DynamicSpreadModel:
         # Get base spread
         if instrument not in self.base_spreads:
             # Default spreads if not configured
-            defaults = {
-                'EUR_USD': 0.8, 'GBP_USD': 1.2, 'USD_JPY': 0.9,
-                'AUD_USD': 1.0, 'USD_CAD': 1.2, 'NZD_USD': 1.3,
-                'XAU_USD': 0.50
-            }
-            base_spread = defaults.get(instrument, 1.0)
+            base_spread = self.default_spreads.get(instrument, 1.0)
         else:
             base_spread = self.base_spreads[instrument]
         
@@ -159,6 +162,56 @@ class DynamicSpreadModel:
         final_spread = base_spread * session_mult * volatility_mult * news_mult
         
         return final_spread
+    
+    def session_codes(self, timestamps) -> np.ndarray:
+        """get_session for many UTC timestamps: positions in list(TradingSession)"""
+        times = pd.DatetimeIndex(timestamps)
+        hour = times.hour.to_numpy()
+        weekend = times.weekday.to_numpy() >= 5
+        sessions = list(TradingSession)
+        rules = [
+            ((13 <= hour) & (hour < 16), TradingSession.LONDON_NY_OVERLAP),
+            ((7 <= hour) & (hour < 16), TradingSession.LONDON),
+            ((13 <= hour) & (hour < 22), TradingSession.NY),
+            ((0 <= hour) & (hour < 9), TradingSession.ASIAN),
+            (weekend, TradingSession.WEEKEND),
+        ]
+        return np.select([mask for mask, _ in rules], [sessions.index(s) for _, s in rules],
+                         default=sessions.index(TradingSession.ASIAN))
+    
+    def spread_series(self,
+                      instrument: str,
+                      timestamps,
+                      volatility=None,
+                      news_events: Optional[List] = None) -> np.ndarray:
+        """
+        get_spread for a whole bar index in one vectorized pass
+        
+        Args:
+            instrument: e.g., 'EUR_USD', 'XAU_USD'
+            timestamps: UTC bar times (DatetimeIndex or array-like)
+            volatility: None, a scalar, or one value per bar
+            news_events: Events as accepted by get_spread (optional)
+        
+        Returns:
+            Spread in pips per bar (float array aligned with timestamps)
+        """
+        base_spread = self.base_spreads.get(instrument, self.default_spreads.get(instrument, 1.0))
+        
+        session_mults = np.array([self.session_multipliers.get(s, np.nan) for s in TradingSession])
+        session_mult = session_mults[self.session_codes(timestamps)]
+        
+        volatility_mult = 1.0
+        if volatility is not None:
+            volatility_mult = 1.0 + (np.asarray(volatility, dtype=np.float64) * 1000)
+        
+        # Largest impact multiplier within 30 minutes of each bar
+        levels = {'high': 5.0, 'medium': 2.0}
+        events = [(event['timestamp'], levels[event['impact']])
+                  for event in (news_events or []) if event['impact'] in levels]
+        news_mult = news_multiplier(timestamps, events, 1800)
+        
+        return base_spread * session_mult * volatility_mult * news_mult
 
 
 # ============================================================================
@@ -188,9 +241,7 @@ class TimeframeAnalyzer:
         if len(prices) < period:
             return prices[-1] if prices else 0.0
         
-        series = pd.Series(prices)
-        ema = series.ewm(span=period, adjust=False).mean()
-        return float(ema.iloc[-1])
+        return indicators.ema_last(prices, period, adjust=False)
     
     def get_higher_timeframe_trend(self, 
                                     prices: List[float],
@@ -305,10 +356,20 @@ class NewsIntegration:
         self.events: List[NewsEvent] = []
         self.pause_before_minutes = 30
         self.pause_after_minutes = 30
+        
+        # Bumped whenever the events change; cached blackout indexes are rebuilt
+        self.events_version = 0
+        # (currencies, before, after) -> (events list, events_version, BlackoutIndex)
+        self._blackout_indexes = {}
     
     def add_event(self, event: NewsEvent):
         """Add news event to calendar"""
         self.events.append(event)
+        self.events_version += 1
+    
+    def invalidate(self):
+        """Call after replacing, removing or editing entries of self.events directly"""
+        self.events_version += 1
     
     def load_events_from_csv(self, filepath: str):
         """Load events from CSV file"""
@@ -342,6 +403,18 @@ class NewsIntegration:
         Returns:
             True if should pause, False otherwise
         """
+        return self.blackout_index(instruments).contains(current_time)
+    
+    def pause_mask(self, timestamps, instruments: List[str]) -> np.ndarray:
+        """should_pause_trading for every timestamp of a bar index at once"""
+        return self.blackout_index(instruments).mask(timestamps)
+    
+    def blackout_index(self, instruments: List[str]) -> BlackoutIndex:
+        """
+        Merged pause windows of the high-impact events on the instruments'
+        currencies. Built once per currency set and rebuilt when events change
+        (add_event / invalidate, or a new self.events list).
+        """
         # Extract currencies from instruments
         currencies = set()
         for inst in instruments:
@@ -349,26 +422,16 @@ class NewsIntegration:
             parts = inst.replace('-', '_').split('_')
             currencies.update(parts)
         
-        # Check each high-impact event
-        for event in self.events:
-            if event.impact != 'high':
-                continue
-            
-            # Check if event affects our currencies
-            if event.currency not in currencies:
-                continue
-            
-            # Calculate time to event
-            time_to_event = (event.timestamp - current_time).total_seconds()
-            
-            # Pause if within window
-            pause_before = self.pause_before_minutes * 60
-            pause_after = self.pause_after_minutes * 60
-            
-            if -pause_after <= time_to_event <= pause_before:
-                return True
+        key = (frozenset(currencies), self.pause_before_minutes, self.pause_after_minutes)
+        cached = self._blackout_indexes.get(key)
+        if cached is not None and cached[0] is self.events and cached[1] == self.events_version:
+            return cached[2]
         
-        return False
+        times = [event.timestamp for event in self.events
+                 if event.impact == 'high' and event.currency in currencies]
+        index = BlackoutIndex.from_times(times, self.pause_before_minutes * 60, self.pause_after_minutes * 60)
+        self._blackout_indexes[key] = (self.events, self.events_version, index)
+        return index
     
     def get_news_sentiment(self,
                           current_time: datetime,
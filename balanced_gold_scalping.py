@@ -11,6 +11,8 @@ from typing import Dict, List, Any, Optional, Tuple
 import logging
 import json
 
+import indicators
+
 logger = logging.getLogger("balanced_gold_scalping")
 
 class BalancedGoldScalping:
@@ -64,52 +66,33 @@ class BalancedGoldScalping:
     
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Calculate RSI indicator"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return pd.Series(indicators.rsi(prices, period), index=prices.index)
     
     def _calculate_macd(self, prices: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, pd.Series]:
         """Calculate MACD indicator"""
-        ema_fast = prices.ewm(span=fast).mean()
-        ema_slow = prices.ewm(span=slow).mean()
-        macd = ema_fast - ema_slow
-        signal_line = macd.ewm(span=signal).mean()
-        histogram = macd - signal_line
+        macd, signal_line, histogram = indicators.macd(prices, fast, slow, signal)
         
         return {
-            'macd': macd,
-            'signal': signal_line,
-            'histogram': histogram
+            'macd': pd.Series(macd, index=prices.index),
+            'signal': pd.Series(signal_line, index=prices.index),
+            'histogram': pd.Series(histogram, index=prices.index)
         }
     
     def _calculate_bollinger_bands(self, prices: pd.Series, period: int = 20, std_dev: float = 2) -> Dict[str, pd.Series]:
         """Calculate Bollinger Bands"""
-        sma = prices.rolling(window=period).mean()
-        std = prices.rolling(window=period).std()
+        upper, middle, lower = indicators.bollinger(prices, period, std_dev)
         
         return {
-            'upper': sma + (std * std_dev),
-            'middle': sma,
-            'lower': sma - (std * std_dev)
+            'upper': pd.Series(upper, index=prices.index),
+            'middle': pd.Series(middle, index=prices.index),
+            'lower': pd.Series(lower, index=prices.index)
         }
     
     def _calculate_atr(self, df: pd.DataFrame, period: int = 14) -> pd.Series:
         """Calculate Average True Range"""
-        high = df['ask']
-        low = df['bid']
-        close = df['mid_price']
-        
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        
-        true_range = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = true_range.rolling(window=period).mean()
-        
-        return atr
+        # ask/bid stand in for high/low
+        atr = indicators.atr(df['ask'], df['bid'], df['mid_price'], period)
+        return pd.Series(atr, index=df.index)
 
 class SimpleRSIScalping(BalancedGoldScalping):
     """Simple RSI-based scalping"""
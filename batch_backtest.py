@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+BATCH BACKTEST
+Many parameter sets over ONE dataset in a single vectorized pass
+
+    metrics = batch_backtest(df, param_sets)                       # N-row table
+    metrics, trades = batch_backtest(df, param_sets, return_trades=True)
+
+Parameter sets (the EMA-crossover family used by the scenario optimizers):
+    ema_fast, ema_slow                EMA spans
+    rsi_oversold, rsi_overbought      RSI thresholds (rsi_period, default 14)
+    sl_atr_mult, rr_ratio             stop = ATR * sl_atr_mult, target = stop * rr_ratio
+                                      (atr_period, default 14)
+    entry_type                        simple | pullback | momentum_confirm
+
+How:
+- every distinct EMA span / RSI period / ATR period is computed once
+- entries of every distinct signal configuration form one 2D boolean matrix
+  (configurations x bars); sets that differ only in SL/TP share a row
+- all sets are simulated together, one round per trade number: each round
+  resolves every set's open trade with exit_resolver and finds every set's
+  next entry with one searchsorted over all configurations' signal positions
+
+Trade rules are those of the iterrows loops in the optimizers: bars with a
+NaN/0 ATR are skipped entirely; entry at the close of a signal bar when flat;
+from the next bar on SL, then TP (filled at the level), then an opposite
+signal (filled at the close); no re-entry on the exit bar; a trade still
+open at the end of the data is dropped.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+import indicators
+from exit_resolver import EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, resolve_exits
+
+PARAM_DEFAULTS = {
+    'rsi_period': 14,
+    'atr_period': 14,
+    'entry_type': 'simple',
+}
+
+ENTRY_TYPES = ('simple', 'pullback', 'momentum_confirm')
+
+# Momentum lookback of the momentum_confirm entry
+MOMENTUM_PERIOD = 5
+
+# Pullback entry: close within this fraction of the slow EMA
+PULLBACK_DISTANCE = 0.001
+
+EXIT_NAMES = np.array(['', 'SL', 'TP', 'Signal'], dtype=object)
+EXIT_SIGNAL = 3
+
+SIGNAL_KEYS = ('ema_fast', 'ema_slow', 'rsi_period', 'rsi_oversold', 'rsi_overbought', 'entry_type')
+
+
+# ----------------------------------------------------------------------
+# Indicators (shared library formulas, each computed once)
+# ----------------------------------------------------------------------
+class _IndicatorCache:
+    """Distinct EMA spans / RSI periods of one dataset, computed on first use"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.close = indicators.as_array(df['close'])
+        self.emas: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self.rsis: Dict[int, np.ndarray] = {}
+        self.momentum = df['close'].pct_change(MOMENTUM_PERIOD).to_numpy(dtype=np.float64)
+
+    def ema(self, span: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(ema, ema of the previous bar)"""
+        if span not in self.emas:
+            values = indicators.ema(self.close, span)
+            self.emas[span] = (values, indicators.shift(values))
+        return self.emas[span]
+
+    def rsi(self, period: int) -> np.ndarray:
+        if period not in self.rsis:
+            self.rsis[period] = indicators.rsi(self.close, period)
+        return self.rsis[period]
+
+
+def _signal_rows(cache: _IndicatorCache, config: Tuple) -> Tuple[np.ndarray, np.ndarray]:
+    """(buy, sell) masks of one signal configuration"""
+    ema_fast, ema_slow, rsi_period, rsi_oversold, rsi_overbought, entry_type = config
+    fast, fast_prev = cache.ema(ema_fast)
+    slow, slow_prev = cache.ema(ema_slow)
+    rsi = cache.rsi(rsi_period)
+
+    with np.errstate(invalid='ignore'):
+        if entry_type == 'pullback':
+            near_ema = np.abs(cache.close - slow) / cache.close < PULLBACK_DISTANCE
+            buy = (fast > slow) & near_ema & (rsi < rsi_overbought)
+            sell = (fast < slow) & near_ema & (rsi > rsi_oversold)
+        else:
+            buy = (fast > slow) & (fast_prev <= slow_prev) & (rsi < rsi_overbought)
+            sell = (fast < slow) & (fast_prev >= slow_prev) & (rsi > rsi_oversold)
+            if entry_type == 'momentum_confirm':
+                buy &= cache.momentum > 0
+                sell &= cache.momentum < 0
+    return buy, sell
+
+
+def signal_matrix(df: pd.DataFrame, configs: Sequence[Tuple]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Entry masks of every signal configuration (SIGNAL_KEYS order) as two
+    (configurations x bars) boolean matrices: buy, sell.
+    """
+    cache = _IndicatorCache(df)
+    buy = np.zeros((len(configs), len(df)), dtype=bool)
+    sell = np.zeros((len(configs), len(df)), dtype=bool)
+    for row, config in enumerate(configs):
+        if config[5] not in ENTRY_TYPES:
+            raise ValueError(f"Unknown entry_type: {config[5]}")
+        buy[row], sell[row] = _signal_rows(cache, config)
+    return buy, sell
+
+
+# ----------------------------------------------------------------------
+# Simulation
+# ----------------------------------------------------------------------
+def _next_position(flat: np.ndarray, rows: np.ndarray, after: np.ndarray, width: int) -> np.ndarray:
+    """
+    First position > after in each row of a (rows x width) mask given as its
+    sorted flat nonzero indices; -1 where the row has none.
+    """
+    keys = rows * width + after
+    found = np.searchsorted(flat, keys, side='right')
+    hit = found < len(flat)
+    positions = np.full(len(rows), -1, dtype=np.int64)
+    candidate = flat[np.minimum(found, len(flat) - 1)] if len(flat) else np.zeros(len(rows), dtype=np.int64)
+    same_row = hit & (candidate < (rows + 1) * width)
+    positions[same_row] = candidate[same_row] - rows[same_row] * width
+    return positions
+
+
+def _simulate_group(high: np.ndarray, low: np.ndarray, close: np.ndarray, atr: np.ndarray,
+                    long_signal: np.ndarray, short_signal: np.ndarray,
+                    rows: np.ndarray, sl_mult: np.ndarray, rr: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Trades of every set over valid bars only. long_signal/short_signal are
+    (configurations x bars) masks, rows maps each set to its configuration.
+    """
+    n_sets = len(rows)
+    width = len(close)
+    any_flat = np.flatnonzero(long_signal | short_signal)
+    long_flat = np.flatnonzero(long_signal)
+    short_flat = np.flatnonzero(short_signal)
+
+    trades: Dict[str, List[np.ndarray]] = {k: [] for k in ('set', 'round', 'entry', 'exit', 'direction',
+                                                          'entry_price', 'exit_price', 'reason')}
+    last_exit = np.full(n_sets, -1, dtype=np.int64)
+    active = np.arange(n_sets)
+    trade_round = 0
+
+    while active.size and width:
+        entry = _next_position(any_flat, rows[active], last_exit[active], width)
+        opened = entry >= 0
+        active, entry = active[opened], entry[opened]
+        if not active.size:
+            break
+
+        set_rows = rows[active]
+        is_long = long_signal[set_rows, entry]
+        direction = np.where(is_long, 1, -1).astype(np.int8)
+
+        # An opposite signal closes the trade at its close unless SL/TP came first
+        opposite = np.where(
+            is_long,
+            _next_position(short_flat, set_rows, entry, width),
+            _next_position(long_flat, set_rows, entry, width)
+        )
+        horizon = np.where(opposite >= 0, opposite, width)
+
+        entry_price = close[entry]
+        risk = atr[entry] * sl_mult[active]
+        stop_loss = np.where(is_long, entry_price - risk, entry_price + risk)
+        take_profit = np.where(is_long, entry_price + risk * rr[active], entry_price - risk * rr[active])
+
+        exits = resolve_exits(entry, direction, stop_loss, take_profit, high, low, close,
+                              max_bars=horizon - entry)
+
+        level_hit = (exits.reason == EXIT_STOP_LOSS) | (exits.reason == EXIT_TAKE_PROFIT)
+        signal_exit = ~level_hit & (opposite >= 0) & (exits.exit_idx == opposite)
+        closed = level_hit | signal_exit
+
+        reason = np.where(level_hit, exits.reason, EXIT_SIGNAL)[closed]
+        trades['set'].append(active[closed])
+        trades['round'].append(np.full(int(closed.sum()), trade_round, dtype=np.int64))
+        trades['entry'].append(entry[closed])
+        trades['exit'].append(exits.exit_idx[closed])
+        trades['direction'].append(direction[closed])
+        trades['entry_price'].append(entry_price[closed])
+        trades['exit_price'].append(exits.exit_price[closed])
+        trades['reason'].append(reason)
+
+        # Trades still open at the end of the data are dropped, and so are their sets
+        last_exit[active] = exits.exit_idx
+        active = active[closed]
+        trade_round += 1
+
+    return {k: np.concatenate(v) if v else np.zeros(0) for k, v in trades.items()}
+
+
+def _metrics_table(trades: pd.DataFrame, n_sets: int, years: float) -> pd.DataFrame:
+    """Per-set statistics with the optimizers' formulas (pnl in percent)"""
+    columns = ['trades', 'win_rate', 'total_return', 'annual_return', 'max_dd', 'sharpe',
+               'profit_factor', 'avg_win', 'avg_loss', 'tp_rate', 'sl_rate']
+    table = pd.DataFrame(0.0, index=pd.RangeIndex(n_sets), columns=columns)
+    table['trades'] = 0
+    if trades.empty:
+        return table
+
+    pnl = trades['pnl_pct']
+    grouped = pnl.groupby(trades['set'])
+    count = grouped.size()
+    wins = pnl.where(pnl > 0)
+    losses = pnl.where(pnl < 0)
+    win_sum = wins.groupby(trades['set']).sum()
+    loss_sum = losses.groupby(trades['set']).sum().abs()
+
+    cumulative = grouped.cumsum()
+    drawdown = cumulative - cumulative.groupby(trades['set']).cummax()
+    std = grouped.std()
+
+    sets = count.index
+    table.loc[sets, 'trades'] = count
+    table.loc[sets, 'win_rate'] = (wins.groupby(trades['set']).count() / count) * 100
+    table.loc[sets, 'total_return'] = grouped.sum()
+    table.loc[sets, 'annual_return'] = grouped.sum() / years if years > 0 else 0
+    table.loc[sets, 'max_dd'] = drawdown.groupby(trades['set']).min().abs()
+    table.loc[sets, 'sharpe'] = np.where((count > 1) & (std > 0), grouped.mean() / std * np.sqrt(count), 0)
+    table.loc[sets, 'profit_factor'] = np.where(loss_sum > 0, win_sum / loss_sum.where(loss_sum > 0), 0)
+    table.loc[sets, 'avg_win'] = wins.groupby(trades['set']).mean().fillna(0)
+    table.loc[sets, 'avg_loss'] = losses.groupby(trades['set']).mean().fillna(0)
+    table.loc[sets, 'tp_rate'] = (trades['exit_reason'] == 'TP').groupby(trades['set']).sum() / count * 100
+    table.loc[sets, 'sl_rate'] = (trades['exit_reason'] == 'SL').groupby(trades['set']).sum() / count * 100
+    return table
+
+
+def batch_backtest(df: pd.DataFrame, param_sets: Sequence[Dict[str, Any]],
+                   return_trades: bool = False) -> Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Backtest every parameter set over df (OHLC columns, DatetimeIndex).
+
+    Returns an N-row table (parameter columns + metrics, row k = param_sets[k]);
+    with return_trades=True also the trade log, one row per trade with the
+    set number in 'set', in trade order within each set.
+    """
+    params = [{**PARAM_DEFAULTS, **p} for p in param_sets]
+    n_sets = len(params)
+    timestamps = pd.DatetimeIndex(df.index)
+
+    configs: Dict[Tuple, int] = {}
+    rows = np.array([configs.setdefault(tuple(p[k] for k in SIGNAL_KEYS), len(configs)) for p in params],
+                    dtype=np.int64)
+    buy, sell = signal_matrix(df, list(configs))
+    # A bar with both signals is a sell (the sell assignment wins)
+    long_all, short_all = buy & ~sell, sell
+
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    close = df['close'].to_numpy(dtype=np.float64)
+    sl_mult = np.array([p['sl_atr_mult'] for p in params], dtype=np.float64)
+    rr = np.array([p['rr_ratio'] for p in params], dtype=np.float64)
+    atr_periods = np.array([p['atr_period'] for p in params])
+
+    pieces = []
+    for period in np.unique(atr_periods):
+        members = np.flatnonzero(atr_periods == period)
+        atr = indicators.atr(df['high'], df['low'], df['close'], int(period))
+        # Skipped bars do not exist for the trade loop
+        valid = np.flatnonzero(~np.isnan(atr) & (atr != 0))
+
+        group_rows, local_rows = np.unique(rows[members], return_inverse=True)
+        result = _simulate_group(
+            high[valid], low[valid], close[valid], atr[valid],
+            long_all[np.ix_(group_rows, valid)], short_all[np.ix_(group_rows, valid)],
+            local_rows.astype(np.int64), sl_mult[members], rr[members]
+        )
+        if len(result['set']):
+            result['set'] = members[result['set'].astype(np.int64)]
+            result['entry'] = valid[result['entry'].astype(np.int64)]
+            result['exit'] = valid[result['exit'].astype(np.int64)]
+            pieces.append(result)
+
+    if pieces:
+        merged = {k: np.concatenate([p[k] for p in pieces]) for k in pieces[0]}
+        order = np.lexsort((merged['round'], merged['set']))
+        merged = {k: v[order] for k, v in merged.items()}
+    else:
+        merged = {k: np.zeros(0, dtype=np.int64) for k in ('set', 'entry', 'exit', 'direction', 'reason')}
+        merged.update(entry_price=np.zeros(0), exit_price=np.zeros(0))
+
+    direction = merged['direction'].astype(np.int64)
+    entry_price = merged['entry_price'].astype(np.float64)
+    exit_price = merged['exit_price'].astype(np.float64)
+    trades = pd.DataFrame({
+        'set': merged['set'].astype(np.int64),
+        'entry_idx': merged['entry'].astype(np.int64),
+        'exit_idx': merged['exit'].astype(np.int64),
+        'entry_time': timestamps[merged['entry'].astype(np.int64)],
+        'exit_time': timestamps[merged['exit'].astype(np.int64)],
+        'direction': direction,
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'pnl_pct': ((exit_price - entry_price) / entry_price * 100) * direction,
+        'exit_reason': EXIT_NAMES[merged['reason'].astype(np.int64)],
+    })
+
+    days = (timestamps[-1] - timestamps[0]).days if len(timestamps) else 0
+    metrics = _metrics_table(trades, n_sets, days / 365.25)
+    table = pd.concat([pd.DataFrame(list(param_sets)).reset_index(drop=True), metrics], axis=1)
+
+    if return_trades:
+        return table, trades
+    return table
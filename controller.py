@@ -14,9 +14,10 @@ import sys
 import traceback
 import argparse
 import hashlib
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -33,6 +34,12 @@ from multi_timeframe_backtesting_system import MultiTimeframeBacktestingSystem
 from advanced_validation_framework import AdvancedValidationFramework
 from risk_management_framework import RiskManagementFramework
 from professional_data_gap_analyzer import ProfessionalDataGapAnalyzer
+from parameter_space import ParameterSpace, satisfies_constraints
+from search_executors import ExperimentOutcome, make_search_executor, search_authkey, serve_search_worker
+from walk_forward import (
+    generate_walk_forward_folds, prepare_engine_history, generate_engine_signals,
+    WalkForwardPool, aggregate_walk_forward
+)
 
 # Import strategies
 from strategies.comprehensive_enhanced_strategy import ComprehensiveEnhancedStrategy
@@ -84,9 +91,17 @@ class UltimateStrategySearchController:
     Master controller for ultimate strategy search
     """
     
-    def __init__(self, config_path: str = "experiments.yaml"):
-        """Initialize the controller"""
-        self.config = self.load_config(config_path)
+    # experiments.yaml strategy name -> strategy key (also its search_space block)
+    STRATEGY_KEYS = {
+        'comprehensive_enhanced_strategy': 'comprehensive_enhanced',
+        'ultra_strict_v3_strategy': 'ultra_strict_v3',
+        'news_enhanced_strategy': 'news_enhanced',
+        'enhanced_optimized_strategy': 'enhanced_optimized'
+    }
+    
+    def __init__(self, config_path: str = "experiments.yaml", config: Optional[Dict[str, Any]] = None):
+        """Initialize the controller (from config_path, or an already loaded config)"""
+        self.config = config if config is not None else self.load_config(config_path)
         self.logger = logger
         
         # Set random seed for reproducibility
@@ -100,6 +115,21 @@ class UltimateStrategySearchController:
         self.risk_manager = None
         self.gap_analyzer = None
         
+        # Walk-forward histories: (engine, pair, tf) -> (indicator frame, folds)
+        self.wfo_history = OrderedDict()
+        self.wfo_history_size = 4
+        # One fold pool for every WFO call of the run (restarted only for new histories)
+        self.wfo_pool = WalkForwardPool(self.config.get('meta', {}).get('wfo_workers'),
+                                        max_histories=self.wfo_history_size)
+        
+        # Lazy parameter spaces per strategy and this process's shard of them
+        self.parameter_spaces = {}
+        self.shard_index = self.config.get("meta", {}).get("shard_index", 0)
+        self.shard_count = self.config.get("meta", {}).get("shard_count", 1)
+        
+        # Execution backend for run_comprehensive_search (serial / process / multi_host)
+        self.executor_settings = dict(self.config.get("executor") or {})
+        
         # Results tracking
         self.results = {}
         self.failures = []
@@ -141,21 +171,20 @@ class UltimateStrategySearchController:
         """Ensure directory exists"""
         base.mkdir(parents=True, exist_ok=True)
     
-    def product_dict(self, grid: Dict[str, List]) -> List[Dict[str, Any]]:
-        """Generate cartesian product of parameter grid with nested dict support"""
-        # Flatten nested dictionaries
-        flattened = {}
-        for key, value in grid.items():
-            if isinstance(value, dict):
-                # Handle nested dictionaries like regime_filter
-                for nested_key, nested_value in value.items():
-                    flattened[f"{key}_{nested_key}"] = nested_value
-            else:
-                flattened[key] = value
-        
-        keys = list(flattened.keys())
-        for vals in itertools.product(*[flattened[k] for k in keys]):
-            yield dict(zip(keys, vals))
+    def product_dict(self, grid: Dict[str, List]) -> Iterator[Dict[str, Any]]:
+        """Lazily generate the constraint-pruned cartesian product of a grid with nested dict support"""
+        return iter(ParameterSpace(grid))
+    
+    def parameter_space(self, strategy_name: str) -> ParameterSpace:
+        """Search space of one strategy: shared parameters plus its own strategy block"""
+        key = self.STRATEGY_KEYS.get(strategy_name, strategy_name)
+        if key not in self.parameter_spaces:
+            self.parameter_spaces[key] = ParameterSpace(
+                self.config['search_space'],
+                strategy=key,
+                strategy_blocks=self.STRATEGY_KEYS.values()
+            )
+        return self.parameter_spaces[key]
     
     def _apply_parameters_to_engine(self, engine, params: Dict[str, Any]):
         """Apply parameters to the backtesting engine"""
@@ -264,14 +293,7 @@ class UltimateStrategySearchController:
     
     def get_strategy(self, strategy_name: str) -> Any:
         """Get strategy instance by name"""
-        strategy_map = {
-            'comprehensive_enhanced_strategy': 'comprehensive_enhanced',
-            'ultra_strict_v3_strategy': 'ultra_strict_v3',
-            'news_enhanced_strategy': 'news_enhanced',
-            'enhanced_optimized_strategy': 'enhanced_optimized'
-        }
-        
-        key = strategy_map.get(strategy_name, strategy_name)
+        key = self.STRATEGY_KEYS.get(strategy_name, strategy_name)
         return self.strategies.get(key)
     
     def run_baseline_backtest(self, engine, pair: str, tf: str, strategy_name: str) -> Dict[str, Any]:
@@ -295,39 +317,86 @@ class UltimateStrategySearchController:
             self.logger.error(f"❌ Baseline backtest failed: {e}")
             return {'error': str(e)}
     
+    @staticmethod
+    def _history_key(engine, pair: str, tf: str) -> Tuple[str, str, str]:
+        return (type(engine).__name__, pair, tf)
+    
+    def _walk_forward_history(self, engine, pair: str, tf: str):
+        """Indicator frame and fold boundaries for (engine, pair, tf), computed once and cached"""
+        key = self._history_key(engine, pair, tf)
+        if key in self.wfo_history:
+            self.wfo_history.move_to_end(key)
+            return self.wfo_history[key]
+        
+        meta = self.config.get('meta', {})
+        df = prepare_engine_history(engine, pair, tf)
+        folds = generate_walk_forward_folds(
+            df['timestamp'],
+            test_months=meta.get('wfo_test_months', 3),
+            embargo_hours=meta.get('embargo_hours', 0),
+            holdout_months=meta.get('holdout_months', 0),
+            train_months=meta.get('wfo_train_months', 12),
+            anchored=meta.get('wfo_mode', 'anchored') != 'rolling'
+        )
+        
+        self.wfo_history[key] = (df, folds)
+        while len(self.wfo_history) > self.wfo_history_size:
+            self.wfo_history.popitem(last=False)
+        return df, folds
+    
+    def preload_histories(self, pairs: List[str], timeframes: List[str]):
+        """Load every (pair, tf) walk-forward history up front, e.g. before workers fork"""
+        self.wfo_history_size = max(self.wfo_history_size, len(pairs) * len(timeframes))
+        for pair in pairs:
+            for tf in timeframes:
+                try:
+                    self._walk_forward_history(self.choose_engine(tf), pair, tf)
+                except Exception as e:
+                    self.logger.warning(f"⚠️ Could not preload {pair} {tf}: {e}")
+        # Start the fold pool with every history, so it never has to restart
+        self.wfo_pool.max_histories = self.wfo_history_size
+        self.wfo_pool.add_histories({key: df for key, (df, _) in self.wfo_history.items()})
+        self.logger.info(f"📦 Preloaded {len(self.wfo_history)} walk-forward histories")
+    
     def run_walk_forward_optimization(self, engine, pair: str, tf: str, strategy_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Run walk-forward optimization"""
+        """
+        Walk-forward evaluation of one parameter set: every fold runs params on
+        its in-sample and out-of-sample slices (no per-fold re-optimization;
+        the search over parameters happens in the caller)
+        """
         self.logger.info(f"🔄 Running WFO for {pair} {tf} {strategy_name} with params: {params}")
         
         try:
-            # This is a simplified WFO implementation
-            # In practice, you'd implement proper anchored expanding windows
-            
-            # Apply parameters to the engine before running backtest
+            # Apply parameters to the engine before running the folds
             self._apply_parameters_to_engine(engine, params)
             
-            # For now, run a single backtest with the given parameters
-            if tf == "1h":
-                result = engine.run_professional_backtest(pair)
-            else:
-                result = engine.run_timeframe_backtest(pair, tf)
+            df, folds = self._walk_forward_history(engine, pair, tf)
+            if not folds:
+                return {'error': f'Not enough history for walk-forward folds ({len(df)} bars)'}
             
-            # Extract metrics
-            performance = result.get('performance', {})
-            metrics = {
-                'oos_sharpe': performance.get('sharpe_ratio', 0),
-                'oos_sortino': performance.get('sortino_ratio', 0),
-                'oos_max_dd': performance.get('max_drawdown', 0) / 100,
-                'profit_factor': performance.get('profit_factor', 0),
-                'trades': performance.get('total_trades', 0),
-                'win_rate': performance.get('win_rate', 0) / 100
-            }
+            # Signals once over the full history; every fold reads its slice
+            signals = generate_engine_signals(engine, df, pair, tf)
+            
+            fold_results = self.wfo_pool.run(self._history_key(engine, pair, tf), df, engine,
+                                             signals, folds, pair, tf)
+            metrics, equity, trades = aggregate_walk_forward(engine, fold_results)
+            
+            folds_report = []
+            for result in fold_results:
+                report = result['fold'].describe(df['timestamp'])
+                report['in_sample'] = result['in_sample']
+                report['out_of_sample'] = result['out_of_sample']
+                folds_report.append(report)
+            
+            self.logger.info(f"📊 WFO {pair} {tf}: {len(folds)} folds, OOS Sharpe {metrics['oos_sharpe']:.3f} "
+                             f"(fold mean {metrics['oos_sharpe_mean']:.3f} ± {metrics['oos_sharpe_std']:.3f}), "
+                             f"{metrics['trades']} OOS trades")
             
             return {
                 'metrics': metrics,
-                'equity': [],
-                'trades': result.get('trades', []),
-                'folds': []
+                'equity': equity,
+                'trades': trades,
+                'folds': folds_report
             }
             
         except Exception as e:
@@ -541,25 +610,17 @@ class UltimateStrategySearchController:
                 self.logger.error("❌ Data validation failed. Aborting search.")
                 return
             
-            # Calculate total experiments
+            # Calculate total experiments (exact, for this shard, nothing materialized)
             universe = self.config['universe']
-            search_space = self.config['search_space']
-            
-            # Count total parameter combinations
-            total_combinations = 1
-            for param, values in search_space.items():
-                if isinstance(values, list):
-                    total_combinations *= len(values)
-            
-            total_experiments = (
-                len(universe['pairs']) * 
-                len(universe['timeframes']) * 
-                len(universe['strategies']) * 
-                total_combinations
-            )
+            
+            total_experiments = sum(
+                self.parameter_space(strategy_name).shard_count(self.shard_index, self.shard_count)
+                for strategy_name in universe['strategies']
+            ) * len(universe['pairs']) * len(universe['timeframes'])
             
             self.total_experiments = total_experiments
-            self.logger.info(f"📊 Total experiments to run: {total_experiments:,}")
+            self.logger.info(f"📊 Total experiments to run: {total_experiments:,} "
+                             f"(shard {self.shard_index + 1}/{self.shard_count})")
             
             # Run experiments with job interleaving
             run_root = Path(self.config['meta']['results_dir']) / datetime.now().strftime("%Y-%m-%d")
@@ -571,47 +632,17 @@ class UltimateStrategySearchController:
             jobs = list(itertools.product(universe['pairs'], universe['timeframes'], universe['strategies']))
             random.shuffle(jobs)
             
-            for pair, tf, strategy_name in jobs:
-                self.logger.info(f"🎯 Processing {pair} {tf} {strategy_name}")
-                
-                # Generate parameter combinations
-                param_combinations = list(self.product_dict(search_space))
+            executor = make_search_executor(self.executor_settings)
+            self.logger.info(f"⚙️ Executor: {executor.name}")
+            if executor.name != 'serial' and self.executor_settings.get('preload_datasets', True):
+                self.preload_histories(universe['pairs'], universe['timeframes'])
+            
+            for outcome in executor.run(self, self._iter_experiments(jobs)):
+                best_configs = self._record_outcome(outcome, best_configs)
                 
-                for params in param_combinations:
-                    # Skip invalid parameter combinations
-                    if self._is_invalid_params(params):
-                        continue
-                    
-                    # Generate run ID and log parameters
-                    run_id = config_hash(pair, tf, strategy_name, params)
-                    self.logger.info(f"[RUN] {pair} {tf} {strategy_name} {run_id} params={params}")
-                    
-                    # Run experiment
-                    result = self.run_single_experiment(pair, tf, strategy_name, params)
-                    
-                    if result:
-                        # Add observability data
-                        trades = result.get('trades', [])
-                        result['metrics']['trade_signature'] = trade_signature(trades)
-                        result['config_hash'] = run_id
-                        
-                        # Check selection criteria
-                        ok, reasons = passes_selection(result['metrics'], self.config['selection'], tf)
-                        result['metrics']['selected'] = bool(ok)
-                        result['metrics']['rejected_by'] = reasons
-                        
-                        best_configs.append(result)
-                        
-                        # Keep only top 10 configs
-                        best_configs.sort(
-                            key=lambda x: x['metrics'].get('oos_sharpe', 0), 
-                            reverse=True
-                        )
-                        best_configs = best_configs[:10]
-                    
-                    # Progress update
-                    progress = (self.completed_experiments / self.total_experiments) * 100
-                    self.logger.info(f"📈 Progress: {progress:.1f}% ({self.completed_experiments}/{self.total_experiments})")
+                # Progress update
+                progress = (self.completed_experiments / self.total_experiments) * 100
+                self.logger.info(f"📈 Progress: {progress:.1f}% ({self.completed_experiments}/{self.total_experiments})")
             
             # Save final results
             self._save_final_results(run_root, best_configs)
@@ -622,20 +653,56 @@ class UltimateStrategySearchController:
         except Exception as e:
             self.logger.error(f"❌ Comprehensive search failed: {e}")
             self.logger.error(traceback.format_exc())
+        finally:
+            self.wfo_pool.shutdown()
     
-    def _is_invalid_params(self, params: Dict[str, Any]) -> bool:
-        """Check if parameter combination is invalid"""
-        # EMA fast must be less than EMA slow
-        if 'ema_fast' in params and 'ema_slow' in params:
-            if params['ema_fast'] >= params['ema_slow']:
-                return True
+    def _iter_experiments(self, jobs: List[Tuple[str, str, str]]) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+        """This shard's experiments, job by job, generated lazily"""
+        for pair, tf, strategy_name in jobs:
+            self.logger.info(f"🎯 Processing {pair} {tf} {strategy_name}")
+            
+            # Valid parameter combinations of this strategy, generated lazily
+            space = self.parameter_space(strategy_name)
+            
+            for params in space.shard(self.shard_index, self.shard_count):
+                # Generate run ID and log parameters
+                run_id = config_hash(pair, tf, strategy_name, params)
+                self.logger.info(f"[RUN] {pair} {tf} {strategy_name} {run_id} params={params}")
+                yield pair, tf, strategy_name, params
+    
+    def _record_outcome(self, outcome: ExperimentOutcome, best_configs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge one experiment outcome (from any executor) and keep the top 10 configs"""
+        self.failures.extend(outcome.failures)
+        self.completed_experiments += outcome.completed
+        
+        result = outcome.summary
+        if not result:
+            return best_configs
+        
+        pair, tf, strategy_name, params = outcome.experiment
+        
+        # Add observability data
+        trades = result.get('trades', [])
+        result['metrics']['trade_signature'] = trade_signature(trades)
+        result['config_hash'] = config_hash(pair, tf, strategy_name, params)
+        
+        # Check selection criteria
+        ok, reasons = passes_selection(result['metrics'], self.config['selection'], tf)
+        result['metrics']['selected'] = bool(ok)
+        result['metrics']['rejected_by'] = reasons
         
-        # MACD fast must be less than MACD slow
-        if 'macd_fast' in params and 'macd_slow' in params:
-            if params['macd_fast'] >= params['macd_slow']:
-                return True
+        best_configs.append(result)
         
-        return False
+        # Keep only top 10 configs
+        best_configs.sort(
+            key=lambda x: x['metrics'].get('oos_sharpe', 0), 
+            reverse=True
+        )
+        return best_configs[:10]
+    
+    def _is_invalid_params(self, params: Dict[str, Any]) -> bool:
+        """Check if parameter combination is invalid (e.g. EMA/MACD fast >= slow)"""
+        return not satisfies_constraints(params)
     
     def _save_final_results(self, run_root: Path, best_configs: List[Dict[str, Any]]):
         """Save final results and summary"""
@@ -701,10 +768,39 @@ def main():
     parser = argparse.ArgumentParser(description='Ultimate Strategy Search Controller')
     parser.add_argument('--config', '-c', default='experiments.yaml', 
                        help='Path to configuration file (default: experiments.yaml)')
+    parser.add_argument('--shard-index', type=int, default=None,
+                       help='Run only this shard of every parameter space (0-based)')
+    parser.add_argument('--shard-count', type=int, default=None,
+                       help='Total number of shards the search is split into')
+    parser.add_argument('--executor', choices=['serial', 'process', 'multi_host'], default=None,
+                       help='Execution backend (default: executor.type from the config)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes on this host (default: executor.max_workers, else all cores)')
+    parser.add_argument('--worker', metavar='HOST:PORT', default=None,
+                       help='Run as a worker host for a multi_host coordinator at HOST:PORT')
     args = parser.parse_args()
     
     try:
+        if args.worker:
+            executor_settings = UltimateStrategySearchController(config_path=args.config).executor_settings
+            serve_search_worker(
+                args.worker,
+                authkey=search_authkey(executor_settings),
+                controller_cls=UltimateStrategySearchController,
+                processes=args.workers or executor_settings.get('max_workers'),
+                preload=executor_settings.get('preload_datasets', True)
+            )
+            return
+        
         controller = UltimateStrategySearchController(config_path=args.config)
+        if args.executor is not None:
+            controller.executor_settings['type'] = args.executor
+        if args.workers is not None:
+            controller.executor_settings['max_workers'] = args.workers
+        if args.shard_count is not None:
+            controller.shard_count = args.shard_count
+        if args.shard_index is not None:
+            controller.shard_index = args.shard_index
         controller.run_comprehensive_search()
     except KeyboardInterrupt:
         logger.info("🛑 Search interrupted by user")
@@ -5,12 +5,14 @@ This script cleans and prepares historical market data for backtesting.
 """
 
 import pandas as pd
-import numpy as np
 import os
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+import indicators
+from indicator_store import dataset_indicators
+
 class DataCleaner:
     def __init__(self, data_dir="data/historical/prices", output_dir="data/cleaned"):
         self.data_dir = data_dir
@@ -170,44 +172,47 @@ class DataCleaner:
         return df_cleaned
     
     def add_technical_indicators(self, df):
-        """Add basic technical indicators for analysis"""
+        """Add basic technical indicators for analysis (persisted in the indicator store)"""
         print("  Adding technical indicators...")
         
         df_enhanced = df.copy()
+        cached = dataset_indicators(df_enhanced, columns=('high', 'low', 'close'))
+        close = df_enhanced['close']
         
         # Simple Moving Averages
-        df_enhanced['sma_20'] = df_enhanced['close'].rolling(window=20).mean()
-        df_enhanced['sma_50'] = df_enhanced['close'].rolling(window=50).mean()
+        df_enhanced['sma_20'] = cached.series('sma', {'source': 'close', 'window': 20},
+                                              lambda: indicators.sma(close, 20))
+        df_enhanced['sma_50'] = cached.series('sma', {'source': 'close', 'window': 50},
+                                              lambda: indicators.sma(close, 50))
         
         # Exponential Moving Averages
-        df_enhanced['ema_12'] = df_enhanced['close'].ewm(span=12).mean()
-        df_enhanced['ema_26'] = df_enhanced['close'].ewm(span=26).mean()
+        df_enhanced['ema_12'] = cached.series('ema', {'source': 'close', 'span': 12, 'adjust': True},
+                                              lambda: indicators.ema(close, 12))
+        df_enhanced['ema_26'] = cached.series('ema', {'source': 'close', 'span': 26, 'adjust': True},
+                                              lambda: indicators.ema(close, 26))
         
         # RSI
-        delta = df_enhanced['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df_enhanced['rsi'] = 100 - (100 / (1 + rs))
+        df_enhanced['rsi'] = cached.series('rsi', {'period': 14, 'smoothing': 'sma'},
+                                           lambda: indicators.rsi(close, 14))
         
         # Bollinger Bands
-        df_enhanced['bb_middle'] = df_enhanced['close'].rolling(window=20).mean()
-        bb_std = df_enhanced['close'].rolling(window=20).std()
+        df_enhanced['bb_middle'] = df_enhanced['sma_20']
+        bb_std = cached.series('rolling_std', {'source': 'close', 'window': 20},
+                               lambda: indicators.rolling_std(close, 20))
         df_enhanced['bb_upper'] = df_enhanced['bb_middle'] + (bb_std * 2)
         df_enhanced['bb_lower'] = df_enhanced['bb_middle'] - (bb_std * 2)
         
         # MACD
         df_enhanced['macd'] = df_enhanced['ema_12'] - df_enhanced['ema_26']
-        df_enhanced['macd_signal'] = df_enhanced['macd'].ewm(span=9).mean()
+        df_enhanced['macd_signal'] = cached.series(
+            'macd_signal', {'fast': 12, 'slow': 26, 'signal': 9, 'adjust': True},
+            lambda: indicators.ema(df_enhanced['macd'], 9))
         df_enhanced['macd_histogram'] = df_enhanced['macd'] - df_enhanced['macd_signal']
         
         # ATR (Average True Range)
-        high_low = df_enhanced['high'] - df_enhanced['low']
-        high_close = np.abs(df_enhanced['high'] - df_enhanced['close'].shift())
-        low_close = np.abs(df_enhanced['low'] - df_enhanced['close'].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = np.max(ranges, axis=1)
-        df_enhanced['atr'] = true_range.rolling(14).mean()
+        df_enhanced['atr'] = cached.series(
+            'atr', {'period': 14, 'true_range': 'skip_nan'},
+            lambda: indicators.atr(df_enhanced['high'], df_enhanced['low'], close, 14))
         
         return df_enhanced
     
@@ -5,13 +5,14 @@ Fixes data quality issues and creates reliable datasets for backtesting
 """
 
 import pandas as pd
-import numpy as np
 import os
 import logging
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+import indicators
+
 class DataQualityEnhancer:
     def __init__(self, data_dir="data/historical/prices"):
         self.data_dir = data_dir
@@ -142,12 +143,7 @@ class DataQualityEnhancer:
     
     def _calculate_atr(self, df, period=14):
         """Calculate Average True Range"""
-        high_low = df['high'] - df['low']
-        high_close = np.abs(df['high'] - df['close'].shift())
-        low_close = np.abs(df['low'] - df['close'].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = np.max(ranges, axis=1)
-        return true_range.rolling(period).mean()
+        return pd.Series(indicators.atr(df['high'], df['low'], df['close'], period), index=df.index)
     
     def _is_major_session(self, timestamps):
         """Check if timestamp is during major trading session"""
@@ -26,6 +26,7 @@ from professional_backtesting_system import ProfessionalBacktestingSystem
 from multi_timeframe_backtesting_system import MultiTimeframeBacktestingSystem
 from advanced_validation_framework import AdvancedValidationFramework
 from risk_management_framework import RiskManagementFramework
+from strategy_cursor import strategy_cursor
 
 # Import strategies
 from strategies.ultra_strict_v3_strategy import UltraStrictV3Strategy
@@ -228,8 +229,21 @@ class DeepBacktestOptimizer:
             signals = []
             trades = []
             
+            # Indicators once for the whole dataset when the strategy supports it
+            cursor = None
+            if not hasattr(strategy, 'generate_signals'):
+                cursor = strategy_cursor(strategy, pair)
+                if cursor is not None:
+                    cursor.precompute(data)
+            
             # Simulate signal generation over time
             for i in range(50, len(data), 10):  # Every 10 bars
+                if cursor is not None:
+                    signal = cursor.signal_at(i)
+                    if signal and signal.get('signal') != 'NO_SIGNAL':
+                        signals.append(signal)
+                    continue
+                
                 current_data = data.iloc[:i+1]
                 
                 if hasattr(strategy, 'generate_signals'):
@@ -12,6 +12,8 @@ from datetime import datetime, timedelta
 import time
 import json
 
+import indicators
+
 class EfficientFuturesDownloader:
     def __init__(self):
         self.data_dir = Path("data/FUTURES_MASTER")
@@ -169,29 +171,11 @@ class EfficientFuturesDownloader:
     
     def _calculate_atr(self, df, period=14):
         """Calculate Average True Range"""
-        high = df['High']
-        low = df['Low']
-        close = df['Close']
-        
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=period).mean()
-        
-        return atr
+        return pd.Series(indicators.atr(df['High'], df['Low'], df['Close'], period), index=df.index)
     
     def _calculate_rsi(self, prices, period=14):
         """Calculate RSI"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+        return pd.Series(indicators.rsi(prices, period), index=prices.index)
     
     def download_all_instruments(self):
         """Download all instruments efficiently"""
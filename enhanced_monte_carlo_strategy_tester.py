@@ -17,6 +17,8 @@ from datetime import datetime
 import json
 from scipy import stats
 
+from mc_streaming import summarize
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -232,64 +234,57 @@ class EnhancedMonteCarloTester:
         
         return results
     
+    def _summarize_runs(self, returns, n_runs, method, block_size=10):
+        """Final return, Sharpe (where the returns vary) and max drawdown of each run, streamed in chunks"""
+        def run_metrics(paths, steps):
+            std = np.std(steps, axis=1)
+            varies = std > 0
+            return {
+                'final': paths[:, -1],
+                'sharpe': np.mean(steps, axis=1)[varies] / std[varies] * np.sqrt(252),
+                'max_dd': np.max(np.maximum.accumulate(paths, axis=1) - paths, axis=1),
+                'survived': (paths[:, -1] > 0).astype(float)
+            }
+        
+        # Seeded from the global state, so np.random.seed() still makes runs reproducible
+        seed = np.random.randint(0, 2**31 - 1)
+        return summarize(returns, n_runs, method, block=block_size, seed=seed, fan=False,
+                         base_metrics=False, extra_metrics=run_metrics)
+    
+    @staticmethod
+    def _mean_sharpe(summary):
+        sharpe = summary.metric('sharpe', percentiles=())
+        return sharpe['mean'] if sharpe['count'] else np.nan
+    
     def _mc_trade_shuffle(self, returns, n_runs):
         """Standard Monte Carlo: shuffle trades"""
-        final_returns = []
-        sharpe_ratios = []
-        max_dds = []
-        
-        for _ in range(n_runs):
-            shuffled = np.random.permutation(returns)
-            cum = np.cumsum(shuffled)
-            final_returns.append(cum[-1])
-            
-            if np.std(shuffled) > 0:
-                sharpe_ratios.append(np.mean(shuffled) / np.std(shuffled) * np.sqrt(252))
-            
-            peak = np.maximum.accumulate(cum)
-            dd = np.max(peak - cum)
-            max_dds.append(dd)
+        summary = self._summarize_runs(returns, n_runs, 'shuffle')
+        final_returns = summary.metric('final', percentiles=(5, 50, 95))
+        max_dds = summary.metric('max_dd', percentiles=(95,))
         
         return {
-            'survival_rate': np.mean(np.array(final_returns) > 0),
-            'mean_return': np.mean(final_returns),
-            'median_return': np.median(final_returns),
-            'std_return': np.std(final_returns),
-            'p5': np.percentile(final_returns, 5),
-            'p95': np.percentile(final_returns, 95),
-            'mean_sharpe': np.mean(sharpe_ratios),
-            'mean_dd': np.mean(max_dds),
-            'worst_dd_95': np.percentile(max_dds, 95)
+            'survival_rate': summary.metric('survived', percentiles=())['mean'],
+            'mean_return': final_returns['mean'],
+            'median_return': final_returns['p50'],
+            'std_return': final_returns['std'],
+            'p5': final_returns['p5'],
+            'p95': final_returns['p95'],
+            'mean_sharpe': self._mean_sharpe(summary),
+            'mean_dd': max_dds['mean'],
+            'worst_dd_95': max_dds['p95']
         }
     
-    def _mc_block_bootstrap(self, returns, n_runs, block_size=10):
-        """Block Bootstrap: preserves serial correlation"""
-        n_trades = len(returns)
-        n_blocks = int(np.ceil(n_trades / block_size))
-        
-        final_returns = []
-        sharpe_ratios = []
-        
-        for _ in range(n_runs):
-            bootstrapped = []
-            for _ in range(n_blocks):
-                start = np.random.randint(0, max(1, n_trades - block_size))
-                block = returns[start:start+block_size]
-                bootstrapped.extend(block)
-            
-            bootstrapped = bootstrapped[:n_trades]
-            cum = np.cumsum(bootstrapped)
-            final_returns.append(cum[-1])
-            
-            if np.std(bootstrapped) > 0:
-                sharpe_ratios.append(np.mean(bootstrapped) / np.std(bootstrapped) * np.sqrt(252))
+    def _mc_block_bootstrap(self, returns, n_runs, block_size=10, method='fixed'):
+        """Block Bootstrap: preserves serial correlation (mc_bootstrap: fixed, circular or stationary)"""
+        summary = self._summarize_runs(returns, n_runs, method, block_size)
+        final_returns = summary.metric('final', percentiles=(5, 95))
         
         return {
-            'survival_rate': np.mean(np.array(final_returns) > 0),
-            'mean_return': np.mean(final_returns),
-            'p5': np.percentile(final_returns, 5),
-            'p95': np.percentile(final_returns, 95),
-            'mean_sharpe': np.mean(sharpe_ratios)
+            'survival_rate': summary.metric('survived', percentiles=())['mean'],
+            'mean_return': final_returns['mean'],
+            'p5': final_returns['p5'],
+            'p95': final_returns['p95'],
+            'mean_sharpe': self._mean_sharpe(summary)
         }
     
     def _mc_parametric(self, returns, n_runs):
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+VECTORIZED EXIT RESOLVER
+One first-touch SL/TP/time-stop kernel shared by all backtesting engines
+
+Instead of walking forward bar by bar with df.iloc[i]['close'] for every
+trade, resolve_exits() takes arrays of entries and levels and scans forward
+in blocks of bars for ALL open trades at once:
+
+    exits = resolve_exits(entry_idx, direction, stop_loss, take_profit,
+                          high, low, close, max_bars=100)
+    exits.exit_idx, exits.exit_price, exits.reason
+
+Rules (per trade, scanning bars entry_idx+first_offset .. entry_idx+max_bars):
+- LONG:  stop if low <= stop_loss, target if high >= take_profit
+- SHORT: stop if high >= stop_loss, target if low <= take_profit
+- Stop and target on the same bar -> STOP_LOSS (conservative, same order
+  the engines always checked them)
+- SL/TP fill at the level; time stop / end of data fill at that bar's close
+
+Engines that historically triggered on the close only pass close as both
+high and low, which reproduces their previous results exactly.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+EXIT_STOP_LOSS = 1
+EXIT_TAKE_PROFIT = 2
+EXIT_TIME_STOP = 3
+EXIT_END_OF_DATA = 4
+
+EXIT_REASONS = {
+    EXIT_STOP_LOSS: 'STOP_LOSS',
+    EXIT_TAKE_PROFIT: 'TAKE_PROFIT',
+    EXIT_TIME_STOP: 'TIME_STOP',
+    EXIT_END_OF_DATA: 'END_OF_DATA',
+}
+
+# Upper bound on (trades x bars) elements materialised per block
+MAX_BLOCK_ELEMENTS = 4_000_000
+
+
+@dataclass
+class ExitResult:
+    """Per-trade exits, aligned with the entry arrays passed in"""
+    exit_idx: np.ndarray     # int64 bar position of the exit
+    exit_price: np.ndarray   # float64 fill price
+    reason: np.ndarray       # int8 EXIT_* code
+
+    def reason_names(self) -> np.ndarray:
+        """Reason codes as EXIT_REASONS strings"""
+        names = np.array([''] + [EXIT_REASONS[k] for k in sorted(EXIT_REASONS)], dtype=object)
+        return names[self.reason]
+
+
+def _as_float_array(values, n: int) -> np.ndarray:
+    arr = np.asarray(values, dtype=np.float64)
+    return np.broadcast_to(arr, (n,)) if arr.ndim == 0 else arr
+
+
+def resolve_exits(entry_idx, direction, stop_loss, take_profit,
+                  high, low, close,
+                  max_bars=None, first_offset: int = 1,
+                  block_size: int = 64) -> ExitResult:
+    """
+    Resolve first-touch exits for every trade at once.
+
+    Args:
+        entry_idx: bar positions of the entries (int array)
+        direction: +1 for LONG/BUY, -1 for SHORT/SELL (array or scalar)
+        stop_loss, take_profit: price levels (arrays or scalars, NaN = no level)
+        high, low, close: OHLC arrays of the dataset
+        max_bars: optional time stop in bars after entry (array or scalar)
+        first_offset: first bar checked, relative to entry (0 = entry bar itself)
+        block_size: bars scanned per pass; doubles for trades still open
+
+    Returns:
+        ExitResult aligned with entry_idx
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    entry_idx = np.asarray(entry_idx, dtype=np.int64)
+
+    n_trades = len(entry_idx)
+    n_bars = len(close)
+
+    direction = np.broadcast_to(np.asarray(direction, dtype=np.int8), (n_trades,))
+    stop_loss = _as_float_array(stop_loss, n_trades)
+    take_profit = _as_float_array(take_profit, n_trades)
+
+    # Last bar each trade may be held to (time stop or end of data)
+    last_bar = np.full(n_trades, n_bars - 1, dtype=np.int64)
+    if max_bars is not None:
+        horizon = entry_idx + np.broadcast_to(np.asarray(max_bars, dtype=np.int64), (n_trades,))
+        last_bar = np.minimum(last_bar, horizon)
+
+    exit_idx = last_bar.copy()
+    reason = np.where(last_bar < n_bars - 1, EXIT_TIME_STOP, EXIT_END_OF_DATA).astype(np.int8)
+
+    is_long = direction > 0
+    active = np.flatnonzero(entry_idx + first_offset <= last_bar)
+    start = entry_idx + first_offset
+    offsets_size = max(1, int(block_size))
+
+    while active.size:
+        offsets = np.arange(offsets_size, dtype=np.int64)
+        chunk = max(1, MAX_BLOCK_ELEMENTS // offsets_size)
+        still_open = []
+
+        for lo in range(0, active.size, chunk):
+            trades = active[lo:lo + chunk]
+            bars = start[trades, None] + offsets[None, :]
+            in_range = bars <= last_bar[trades, None]
+            bars = np.minimum(bars, n_bars - 1)
+
+            bar_high = high[bars]
+            bar_low = low[bars]
+            long_rows = is_long[trades, None]
+            sl = stop_loss[trades, None]
+            tp = take_profit[trades, None]
+
+            sl_hit = np.where(long_rows, bar_low <= sl, bar_high >= sl) & in_range
+            tp_hit = np.where(long_rows, bar_high >= tp, bar_low <= tp) & in_range
+            any_hit = sl_hit | tp_hit
+
+            hit_rows = any_hit.any(axis=1)
+            first = any_hit.argmax(axis=1)
+
+            hit_trades = trades[hit_rows]
+            hit_cols = first[hit_rows]
+            exit_idx[hit_trades] = bars[hit_rows, hit_cols]
+            reason[hit_trades] = np.where(sl_hit[hit_rows, hit_cols], EXIT_STOP_LOSS, EXIT_TAKE_PROFIT)
+
+            # Trades whose window still has bars left continue in the next pass
+            open_trades = trades[~hit_rows]
+            next_start = start[open_trades] + offsets_size
+            start[open_trades] = next_start
+            still_open.append(open_trades[next_start <= last_bar[open_trades]])
+
+        active = np.concatenate(still_open) if still_open else active[:0]
+        offsets_size = min(offsets_size * 2, 4096)
+
+    exit_price = close[exit_idx].copy()
+    sl_exits = reason == EXIT_STOP_LOSS
+    tp_exits = reason == EXIT_TAKE_PROFIT
+    exit_price[sl_exits] = stop_loss[sl_exits]
+    exit_price[tp_exits] = take_profit[tp_exits]
+
+    return ExitResult(exit_idx=exit_idx, exit_price=exit_price, reason=reason)
+
+
+def locate_entries(timestamps, entry_times) -> np.ndarray:
+    """
+    Bar positions of entry_times within timestamps (first match), -1 if absent.
+    Accepts a DatetimeIndex or a timestamp column.
+    """
+    index = pd.Index(timestamps)
+    positions = np.arange(len(index), dtype=np.int64)
+    if not index.is_unique:
+        keep = ~index.duplicated(keep='first')
+        index, positions = index[keep], positions[keep]
+
+    found = index.get_indexer(pd.Index(entry_times))
+    return np.where(found >= 0, positions[found], -1)
+
+
+def direction_sign(directions) -> np.ndarray:
+    """Map 'LONG'/'BUY' to +1 and 'SHORT'/'SELL' to -1"""
+    return np.array([1 if str(d).upper() in ('LONG', 'BUY') else -1 for d in directions], dtype=np.int8)
+
+
+def resolve_signal_exits(timestamps, signals: List[Dict[str, Any]], high, low, close,
+                         direction_key: str = 'direction',
+                         max_bars=None) -> List[Optional[Tuple[int, float, str]]]:
+    """
+    Engine-facing wrapper: resolve exits for a list of signal dicts
+    (timestamp, stop_loss, take_profit, direction_key).
+
+    Returns one (exit_idx, exit_price, reason_name) per signal, or None when
+    the signal's timestamp is not in the data.
+    """
+    results: List[Optional[Tuple[int, float, str]]] = [None] * len(signals)
+    if not signals:
+        return results
+
+    entry_idx = locate_entries(timestamps, [s['timestamp'] for s in signals])
+    found = np.flatnonzero(entry_idx >= 0)
+    if not found.size:
+        return results
+
+    picked = [signals[k] for k in found]
+    exits = resolve_exits(
+        entry_idx[found],
+        direction_sign([s[direction_key] for s in picked]),
+        np.array([s['stop_loss'] for s in picked], dtype=np.float64),
+        np.array([s['take_profit'] for s in picked], dtype=np.float64),
+        high, low, close,
+        max_bars=max_bars,
+    )
+
+    for k, idx, price, name in zip(found, exits.exit_idx, exits.exit_price, exits.reason_names()):
+        results[k] = (int(idx), float(price), name)
+    return results
@@ -4,7 +4,7 @@ HIGH-PERFORMANCE MONTE CARLO ANALYZER
 Optimized for AMD 5950X, RTX 3080, 64GB RAM, NVMe Storage
 
 Features:
-- Multi-threaded simulations
+- Multi-process simulations (reproducible SeedSequence streams per task)
 - GPU acceleration where available
 - Memory-optimized data structures
 - Parallel processing of results
@@ -18,12 +18,19 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime
 import logging
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, Any, Tuple, Optional
 import multiprocessing as mp
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
 import threading
 import time
 
+from mc_engine import relative_metrics
+from mc_parallel import parallel_summarize, task_paths, task_seeds
+from mc_streaming import DEFAULT_PERCENTILES, use_streaming
+
+# Rows each worker's fan-band sketch is compressed to in streaming mode
+FAN_CAPACITY = 256
+
 # Setup logging
 log_filename = f"monte_carlo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
 logging.basicConfig(
@@ -66,7 +73,7 @@ class HighPerformanceMonteCarlo:
         
         logger.info(f"HIGH-PERFORMANCE MONTE CARLO INITIALIZED")
         logger.info(f"System: {self.system_specs['cpu_cores']} cores | {self.system_specs['ram_gb']}GB RAM | GPU: {self.system_specs['gpu_available']}")
-        logger.info(f"Optimal Workers: {self.optimal_workers['cpu_workers']} CPU threads | Batch size: {self.optimal_workers['mc_batch_size']}")
+        logger.info(f"Optimal Workers: {self.optimal_workers['cpu_workers']} CPU processes | Batch size: {self.optimal_workers['mc_batch_size']}")
     
     def _get_system_specs(self) -> Dict[str, Any]:
         """Get system specifications for optimal performance"""
@@ -122,8 +129,8 @@ class HighPerformanceMonteCarlo:
         gpu_available = self.system_specs['gpu_available']
         gpu_memory_gb = self.system_specs['gpu_memory_gb']
         
-        # Use ~85% of available cores for workers
-        cpu_workers = max(8, int(cpu_cores * 0.85))
+        # Use ~85% of available cores for workers; they are processes, so never more than the host has
+        cpu_workers = min(max(8, int(cpu_cores * 0.85)), os.cpu_count() or 1)
         
         # Determine optimal batch size for Monte Carlo simulations
         if gpu_available and gpu_memory_gb > 6:
@@ -209,57 +216,12 @@ class HighPerformanceMonteCarlo:
             logger.error(f"Error preparing returns data: {e}")
             raise
     
-    def _mc_trade_shuffle_parallel_cpu(self, returns: np.ndarray, runs: int, seed: int) -> List[np.ndarray]:
-        """Run Monte Carlo trade shuffling simulations in parallel on CPU"""
+    def _mc_trade_shuffle_parallel_cpu(self, returns: np.ndarray, runs: int, seed: int) -> np.ndarray:
+        """Trade shuffling paths on CPU, drawn from the same SeedSequence task streams as the process backend"""
         logger.info(f"Running {runs} Monte Carlo trade shuffling simulations on CPU")
-        n_trades = len(returns)
-        
-        # Generate all random permutations at once
-        batch_size = self.optimal_workers['mc_batch_size']
-        n_batches = (runs + batch_size - 1) // batch_size
-        
-        results = []
-        rng = np.random.RandomState(seed)
-        
-        with ThreadPoolExecutor(max_workers=self.optimal_workers['cpu_workers']) as executor:
-            future_to_batch = {}
-            
-            for batch_idx in range(n_batches):
-                batch_runs = min(batch_size, runs - batch_idx * batch_size)
-                if batch_runs <= 0:
-                    break
-                
-                batch_seed = seed + batch_idx
-                future = executor.submit(
-                    self._run_mc_batch, returns, batch_runs, batch_seed
-                )
-                future_to_batch[future] = batch_idx
-            
-            completed = 0
-            for future in future_to_batch:
-                batch_results = future.result()
-                results.extend(batch_results)
-                
-                completed += len(batch_results)
-                if completed % (runs // 10) < batch_size:
-                    logger.info(f"Monte Carlo progress: {completed}/{runs} simulations ({completed/runs*100:.1f}%)")
-        
-        return results
+        return task_paths(returns, runs, method='shuffle', seed=seed)
     
-    def _run_mc_batch(self, returns: np.ndarray, n_runs: int, seed: int) -> List[np.ndarray]:
-        """Run a batch of Monte Carlo simulations"""
-        n_trades = len(returns)
-        rng = np.random.RandomState(seed)
-        results = []
-        
-        for _ in range(n_runs):
-            idx = rng.permutation(n_trades)
-            shuffled_returns = returns[idx]
-            results.append(np.cumsum(shuffled_returns))
-        
-        return results
-    
-    def _mc_trade_shuffle_gpu(self, returns: np.ndarray, runs: int, seed: int) -> List[np.ndarray]:
+    def _mc_trade_shuffle_gpu(self, returns: np.ndarray, runs: int, seed: int) -> np.ndarray:
         """Run Monte Carlo trade shuffling simulations on GPU (if available)"""
         if not HAS_GPU:
             logger.warning("GPU acceleration requested but not available, falling back to CPU")
@@ -276,104 +238,56 @@ class HighPerformanceMonteCarlo:
             n_batches = (runs + batch_size - 1) // batch_size
             
             all_paths = []
+            batch_seeds = task_seeds(seed, n_batches)
             
             for batch_idx in range(n_batches):
                 batch_runs = min(batch_size, runs - batch_idx * batch_size)
                 if batch_runs <= 0:
                     break
                 
-                # Create random permutations on GPU
-                cp.random.seed(seed + batch_idx)
-                
-                # Process one simulation at a time to avoid memory issues
-                batch_paths = []
-                for i in range(batch_runs):
-                    idx = cp.random.permutation(n_trades)
-                    shuffled_returns = returns_gpu[idx]
-                    cum_returns = cp.cumsum(shuffled_returns)
-                    # Move result back to CPU
-                    batch_paths.append(cp.asnumpy(cum_returns))
+                # Create random permutations on GPU (independent stream per batch)
+                cp.random.seed(int(batch_seeds[batch_idx].generate_state(1)[0]))
                 
-                all_paths.extend(batch_paths)
+                # Whole batch as one (runs x trades) matrix: row-wise permutations by argsort
+                idx = cp.argsort(cp.random.random((batch_runs, n_trades)), axis=1)
+                cum_returns = cp.cumsum(returns_gpu[idx], axis=1)
+                # Move result back to CPU
+                all_paths.append(cp.asnumpy(cum_returns))
                 
+                completed = batch_idx * batch_size + batch_runs
                 if batch_idx % max(1, n_batches // 10) == 0:
-                    logger.info(f"GPU Monte Carlo progress: {len(all_paths)}/{runs} simulations ({len(all_paths)/runs*100:.1f}%)")
+                    logger.info(f"GPU Monte Carlo progress: {completed}/{runs} simulations ({completed/runs*100:.1f}%)")
             
-            return all_paths
+            return np.vstack(all_paths) if all_paths else np.empty((0, n_trades))
             
         except Exception as e:
             logger.error(f"Error running GPU Monte Carlo: {e}")
             logger.warning("Falling back to CPU implementation")
             return self._mc_trade_shuffle_parallel_cpu(returns, runs, seed)
     
-    def _mc_block_bootstrap_parallel(self, returns: np.ndarray, runs: int, block_size: int, seed: int) -> List[np.ndarray]:
-        """Run block bootstrap Monte Carlo simulations in parallel"""
-        logger.info(f"Running {runs} block bootstrap Monte Carlo simulations (block size: {block_size})")
-        n_trades = len(returns)
-        n_blocks = int(np.ceil(n_trades / block_size))
-        
-        # Generate all simulations in batches
-        batch_size = self.optimal_workers['mc_batch_size']
-        n_batches = (runs + batch_size - 1) // batch_size
-        
-        results = []
-        
-        with ThreadPoolExecutor(max_workers=self.optimal_workers['cpu_workers']) as executor:
-            future_to_batch = {}
-            
-            for batch_idx in range(n_batches):
-                batch_runs = min(batch_size, runs - batch_idx * batch_size)
-                if batch_runs <= 0:
-                    break
-                
-                batch_seed = seed + batch_idx
-                future = executor.submit(
-                    self._run_block_bootstrap_batch, 
-                    returns, batch_runs, block_size, n_trades, batch_seed
-                )
-                future_to_batch[future] = batch_idx
-            
-            completed = 0
-            for future in future_to_batch:
-                batch_results = future.result()
-                results.extend(batch_results)
-                
-                completed += len(batch_results)
-                if completed % (runs // 10) < batch_size:
-                    logger.info(f"Block bootstrap progress: {completed}/{runs} simulations ({completed/runs*100:.1f}%)")
-        
-        return results
-    
-    def _run_block_bootstrap_batch(self, returns: np.ndarray, n_runs: int, block_size: int, n_trades: int, seed: int) -> List[np.ndarray]:
-        """Run a batch of block bootstrap simulations"""
-        rng = np.random.RandomState(seed)
-        results = []
-        n_blocks = int(np.ceil(n_trades / block_size))
-        
-        for _ in range(n_runs):
-            bootstrapped_returns = []
-            for _ in range(n_blocks):
-                # Select a random starting point for the block
-                start = rng.randint(0, max(1, n_trades - block_size))
-                # Add the block to bootstrapped returns
-                block = returns[start:start+block_size]
-                bootstrapped_returns.extend(block)
-            
-            # Trim to original length
-            bootstrapped_returns = bootstrapped_returns[:n_trades]
-            results.append(np.cumsum(np.array(bootstrapped_returns)))
-        
-        return results
-    
     def run_monte_carlo_simulations(
         self, 
         returns: np.ndarray, 
         runs: int = 1000, 
         block_size: int = 10, 
-        seed: int = 42
+        seed: int = 42,
+        streaming: Optional[bool] = None
     ) -> Dict[str, Any]:
-        """Run multiple types of Monte Carlo simulations"""
-        logger.info(f"Running {runs} Monte Carlo simulations with seed {seed}")
+        """
+        Run multiple types of Monte Carlo simulations
+        
+        CPU simulations run on the mc_parallel process backend: each worker
+        returns summaries of its SeedSequence task stream, so a seed gives the
+        same results for any worker count. Without streaming the per-run
+        metrics are exact; with it (None: when all paths would exceed
+        MC_MEMORY_MB) they are bounded by the memory ceiling. The 5/95% path
+        bands follow the same split: exact without streaming, from
+        FAN_CAPACITY-row sketches per worker with it; percentiles and bands
+        carry the 'rank_error' / 'fan_rank_error' bounds of mc_streaming
+        """
+        streaming = use_streaming(runs, len(returns), streaming)
+        logger.info(f"Running {runs} Monte Carlo simulations with seed {seed}"
+                    f"{' (streaming summaries)' if streaming else ''}")
         
         results = {
             'timestamp': datetime.now().isoformat(),
@@ -381,6 +295,7 @@ class HighPerformanceMonteCarlo:
             'runs': runs,
             'block_size': block_size,
             'seed': seed,
+            'streaming': streaming,
             'original_returns': {
                 'mean': float(np.mean(returns)),
                 'std': float(np.std(returns)),
@@ -400,29 +315,30 @@ class HighPerformanceMonteCarlo:
         shuffle_start = time.time()
         logger.info("Running standard trade shuffle Monte Carlo...")
         
-        if self.optimal_workers['use_gpu_for_mc']:
+        if self.optimal_workers['use_gpu_for_mc'] and not streaming:
             shuffle_paths = self._mc_trade_shuffle_gpu(returns, runs, seed)
+            
+            # Calculate statistics from shuffle paths
+            shuffle_metrics = self._calculate_mc_metrics(shuffle_paths, returns)
         else:
-            shuffle_paths = self._mc_trade_shuffle_parallel_cpu(returns, runs, seed)
+            shuffle_metrics = self._calculate_mc_metrics_parallel(
+                returns, runs, 'shuffle', block_size, seed, exact=not streaming
+            )
         
         shuffle_end = time.time()
         logger.info(f"Trade shuffle Monte Carlo completed in {shuffle_end - shuffle_start:.2f} seconds")
-        
-        # Calculate statistics from shuffle paths
-        shuffle_metrics = self._calculate_mc_metrics(shuffle_paths, returns)
         results['trade_shuffle_mc'] = shuffle_metrics
         
         # Run block bootstrap Monte Carlo
         bootstrap_start = time.time()
         logger.info("Running block bootstrap Monte Carlo...")
         
-        bootstrap_paths = self._mc_block_bootstrap_parallel(returns, runs, block_size, seed)
+        bootstrap_metrics = self._calculate_mc_metrics_parallel(
+            returns, runs, 'block', block_size, seed, exact=not streaming
+        )
         
         bootstrap_end = time.time()
         logger.info(f"Block bootstrap Monte Carlo completed in {bootstrap_end - bootstrap_start:.2f} seconds")
-        
-        # Calculate statistics from bootstrap paths
-        bootstrap_metrics = self._calculate_mc_metrics(bootstrap_paths, returns)
         results['block_bootstrap_mc'] = bootstrap_metrics
         
         # Calculate performance metrics
@@ -450,38 +366,29 @@ class HighPerformanceMonteCarlo:
         
         return results
     
-    def _calculate_mc_metrics(self, paths: List[np.ndarray], original_returns: np.ndarray) -> Dict[str, Any]:
-        """Calculate metrics from Monte Carlo paths"""
-        # Extract final returns
-        final_returns = np.array([path[-1] for path in paths])
-        
-        # Calculate Sharpe ratios
-        sharpe_ratios = np.array([
-            np.mean(path[1:] - path[:-1]) / np.std(path[1:] - path[:-1])
-            if len(path) > 1 and np.std(path[1:] - path[:-1]) > 0 else 0
-            for path in paths
-        ])
-        
-        # Calculate maximum drawdowns
-        max_drawdowns = np.array([self._calculate_max_drawdown(path) for path in paths])
-        
-        # Calculate percentiles
-        return_percentiles = np.percentile(final_returns, [1, 5, 10, 25, 50, 75, 90, 95, 99])
-        sharpe_percentiles = np.percentile(sharpe_ratios, [1, 5, 10, 25, 50, 75, 90, 95, 99])
-        drawdown_percentiles = np.percentile(max_drawdowns, [1, 5, 10, 25, 50, 75, 90, 95, 99])
+    def _path_statistics(self, paths: np.ndarray) -> Dict[str, np.ndarray]:
+        """Final return, Sharpe ratio and max drawdown of every row of a (runs x trades) path matrix"""
+        stats = relative_metrics(np.asarray(paths, dtype=float))
+        stats.pop('profitable')
+        return stats
+    
+    @staticmethod
+    def _percentile_dict(values: np.ndarray) -> Dict[str, float]:
+        return {f'p{p}': float(v) for p, v in zip(DEFAULT_PERCENTILES, values)}
+    
+    def _calculate_mc_metrics(self, paths: np.ndarray, original_returns: np.ndarray) -> Dict[str, Any]:
+        """Calculate metrics from a (runs x trades) Monte Carlo path matrix, column-wise"""
+        paths = np.asarray(paths, dtype=float)
+        stats = self._path_statistics(paths)
+        final_returns = stats['final']
+        sharpe_ratios = stats['sharpe']
+        max_drawdowns = stats['max_dd']
         
         # Calculate survival rate (% of simulations with positive returns)
         survival_rate = np.mean(final_returns > 0) * 100
         
         # Calculate average path and confidence bands
-        def get_path_length(p):
-            return len(p)
-        
-        min_length = min(map(get_path_length, paths))
-        path_matrix = np.zeros((len(paths), min_length))
-        
-        for i, path in enumerate(paths):
-            path_matrix[i, :] = path[:min_length]
+        path_matrix = paths
         
         mean_path = np.mean(path_matrix, axis=0)
         lower_5pct = np.percentile(path_matrix, 5, axis=0)
@@ -497,56 +404,58 @@ class HighPerformanceMonteCarlo:
             'max_drawdown_mean': float(np.mean(max_drawdowns)),
             'max_drawdown_std': float(np.std(max_drawdowns)),
             'survival_rate': float(survival_rate),
-            'return_percentiles': {
-                'p1': float(return_percentiles[0]),
-                'p5': float(return_percentiles[1]),
-                'p10': float(return_percentiles[2]),
-                'p25': float(return_percentiles[3]),
-                'p50': float(return_percentiles[4]),
-                'p75': float(return_percentiles[5]),
-                'p90': float(return_percentiles[6]),
-                'p95': float(return_percentiles[7]),
-                'p99': float(return_percentiles[8])
-            },
-            'sharpe_percentiles': {
-                'p1': float(sharpe_percentiles[0]),
-                'p5': float(sharpe_percentiles[1]),
-                'p10': float(sharpe_percentiles[2]),
-                'p25': float(sharpe_percentiles[3]),
-                'p50': float(sharpe_percentiles[4]),
-                'p75': float(sharpe_percentiles[5]),
-                'p90': float(sharpe_percentiles[6]),
-                'p95': float(sharpe_percentiles[7]),
-                'p99': float(sharpe_percentiles[8])
-            },
-            'drawdown_percentiles': {
-                'p1': float(drawdown_percentiles[0]),
-                'p5': float(drawdown_percentiles[1]),
-                'p10': float(drawdown_percentiles[2]),
-                'p25': float(drawdown_percentiles[3]),
-                'p50': float(drawdown_percentiles[4]),
-                'p75': float(drawdown_percentiles[5]),
-                'p90': float(drawdown_percentiles[6]),
-                'p95': float(drawdown_percentiles[7]),
-                'p99': float(drawdown_percentiles[8])
-            },
+            'return_percentiles': self._percentile_dict(np.percentile(final_returns, DEFAULT_PERCENTILES)),
+            'sharpe_percentiles': self._percentile_dict(np.percentile(sharpe_ratios, DEFAULT_PERCENTILES)),
+            'drawdown_percentiles': self._percentile_dict(np.percentile(max_drawdowns, DEFAULT_PERCENTILES)),
             'mean_path': mean_path.tolist(),
             'lower_5pct_path': lower_5pct.tolist(),
             'upper_95pct_path': upper_95pct.tolist()
         }
     
-    def _calculate_max_drawdown(self, returns: np.ndarray) -> float:
-        """Calculate maximum drawdown from cumulative returns"""
-        peak = returns[0]
-        max_dd = 0
-        
-        for value in returns:
-            if value > peak:
-                peak = value
-            dd = (peak - value) / peak if peak > 0 else 0
-            max_dd = max(max_dd, dd)
-        
-        return max_dd
+    def _calculate_mc_metrics_parallel(
+        self, 
+        returns: np.ndarray, 
+        runs: int, 
+        method: str, 
+        block_size: int, 
+        seed: int, 
+        exact: bool = True
+    ) -> Dict[str, Any]:
+        """_calculate_mc_metrics from per-worker summaries (moments + quantile sketches), no paths kept"""
+        summary = parallel_summarize(
+            returns, runs, method, block=block_size, seed=seed, 
+            workers=self.optimal_workers['cpu_workers'], statistics=relative_metrics, exact=exact,
+            fan_capacity=None if exact else FAN_CAPACITY
+        )
+        final_returns = summary.metric('final')
+        sharpe_ratios = summary.metric('sharpe')
+        max_drawdowns = summary.metric('max_dd')
+        bands = summary.fan((5, 95))
+        logger.info(f"Summarized {summary.count} {method} paths "
+                    f"(quantile rank error <= {summary.rank_error:.2e})")
+        
+        def percentiles(metric: Dict[str, float]) -> Dict[str, float]:
+            return {f'p{p}': metric[f'p{p}'] for p in DEFAULT_PERCENTILES}
+        
+        return {
+            'returns_mean': final_returns['mean'],
+            'returns_std': final_returns['std'],
+            'returns_min': final_returns['min'],
+            'returns_max': final_returns['max'],
+            'sharpe_mean': sharpe_ratios['mean'],
+            'sharpe_std': sharpe_ratios['std'],
+            'max_drawdown_mean': max_drawdowns['mean'],
+            'max_drawdown_std': max_drawdowns['std'],
+            'survival_rate': summary.metric('profitable', percentiles=())['mean'] * 100,
+            'return_percentiles': percentiles(final_returns),
+            'sharpe_percentiles': percentiles(sharpe_ratios),
+            'drawdown_percentiles': percentiles(max_drawdowns),
+            'mean_path': bands['mean'].tolist(),
+            'lower_5pct_path': bands['p5'].tolist(),
+            'upper_95pct_path': bands['p95'].tolist(),
+            'rank_error': summary.rank_error,
+            'fan_rank_error': summary.path_sketch.rank_error
+        }
     
     def _generate_report(self, results: Dict[str, Any]) -> None:
         """Generate human-readable report from Monte Carlo results"""
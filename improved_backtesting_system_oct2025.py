@@ -32,6 +32,10 @@ from enum import Enum
 import warnings
 warnings.filterwarnings('ignore')
 
+import indicators
+from indicator_store import dataset_indicators
+from news_blackout import BlackoutIndex, news_multiplier
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -223,6 +227,55 @@ class DynamicSpreadModel:
         final_spread = base_spread * session_mult * volatility_mult * news_mult
         
         return final_spread
+    
+    def session_codes(self, timestamps) -> np.ndarray:
+        """get_session for many UTC timestamps: positions in list(TradingSession)"""
+        times = pd.DatetimeIndex(timestamps)
+        hour = times.hour.to_numpy()
+        sessions = list(TradingSession)
+        rules = [
+            (times.weekday.to_numpy() >= 5, TradingSession.WEEKEND),
+            ((13 <= hour) & (hour < 16), TradingSession.LONDON_NY_OVERLAP),
+            ((7 <= hour) & (hour < 16), TradingSession.LONDON),
+            ((13 <= hour) & (hour < 22), TradingSession.NY),
+            ((0 <= hour) & (hour < 9), TradingSession.ASIAN),
+        ]
+        return np.select([mask for mask, _ in rules], [sessions.index(s) for _, s in rules],
+                         default=sessions.index(TradingSession.OFF_HOURS))
+    
+    def spread_series(self,
+                      instrument: str,
+                      timestamps,
+                      volatility=None,
+                      news_events: Optional[List] = None) -> np.ndarray:
+        """
+        get_spread for a whole bar index in one vectorized pass
+        
+        Args:
+            instrument: e.g., 'EUR_USD', 'XAU_USD'
+            timestamps: UTC bar times (DatetimeIndex or array-like)
+            volatility: None, a scalar, or one value per bar
+            news_events: Events as accepted by get_spread (optional)
+        
+        Returns:
+            Spread in pips per bar (float array aligned with timestamps)
+        """
+        base_spread = self.base_spreads.get(instrument, 1.0)
+        
+        session_mults = np.array([self.session_multipliers.get(s, np.nan) for s in TradingSession])
+        session_mult = session_mults[self.session_codes(timestamps)]
+        
+        volatility_mult = 1.0
+        if volatility is not None:
+            volatility_mult = 1.0 + (np.asarray(volatility, dtype=np.float64) * 1000)
+        
+        # Largest impact multiplier within 30 minutes of each bar
+        levels = {'high': 5.0, 'medium': 2.0}
+        events = [(event.timestamp, levels[event.impact])
+                  for event in (news_events or []) if event.impact in levels]
+        news_mult = news_multiplier(timestamps, events, 1800)
+        
+        return base_spread * session_mult * volatility_mult * news_mult
 
 
 # ============================================================================
@@ -241,8 +294,7 @@ class TimeframeAnalyzer:
         if len(prices) < period:
             return prices.iloc[-1] if len(prices) > 0 else 0.0
         
-        ema = prices.ewm(span=period, adjust=False).mean()
-        return float(ema.iloc[-1])
+        return indicators.ema_last(prices, period, adjust=False)
     
     def get_higher_timeframe_trend(self, 
                                     df: pd.DataFrame,
@@ -303,29 +355,45 @@ class NewsIntegration:
         ]
         self.pause_before_minutes = 30
         self.pause_after_minutes = 30
+        
+        # Bumped by invalidate(); cached blackout indexes are rebuilt
+        self.events_version = 0
+        # (instrument, before, after) -> (event list, its length, events_version, BlackoutIndex)
+        self._blackout_indexes = {}
+    
+    def invalidate(self):
+        """Call after replacing or editing events in place in a list already passed in"""
+        self.events_version += 1
+    
+    def blackout_index(self, instrument: str, news_events: List[NewsEvent]) -> BlackoutIndex:
+        """
+        Merged pause windows of the high-impact events affecting instrument.
+        Built once per event list; rebuilt for another list, a new length or
+        after invalidate().
+        """
+        key = (instrument, self.pause_before_minutes, self.pause_after_minutes)
+        cached = self._blackout_indexes.get(key)
+        if (cached is not None and cached[0] is news_events and cached[1] == len(news_events)
+                and cached[2] == self.events_version):
+            return cached[3]
+        
+        times = [event.timestamp for event in news_events
+                 if event.impact == 'high' and self._affects_instrument(event, instrument)]
+        # Pause 30 min before and after
+        index = BlackoutIndex.from_times(times, self.pause_before_minutes * 60, self.pause_after_minutes * 60)
+        self._blackout_indexes[key] = (news_events, len(news_events), self.events_version, index)
+        return index
     
     def should_pause_trading(self, 
                             timestamp: datetime,
                             instrument: str,
                             news_events: List[NewsEvent]) -> bool:
         """Check if trading should be paused due to news"""
-        for event in news_events:
-            # Check if event is high impact
-            if event.impact != 'high':
-                continue
-            
-            # Check if event affects this instrument
-            if not self._affects_instrument(event, instrument):
-                continue
-            
-            # Check time proximity
-            time_to_event = (event.timestamp - timestamp).total_seconds()
-            
-            # Pause 30 min before and after
-            if -self.pause_after_minutes * 60 <= time_to_event <= self.pause_before_minutes * 60:
-                return True
-        
-        return False
+        return self.blackout_index(instrument, news_events).contains(timestamp)
+    
+    def pause_mask(self, timestamps, instrument: str, news_events: List[NewsEvent]) -> np.ndarray:
+        """should_pause_trading for every timestamp of a bar index at once"""
+        return self.blackout_index(instrument, news_events).mask(timestamps)
     
     def _affects_instrument(self, event: NewsEvent, instrument: str) -> bool:
         """Check if news event affects instrument"""
@@ -580,6 +648,15 @@ class ImprovedBacktestingSystem:
         if htf_df is not None:
             htf_df = self._calculate_indicators(htf_df)
         
+        # News pauses, sessions and spreads for every bar in one pass
+        instrument = self._get_instrument_from_df(df)
+        news_paused = self.news_integration.pause_mask(df.index, instrument, news_events)
+        sessions = list(TradingSession)
+        session_codes = self.spread_model.session_codes(df.index)
+        atr = df['atr'] if 'atr' in df.columns else 0
+        spreads = self.spread_model.spread_series(instrument, df.index, volatility=atr / df['close'],
+                                                  news_events=news_events)
+        
         # Run simulation
         for i in range(100, len(df)):  # Start after indicators ready
             current_time = df.index[i]
@@ -589,12 +666,11 @@ class ImprovedBacktestingSystem:
             self._update_open_positions(current_bar, current_time)
             
             # Check for news pause
-            instrument = self._get_instrument_from_df(df)
-            if self.news_integration.should_pause_trading(current_time, instrument, news_events):
+            if news_paused[i]:
                 continue
             
             # Check session filter
-            session = self.spread_model.get_session(current_time)
+            session = sessions[session_codes[i]]
             if not self.session_filter.should_trade_session(strategy_name, session):
                 continue
             
@@ -605,7 +681,9 @@ class ImprovedBacktestingSystem:
                 index=i,
                 htf_df=htf_df,
                 news_events=news_events,
-                current_time=current_time
+                current_time=current_time,
+                session=session,
+                spread=spreads[i]
             )
             
             if signal and signal.quality_score >= self.config.get('min_signal_quality', 60):
@@ -626,35 +704,37 @@ class ImprovedBacktestingSystem:
         return self.results
     
     def _calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Calculate technical indicators"""
+        """Calculate technical indicators (persisted in the indicator store)"""
+        cached = dataset_indicators(df, columns=('high', 'low', 'close'))
+        close = df['close']
+        
+        def ema(span):
+            return cached.series('ema', {'source': 'close', 'span': span, 'adjust': False},
+                                 lambda: indicators.ema(close, span, adjust=False))
+        
         # EMAs
-        df['ema_3'] = df['close'].ewm(span=3, adjust=False).mean()
-        df['ema_8'] = df['close'].ewm(span=8, adjust=False).mean()
-        df['ema_21'] = df['close'].ewm(span=21, adjust=False).mean()
-        df['ema_50'] = df['close'].ewm(span=50, adjust=False).mean()
+        for span in (3, 8, 21, 50):
+            df[f'ema_{span}'] = ema(span)
         
         # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
+        df['rsi'] = cached.series('rsi', {'period': 14, 'smoothing': 'sma'},
+                                  lambda: indicators.rsi(close, 14))
         
         # MACD
-        df['ema_12'] = df['close'].ewm(span=12, adjust=False).mean()
-        df['ema_26'] = df['close'].ewm(span=26, adjust=False).mean()
+        df['ema_12'] = ema(12)
+        df['ema_26'] = ema(26)
         df['macd'] = df['ema_12'] - df['ema_26']
-        df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
+        df['macd_signal'] = cached.series(
+            'macd_signal', {'fast': 12, 'slow': 26, 'signal': 9, 'adjust': False},
+            lambda: indicators.ema(df['macd'], 9, adjust=False))
         
-        # ATR
-        high_low = df['high'] - df['low']
-        high_close = np.abs(df['high'] - df['close'].shift())
-        low_close = np.abs(df['low'] - df['close'].shift())
-        true_range = np.maximum(high_low, np.maximum(high_close, low_close))
-        df['atr'] = true_range.rolling(window=14).mean()
+        # ATR (the first bar's missing previous close propagates, as with np.maximum)
+        df['atr'] = cached.series('atr', {'period': 14, 'true_range': 'propagate_nan'},
+                                  lambda: indicators.atr(df['high'], df['low'], close, 14, skip_nan=False))
         
         # Momentum
-        df['momentum'] = df['close'].pct_change(periods=10)
+        df['momentum'] = cached.series('momentum', {'source': 'close', 'periods': 10},
+                                       lambda: close.pct_change(periods=10))
         
         return df
     
@@ -664,8 +744,14 @@ class ImprovedBacktestingSystem:
                         index: int,
                         htf_df: Optional[pd.DataFrame],
                         news_events: List[NewsEvent],
-                        current_time: datetime) -> Optional[TradeSignal]:
-        """Generate trading signal with quality scoring"""
+                        current_time: datetime,
+                        session: Optional[TradingSession] = None,
+                        spread: Optional[float] = None) -> Optional[TradeSignal]:
+        """
+        Generate trading signal with quality scoring. session / spread are the
+        bar's precomputed values (spread_model.session_codes / spread_series);
+        they are computed here when not given.
+        """
         current = df.iloc[index]
         instrument = self._get_instrument_from_df(df)
         
@@ -733,13 +819,15 @@ class ImprovedBacktestingSystem:
             return None
         
         # Get spread
-        session = self.spread_model.get_session(current_time)
-        spread = self.spread_model.get_spread(
-            instrument, 
-            current_time,
-            volatility=current.get('atr', 0) / current['close'],
-            news_events=news_events
-        )
+        if session is None:
+            session = self.spread_model.get_session(current_time)
+        if spread is None:
+            spread = self.spread_model.get_spread(
+                instrument, 
+                current_time,
+                volatility=current.get('atr', 0) / current['close'],
+                news_events=news_events
+            )
         
         # Check max spread
         max_spread = 2.0 if 'XAU' in instrument else 1.5
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+INDICATOR COLUMNS
+Per-bar access to an indicator DataFrame without df.iloc row materialization
+
+df.iloc[i] builds a new (object-dtype, for mixed frames) Series on every call,
+which dominates per-bar signal loops. IndicatorColumns pulls every column out
+as an array ONCE; bar(i) is a tiny view that reads column[i] on demand:
+
+    columns = IndicatorColumns(df)
+    for i in range(start, len(columns)):
+        current = columns.bar(i)
+        if current['close'] > current['sma_20']:
+            ...
+
+Numeric columns become NumPy arrays. Other columns (timestamps) keep their
+pandas array so current['timestamp'] is still a pd.Timestamp.
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+
+class IndicatorBar:
+    """Read-only view of one bar; supports current['col'] and 'col' in current"""
+
+    __slots__ = ('_arrays', 'index')
+
+    def __init__(self, arrays: Dict[str, Any], index: int):
+        self._arrays = arrays
+        self.index = index
+
+    def __getitem__(self, name: str):
+        return self._arrays[name][self.index]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._arrays
+
+    def get(self, name: str, default=None):
+        arr = self._arrays.get(name)
+        return default if arr is None else arr[self.index]
+
+
+class IndicatorColumns:
+    """Column arrays of an indicator DataFrame, extracted once"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.arrays: Dict[str, Any] = {}
+        for name in df.columns:
+            column = df[name]
+            if pd.api.types.is_numeric_dtype(column.dtype):
+                self.arrays[name] = column.to_numpy()
+            else:
+                self.arrays[name] = column.array
+        self.length = len(df)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, name: str):
+        return self.arrays[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.arrays
+
+    def bar(self, index: int) -> IndicatorBar:
+        return IndicatorBar(self.arrays, index)
+
+    def valid_mask(self, *names: str) -> np.ndarray:
+        """True where none of the named columns is NaN"""
+        mask = np.ones(self.length, dtype=bool)
+        for name in names:
+            mask &= ~pd.isna(self.arrays[name])
+        return mask
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+PERSISTENT INDICATOR STORE
+Disk-backed cache of indicator series keyed by (dataset fingerprint, indicator, params)
+
+    indicators = dataset_indicators(df, columns=('high', 'low', 'close'))
+    df['rsi'] = indicators.series('rsi', {'period': 14}, lambda: rsi_of(df['close']))
+
+- The dataset fingerprint is a SHA-1 of the index and the listed source
+  columns' VALUES. Any change to the source data gives a new fingerprint, so
+  stale entries are never read; they simply age out of the LRU
+- Every (indicator, params) pair is one .npy file, read memory-mapped
+  (values() returns the read-only map, series() an in-memory copy by default)
+- Reads bump the file's mtime; when the store exceeds its size budget the
+  least recently used files are deleted. The store's size is scanned once and
+  then tracked per write, so a save is O(1) until the budget is exceeded (a
+  full scan then also picks up other processes' writes)
+- Writes go to a temporary file and are swapped in with os.replace, so
+  concurrent workers never see a partial entry
+
+Only 1-D numeric results of the dataset's length are stored; anything else is
+returned uncached. Bump the params (e.g. {'v': 2}) when a formula changes.
+
+Environment:
+    INDICATOR_STORE=0             disable (compute every time)
+    INDICATOR_STORE_DIR           location (default data/.indicator_store)
+    INDICATOR_STORE_MAX_GB        size budget (default 5)
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+STORE_VERSION = 1
+DEFAULT_DIR = os.path.join("data", ".indicator_store")
+DEFAULT_MAX_GB = 5.0
+# Eviction frees down to this share of the budget, so full scans stay rare at capacity
+EVICT_TO = 0.9
+
+
+def store_enabled() -> bool:
+    """Store is on unless INDICATOR_STORE is set to 0/false/no"""
+    return os.environ.get('INDICATOR_STORE', '1').lower() not in ('0', 'false', 'no')
+
+
+def _update_with_array(digest, values) -> None:
+    arr = np.asarray(values)
+    if arr.dtype == object:
+        arr = pd.util.hash_pandas_object(pd.Series(arr), index=False).to_numpy()
+    digest.update(str(arr.dtype).encode())
+    digest.update(np.ascontiguousarray(arr).tobytes())
+
+
+def dataset_fingerprint(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> str:
+    """SHA-1 of the index and the values of `columns` (default: all columns)"""
+    columns = list(df.columns if columns is None else columns)
+    digest = hashlib.sha1(f"v{STORE_VERSION}|{len(df)}|".encode())
+
+    index = df.index
+    if isinstance(index, pd.DatetimeIndex):
+        digest.update(b'dt|' + str(index.tz).encode())
+        _update_with_array(digest, index.as_unit('ns').asi8)
+    elif isinstance(index, pd.RangeIndex):
+        digest.update(f"range|{index.start}|{index.stop}|{index.step}".encode())
+    else:
+        _update_with_array(digest, pd.util.hash_pandas_object(index).to_numpy())
+
+    for name in columns:
+        digest.update(b'|' + str(name).lower().encode() + b'|')
+        _update_with_array(digest, df[name].to_numpy())
+    return digest.hexdigest()
+
+
+def params_key(indicator: str, params: Dict[str, Any]) -> str:
+    """File name of one (indicator, params) entry"""
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return f"{indicator}-{hashlib.sha1(payload.encode()).hexdigest()[:16]}.npy"
+
+
+class IndicatorStore:
+    """Size-bounded LRU of indicator arrays on disk"""
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root or os.environ.get('INDICATOR_STORE_DIR', DEFAULT_DIR))
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get('INDICATOR_STORE_MAX_GB', DEFAULT_MAX_GB)) * (1 << 30))
+        self.max_bytes = max_bytes
+        self._tracked_bytes: Optional[int] = None   # None until the first scan
+
+    def entry_path(self, fingerprint: str, indicator: str, params: Dict[str, Any]) -> Path:
+        return self.root / fingerprint[:2] / fingerprint / params_key(indicator, params)
+
+    # ------------------------------------------------------------------
+    # Read / write
+    # ------------------------------------------------------------------
+    def load(self, fingerprint: str, indicator: str, params: Dict[str, Any],
+             length: int) -> Optional[np.ndarray]:
+        """Memory-mapped entry, or None if missing/unreadable"""
+        path = self.entry_path(fingerprint, indicator, params)
+        try:
+            values = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        if values.ndim != 1 or len(values) != length:
+            return None
+        try:
+            os.utime(path)  # LRU recency
+        except OSError:
+            pass
+        return values
+
+    def save(self, fingerprint: str, indicator: str, params: Dict[str, Any], values: np.ndarray) -> bool:
+        path = self.entry_path(fingerprint, indicator, params)
+        tmp_path = path.with_name(path.name + f".tmp{os.getpid()}")
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.save(f, values)
+            written = tmp_path.stat().st_size
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return False
+
+        if self._tracked_bytes is None:
+            self._tracked_bytes = self.size()
+        else:
+            self._tracked_bytes += written - replaced
+        if self._tracked_bytes > self.max_bytes:
+            self.evict()
+        return True
+
+    def get(self, fingerprint: str, indicator: str, params: Dict[str, Any], length: int,
+            compute: Callable[[], Any]) -> Any:
+        """Stored array for the key, computing and storing it on a miss"""
+        values = self.load(fingerprint, indicator, params, length)
+        if values is not None:
+            return values
+
+        result = compute()
+        array = np.asarray(result)
+        if array.ndim == 1 and len(array) == length and array.dtype.kind in 'biuf':
+            self.save(fingerprint, indicator, params, array)
+        return result
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def _entries(self):
+        if not self.root.exists():
+            return []
+        entries = []
+        for path in self.root.glob('*/*/*.npy'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Over max_bytes (full scan): delete least recently used entries down to EVICT_TO of it"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        self._tracked_bytes = total
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self._tracked_bytes = total
+            try:
+                path.parent.rmdir()  # only succeeds once the dataset has no entries left
+            except OSError:
+                pass
+            if total <= self.max_bytes * EVICT_TO:
+                break
+
+    def invalidate(self, fingerprint: str):
+        """Drop every entry of one dataset"""
+        directory = self.root / fingerprint[:2] / fingerprint
+        for path in directory.glob('*.npy'):
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except OSError:
+                continue
+            if self._tracked_bytes is not None:
+                self._tracked_bytes -= size
+        try:
+            directory.rmdir()
+        except OSError:
+            pass
+
+
+class DatasetIndicators:
+    """One dataset bound to the store: fingerprinted once, many indicators"""
+
+    def __init__(self, df: pd.DataFrame, store: Optional[IndicatorStore],
+                 columns: Optional[Sequence[str]] = None):
+        self.df = df
+        self.store = store
+        self.fingerprint = dataset_fingerprint(df, columns) if store is not None else None
+
+    def values(self, indicator: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """Indicator values (ndarray on a hit, compute()'s result on a miss)"""
+        if self.store is None:
+            return compute()
+        return self.store.get(self.fingerprint, indicator, params, len(self.df), compute)
+
+    def series(self, indicator: str, params: Dict[str, Any], compute: Callable[[], Any],
+               copy: bool = True) -> pd.Series:
+        """
+        Indicator as a Series on the dataset's index. Stored values are
+        read-only memory maps; copy=False keeps them mapped for read-only use,
+        the default copies so the Series can go into a DataFrame that is
+        modified later.
+        """
+        values = self.values(indicator, params, compute)
+        if isinstance(values, pd.Series):
+            return values
+        return pd.Series(np.array(values) if copy else values, index=self.df.index, copy=False)
+
+
+_default_store: Optional[IndicatorStore] = None
+
+
+def indicator_store() -> Optional[IndicatorStore]:
+    """Process-wide store, or None when INDICATOR_STORE is disabled"""
+    global _default_store
+    if not store_enabled():
+        return None
+    if _default_store is None:
+        _default_store = IndicatorStore()
+    return _default_store
+
+
+def dataset_indicators(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> DatasetIndicators:
+    """Bind df (fingerprinted on `columns`) to the process-wide store"""
+    return DatasetIndicators(df, indicator_store(), columns)
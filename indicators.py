@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+INDICATORS
+Shared NumPy implementations of the indicators every engine and strategy uses
+
+    from indicators import rsi, atr, ema, adx, rsi_last
+
+    rsi_values = rsi(df['close'], 14)                     # ndarray, one value per bar
+    atr_values = atr(df['high'], df['low'], df['close'], 14)
+    latest = rsi_last(df['close'], 14)                    # float, reads only the tail
+
+Inputs are anything array-like (Series, list, ndarray); they are converted
+once to contiguous float64 arrays and never wrapped in intermediate Series or
+DataFrames. Full-series functions return an ndarray aligned with the input
+(NaN where the window is not yet full); callers that need a Series wrap it
+with their own index. *_last variants return a float for the final bar and
+only touch the bars that value depends on.
+
+Formulas are the ones the repo has always used, so results match the former
+per-module pandas copies on RangeIndex data (see the ADX note below):
+- rsi          SMA-smoothed gains/losses (rolling mean, not Wilder)
+- ema          pandas ewm(span) semantics, adjust=True by default; NaN gaps
+               as ignore_na=False (value carried, weights keep decaying)
+- true_range   skip_nan=True ignores the missing previous close on the first
+               bar (DataFrame.max); skip_nan=False propagates it (np.maximum)
+- atr          rolling mean of the true range
+- adx          rolling-mean smoothed +DI/-DI/DX (the "simplified" ADX);
+               dm_rule picks the +DM/-DM rule each former copy used:
+               'standard' (exclusive, up move vs down move),
+               'low_diff' (compares high.diff() with raw low.diff(), as in
+               OptimizedStrategyV2 / UltraStrictV3) and 'non_exclusive'
+               (both clipped at zero independently, first bar NaN, as in
+               EnhancedOptimizedStrategy)
+
+Inputs are aligned by position. The old OptimizedStrategyV2 / UltraStrictV3
+ADX divided a RangeIndex Series by a timestamp-indexed one, so on
+DatetimeIndex data it came out all NaN; here it is computed normally.
+
+Run `python indicators.py` for a micro-benchmark against the pandas versions.
+"""
+
+from typing import Any, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+# Rows per block when a rolling statistic materializes its windows
+_WINDOW_BLOCK = 1 << 16
+
+
+def as_array(values: Any) -> np.ndarray:
+    """Contiguous float64 view/copy of a Series, list or array"""
+    if hasattr(values, 'to_numpy'):
+        values = values.to_numpy(dtype=np.float64)
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def shift(values: Any, periods: int = 1) -> np.ndarray:
+    """Series.shift(periods) for periods >= 0"""
+    x = as_array(values)
+    out = np.full(len(x), np.nan)
+    if periods < len(x):
+        out[periods:] = x[:len(x) - periods]
+    return out
+
+
+# ----------------------------------------------------------------------
+# Rolling statistics
+# ----------------------------------------------------------------------
+def rolling_mean(values: Any, period: int) -> np.ndarray:
+    """Series.rolling(period).mean(): NaN until the window is full or if it holds a NaN"""
+    x = as_array(values)
+    n = len(x)
+    out = np.full(n, np.nan)
+    if period <= 0 or n < period:
+        return out
+
+    missing = np.isnan(x)
+    finite = x[~missing]
+    # Centering keeps the running sums small (prices) so differences stay exact
+    offset = finite[0] if len(finite) else 0.0
+    centered = np.where(missing, 0.0, x - offset)
+
+    sums = np.empty(n + 1)
+    sums[0] = 0.0
+    np.cumsum(centered, out=sums[1:])
+    window = (sums[period:] - sums[:-period]) / period + offset
+
+    if missing.any():
+        gaps = np.concatenate(([0], np.cumsum(missing)))
+        window[(gaps[period:] - gaps[:-period]) > 0] = np.nan
+    out[period - 1:] = window
+    return out
+
+
+def _rolling_reduce(x: np.ndarray, period: int, reduce) -> np.ndarray:
+    n = len(x)
+    out = np.full(n, np.nan)
+    if period <= 0 or n < period:
+        return out
+    windows = sliding_window_view(x, period)
+    for start in range(0, len(windows), _WINDOW_BLOCK):
+        block = windows[start:start + _WINDOW_BLOCK]
+        out[period - 1 + start:period - 1 + start + len(block)] = reduce(block)
+    return out
+
+
+def rolling_std(values: Any, period: int, ddof: int = 1) -> np.ndarray:
+    """Series.rolling(period).std() (sample std by default)"""
+    return _rolling_reduce(as_array(values), period, lambda w: w.std(axis=1, ddof=ddof))
+
+
+def rolling_max(values: Any, period: int) -> np.ndarray:
+    """Series.rolling(period).max()"""
+    return _rolling_reduce(as_array(values), period, lambda w: w.max(axis=1))
+
+
+def rolling_min(values: Any, period: int) -> np.ndarray:
+    """Series.rolling(period).min()"""
+    return _rolling_reduce(as_array(values), period, lambda w: w.min(axis=1))
+
+
+def sma(values: Any, period: int) -> np.ndarray:
+    return rolling_mean(values, period)
+
+
+def sma_last(values: Any, period: int) -> float:
+    x = as_array(values)
+    if period <= 0 or len(x) < period:
+        return np.nan
+    return float(np.mean(x[-period:]))
+
+
+# ----------------------------------------------------------------------
+# Exponential moving average
+# ----------------------------------------------------------------------
+def ema(values: Any, span: int, adjust: bool = True) -> np.ndarray:
+    """
+    Series.ewm(span=span, adjust=adjust).mean() as a linear filter.
+    Leading NaNs are skipped; later NaNs follow pandas (ignore_na=False): the
+    previous value is carried and older weights keep decaying across the gap.
+    """
+    x = as_array(values)
+    out = np.full(len(x), np.nan)
+    finite = np.flatnonzero(~np.isnan(x))
+    if not len(finite):
+        return out
+    start = finite[0]
+    x = x[start:]
+    observed = ~np.isnan(x)
+
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    if adjust:
+        # Weighted mean with weights decay**k: numerator / sum of weights (gaps weigh 0)
+        numerator = lfilter([1.0], [1.0, -decay], np.where(observed, x, 0.0))
+        weights = lfilter([1.0], [1.0, -decay], observed.astype(np.float64))
+        positions = np.arange(len(x))
+        # Gaps repeat the last observed average (numerator and weights decay alike)
+        last_observed = np.maximum.accumulate(np.where(observed, positions, 0))
+        out[start:] = numerator[last_observed] / weights[last_observed]
+        return out
+
+    # y[0] = x[0]; y[t] = decay * y[t-1] + alpha * x[t], one filter per run of observations
+    y = out[start:]
+    runs = np.split(np.flatnonzero(observed), np.flatnonzero(np.diff(np.flatnonzero(observed)) > 1) + 1)
+    previous = None
+    for run in runs:
+        first, last = run[0], run[-1]
+        if previous is None:
+            y[first] = x[first]
+        else:
+            # pandas: the old weight decays once per bar since the last observation
+            old_weight = decay ** (first - previous)
+            y[first] = (old_weight * y[previous] + alpha * x[first]) / (old_weight + alpha)
+            y[previous + 1:first] = y[previous]
+        if last > first:
+            y[first + 1:last + 1], _ = lfilter([alpha], [1.0, -decay], x[first + 1:last + 1],
+                                               zi=[decay * y[first]])
+        previous = last
+    y[previous + 1:] = y[previous]
+    return out
+
+
+def ema_last(values: Any, span: int, adjust: bool = True) -> float:
+    x = as_array(values)
+    if not len(x):
+        return np.nan
+    return float(ema(x, span, adjust)[-1])
+
+
+# ----------------------------------------------------------------------
+# Oscillators
+# ----------------------------------------------------------------------
+def _gains_losses(close: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    delta = np.diff(close, prepend=np.nan)
+    # delta.where(delta > 0, 0): the undefined first delta counts as 0
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    return gain, loss
+
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+
+def rsi(close: Any, period: int = 14) -> np.ndarray:
+    """RSI on rolling-mean gains/losses"""
+    gain, loss = _gains_losses(as_array(close))
+    return _rsi_from_averages(rolling_mean(gain, period), rolling_mean(loss, period))
+
+
+def rsi_last(close: Any, period: int = 14) -> float:
+    x = as_array(close)
+    if period <= 0 or len(x) < period:
+        return np.nan
+    gain, loss = _gains_losses(x[-(period + 1):])
+    return float(_rsi_from_averages(np.mean(gain[-period:]), np.mean(loss[-period:])))
+
+
+def macd(close: Any, fast: int = 12, slow: int = 26, signal: int = 9,
+         adjust: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(macd, signal line, histogram)"""
+    x = as_array(close)
+    line = ema(x, fast, adjust) - ema(x, slow, adjust)
+    signal_line = ema(line, signal, adjust)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close: Any, period: int = 20, num_std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(upper, middle, lower) bands on the sample std"""
+    x = as_array(close)
+    middle = rolling_mean(x, period)
+    width = rolling_std(x, period) * num_std
+    return middle + width, middle, middle - width
+
+
+# ----------------------------------------------------------------------
+# Range / trend
+# ----------------------------------------------------------------------
+def true_range(high: Any, low: Any, close: Any, skip_nan: bool = True) -> np.ndarray:
+    """max(high - low, |high - prev close|, |low - prev close|)"""
+    h, l = as_array(high), as_array(low)
+    prev_close = shift(close)
+    combine = np.fmax if skip_nan else np.maximum
+    return combine(h - l, combine(np.abs(h - prev_close), np.abs(l - prev_close)))
+
+
+def atr(high: Any, low: Any, close: Any, period: int = 14, skip_nan: bool = True) -> np.ndarray:
+    """Rolling mean of the true range"""
+    return rolling_mean(true_range(high, low, close, skip_nan), period)
+
+
+def atr_last(high: Any, low: Any, close: Any, period: int = 14, skip_nan: bool = True) -> float:
+    h = as_array(high)
+    if period <= 0 or len(h) < period:
+        return np.nan
+    tail = slice(-(period + 1), None)
+    tr = true_range(h[tail], as_array(low)[tail], as_array(close)[tail], skip_nan)
+    return float(np.mean(tr[-period:]))
+
+
+DM_RULES = ('standard', 'low_diff', 'non_exclusive')
+
+
+def directional_movement(high: Any, low: Any, dm_rule: str = 'standard') -> Tuple[np.ndarray, np.ndarray]:
+    """(+DM, -DM) under dm_rule; 'standard' keeps the larger of the up / down move, if positive"""
+    up = np.diff(as_array(high), prepend=np.nan)
+    down = -np.diff(as_array(low), prepend=np.nan)
+    if dm_rule not in DM_RULES:
+        raise ValueError(f"Unknown dm_rule: {dm_rule} ({' | '.join(DM_RULES)})")
+    if dm_rule == 'non_exclusive':
+        return np.maximum(up, 0.0), np.maximum(down, 0.0)
+    if dm_rule == 'low_diff':
+        down = -down
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    return plus_dm, minus_dm
+
+
+def adx(high: Any, low: Any, close: Any, period: int = 14, epsilon: float = 0.0,
+        skip_nan: bool = True, dm_rule: str = 'standard') -> np.ndarray:
+    """ADX with rolling-mean smoothing; epsilon guards the DX denominator"""
+    h, l = as_array(high), as_array(low)
+    plus_dm, minus_dm = directional_movement(h, l, dm_rule)
+    tr_mean = rolling_mean(true_range(h, l, close, skip_nan), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100 * rolling_mean(plus_dm, period) / tr_mean
+        minus_di = 100 * rolling_mean(minus_dm, period) / tr_mean
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di + epsilon)
+    return rolling_mean(dx, period)
+
+
+def adx_last(high: Any, low: Any, close: Any, period: int = 14, epsilon: float = 0.0,
+             skip_nan: bool = True, dm_rule: str = 'standard') -> float:
+    """Final ADX value from the last 2 * period + 1 bars (all it depends on)"""
+    h = as_array(high)
+    if not len(h):
+        return np.nan
+    tail = slice(-(2 * period + 1), None)
+    return float(adx(h[tail], as_array(low)[tail], as_array(close)[tail], period, epsilon, skip_nan,
+                     dm_rule)[-1])
+
+
+# ----------------------------------------------------------------------
+# Micro-benchmark
+# ----------------------------------------------------------------------
+def _pandas_reference(df, period: int = 14):
+    """The former per-module pandas implementations"""
+    import pandas as pd
+
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rsi_values = 100 - (100 / (1 + gain / loss))
+
+    high_low = df['high'] - df['low']
+    high_close = np.abs(df['high'] - df['close'].shift())
+    low_close = np.abs(df['low'] - df['close'].shift())
+    true_ranges = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    atr_values = true_ranges.rolling(period).mean()
+
+    ema_values = df['close'].ewm(span=21).mean()
+    return rsi_values, atr_values, ema_values
+
+
+def benchmark(bars: int = 100_000, repeat: int = 20):
+    """Time pandas vs NumPy for full series and last values; check they agree"""
+    import time
+
+    import pandas as pd
+
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, bars))
+    spread = np.abs(rng.normal(0, 0.05, bars))
+    df = pd.DataFrame({'high': close + spread, 'low': close - spread, 'close': close})
+
+    def timed(fn):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = fn()
+        return (time.perf_counter() - start) / repeat * 1000, result
+
+    pandas_ms, (ref_rsi, ref_atr, ref_ema) = timed(lambda: _pandas_reference(df))
+    numpy_ms, (new_rsi, new_atr, new_ema) = timed(lambda: (
+        rsi(df['close']), atr(df['high'], df['low'], df['close']), ema(df['close'], 21)))
+    for name, ref, new in (('rsi', ref_rsi, new_rsi), ('atr', ref_atr, new_atr), ('ema', ref_ema, new_ema)):
+        np.testing.assert_allclose(new, ref.to_numpy(), rtol=1e-9, atol=1e-9, err_msg=name)
+
+    # Interior NaNs (dirty closes) carry the average forward like ewm
+    gappy = df['close'].copy()
+    gappy.iloc[[10, 500, 501, 502, bars - 1]] = np.nan
+    for adjust in (True, False):
+        np.testing.assert_allclose(ema(gappy, 21, adjust), gappy.ewm(span=21, adjust=adjust).mean().to_numpy(),
+                                   rtol=1e-9, atol=1e-9, err_msg=f'ema with gaps, adjust={adjust}')
+
+    pandas_last_ms, _ = timed(lambda: [s.iloc[-1] for s in _pandas_reference(df)])
+    numpy_last_ms, _ = timed(lambda: (rsi_last(df['close']),
+                                      atr_last(df['high'], df['low'], df['close']),
+                                      ema_last(df['close'], 21)))
+
+    print(f"RSI + ATR + EMA over {bars:,} bars")
+    print(f"  full series  pandas {pandas_ms:8.2f} ms   numpy {numpy_ms:8.2f} ms   x{pandas_ms / numpy_ms:.1f}")
+    print(f"  last value   pandas {pandas_last_ms:8.3f} ms   numpy {numpy_last_ms:8.3f} ms   "
+          f"x{pandas_last_ms / numpy_last_ms:.1f}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -17,6 +17,7 @@ warnings.filterwarnings('ignore')
 
 # Import our custom modules
 from optimized_strategy_v2 import OptimizedStrategyV2
+from strategy_cursor import strategy_cursor
 from risk_management_framework import RiskManagementFramework
 from advanced_validation_framework import AdvancedValidationFramework
 
@@ -113,12 +114,21 @@ class IntegratedTestingFramework:
             portfolio_values = []
             current_capital = self.risk_manager.initial_capital
             
+            # Indicators once for the whole period, then one signal per candle
+            cursor = strategy_cursor(self.strategy, symbol)
+            if cursor is not None:
+                cursor.precompute(data)
+            
             # Process each candle
             for i in range(50, len(data)):  # Start after 50 candles for indicators
-                current_data = data.iloc[:i+1].copy()
-                
-                # Generate signal
-                signal = self.strategy.generate_signal(current_data, symbol)
+                if cursor is not None:
+                    current_data = data.iloc[:i+1]
+                    signal = cursor.signal_at(i)
+                else:
+                    current_data = data.iloc[:i+1].copy()
+                    
+                    # Generate signal
+                    signal = self.strategy.generate_signal(current_data, symbol)
                 
                 if signal['signal'] != 'NO_SIGNAL' and signal['signal'] != 'ERROR':
                     signals.append(signal)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+KEYWORD MATCHER
+Compiled, cached multi-keyword classification of headline text
+
+    impact = KeywordClassifier.get([('high', ['cpi', 'fed']), ('medium', ['pmi'])], default='unknown')
+    impact.classify("Fed holds rates")            # 'high'
+    labels = impact.classify_many(texts)          # list of labels, one per text
+
+- A text gets the first label (in the given order) with any keyword occurring
+  in its lowercased form as a substring, else the default: the same answer as
+  `any(keyword in text.lower() for keyword in keywords)` label by label
+- Each label's keywords are compiled into one alternation regex, built once
+  per keyword set; get() returns the same classifier for the same lists
+  (for the INSTANCE_CACHE_SIZE most recently used keyword sets)
+- classify_many() lowercases and classifies each distinct text once and
+  remembers the result, so duplicate headlines and repeated passes over an
+  archive are dictionary lookups
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Results remembered per classifier before the cache is reset
+CACHE_SIZE = 500_000
+
+# Shared classifiers kept by get(), least recently used dropped first
+INSTANCE_CACHE_SIZE = 32
+
+
+class KeywordClassifier:
+    """First matching label of an ordered list of (label, keywords)"""
+
+    def __init__(self, classes: Sequence[Tuple[str, Iterable[str]]], default: str):
+        self.classes = [(label, tuple(keywords)) for label, keywords in classes]
+        self.default = default
+        self._patterns = [(label, re.compile('|'.join(map(re.escape, keywords))))
+                          for label, keywords in self.classes if keywords]
+        self._cache: Dict[str, str] = {}
+
+    @classmethod
+    def get(cls, classes: Sequence[Tuple[str, Iterable[str]]], default: str) -> 'KeywordClassifier':
+        """Shared classifier for these labels and keywords (rebuilt only when they change)"""
+        return _shared_classifier(cls, tuple((label, tuple(keywords)) for label, keywords in classes), default)
+
+    def _match(self, text: str) -> str:
+        lowered = text.lower()
+        for label, pattern in self._patterns:
+            if pattern.search(lowered):
+                return label
+        return self.default
+
+    def classify(self, text: str) -> str:
+        label = self._cache.get(text)
+        if label is None:
+            label = self._remember(text, self._match(text))
+        return label
+
+    def classify_many(self, texts: Iterable[str]) -> List[str]:
+        """Labels for a whole column of texts; each distinct, unseen text is matched once"""
+        texts = list(texts)
+        cache = self._cache
+        pending = [text for text in dict.fromkeys(texts) if text not in cache]
+        if pending:
+            if len(cache) + len(pending) > CACHE_SIZE:
+                cache.clear()
+            match = self._match
+            for text in pending:
+                cache[text] = match(text)
+        return [cache[text] for text in texts]
+
+    def _remember(self, text: str, label: str) -> str:
+        if len(self._cache) >= CACHE_SIZE:
+            self._cache.clear()
+        self._cache[text] = label
+        return label
+
+
+@lru_cache(maxsize=INSTANCE_CACHE_SIZE)
+def _shared_classifier(cls, classes: Tuple[Tuple[str, Tuple[str, ...]], ...], default: str) -> KeywordClassifier:
+    return cls(classes, default)
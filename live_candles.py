@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+LIVE CANDLES
+Fixed-capacity, array-backed ring buffer of OHLCV bars per symbol
+
+    buffer = CandleRingBuffer(capacity=5000, unit='ms')
+    new_bars = buffer.sync(candles, timestamp=lambda c: c['timestamp'], bar=candle_bar)
+    closes = buffer.column('close', 200)      # read-only view, no copy
+    df = buffer.to_frame()                    # DataFrame copy when one is needed
+
+- Timestamps are int64 epoch values in `unit` ('ms' for broker candles,
+  'ns' for pd.Timestamp.value); fields are float64
+- Appending a bar with the last bar's timestamp overwrites it (a bar still
+  forming); an older bar is ignored; a full buffer drops its oldest bar
+- Every bar is written twice, at slot and slot + capacity, so the last n bars
+  are always one contiguous slice: window views never copy, whatever the wrap
+- sync() converts only the candles newer than the last bar held and returns
+  them, so the caller can feed the same bars to its streaming indicators
+
+Environment:
+    LIVE_CANDLE_CAPACITY          bars kept per symbol (default 5000)
+"""
+
+import os
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+DEFAULT_CAPACITY = 5000
+
+
+def default_capacity() -> int:
+    return int(os.environ.get('LIVE_CANDLE_CAPACITY', DEFAULT_CAPACITY))
+
+
+class CandleRingBuffer:
+    """Last `capacity` OHLCV bars of one symbol"""
+
+    def __init__(self, capacity: Optional[int] = None, unit: str = 'ms'):
+        capacity = default_capacity() if capacity is None else capacity
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.unit = unit
+        self._fields = {name: i for i, name in enumerate(FIELDS)}
+        self._values = np.full((len(FIELDS), 2 * capacity), np.nan)
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._count = 0  # bars ever appended (not counting overwrites)
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def _last_slot(self) -> int:
+        return (self._count - 1) % self.capacity
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        if not self._count:
+            return None
+        return int(self._timestamps[self._last_slot])
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def append(self, timestamp: int, bar: Mapping[str, Any]) -> bool:
+        """
+        Store one bar (missing fields are NaN). Same timestamp as the last bar:
+        overwrite it. Older: ignored. Returns whether the buffer changed.
+        """
+        if self._count:
+            last = self._timestamps[self._last_slot]
+            if timestamp < last:
+                return False
+            if timestamp > last:
+                self._count += 1
+        else:
+            self._count = 1
+
+        slot = self._last_slot
+        mirror = slot + self.capacity
+        values = self._values
+        for name, row in self._fields.items():
+            value = bar.get(name, np.nan)
+            values[row, slot] = value
+            values[row, mirror] = value
+        self._timestamps[slot] = timestamp
+        self._timestamps[mirror] = timestamp
+        return True
+
+    def sync(self, candles: Sequence[Any], timestamp: Callable[[Any], int],
+             bar: Callable[[Any], Mapping[str, Any]]) -> List[Tuple[int, Mapping[str, Any]]]:
+        """
+        Append the candles of a full history (in time order) that are newer
+        than, or revise, the last bar held. Only that tail is read and
+        converted. Returns the applied (timestamp, bar) pairs in time order.
+        """
+        last = self.last_timestamp
+        fresh = []
+        for candle in reversed(candles):
+            ts = timestamp(candle)
+            if last is not None and ts < last:
+                break
+            fresh.append((ts, candle))
+        fresh.sort(key=lambda item: item[0])
+
+        applied = []
+        for ts, candle in fresh:
+            values = bar(candle)
+            if self.append(ts, values):
+                applied.append((ts, values))
+        return applied
+
+    def clear(self):
+        self._count = 0
+
+    # ------------------------------------------------------------------
+    # Zero-copy reads
+    # ------------------------------------------------------------------
+    def _window(self, n: Optional[int]) -> slice:
+        size = len(self)
+        n = size if n is None else max(0, min(n, size))
+        end = self._last_slot + self.capacity + 1 if self._count else 0
+        return slice(end - n, end)
+
+    @staticmethod
+    def _read_only(view: np.ndarray) -> np.ndarray:
+        view.flags.writeable = False
+        return view
+
+    def column(self, name: str, n: Optional[int] = None) -> np.ndarray:
+        """Read-only view of the last n values of one field (all held bars by default)"""
+        return self._read_only(self._values[self._fields[name], self._window(n)])
+
+    def timestamps(self, n: Optional[int] = None) -> np.ndarray:
+        return self._read_only(self._timestamps[self._window(n)])
+
+    def window(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Read-only views of the last n bars: {'timestamp': ..., 'open': ..., ...}"""
+        window = self._window(n)
+        views = {'timestamp': self._read_only(self._timestamps[window])}
+        for name, row in self._fields.items():
+            views[name] = self._read_only(self._values[row, window])
+        return views
+
+    def last(self) -> Optional[Dict[str, float]]:
+        """The last bar as a dict, or None when empty"""
+        if not self._count:
+            return None
+        slot = self._last_slot
+        bar = {'timestamp': int(self._timestamps[slot])}
+        for name, row in self._fields.items():
+            bar[name] = float(self._values[row, slot])
+        return bar
+
+    def to_frame(self, n: Optional[int] = None, columns: Optional[Dict[str, str]] = None,
+                 index_name: str = 'timestamp') -> pd.DataFrame:
+        """DataFrame copy of the last n bars on a DatetimeIndex; columns renames fields"""
+        views = self.window(n)
+        index = pd.to_datetime(views.pop('timestamp'), unit=self.unit)
+        index.name = index_name
+        columns = columns or {}
+        return pd.DataFrame({columns.get(name, name): np.array(values) for name, values in views.items()},
+                            index=index)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+MONTE CARLO BOOTSTRAPS
+Fixed, circular and stationary block bootstraps with vectorized index generation
+
+    from mc_bootstrap import bootstrap_indices, optimal_block_length
+
+    block = optimal_block_length(returns, method='stationary')     # Politis-White
+    idx = bootstrap_indices(rng, runs=50_000, n=len(returns), method='stationary', block=block)
+    paths = np.cumsum(returns[idx], axis=1)
+
+Each method returns a (runs x n) index matrix from one whole-matrix draw (no
+per-run or per-block Python loops); rows consume the Generator in order, so
+splitting runs into chunks does not change the paths:
+
+- fixed       moving blocks of `block` trades, starts uniform over all
+              n - block + 1 positions (the last trades are sampled too)
+- circular    blocks of `block` trades that wrap around the end; every trade
+              is equally likely at every position
+- stationary  Politis-Romano: block lengths are geometric with mean `block`
+              and wrap around; the resampled series is stationary
+
+optimal_block_length() is the Politis & White (2004) automatic selector with
+the Patton, Politis & White (2009) correction: the flat-top lag window is set
+from the first lag after which the autocorrelations stay insignificant.
+
+mc_engine accepts these as methods ('fixed', 'circular', 'stationary'), so
+simulate_paths, the streaming summaries and the process backend all use them.
+"""
+
+import math
+from typing import Any, Union
+
+import numpy as np
+
+BOOTSTRAPS = ('fixed', 'circular', 'stationary')
+
+
+def fixed_indices(rng: np.random.Generator, runs: int, n: int, block: int) -> np.ndarray:
+    """Moving block bootstrap: ceil(n / block) blocks per row, starts in [0, n - block]"""
+    block = max(1, min(int(block), n))
+    n_blocks = -(-n // block)
+    starts = rng.integers(0, n - block + 1, size=(runs, n_blocks))
+    return (starts[:, :, None] + np.arange(block)).reshape(runs, n_blocks * block)[:, :n]
+
+
+def circular_indices(rng: np.random.Generator, runs: int, n: int, block: int) -> np.ndarray:
+    """Circular block bootstrap: blocks start anywhere and wrap past the last trade"""
+    block = max(1, min(int(block), n))
+    n_blocks = -(-n // block)
+    starts = rng.integers(0, n, size=(runs, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(runs, n_blocks * block)[:, :n]
+    return np.remainder(idx, n, out=idx)
+
+
+def stationary_indices(rng: np.random.Generator, runs: int, n: int, block: float) -> np.ndarray:
+    """Stationary bootstrap: a new random start with probability 1 / block at each step, else the next trade"""
+    steps = np.arange(n)
+    # One draw, row by row (restart coins, then starts), so chunking never changes the stream
+    uniform = rng.random((runs, 2 * n))
+    restart = uniform[:, :n] < 1.0 / max(1.0, float(block))
+    restart[:, 0] = True
+    starts = (uniform[:, n:] * n).astype(np.int64)
+    # Position of the latest restart at or before each step
+    last = np.maximum.accumulate(np.where(restart, steps, 0), axis=1)
+    idx = np.take_along_axis(starts, last, axis=1)
+    idx += steps
+    idx -= last
+    return np.remainder(idx, n, out=idx)
+
+
+def bootstrap_indices(rng: np.random.Generator, runs: int, n: int, method: str = 'stationary',
+                      block: float = 10) -> np.ndarray:
+    if not n and method in BOOTSTRAPS:
+        return np.empty((runs, 0), dtype=np.int64)
+    if method == 'fixed':
+        return fixed_indices(rng, runs, n, round(block))
+    if method == 'circular':
+        return circular_indices(rng, runs, n, round(block))
+    if method == 'stationary':
+        return stationary_indices(rng, runs, n, block)
+    raise ValueError(f"Unknown bootstrap {method!r}, expected one of {BOOTSTRAPS}")
+
+
+def _flat_top(t: np.ndarray) -> np.ndarray:
+    """Politis-Romano trapezoidal lag window"""
+    t = np.abs(t)
+    return np.where(t <= 0.5, 1.0, np.where(t <= 1.0, 2.0 * (1.0 - t), 0.0))
+
+
+def optimal_block_length(returns: Any, method: str = 'stationary') -> float:
+    """
+    Politis-White (2004, 2009 correction) block length for the stationary or
+    circular/fixed bootstrap, between 1 and min(3 sqrt(n), n / 3)
+    """
+    x = np.asarray(returns, dtype=np.float64)
+    x = x[np.isfinite(x)]
+    n = len(x)
+    if n < 8:
+        return 1.0
+    x = x - x.mean()
+
+    kn = max(5, math.ceil(math.log10(n)))
+    max_lag = min(math.ceil(math.sqrt(n)) + kn, n - 1)
+    max_block = math.ceil(min(3 * math.sqrt(n), n / 3))
+
+    acov = np.array([x[k:] @ x[:n - k] for k in range(max_lag + 1)]) / n
+    if acov[0] <= 0:
+        return 1.0
+    rho = np.abs(acov[1:] / acov[0])
+
+    # First lag m after which kn consecutive autocorrelations are insignificant
+    insignificant = rho < 2.0 * math.sqrt(math.log10(n) / n)
+    m = max_lag
+    for lag in range(1, max_lag - kn + 2):
+        if insignificant[lag - 1:lag - 1 + kn].all():
+            m = lag - 1
+            break
+    bandwidth = min(2 * max(m, 1), max_lag)
+
+    lags = np.arange(1, bandwidth + 1)
+    window = _flat_top(lags / bandwidth)
+    g = 2.0 * np.sum(window * lags * acov[1:bandwidth + 1])
+    spectrum = acov[0] + 2.0 * np.sum(window * acov[1:bandwidth + 1])
+    d = (2.0 if method == 'stationary' else 4.0 / 3.0) * spectrum ** 2
+    if d <= 0 or g == 0:
+        return 1.0
+
+    block = (2.0 * g ** 2 / d) ** (1.0 / 3.0) * n ** (1.0 / 3.0)
+    return float(min(max(block, 1.0), max_block))
+
+
+def parse_block(value: str) -> Union[float, str]:
+    """argparse type for --block: a size or 'auto'"""
+    return value if value == 'auto' else float(value)
+
+
+def resolve_block(returns: Any, method: str, block: Union[int, float, str]) -> float:
+    """Block length to use: optimal_block_length() for 'auto', else the given size"""
+    if block == 'auto':
+        return optimal_block_length(returns, 'stationary' if method == 'stationary' else 'circular')
+    return float(block)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+MONTE CARLO ENGINE
+Vectorized trade-return resampling into (runs x trades) equity matrices
+
+    from mc_engine import simulate_paths, simulate_metrics, path_metrics
+
+    paths = simulate_paths(returns, runs=10_000, method='shuffle', seed=42)   # 2D ndarray
+    metrics = path_metrics(paths)           # {'sharpe': (runs,), 'max_dd': ..., 'ulcer': ..., 'final': ...}
+    metrics = simulate_metrics(returns, runs=100_000, method='block', block=10, seed=43)  # no paths kept
+
+- Resampling indices are drawn as whole (chunk x trades) integer matrices:
+  'shuffle' permutes every row at once (Generator.permuted), 'block' draws
+  all block starts with one integers() call and expands them by broadcasting;
+  'fixed', 'circular' and 'stationary' are the mc_bootstrap samplers ('block'
+  is the original sampler, whose starts stop short of the last trades)
+- Equity is one cumsum(axis=1) per chunk; metrics are row-wise reductions
+- Rows consume the Generator exactly as the former per-run loops did
+  (permutation(n) / integers(0, n - block) per block), so a seeded run
+  reproduces the old paths; chunking does not change the stream either
+- Work is split into chunks of about MC_CHUNK_ELEMENTS matrix cells so peak
+  memory stays bounded whatever the number of runs
+
+Metric definitions are those of monte_carlo_patterns.compute_metrics:
+annualized Sharpe of the per-step returns (ddof=1, +eps), absolute max
+drawdown and the ulcer index (RMS drawdown).
+
+Environment:
+    MC_CHUNK_ELEMENTS             cells (runs x trades) per chunk (default 4,000,000)
+
+Run `python mc_engine.py` for a benchmark against the per-run loops;
+test_mc_engine.py checks that the engine reproduces them.
+"""
+
+import os
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+from mc_bootstrap import BOOTSTRAPS, bootstrap_indices
+
+DEFAULT_CHUNK_ELEMENTS = 4_000_000
+METHODS = ('shuffle', 'block') + BOOTSTRAPS
+
+Seed = Union[None, int, np.random.Generator]
+
+
+def chunk_runs_for(n_trades: int, chunk_runs: Optional[int] = None) -> int:
+    """Runs per chunk: explicit, or as many as fit in MC_CHUNK_ELEMENTS cells"""
+    if chunk_runs is not None:
+        return max(1, int(chunk_runs))
+    elements = int(os.environ.get('MC_CHUNK_ELEMENTS', DEFAULT_CHUNK_ELEMENTS))
+    return max(1, elements // max(1, n_trades))
+
+
+def as_generator(seed: Seed) -> np.random.Generator:
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+# ----------------------------------------------------------------------
+# Index generation
+# ----------------------------------------------------------------------
+def shuffle_indices(rng: np.random.Generator, runs: int, n: int) -> np.ndarray:
+    """(runs x n) matrix whose rows are independent permutations of range(n)"""
+    idx = np.tile(np.arange(n), (runs, 1))
+    return rng.permuted(idx, axis=1, out=idx)
+
+
+def block_indices(rng: np.random.Generator, runs: int, n: int, block: int) -> np.ndarray:
+    """
+    (runs x n) fixed-size block bootstrap indices: ceil(n / block) blocks per
+    row, starts uniform in [0, max(1, n - block)), truncated to n
+    """
+    n_blocks = int(np.ceil(n / block))
+    starts = rng.integers(0, max(1, n - block), size=(runs, n_blocks))
+    # start + block <= n - 1, or a single block from 0 when n <= block: never past the end
+    return (starts[:, :, None] + np.arange(block)).reshape(runs, n_blocks * block)[:, :n]
+
+
+def resample_indices(rng: np.random.Generator, runs: int, n: int, method: str = 'shuffle',
+                     block: float = 10) -> np.ndarray:
+    if method == 'shuffle':
+        return shuffle_indices(rng, runs, n)
+    if method == 'block':
+        return block_indices(rng, runs, n, int(round(block)))
+    if method in BOOTSTRAPS:
+        return bootstrap_indices(rng, runs, n, method, block)
+    raise ValueError(f"Unknown Monte Carlo method {method!r}, expected one of {METHODS}")
+
+
+# ----------------------------------------------------------------------
+# Paths
+# ----------------------------------------------------------------------
+def iter_chunks(returns: Any, runs: int, method: str = 'shuffle', block: int = 10, seed: Seed = None,
+                chunk_runs: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """(first run, resampled returns, equity) per chunk"""
+    rets = np.asarray(returns, dtype=np.float64)
+    n = len(rets)
+    rng = as_generator(seed)
+    step = chunk_runs_for(n, chunk_runs)
+    for start in range(0, runs, step):
+        count = min(step, runs - start)
+        sampled = rets[resample_indices(rng, count, n, method, block)]
+        yield start, sampled, np.cumsum(sampled, axis=1)
+
+
+def iter_paths(returns: Any, runs: int, method: str = 'shuffle', block: int = 10, seed: Seed = None,
+               chunk_runs: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yield (first run, equity chunk) with chunk rows = cumulative resampled returns"""
+    for start, _, paths in iter_chunks(returns, runs, method, block, seed, chunk_runs):
+        yield start, paths
+
+
+def simulate_paths(returns: Any, runs: int, method: str = 'shuffle', block: int = 10,
+                   seed: Seed = None, chunk_runs: Optional[int] = None) -> np.ndarray:
+    """All equity paths as one (runs x trades) matrix"""
+    paths = np.empty((runs, len(returns)))
+    for start, chunk in iter_paths(returns, runs, method, block, seed, chunk_runs):
+        paths[start:start + len(chunk)] = chunk
+    return paths
+
+
+# ----------------------------------------------------------------------
+# Row-wise metrics
+# ----------------------------------------------------------------------
+def step_returns(paths: np.ndarray) -> np.ndarray:
+    """Per-step returns of each equity row (the first step from 0)"""
+    paths = np.atleast_2d(paths)
+    return np.diff(paths, axis=1, prepend=0.0)
+
+
+def sharpe_ratios(returns: np.ndarray, eps: float = 1e-9, periods: int = 252) -> np.ndarray:
+    """Annualized Sharpe of each row of returns (0 for rows shorter than 2)"""
+    returns = np.atleast_2d(returns)
+    if returns.shape[1] < 2:
+        return np.zeros(len(returns))
+    return returns.mean(axis=1) / (returns.std(axis=1, ddof=1) + eps) * np.sqrt(periods)
+
+
+def drawdowns(paths: np.ndarray) -> np.ndarray:
+    """Drawdown (equity - running peak, <= 0) of each row"""
+    paths = np.atleast_2d(paths)
+    return paths - np.maximum.accumulate(paths, axis=1)
+
+
+def path_metrics(paths: np.ndarray, eps: float = 1e-9, steps: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    compute_metrics for every row at once. steps: the returns the paths were
+    summed from, if at hand (skips re-differencing; equal up to rounding)
+    """
+    paths = np.atleast_2d(paths)
+    runs, n = paths.shape
+    if not n:
+        zeros = np.zeros(runs)
+        return {'sharpe': zeros, 'max_dd': zeros, 'ulcer': zeros, 'final': zeros, 'trades': 0}
+    dd = np.maximum.accumulate(paths, axis=1)
+    np.subtract(paths, dd, out=dd)
+    return {
+        'sharpe': sharpe_ratios(step_returns(paths) if steps is None else steps, eps),
+        'max_dd': -dd.min(axis=1),
+        'ulcer': np.sqrt(np.einsum('ij,ij->i', dd, dd) / n),
+        'final': paths[:, -1].copy(),
+        'trades': n
+    }
+
+
+def peak_drawdowns(paths: np.ndarray) -> np.ndarray:
+    """Largest (peak - value) / peak of each row while the running peak is positive (else 0)"""
+    paths = np.atleast_2d(paths)
+    peaks = np.maximum.accumulate(paths, axis=1)
+    relative = np.zeros_like(paths)
+    np.divide(peaks - paths, peaks, out=relative, where=peaks > 0)
+    return np.maximum(relative.max(axis=1, initial=0.0), 0.0)
+
+
+def relative_metrics(paths: np.ndarray, steps: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    HighPerformanceMonteCarlo's per-run statistics: final value, Sharpe of the
+    path's increments (ddof=0, not annualized, 0 when flat), peak-relative max
+    drawdown and 1.0 / 0.0 for a positive final value. steps is unused (the
+    first step is not an increment here); it keeps the summarize() signature
+    """
+    paths = np.atleast_2d(paths)
+    sharpe = np.zeros(len(paths))
+    if paths.shape[1] > 1:
+        increments = np.diff(paths, axis=1)
+        std = np.std(increments, axis=1)
+        np.divide(np.mean(increments, axis=1), std, out=sharpe, where=std > 0)
+    final = paths[:, -1].copy()
+    return {
+        'final': final,
+        'sharpe': sharpe,
+        'max_dd': peak_drawdowns(paths),
+        'profitable': (final > 0).astype(float)
+    }
+
+
+def simulate_metrics(returns: Any, runs: int, method: str = 'shuffle', block: int = 10,
+                     seed: Seed = None, chunk_runs: Optional[int] = None) -> Dict[str, Any]:
+    """path_metrics of every run, computed chunk by chunk without keeping the paths"""
+    out = {name: np.empty(runs) for name in ('sharpe', 'max_dd', 'ulcer', 'final')}
+    for start, sampled, chunk in iter_chunks(returns, runs, method, block, seed, chunk_runs):
+        metrics = path_metrics(chunk, steps=sampled)
+        for name, values in out.items():
+            values[start:start + len(chunk)] = metrics[name]
+    out['trades'] = len(returns)
+    return out
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+def benchmark(runs: int = 100_000, trades: int = 2_000):
+    """Time the vectorized engine against the per-run loops (test_mc_engine.py checks it reproduces them)"""
+    import time
+
+    rng = np.random.default_rng(0)
+    rets = rng.normal(0.1, 1.0, trades)
+
+    def loop_shuffle(runs_, seed):
+        gen = np.random.default_rng(seed)
+        return [np.cumsum(rets[gen.permutation(trades)]) for _ in range(runs_)]
+
+    def loop_block(runs_, seed, block=10):
+        gen = np.random.default_rng(seed)
+        paths = []
+        for _ in range(runs_):
+            out = []
+            for _ in range(int(np.ceil(trades / block))):
+                start = int(gen.integers(0, max(1, trades - block)))
+                out.extend(rets[start:start + block])
+            paths.append(np.cumsum(np.array(out[:trades])))
+        return paths
+
+    def loop_metrics(equity):
+        # monte_carlo_patterns.compute_metrics
+        steps = np.diff(np.concatenate([[0.0], equity]))
+        dd = equity - np.maximum.accumulate(equity)
+        return (steps.mean() / (steps.std(ddof=1) + 1e-9) * np.sqrt(252), -dd.min(),
+                float(np.sqrt(np.mean(dd ** 2))))
+
+    sample = 200
+    for method, loop in (('shuffle', loop_shuffle), ('block', loop_block)):
+        start = time.perf_counter()
+        for path in loop(sample, 7):
+            loop_metrics(path)
+        loop_s = (time.perf_counter() - start) / sample * runs
+
+        start = time.perf_counter()
+        metrics = simulate_metrics(rets, runs, method, seed=7)
+        engine_s = time.perf_counter() - start
+        print(f"{method:8s} {runs:,} runs x {trades:,} trades + metrics: "
+              f"engine {engine_s:6.2f} s   per-run loop ~{loop_s:7.1f} s (extrapolated)   "
+              f"median Sharpe {np.median(metrics['sharpe']):.3f}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+MONTE CARLO PARALLEL BACKEND
+Process-parallel Monte Carlo summaries with reproducible SeedSequence streams
+
+    from mc_parallel import parallel_summarize
+
+    summary = parallel_summarize(returns, runs=100_000, method='block', block=10, seed=42, workers=8)
+    summary.metric('final')          # the same numbers with workers=1, 8 or 32
+
+- Runs are split into fixed tasks of MC_TASK_RUNS runs; task i draws from the
+  i-th child of SeedSequence(seed).spawn(n_tasks), so the streams are
+  statistically independent (unlike seed + batch_idx seeds, which overlap)
+- The split depends only on runs and MC_TASK_RUNS, never on the worker count,
+  and task summaries are merged in task order: results are bit-for-bit
+  identical for a given seed whatever the number of workers
+- Workers run the vectorized engine chunk by chunk and send back a
+  MonteCarloSummary (moments + quantile sketches), not paths; see
+  mc_streaming for exact=True and the memory ceiling. With fan_capacity the
+  fan sketch is compressed to at most that many rows before it is sent
+- statistics(paths, steps) -> {name: per-run array} is pickled by reference,
+  so it must be a module-level function (mc_engine.path_metrics style)
+
+Environment:
+    MC_TASK_RUNS                  runs per task (default 1000)
+
+Run `python mc_parallel.py` for a benchmark across worker counts;
+test_mc_parallel.py checks that the summaries are identical.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from mc_engine import path_metrics, simulate_paths
+from mc_streaming import MonteCarloSummary, summarize
+
+DEFAULT_TASK_RUNS = 1000
+
+Statistics = Callable[[np.ndarray, np.ndarray], Dict[str, np.ndarray]]
+
+
+def engine_metrics(paths: np.ndarray, steps: np.ndarray) -> Dict[str, np.ndarray]:
+    """mc_engine.path_metrics without the trade count"""
+    metrics = path_metrics(paths, steps=steps)
+    metrics.pop('trades')
+    return metrics
+
+
+def split_runs(runs: int, task_runs: Optional[int] = None) -> List[int]:
+    """Runs per task: MC_TASK_RUNS each, the remainder last"""
+    size = max(1, int(task_runs or os.environ.get('MC_TASK_RUNS', DEFAULT_TASK_RUNS)))
+    return [min(size, runs - start) for start in range(0, runs, size)]
+
+
+def task_seeds(seed: Optional[int], n_tasks: int) -> List[np.random.SeedSequence]:
+    """Independent child streams, one per task"""
+    return np.random.SeedSequence(seed).spawn(n_tasks)
+
+
+def _summarize_task(task: tuple) -> MonteCarloSummary:
+    returns, runs, total_runs, method, block, seed_seq, statistics, fan, exact, memory_mb, fan_capacity = task
+    summary = MonteCarloSummary(total_runs, len(returns), fan=fan, memory_mb=memory_mb, exact=exact,
+                                fan_capacity=fan_capacity)
+    summarize(returns, runs, method, block=block, seed=np.random.default_rng(seed_seq),
+              base_metrics=False, extra_metrics=statistics, summary=summary)
+    if summary.path_sketch is not None:
+        # Only the capped fan can exceed its capacity; the parent merges bounded sketches
+        summary.path_sketch.compress()
+    return summary
+
+
+def parallel_summarize(returns, runs: int, method: str = 'shuffle', block: int = 10,
+                       seed: Optional[int] = None, workers: Optional[int] = None,
+                       statistics: Statistics = engine_metrics, fan: bool = True, exact: bool = False,
+                       memory_mb: Optional[float] = None, task_runs: Optional[int] = None,
+                       fan_capacity: Optional[int] = None) -> MonteCarloSummary:
+    """
+    Summary of `runs` simulated paths, computed by `workers` processes
+    (default: all cores; 1 runs in this process). Identical for any workers.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    counts = split_runs(runs, task_runs)
+    tasks = [(returns, count, runs, method, block, seed_seq, statistics, fan, exact, memory_mb, fan_capacity)
+             for count, seed_seq in zip(counts, task_seeds(seed, len(counts)))]
+    summary = MonteCarloSummary(runs, len(returns), fan=fan, memory_mb=memory_mb, exact=exact,
+                                fan_capacity=fan_capacity)
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        for task in tasks:
+            summary.merge(_summarize_task(task))
+        return summary
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map yields in task order, which keeps the merge order fixed
+        for part in executor.map(_summarize_task, tasks):
+            summary.merge(part)
+    return summary
+
+
+def task_paths(returns, runs: int, method: str = 'shuffle', block: int = 10, seed: Optional[int] = None,
+               task_runs: Optional[int] = None) -> np.ndarray:
+    """The (runs x trades) paths parallel_summarize summarizes, for callers that need the matrix"""
+    returns = np.asarray(returns, dtype=np.float64)
+    counts = split_runs(runs, task_runs)
+    parts = [simulate_paths(returns, count, method, block, seed=np.random.default_rng(seed_seq))
+             for count, seed_seq in zip(counts, task_seeds(seed, len(counts)))]
+    return np.vstack(parts) if parts else np.empty((0, len(returns)))
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+def benchmark(runs: int = 100_000, trades: int = 2_000):
+    """Time 1 vs all cores (at least 2) workers (test_mc_parallel.py checks they give the same summary)"""
+    import time
+
+    rets = np.random.default_rng(0).normal(0.1, 1.0, trades)
+    cores = os.cpu_count() or 1
+    for method in ('shuffle', 'block'):
+        results = {}
+        for workers in sorted({1, max(2, cores)}):
+            start = time.perf_counter()
+            summary = parallel_summarize(rets, runs, method, seed=7, workers=workers, fan=False)
+            results[workers] = (time.perf_counter() - start, summary.metric('sharpe'))
+        timings = '   '.join(f"{workers} worker(s) {result[0]:6.2f} s" for workers, result in results.items())
+        print(f"{method:8s} {runs:,} runs x {trades:,} trades: {timings}   "
+              f"median Sharpe {results[1][1]['p50']:.3f}")
+
+
+if __name__ == "__main__":
+    benchmark()
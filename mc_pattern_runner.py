@@ -11,9 +11,10 @@ import json
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 
 # Import our modules
+from mc_bootstrap import BOOTSTRAPS, parse_block
 from monte_carlo_analyzer import MonteCarloAnalyzer
 from mc_patterns_report_generator import MCPatternsReportGenerator
 
@@ -51,9 +52,10 @@ class MCPatternRunner:
         self, 
         file_path: str,
         runs: int = 1000,
-        block: int = 10,
+        block: Union[float, str] = 10,
         window: int = 20,
-        generate_html: bool = True
+        generate_html: bool = True,
+        bootstrap: str = 'stationary'
     ) -> Optional[str]:
         """Analyze a single backtest file and generate reports"""
         logger.info("")
@@ -66,7 +68,8 @@ class MCPatternRunner:
             file_path,
             runs=runs,
             block=block,
-            window=window
+            window=window,
+            bootstrap=bootstrap
         )
         
         if mc_report is None:
@@ -90,10 +93,11 @@ class MCPatternRunner:
         directory: str,
         pattern: str = "*.json",
         runs: int = 1000,
-        block: int = 10,
+        block: Union[float, str] = 10,
         window: int = 20,
         max_files: Optional[int] = None,
-        generate_html: bool = True
+        generate_html: bool = True,
+        bootstrap: str = 'stationary'
     ) -> List[str]:
         """Analyze all backtest files in a directory"""
         logger.info("")
@@ -109,7 +113,8 @@ class MCPatternRunner:
             runs=runs,
             block=block,
             window=window,
-            max_files=max_files
+            max_files=max_files,
+            bootstrap=bootstrap
         )
         
         logger.info(f"\nSuccessfully analyzed {len(reports)} files")
@@ -154,6 +159,8 @@ class MCPatternRunner:
         logger.info(f"  Trades:          {base.get('trades', 0):>8}")
         logger.info("")
         logger.info(f"MONTE CARLO ({mc.get('runs', 0)} simulations):")
+        if "bootstrap" in mc:
+            logger.info(f"  Bootstrap:       {mc['bootstrap']:>8} (block {mc.get('block', 0):.1f})")
         logger.info(f"  Sharpe Mean:     {mc.get('sharpe_mean', 0):>8.3f}")
         logger.info(f"  Sharpe P5-P95:   {mc.get('sharpe_p05', 0):>8.3f} - {mc.get('sharpe_p95', 0):.3f}")
         logger.info(f"  MaxDD Mean:      {mc.get('maxdd_mean', 0):>8.2%}")
@@ -241,6 +248,9 @@ Examples:
   # Analyze with custom settings (2000 MC runs, block size 15)
   python mc_pattern_runner.py --file results.json --runs 2000 --block 15
 
+  # 50k runs, circular bootstrap with the automatic block length
+  python mc_pattern_runner.py --file results.json --runs 50000 --bootstrap circular --block auto
+
   # Analyze directory but only first 10 files
   python mc_pattern_runner.py --dir backtesting_output --max-files 10
 
@@ -256,7 +266,9 @@ Examples:
     
     # MC parameters
     parser.add_argument("--runs", type=int, default=1000, help="Number of MC simulations (default: 1000)")
-    parser.add_argument("--block", type=int, default=10, help="Block size for bootstrap (default: 10)")
+    parser.add_argument("--block", type=parse_block, default=10, help="Block size for bootstrap, or 'auto' (default: 10)")
+    parser.add_argument("--bootstrap", choices=BOOTSTRAPS + ('block',), default="stationary",
+                        help="Block bootstrap: stationary, circular, fixed or block (original sampler) (default: stationary)")
     parser.add_argument("--window", type=int, default=20, help="Window size for motif discovery (default: 20)")
     parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
     
@@ -284,7 +296,8 @@ Examples:
                 runs=args.runs,
                 block=args.block,
                 window=args.window,
-                generate_html=not args.no_html
+                generate_html=not args.no_html,
+                bootstrap=args.bootstrap
             )
             
             if html_path:
@@ -305,7 +318,8 @@ Examples:
                 block=args.block,
                 window=args.window,
                 max_files=args.max_files,
-                generate_html=not args.no_html
+                generate_html=not args.no_html,
+                bootstrap=args.bootstrap
             )
             
             logger.info("")
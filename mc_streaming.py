@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+MONTE CARLO STREAMING SUMMARIES
+Percentiles, moments and fan bands of Monte Carlo runs without keeping the paths
+
+    from mc_streaming import summarize
+
+    summary = summarize(returns, runs=200_000, method='shuffle', seed=42, memory_mb=256)
+    summary.metric('final', percentiles=(5, 50, 95))   # {'mean', 'std', 'min', 'max', 'count', 'p5', ...}
+    summary.fan((5, 95))                               # {'mean': (steps,), 'p5': (steps,), 'p95': (steps,)}
+    summary.rank_error                                 # worst-case quantile rank error (fraction of runs)
+
+Paths are generated and consumed chunk by chunk (mc_engine); only these
+summaries are kept:
+
+- RunningMoments   count / mean / variance (Chan's parallel merge) / min / max
+                   per column: exact up to floating-point rounding
+- QuantileSketch   Munro-Paterson compaction per column. Rows are gathered
+                   into sorted buffers of `capacity` rows; two buffers of the
+                   same weight are merged and every other row is kept. Each
+                   compaction at weight w moves any rank by at most w and a
+                   query is off by at most the heaviest weight, so the bound
+                   (`rank_error`, as a fraction of the row count) is about
+                   (levels + 2) / (2 * capacity). Until the first
+                   compaction the sketch holds every row and percentiles are
+                   exactly np.percentile's. Otherwise a reported p-th
+                   percentile lies between the exact order statistics of
+                   ranks (p/100 -/+ rank_error) * n (+/- 1 for interpolation).
+- Fan bands        one QuantileSketch whose columns are the path steps, plus
+                   per-step RunningMoments for the mean path
+
+MonteCarloSummary sizes the fan sketch and the generation chunks from a memory
+ceiling: when runs x steps fits (or with exact=True), everything is exact.
+fan_capacity caps the fan sketch on its own, so the per-run metrics can stay
+exact while the bands hold a bounded number of rows.
+Summaries of disjoint runs merge (merge()), so workers can each summarize a
+share of the runs (see mc_parallel).
+
+Environment:
+    MC_MEMORY_MB                  memory ceiling for streaming summaries (default 512)
+    MC_STREAMING                  1 = always stream, 0 = never, unset = when paths exceed the ceiling
+"""
+
+import math
+import os
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+from mc_engine import Seed, as_generator, iter_chunks, path_metrics
+
+DEFAULT_MEMORY_MB = 512
+BYTES_PER_VALUE = 8
+# Scalar metrics are exact up to this many runs (then ~1e-5 rank error per doubling)
+SCALAR_CAPACITY = 1 << 16
+DEFAULT_PERCENTILES = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+
+
+def memory_ceiling_mb(memory_mb: Optional[float] = None) -> float:
+    if memory_mb is not None:
+        return float(memory_mb)
+    return float(os.environ.get('MC_MEMORY_MB', DEFAULT_MEMORY_MB))
+
+
+def use_streaming(runs: int, n_steps: int, streaming: Optional[bool] = None,
+                  memory_mb: Optional[float] = None) -> bool:
+    """Explicit choice, else MC_STREAMING, else whether all paths would exceed the ceiling"""
+    if streaming is not None:
+        return streaming
+    flag = os.environ.get('MC_STREAMING', '')
+    if flag in ('0', '1'):
+        return flag == '1'
+    return runs * n_steps * BYTES_PER_VALUE > memory_ceiling_mb(memory_mb) * 2 ** 20
+
+
+class RunningMoments:
+    """Streaming count, mean, variance, min and max of each column"""
+
+    def __init__(self, width: int = 1):
+        self.count = 0
+        self.mean = np.zeros(width)
+        self._m2 = np.zeros(width)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64).reshape(-1, len(self.mean))
+        if not len(values):
+            return
+        mean = values.mean(axis=0)
+        m2 = np.einsum('ij,ij->j', values - mean, values - mean)
+        self._combine(len(values), mean, m2, values.min(axis=0), values.max(axis=0))
+
+    def merge(self, other: 'RunningMoments'):
+        """Fold in moments accumulated elsewhere (e.g. by a worker)"""
+        if other.count:
+            self._combine(other.count, other.mean, other._m2, other.min, other.max)
+
+    def _combine(self, n: int, mean: np.ndarray, m2: np.ndarray, low: np.ndarray, high: np.ndarray):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self._m2 = self._m2 + m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+        np.minimum(self.min, low, out=self.min)
+        np.maximum(self.max, high, out=self.max)
+
+    def std(self, ddof: int = 0) -> np.ndarray:
+        if self.count <= ddof:
+            return np.full(len(self.mean), np.nan)
+        return np.sqrt(self._m2 / (self.count - ddof))
+
+
+class QuantileSketch:
+    """Per-column quantiles of a stream of rows in O(capacity * log(n / capacity)) rows"""
+
+    def __init__(self, width: int = 1, capacity: int = 4096):
+        if capacity < 2:
+            raise ValueError(f"capacity must be at least 2, got {capacity}")
+        self.width = width
+        self.capacity = capacity
+        self.count = 0
+        self._pending = []       # unsorted rows, fewer than capacity in total
+        self._pending_rows = 0
+        self._levels: Dict[int, np.ndarray] = {}   # level -> sorted buffer of weight 2**level
+        self._offsets: Dict[int, int] = {}         # alternate kept rows per level (no drift)
+        self._error = 0.0                          # rank error bound, in rows
+
+    @property
+    def rank_error(self) -> float:
+        """Worst-case quantile rank error as a fraction of the rows seen (0.0 = exact)"""
+        if not self._error:
+            return 0.0
+        # compactions so far plus the query's granularity (the heaviest row)
+        return (self._error + 2 ** max(self._levels)) / self.count
+
+    @property
+    def rows_held(self) -> int:
+        return self._pending_rows + sum(len(buffer) for buffer in self._levels.values())
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64).reshape(-1, self.width)
+        self.count += len(values)
+        self._add_rows(values)
+
+    def merge(self, other: 'QuantileSketch'):
+        """Fold in a sketch of the same width and capacity; its bound adds to this one's"""
+        if (other.width, other.capacity) != (self.width, self.capacity):
+            raise ValueError("can only merge sketches of the same width and capacity")
+        self.count += other.count
+        self._error += other._error
+        for level in sorted(other._levels):
+            self._push(level, other._levels[level])
+        for rows in other._pending:
+            self._add_rows(rows)
+
+    def _add_rows(self, values: np.ndarray):
+        if not len(values):
+            return
+        self._pending.append(values)
+        self._pending_rows += len(values)
+        if self._pending_rows < self.capacity:
+            return
+        rows = np.vstack(self._pending)
+        full = len(rows) - len(rows) % self.capacity
+        for start in range(0, full, self.capacity):
+            self._push(0, np.sort(rows[start:start + self.capacity], axis=0))
+        rest = rows[full:]
+        self._pending = [rest] if len(rest) else []
+        self._pending_rows = len(rest)
+
+    def _push(self, level: int, buffer: np.ndarray):
+        while level in self._levels:
+            merged = np.sort(np.vstack([self._levels.pop(level), buffer]), axis=0)
+            offset = self._offsets.get(level, 0)
+            self._offsets[level] = 1 - offset
+            buffer = merged[offset::2]
+            self._error += 2 ** level
+            level += 1
+        self._levels[level] = buffer
+
+    def compress(self):
+        """Halve the lightest rows into heavier levels until at most `capacity` rows are held"""
+        if self.rows_held <= self.capacity:
+            return
+        if self._pending:
+            rows = np.sort(np.vstack(self._pending), axis=0)
+            self._pending, self._pending_rows = [], 0
+            self._push(0, rows)
+        while self.rows_held > self.capacity:
+            level = min(self._levels)
+            buffer = self._levels.pop(level)
+            offset = self._offsets.get(level, 0)
+            self._offsets[level] = 1 - offset
+            self._error += 2 ** level
+            self._push(level + 1, buffer[offset::2])
+
+    def percentiles(self, percents: Sequence[float]) -> np.ndarray:
+        """(len(percents) x width) percentiles; exact (np.percentile) until the first compaction"""
+        percents = np.atleast_1d(np.asarray(percents, dtype=np.float64))
+        parts = list(self._pending)
+        weights = [np.ones(len(part)) for part in parts]
+        for level, buffer in self._levels.items():
+            parts.append(buffer)
+            weights.append(np.full(len(buffer), float(2 ** level)))
+        if not parts:
+            return np.full((len(percents), self.width), np.nan)
+
+        values = np.vstack(parts)
+        if not self._error:
+            return np.percentile(values, percents, axis=0).reshape(len(percents), self.width)
+
+        # Weighted inverted CDF over the held rows, column by column
+        order = np.argsort(values, axis=0)
+        ordered = np.take_along_axis(values, order, axis=0)
+        cumulative = np.cumsum(np.concatenate(weights)[order], axis=0)
+        columns = np.arange(self.width)
+        out = np.empty((len(percents), self.width))
+        for i, percent in enumerate(percents):
+            rank = (cumulative < percent / 100.0 * cumulative[-1]).sum(axis=0)
+            out[i] = ordered[np.minimum(rank, len(values) - 1), columns]
+        return out
+
+
+class MonteCarloSummary:
+    """Moments and quantile sketches of per-run metrics and per-step equity, fed chunk by chunk"""
+
+    def __init__(self, runs: int, n_steps: int, fan: bool = True, memory_mb: Optional[float] = None,
+                 exact: bool = False, fan_capacity: Optional[int] = None):
+        self.runs = runs
+        self.n_steps = n_steps
+        self.exact = exact
+        self.fan_capacity = fan_capacity
+        self.count = 0
+        self.memory_bytes = memory_ceiling_mb(memory_mb) * 2 ** 20
+        # A quarter of the ceiling for generating a chunk (indices, returns, equity, drawdowns)
+        self.chunk_runs = max(1, int(self.memory_bytes / 4 / (4 * BYTES_PER_VALUE * max(1, n_steps))))
+        self._metrics: Dict[str, RunningMoments] = {}
+        self._sketches: Dict[str, QuantileSketch] = {}
+        self.path_moments = RunningMoments(n_steps) if fan else None
+        self.path_sketch = QuantileSketch(n_steps, self._fan_capacity()) if fan else None
+
+    def _fan_capacity(self) -> int:
+        """
+        fan_capacity if given; else the largest buffer (rows) whose sketch fits
+        half the ceiling, or every run if they all fit (or exact)
+        """
+        if self.fan_capacity is not None:
+            return max(2, min(self.fan_capacity, self.runs))
+        budget_rows = self.memory_bytes / 2 / (BYTES_PER_VALUE * max(1, self.n_steps))
+        if self.exact or self.runs <= budget_rows:
+            return max(2, self.runs)
+        capacity = max(2, int(budget_rows))
+        # levels held + pending + merge scratch (2 buffers) must fit the budget
+        while capacity > 2 and (math.log2(self.runs / capacity) + 4) * capacity > budget_rows:
+            capacity //= 2
+        return capacity
+
+    def update(self, paths: Optional[np.ndarray] = None, **metrics: np.ndarray):
+        """Add one chunk: its equity paths (counted, and fed to the fan if kept) and per-run metric arrays"""
+        if paths is not None:
+            self.count += len(paths)
+        if paths is not None and self.path_sketch is not None:
+            self.path_moments.update(paths)
+            self.path_sketch.update(paths)
+        for name, values in metrics.items():
+            if name not in self._metrics:
+                self._metrics[name] = RunningMoments()
+                self._sketches[name] = QuantileSketch(1, self._scalar_capacity())
+            self._metrics[name].update(values)
+            self._sketches[name].update(values)
+
+    def _scalar_capacity(self) -> int:
+        return max(2, self.runs if self.exact else min(SCALAR_CAPACITY, self.runs))
+
+    def merge(self, other: 'MonteCarloSummary'):
+        """Fold in a summary of other runs sized for the same total (e.g. a worker's share)"""
+        self.count += other.count
+        if self.path_sketch is not None and other.path_sketch is not None:
+            self.path_moments.merge(other.path_moments)
+            self.path_sketch.merge(other.path_sketch)
+        for name, moments in other._metrics.items():
+            if name not in self._metrics:
+                self._metrics[name] = RunningMoments()
+                self._sketches[name] = QuantileSketch(1, self._scalar_capacity())
+            self._metrics[name].merge(moments)
+            self._sketches[name].merge(other._sketches[name])
+
+    @property
+    def rank_error(self) -> float:
+        sketches = list(self._sketches.values())
+        if self.path_sketch is not None:
+            sketches.append(self.path_sketch)
+        return max((sketch.rank_error for sketch in sketches), default=0.0)
+
+    def metric(self, name: str, percentiles: Iterable[float] = DEFAULT_PERCENTILES,
+               ddof: int = 0) -> Dict[str, float]:
+        moments = self._metrics[name]
+        percentiles = list(percentiles)
+        summary = {
+            'count': moments.count,
+            'mean': float(moments.mean[0]),
+            'std': float(moments.std(ddof)[0]),
+            'min': float(moments.min[0]),
+            'max': float(moments.max[0])
+        }
+        if percentiles:
+            values = self._sketches[name].percentiles(percentiles)[:, 0]
+            summary.update({f'p{p:g}': float(v) for p, v in zip(percentiles, values)})
+        return summary
+
+    def fan(self, percentiles: Iterable[float] = (5, 50, 95)) -> Dict[str, np.ndarray]:
+        """Mean path and per-step percentile bands"""
+        if self.path_sketch is None:
+            raise ValueError("summary was created with fan=False")
+        percentiles = list(percentiles)
+        bands = {'mean': self.path_moments.mean.copy()}
+        for p, values in zip(percentiles, self.path_sketch.percentiles(percentiles)):
+            bands[f'p{p:g}'] = values
+        return bands
+
+
+def summarize(returns: Any, runs: int, method: str = 'shuffle', block: int = 10, seed: Seed = None,
+              memory_mb: Optional[float] = None, fan: bool = True, base_metrics: bool = True,
+              extra_metrics: Optional[Callable[[np.ndarray, np.ndarray], Dict[str, np.ndarray]]] = None,
+              summary: Optional[MonteCarloSummary] = None) -> MonteCarloSummary:
+    """
+    Stream `runs` simulated paths through a MonteCarloSummary: path_metrics
+    (final, sharpe, max_dd, ulcer; unless base_metrics=False) plus
+    extra_metrics(paths, step_returns) per chunk. Pass an existing summary to
+    pool several methods into one.
+    """
+    n = len(returns)
+    summary = summary or MonteCarloSummary(runs, n, fan=fan, memory_mb=memory_mb)
+    for _, sampled, paths in iter_chunks(returns, runs, method, block, as_generator(seed), summary.chunk_runs):
+        metrics = {}
+        if base_metrics:
+            metrics = path_metrics(paths, steps=sampled)
+            metrics.pop('trades')
+        if extra_metrics is not None:
+            metrics.update(extra_metrics(paths, sampled))
+        summary.update(paths, **metrics)
+    return summary
@@ -11,11 +11,12 @@ import json
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 import numpy as np
 import pandas as pd
 
 # Import the Monte Carlo patterns module
+from mc_bootstrap import BOOTSTRAPS, parse_block
 from monte_carlo_patterns import analyze
 
 # Setup logging
@@ -87,9 +88,10 @@ class MonteCarloAnalyzer:
         self, 
         file_path: str, 
         runs: int = 1000, 
-        block: int = 10, 
+        block: Union[float, str] = 10, 
         window: int = 20,
-        seed: int = 42
+        seed: int = 42,
+        bootstrap: str = 'stationary'
     ) -> Optional[Dict[str, Any]]:
         """Analyze a single backtest result file"""
         try:
@@ -112,7 +114,8 @@ class MonteCarloAnalyzer:
                 runs=runs,
                 block=block,
                 window=window,
-                seed=seed
+                seed=seed,
+                bootstrap=bootstrap
             )
             
             # Add source information
@@ -142,9 +145,10 @@ class MonteCarloAnalyzer:
         directory: str, 
         pattern: str = "*.json",
         runs: int = 1000,
-        block: int = 10,
+        block: Union[float, str] = 10,
         window: int = 20,
-        max_files: Optional[int] = None
+        max_files: Optional[int] = None,
+        bootstrap: str = 'stationary'
     ) -> List[Dict[str, Any]]:
         """Analyze all backtest result files in a directory"""
         logger.info(f"Scanning directory: {directory}")
@@ -172,7 +176,8 @@ class MonteCarloAnalyzer:
                 runs=runs,
                 block=block,
                 window=window,
-                seed=42 + i  # Different seed for each file
+                seed=42 + i,  # Different seed for each file
+                bootstrap=bootstrap
             )
             
             if report is not None:
@@ -255,8 +260,9 @@ class MonteCarloAnalyzer:
         equity_curve: List[float], 
         name: str = "custom",
         runs: int = 1000,
-        block: int = 10,
-        window: int = 20
+        block: Union[float, str] = 10,
+        window: int = 20,
+        bootstrap: str = 'stationary'
     ) -> Dict[str, Any]:
         """Analyze directly from an equity curve"""
         logger.info(f"Analyzing equity curve: {name} ({len(equity_curve)} points)")
@@ -266,7 +272,8 @@ class MonteCarloAnalyzer:
             runs=runs,
             block=block,
             window=window,
-            seed=42
+            seed=42,
+            bootstrap=bootstrap
         )
         
         mc_report["name"] = name
@@ -292,7 +299,8 @@ def main():
     parser.add_argument("--dir", type=str, help="Directory containing backtest results")
     parser.add_argument("--pattern", type=str, default="*.json", help="File pattern to match (default: *.json)")
     parser.add_argument("--runs", type=int, default=1000, help="Number of MC simulations (default: 1000)")
-    parser.add_argument("--block", type=int, default=10, help="Block size for bootstrap (default: 10)")
+    parser.add_argument("--block", type=parse_block, default=10, help="Block size for bootstrap, or 'auto' (default: 10)")
+    parser.add_argument("--bootstrap", choices=BOOTSTRAPS + ('block',), default="stationary", help="Block bootstrap (default: stationary)")
     parser.add_argument("--window", type=int, default=20, help="Window size for motif discovery (default: 20)")
     parser.add_argument("--max-files", type=int, help="Maximum number of files to process")
     parser.add_argument("--output", type=str, default="monte_carlo_reports", help="Output directory")
@@ -307,7 +315,8 @@ def main():
             args.file,
             runs=args.runs,
             block=args.block,
-            window=args.window
+            window=args.window,
+            bootstrap=args.bootstrap
         )
         if report:
             print(f"\nAnalysis complete!")
@@ -326,7 +335,8 @@ def main():
             runs=args.runs,
             block=args.block,
             window=args.window,
-            max_files=args.max_files
+            max_files=args.max_files,
+            bootstrap=args.bootstrap
         )
         print(f"\nAnalyzed {len(reports)} files successfully")
         
@@ -12,13 +12,18 @@ import uuid
 import time
 import random
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 import numpy as np
 import pandas as pd
 from scipy import stats
 from statsmodels.stats.diagnostic import acorr_ljungbox
 from sklearn.cluster import KMeans
 
+from matrix_profile import matrix_profile, top_discords, top_motifs
+from mc_bootstrap import resolve_block
+from mc_engine import path_metrics, sharpe_ratios, simulate_paths, step_returns
+from mc_streaming import MonteCarloSummary, summarize, use_streaming
+
 logger = logging.getLogger(__name__)
 
 
@@ -61,42 +66,33 @@ def _to_df(trades_or_equity: Dict[str, Any]) -> pd.DataFrame:
     return df[["ts", "ret", "equity", "hour", "side", "duration"]]
 
 
-def mc_trade_shuffle(df: pd.DataFrame, runs: int = 1000, seed: int = 42) -> List[np.ndarray]:
-    """Monte Carlo simulation using trade shuffling (permutation test)"""
-    rng = np.random.default_rng(seed)
-    rets = df["ret"].values.copy()
-    paths = []
-    n = len(rets)
+def mc_trade_shuffle(df: pd.DataFrame, runs: int = 1000, seed: int = 42) -> np.ndarray:
+    """Monte Carlo simulation using trade shuffling (permutation test); (runs x trades) equity paths"""
+    rets = df["ret"].values
     
-    logger.info(f"Running {runs} MC trade shuffle simulations on {n} trades")
+    logger.info(f"Running {runs} MC trade shuffle simulations on {len(rets)} trades")
     
-    for _ in range(runs):
-        idx = rng.permutation(n)
-        r = rets[idx]
-        paths.append(np.cumsum(r))
-        
-    return paths
+    return simulate_paths(rets, runs, method='shuffle', seed=seed)
 
 
-def mc_block_bootstrap(df: pd.DataFrame, runs: int = 1000, block: int = 10, seed: int = 123) -> List[np.ndarray]:
-    """Monte Carlo simulation using block bootstrap (preserves serial correlation)"""
-    rng = np.random.default_rng(seed)
+def mc_block_bootstrap(
+    df: pd.DataFrame, 
+    runs: int = 1000, 
+    block: float = 10, 
+    seed: int = 123, 
+    method: str = 'block'
+) -> np.ndarray:
+    """
+    Monte Carlo simulation using block bootstrap (preserves serial correlation); (runs x trades) equity paths
+    
+    method: 'block' (original fixed-size sampler), or an mc_bootstrap method:
+    'fixed', 'circular' or 'stationary' (block = mean block length)
+    """
     rets = df["ret"].values
-    n = len(rets)
-    nb = int(np.ceil(n / block))
-    paths = []
-    
-    logger.info(f"Running {runs} MC block bootstrap simulations (block size={block})")
-    
-    for _ in range(runs):
-        out = []
-        for _ in range(nb):
-            start = int(rng.integers(0, max(1, n - block)))
-            out.extend(rets[start:start+block])
-        out = out[:n]
-        paths.append(np.cumsum(np.array(out)))
-        
-    return paths
+    
+    logger.info(f"Running {runs} MC {method} bootstrap simulations (block size={block:g})")
+    
+    return simulate_paths(rets, runs, method=method, block=block, seed=seed)
 
 
 def sharpe_ratio(returns: np.ndarray, eps: float = 1e-9) -> float:
@@ -205,48 +201,33 @@ def runs_test(x: np.ndarray) -> Dict[str, Any]:
     }
 
 
-def motif_discovery_simple(series: np.ndarray, w: int = 20, top_k: int = 3) -> Dict[str, Any]:
-    """Discover recurring patterns (motifs) and anomalies (discords) in equity curve"""
+def motif_discovery_simple(series: np.ndarray, w: int = 20, top_k: int = 3,
+                           workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Discover recurring patterns (motifs) and anomalies (discords) in equity curve
+
+    Exact matrix profile over every window (matrix_profile), not a sample:
+    motifs are the top_k closest non-overlapping window pairs (score = number
+    of windows within z-normalized distance 5.0), discords the top_k windows
+    farthest from their nearest match. workers > 1 tiles the profile over
+    processes (default MATRIX_PROFILE_WORKERS).
+    """
     n = len(series)
     if n < 3 * w:
-        return {"motifs": [], "discord": None}
-        
-    # Extract and normalize windows
-    windows = []
-    for i in range(0, n - w + 1):
-        seg = series[i:i+w]
-        z = (seg - seg.mean()) / (seg.std(ddof=1) + 1e-9)
-        windows.append((i, z))
-        
-    idxs = list(range(len(windows)))
-    rng = np.random.default_rng(123)
-    sample = set(rng.choice(idxs, size=min(200, len(idxs)), replace=False))
-    
-    counts = np.zeros(len(windows))
-    dists = np.full(len(windows), np.inf)
-    
-    # Find motifs (similar patterns) and discords (anomalous patterns)
-    for i, (si, sz) in enumerate(windows):
-        if i not in sample:
-            continue
-        for j, (sj, tz) in enumerate(windows):
-            if abs(si - sj) < w:
-                continue
-            d = np.linalg.norm(sz - tz)
-            if d < 5.0:
-                counts[i] += 1
-            dists[i] = min(dists[i], d)
-            
-    motif_idx = np.argsort(-counts)[:top_k]
+        return {"motifs": [], "discord": None, "discords": []}
+
+    profile = matrix_profile(series, w, exclusion=w, workers=workers)
     motifs = [
-        {"start": int(windows[i][0]), "len": int(w), "score": float(counts[i])} 
-        for i in motif_idx if counts[i] > 0
+        {"start": m["start"], "len": int(w), "score": float(m["matches"]),
+         "neighbor": m["neighbor"], "distance": m["distance"]}
+        for m in top_motifs(series, w, k=top_k, exclusion=w, radius=5.0, profile=profile)
     ]
-    
-    discord = int(np.argmax(dists)) if np.isfinite(dists).any() else None
-    discord_info = {"start": int(windows[discord][0]), "len": int(w)} if discord is not None else None
-    
-    return {"motifs": motifs, "discord": discord_info}
+    discords = [
+        {"start": d["start"], "len": int(w), "distance": d["distance"]}
+        for d in top_discords(series, w, k=top_k, exclusion=w, profile=profile)
+    ]
+
+    return {"motifs": motifs, "discord": discords[0] if discords else None, "discords": discords}
 
 
 def drawdown_shape_clustering(equity: np.ndarray, k: int = 3) -> Dict[str, Any]:
@@ -286,32 +267,30 @@ def drawdown_shape_clustering(equity: np.ndarray, k: int = 3) -> Dict[str, Any]:
     }
 
 
+def _hour_filter_uplifts(hours: np.ndarray, rets: np.ndarray, top_hours: List[int],
+                        worst_hours: List[int]) -> np.ndarray:
+    """Sharpe uplift of each row of step returns from the hour filter + leverage"""
+    h = np.resize(hours, rets.shape[1])
+    adj = rets.copy()
+    
+    # Filter worst hours (set returns to 0)
+    adj[:, np.isin(h, worst_hours)] = 0.0
+    # Leverage best hours (multiply by 1.25)
+    adj[:, np.isin(h, top_hours)] *= 1.25
+    
+    return sharpe_ratios(adj) - sharpe_ratios(rets)
+
+
 def leverage_test_hour_filter(
     df: pd.DataFrame, 
-    mc_paths: List[np.ndarray], 
+    mc_paths: np.ndarray, 
     top_hours: List[int], 
     worst_hours: List[int]
 ) -> Dict[str, Any]:
-    """Test if filtering hours and leveraging best hours improves Sharpe ratio"""
-    hours = df["hour"].values
-    uplifts = []
-    
-    for eq in mc_paths:
-        rets = np.diff(np.concatenate([[0.0], eq]))
-        h = np.resize(hours, rets.shape[0])
-        adj = rets.copy()
-        
-        # Filter worst hours (set returns to 0)
-        adj[np.isin(h, worst_hours)] = 0.0
-        # Leverage best hours (multiply by 1.25)
-        adj[np.isin(h, top_hours)] *= 1.25
-        
-        base_sharpe = float((rets.mean() / (rets.std(ddof=1) + 1e-9)) * np.sqrt(252)) if len(rets) > 1 else 0.0
-        adj_sharpe = float((adj.mean() / (adj.std(ddof=1) + 1e-9)) * np.sqrt(252)) if len(adj) > 1 else 0.0
-        
-        uplifts.append(adj_sharpe - base_sharpe)
-        
-    arr = np.array(uplifts)
+    """Test if filtering hours and leveraging best hours improves Sharpe ratio (all paths at once)"""
+    paths = np.asarray(mc_paths, dtype=float)
+    rets = step_returns(paths) if len(paths) else np.empty((0, 0))
+    arr = _hour_filter_uplifts(df["hour"].values, rets, top_hours, worst_hours)
     
     return {
         "uplift_mean": float(arr.mean() if len(arr) else 0.0),
@@ -321,12 +300,48 @@ def leverage_test_hour_filter(
     }
 
 
+def _streamed_mc(
+    df: pd.DataFrame, 
+    runs: int, 
+    block: float, 
+    seed: int, 
+    hod: Dict[str, Any], 
+    memory_mb: Optional[float] = None, 
+    bootstrap: str = 'block'
+) -> Tuple[MonteCarloSummary, Dict[str, Any]]:
+    """MC metrics and hour-filter uplifts summarized chunk by chunk (same seeds and split as analyze)"""
+    rets = df["ret"].values
+    hours = df["hour"].values
+    
+    def uplifts(paths: np.ndarray, steps: np.ndarray) -> Dict[str, np.ndarray]:
+        arr = _hour_filter_uplifts(hours, steps, hod["best_hours"], hod["worst_hours"])
+        return {"uplift": arr, "uplift_positive": (arr > 0).astype(float)}
+    
+    summary = MonteCarloSummary(runs, len(rets), fan=False, memory_mb=memory_mb)
+    summarize(rets, runs // 2, 'shuffle', seed=seed, extra_metrics=uplifts, summary=summary)
+    summarize(rets, runs - runs // 2, bootstrap, block=block, seed=seed + 1, extra_metrics=uplifts, summary=summary)
+    
+    if not summary.count:
+        return summary, {"uplift_mean": 0.0, "uplift_p95": 0.0, "uplift_frac_positive": 0.0, "n_paths": 0}
+    uplift = summary.metric("uplift", percentiles=(95,))
+    lev = {
+        "uplift_mean": uplift["mean"],
+        "uplift_p95": uplift["p95"],
+        "uplift_frac_positive": summary.metric("uplift_positive", percentiles=())["mean"],
+        "n_paths": summary.count
+    }
+    return summary, lev
+
+
 def analyze(
     trades_or_equity: Dict[str, Any], 
     runs: int = 1000, 
-    block: int = 10, 
+    block: Union[int, float, str] = 10, 
     window: int = 20, 
-    seed: int = 42
+    seed: int = 42,
+    streaming: Optional[bool] = None,
+    memory_mb: Optional[float] = None,
+    bootstrap: str = 'stationary'
 ) -> Dict[str, Any]:
     """
     Comprehensive Monte Carlo pattern analysis
@@ -334,9 +349,15 @@ def analyze(
     Args:
         trades_or_equity: Dict with either 'equity' array or 'trades' list
         runs: Number of Monte Carlo simulations
-        block: Block size for block bootstrap
+        block: Block size (mean block length for 'stationary') for the bootstrap,
+            or 'auto' for the Politis-White selection (mc_bootstrap)
         window: Window size for motif discovery
         seed: Random seed for reproducibility
+        streaming: Summarize MC paths chunk by chunk instead of keeping them
+            (None: when they would exceed MC_MEMORY_MB, see mc_streaming)
+        memory_mb: Memory ceiling for the streaming summaries
+        bootstrap: Half of the runs resample blocks: 'stationary', 'circular',
+            'fixed' (mc_bootstrap) or 'block' (the original sampler)
         
     Returns:
         Comprehensive analysis report with MC simulations and pattern analysis
@@ -348,11 +369,8 @@ def analyze(
     df = _to_df(trades_or_equity)
     logger.info(f"Loaded {len(df)} trades/data points")
     
-    # Run Monte Carlo simulations (50/50 split between shuffle and block bootstrap)
-    paths_shuffle = mc_trade_shuffle(df, runs=runs//2, seed=seed)
-    paths_block = mc_block_bootstrap(df, runs=runs - len(paths_shuffle), block=block, seed=seed+1)
-    paths = paths_shuffle + paths_block
-    logger.info(f"Generated {len(paths)} MC paths")
+    block = resolve_block(df["ret"].values, bootstrap, block)
+    logger.info(f"Bootstrap: {bootstrap}, block size {block:.1f}")
     
     # Calculate base metrics
     base_metrics = compute_metrics(df["equity"].values)
@@ -364,14 +382,39 @@ def analyze(
     rt = runs_test(df["ret"].values)
     motifs = motif_discovery_simple(df["equity"].values, w=window, top_k=3)
     ddc = drawdown_shape_clustering(df["equity"].values, k=3)
-    lev = leverage_test_hour_filter(df, paths, hod["best_hours"], hod["worst_hours"])
     
-    # MC metrics distribution
-    metrics = [compute_metrics(p) for p in paths]
-    sharpe_dist = [m["sharpe"] for m in metrics]
-    dd_dist = [m["max_dd"] for m in metrics]
+    # Run Monte Carlo simulations (50/50 split between shuffle and block bootstrap)
+    if use_streaming(runs, len(df), streaming, memory_mb):
+        summary, lev = _streamed_mc(df, runs, block, seed, hod, memory_mb, bootstrap)
+        logger.info(f"Streamed {summary.count} MC paths (quantile rank error <= {summary.rank_error:.2e})")
+        mc = {"runs": summary.count, "sharpe_mean": 0.0, "sharpe_p05": 0.0, "sharpe_p95": 0.0,
+              "maxdd_mean": 0.0, "maxdd_p95": 0.0, "rank_error": summary.rank_error}
+        if summary.count:
+            sharpe = summary.metric("sharpe", percentiles=(5, 95))
+            dd = summary.metric("max_dd", percentiles=(95,))
+            mc.update(sharpe_mean=sharpe["mean"], sharpe_p05=sharpe["p5"], sharpe_p95=sharpe["p95"],
+                      maxdd_mean=dd["mean"], maxdd_p95=dd["p95"])
+    else:
+        paths_shuffle = mc_trade_shuffle(df, runs=runs//2, seed=seed)
+        paths_block = mc_block_bootstrap(df, runs=runs - len(paths_shuffle), block=block, seed=seed+1, method=bootstrap)
+        paths = np.vstack([paths_shuffle, paths_block])
+        logger.info(f"Generated {len(paths)} MC paths")
+        lev = leverage_test_hour_filter(df, paths, hod["best_hours"], hod["worst_hours"])
+        
+        # MC metrics distribution (column-wise over all paths)
+        metrics = path_metrics(paths)
+        sharpe_dist = metrics["sharpe"]
+        dd_dist = metrics["max_dd"]
+        mc = {
+            "runs": len(paths),
+            "sharpe_mean": float(np.mean(sharpe_dist)) if len(sharpe_dist) else 0.0,
+            "sharpe_p05": float(np.percentile(sharpe_dist, 5)) if len(sharpe_dist) else 0.0,
+            "sharpe_p95": float(np.percentile(sharpe_dist, 95)) if len(sharpe_dist) else 0.0,
+            "maxdd_mean": float(np.mean(dd_dist)) if len(dd_dist) else 0.0,
+            "maxdd_p95": float(np.percentile(dd_dist, 95)) if len(dd_dist) else 0.0
+        }
     
-    logger.info(f"MC Sharpe: mean={np.mean(sharpe_dist):.2f}, p5={np.percentile(sharpe_dist, 5):.2f}, p95={np.percentile(sharpe_dist, 95):.2f}")
+    logger.info(f"MC Sharpe: mean={mc['sharpe_mean']:.2f}, p5={mc['sharpe_p05']:.2f}, p95={mc['sharpe_p95']:.2f}")
     logger.info(f"Leverageability uplift: {lev['uplift_mean']:.3f} (p95={lev['uplift_p95']:.3f})")
     
     # Compile report
@@ -379,14 +422,7 @@ def analyze(
         "run_id": str(uuid.uuid4())[:8],
         "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         "base_metrics": base_metrics,
-        "mc": {
-            "runs": len(paths),
-            "sharpe_mean": float(np.mean(sharpe_dist)) if sharpe_dist else 0.0,
-            "sharpe_p05": float(np.percentile(sharpe_dist, 5)) if sharpe_dist else 0.0,
-            "sharpe_p95": float(np.percentile(sharpe_dist, 95)) if sharpe_dist else 0.0,
-            "maxdd_mean": float(np.mean(dd_dist)) if dd_dist else 0.0,
-            "maxdd_p95": float(np.percentile(dd_dist, 95)) if dd_dist else 0.0
-        },
+        "mc": {**mc, "bootstrap": bootstrap, "block": block},
         "patterns": {
             "hour_of_day": hod,
             "autocorr": ac,
@@ -13,6 +13,9 @@ from typing import Dict, List, Any, Optional, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+from exit_resolver import resolve_signal_exits
+from indicator_columns import IndicatorBar, IndicatorColumns
+
 class MultiTimeframeBacktestingSystem:
     def __init__(self, data_dir="data/timeframes"):
         self.data_dir = data_dir
@@ -106,6 +109,8 @@ class MultiTimeframeBacktestingSystem:
         low_close = np.abs(df['low'] - df['close'].shift())
         true_range = np.maximum(high_low, np.maximum(high_close, low_close))
         df['atr'] = true_range.rolling(window=14).mean()
+        df['atr_avg_10'] = df['atr'].rolling(window=10).mean()
+        df['atr_avg_20'] = df['atr'].rolling(window=20).mean()
         
         # Timeframe-specific indicators
         if timeframe in ["1m", "5m", "15m"]:  # Scalping timeframes
@@ -154,27 +159,24 @@ class MultiTimeframeBacktestingSystem:
             return signals
         
         start_idx = min_periods
+        columns = IndicatorColumns(df)
         
-        for i in range(start_idx, len(df)):
-            current = df.iloc[i]
-            previous = df.iloc[i-1]
-            
-            # Skip if any required indicators are NaN
-            if pd.isna(current['sma_20']) or pd.isna(current['rsi']) or pd.isna(current['macd']):
-                continue
-            
+        # Skip bars where any required indicator is NaN
+        valid = columns.valid_mask('sma_20', 'rsi', 'macd')
+        
+        for i in np.flatnonzero(valid[start_idx:]) + start_idx:
             # Generate timeframe-specific signal
-            signal = self._analyze_timeframe_setup(df, i, currency_pair, timeframe)
+            signal = self._analyze_timeframe_setup(columns, int(i), currency_pair, timeframe)
             
             if signal and signal['signal'] != 'NO_SIGNAL':
                 signals.append(signal)
         
         return signals
     
-    def _analyze_timeframe_setup(self, df: pd.DataFrame, index: int, currency_pair: str, timeframe: str) -> Optional[Dict[str, Any]]:
+    def _analyze_timeframe_setup(self, columns: IndicatorColumns, index: int, currency_pair: str, timeframe: str) -> Optional[Dict[str, Any]]:
         """Analyze trading setup for specific timeframe"""
-        current = df.iloc[index]
-        previous = df.iloc[index-1]
+        current = columns.bar(index)
+        previous = columns.bar(index - 1)
         
         # Get timeframe-specific parameters
         params = self.timeframe_params.get(timeframe, self.timeframe_params["1h"])
@@ -191,19 +193,19 @@ class MultiTimeframeBacktestingSystem:
         
         # Timeframe-specific analysis
         if timeframe in ["1m", "5m", "15m"]:  # Scalping
-            signal = self._analyze_scalping_setup(df, index, currency_pair, current, previous, trend_bullish, trend_bearish)
+            signal = self._analyze_scalping_setup(columns, index, currency_pair, current, previous, trend_bullish, trend_bearish)
         elif timeframe in ["30m", "1h"]:  # Swing trading
-            signal = self._analyze_swing_setup(df, index, currency_pair, current, previous, trend_bullish, trend_bearish)
+            signal = self._analyze_swing_setup(columns, index, currency_pair, current, previous, trend_bullish, trend_bearish)
         else:  # Position trading
-            signal = self._analyze_position_setup(df, index, currency_pair, current, previous, trend_bullish, trend_bearish)
+            signal = self._analyze_position_setup(columns, index, currency_pair, current, previous, trend_bullish, trend_bearish)
         
         if signal and signal.get('confidence', 0) >= min_confidence:
             return signal
         
         return {'signal': 'NO_SIGNAL'}
     
-    def _analyze_scalping_setup(self, df: pd.DataFrame, index: int, currency_pair: str, current: pd.Series, 
-                               previous: pd.Series, trend_bullish: bool, trend_bearish: bool) -> Optional[Dict[str, Any]]:
+    def _analyze_scalping_setup(self, columns: IndicatorColumns, index: int, currency_pair: str, current: IndicatorBar, 
+                               previous: IndicatorBar, trend_bullish: bool, trend_bearish: bool) -> Optional[Dict[str, Any]]:
         """Analyze scalping setup (1m, 5m, 15m)"""
         # Fast momentum analysis
         momentum_bullish = (current['rsi_fast'] > 30 and current['rsi_fast'] < 70 and
@@ -215,17 +217,17 @@ class MultiTimeframeBacktestingSystem:
                            current['macd_histogram'] < previous['macd_histogram'])
         
         # Volatility check
-        volatility_adequate = current['atr'] > df['atr'].rolling(10).mean().iloc[index] * 0.5
+        volatility_adequate = current['atr'] > current['atr_avg_10'] * 0.5
         
         if trend_bullish and momentum_bullish and volatility_adequate:
-            return self._create_signal(df, index, currency_pair, 'LONG', current, "scalp")
+            return self._create_signal(columns, index, currency_pair, 'LONG', current, "scalp")
         elif trend_bearish and momentum_bearish and volatility_adequate:
-            return self._create_signal(df, index, currency_pair, 'SHORT', current, "scalp")
+            return self._create_signal(columns, index, currency_pair, 'SHORT', current, "scalp")
         
         return None
     
-    def _analyze_swing_setup(self, df: pd.DataFrame, index: int, currency_pair: str, current: pd.Series, 
-                            previous: pd.Series, trend_bullish: bool, trend_bearish: bool) -> Optional[Dict[str, Any]]:
+    def _analyze_swing_setup(self, columns: IndicatorColumns, index: int, currency_pair: str, current: IndicatorBar, 
+                            previous: IndicatorBar, trend_bullish: bool, trend_bearish: bool) -> Optional[Dict[str, Any]]:
         """Analyze swing trading setup (30m, 1h)"""
         # Standard momentum analysis
         momentum_bullish = (current['rsi'] > 30 and current['rsi'] < 70 and
@@ -235,17 +237,17 @@ class MultiTimeframeBacktestingSystem:
                            current['macd_histogram'] < previous['macd_histogram'])
         
         # Volatility check
-        volatility_adequate = current['atr'] > df['atr'].rolling(20).mean().iloc[index] * 0.8
+        volatility_adequate = current['atr'] > current['atr_avg_20'] * 0.8
         
         if trend_bullish and momentum_bullish and volatility_adequate:
-            return self._create_signal(df, index, currency_pair, 'LONG', current, "swing")
+            return self._create_signal(columns, index, currency_pair, 'LONG', current, "swing")
         elif trend_bearish and momentum_bearish and volatility_adequate:
-            return self._create_signal(df, index, currency_pair, 'SHORT', current, "swing")
+            return self._create_signal(columns, index, currency_pair, 'SHORT', current, "swing")
         
         return None
     
-    def _analyze_position_setup(self, df: pd.DataFrame, index: int, currency_pair: str, current: pd.Series, 
-                               previous: pd.Series, trend_bullish: bool, trend_bearish: bool) -> Optional[Dict[str, Any]]:
+    def _analyze_position_setup(self, columns: IndicatorColumns, index: int, currency_pair: str, current: IndicatorBar, 
+                               previous: IndicatorBar, trend_bullish: bool, trend_bearish: bool) -> Optional[Dict[str, Any]]:
         """Analyze position trading setup (4h, 1d, 1w)"""
         # Strong trend analysis
         strong_trend_bullish = (current['sma_50'] > current['sma_200'] and
@@ -264,13 +266,13 @@ class MultiTimeframeBacktestingSystem:
                            current['macd'] < current['macd_signal'])
         
         if strong_trend_bullish and momentum_bullish:
-            return self._create_signal(df, index, currency_pair, 'LONG', current, "position")
+            return self._create_signal(columns, index, currency_pair, 'LONG', current, "position")
         elif strong_trend_bearish and momentum_bearish:
-            return self._create_signal(df, index, currency_pair, 'SHORT', current, "position")
+            return self._create_signal(columns, index, currency_pair, 'SHORT', current, "position")
         
         return None
     
-    def _create_signal(self, df: pd.DataFrame, index: int, currency_pair: str, direction: str, current: pd.Series, strategy_type: str) -> Dict[str, Any]:
+    def _create_signal(self, columns: IndicatorColumns, index: int, currency_pair: str, direction: str, current: IndicatorBar, strategy_type: str) -> Dict[str, Any]:
         """Create trading signal with appropriate risk management"""
         entry_price = current['close']
         atr = current['atr']
@@ -295,7 +297,7 @@ class MultiTimeframeBacktestingSystem:
             take_profit = entry_price - (atr * target_multiplier)
         
         # Calculate confidence
-        confidence = self._calculate_signal_confidence(df, index, direction, strategy_type)
+        confidence = self._calculate_signal_confidence(columns, index, direction, strategy_type)
         
         return {
             'signal': direction,
@@ -310,9 +312,9 @@ class MultiTimeframeBacktestingSystem:
             'currency_pair': currency_pair
         }
     
-    def _calculate_signal_confidence(self, df: pd.DataFrame, index: int, direction: str, strategy_type: str) -> float:
+    def _calculate_signal_confidence(self, columns: IndicatorColumns, index: int, direction: str, strategy_type: str) -> float:
         """Calculate signal confidence based on strategy type"""
-        current = df.iloc[index]
+        current = columns.bar(index)
         confidence = 50.0  # Base confidence
         
         # Trend alignment bonus
@@ -333,14 +335,14 @@ class MultiTimeframeBacktestingSystem:
         
         # Strategy-specific bonuses
         if strategy_type == "scalp":
-            if hasattr(current, 'rsi_fast') and 30 < current['rsi_fast'] < 70:
+            if 'rsi_fast' in current and 30 < current['rsi_fast'] < 70:
                 confidence += 5
         elif strategy_type == "position":
-            if hasattr(current, 'adx') and current['adx'] > 30:
+            if 'adx' in current and current['adx'] > 30:
                 confidence += 10
         
         # Volatility bonus
-        if current['atr'] > df['atr'].rolling(20).mean().iloc[index]:
+        if current['atr'] > current['atr_avg_20']:
             confidence += 5
         
         return min(100.0, confidence)
@@ -364,7 +366,10 @@ class MultiTimeframeBacktestingSystem:
         # Track daily trade count
         daily_trades = {}
         
-        for signal in signals:
+        # Resolve every signal's exit in one vectorized pass
+        exits = self._resolve_exits(df, signals)
+        
+        for signal, exit_info in zip(signals, exits):
             # Check max drawdown
             if current_drawdown > self.max_drawdown_limit:
                 continue
@@ -383,7 +388,7 @@ class MultiTimeframeBacktestingSystem:
             position_size = risk_amount / stop_distance
             
             # Simulate trade execution
-            trade_result = self._simulate_trade_execution(df, signal, position_size)
+            trade_result = self._simulate_trade_execution(df, signal, position_size, exit_info)
             
             if trade_result:
                 trades.append(trade_result)
@@ -409,65 +414,37 @@ class MultiTimeframeBacktestingSystem:
             'max_drawdown': max_drawdown
         }
     
-    def _simulate_trade_execution(self, df: pd.DataFrame, signal: Dict[str, Any], position_size: float) -> Optional[Dict[str, Any]]:
+    def _resolve_exits(self, df: pd.DataFrame, signals: List[Dict[str, Any]]) -> List[Optional[Tuple[int, float, str]]]:
+        """Resolve (exit_idx, exit_price, exit_reason) for all signals with the shared exit kernel"""
+        close = df['close'].to_numpy(dtype=np.float64)
+        # Stops and targets trigger on the close, as this engine always has
+        return resolve_signal_exits(df['timestamp'], signals, close, close, close, direction_key='signal')
+    
+    def _simulate_trade_execution(self, df: pd.DataFrame, signal: Dict[str, Any], position_size: float,
+                                  exit_info: Optional[Tuple[int, float, str]] = None) -> Optional[Dict[str, Any]]:
         """Simulate realistic trade execution"""
         entry_time = signal['timestamp']
         entry_price = signal['entry_price']
-        stop_loss = signal['stop_loss']
-        take_profit = signal['take_profit']
         direction = signal['signal']
         
-        # Find entry point in data
-        entry_idx = df[df['timestamp'] == entry_time].index
-        if len(entry_idx) == 0:
+        if exit_info is None:
+            exit_info = self._resolve_exits(df, [signal])[0]
+        if exit_info is None:
             return None
         
-        entry_idx = entry_idx[0]
+        exit_idx, exit_price, exit_reason = exit_info
         
         # Add slippage and transaction costs
         if direction == 'LONG':
             actual_entry = entry_price + self.slippage
+            pnl = (exit_price - actual_entry) * position_size - (position_size * actual_entry * self.transaction_cost)
         else:
             actual_entry = entry_price - self.slippage
-        
-        # Simulate trade progression
-        for i in range(entry_idx + 1, len(df)):
-            current_price = df.iloc[i]['close']
-            
-            if direction == 'LONG':
-                if current_price <= stop_loss:
-                    exit_price = stop_loss
-                    exit_reason = 'STOP_LOSS'
-                    pnl = (exit_price - actual_entry) * position_size - (position_size * actual_entry * self.transaction_cost)
-                    break
-                elif current_price >= take_profit:
-                    exit_price = take_profit
-                    exit_reason = 'TAKE_PROFIT'
-                    pnl = (exit_price - actual_entry) * position_size - (position_size * actual_entry * self.transaction_cost)
-                    break
-            else:  # SHORT
-                if current_price >= stop_loss:
-                    exit_price = stop_loss
-                    exit_reason = 'STOP_LOSS'
-                    pnl = (actual_entry - exit_price) * position_size - (position_size * actual_entry * self.transaction_cost)
-                    break
-                elif current_price <= take_profit:
-                    exit_price = take_profit
-                    exit_reason = 'TAKE_PROFIT'
-                    pnl = (actual_entry - exit_price) * position_size - (position_size * actual_entry * self.transaction_cost)
-                    break
-        else:
-            # Trade still open at end of data
-            exit_price = df.iloc[-1]['close']
-            exit_reason = 'END_OF_DATA'
-            if direction == 'LONG':
-                pnl = (exit_price - actual_entry) * position_size - (position_size * actual_entry * self.transaction_cost)
-            else:
-                pnl = (actual_entry - exit_price) * position_size - (position_size * actual_entry * self.transaction_cost)
+            pnl = (actual_entry - exit_price) * position_size - (position_size * actual_entry * self.transaction_cost)
         
         return {
             'entry_time': entry_time,
-            'exit_time': df.iloc[i]['timestamp'] if 'i' in locals() else df.iloc[-1]['timestamp'],
+            'exit_time': df['timestamp'].iloc[exit_idx],
             'entry_price': actual_entry,
             'exit_price': exit_price,
             'direction': direction,
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+NEWS BLACKOUT INDEX
+Sorted, merged pause intervals around news events with O(log n) lookups
+
+    index = BlackoutIndex.from_times(event_times, before_seconds=1800, after_seconds=1800)
+    index.contains(bar_time)          # one timestamp, bisect
+    paused = index.mask(df.index)     # whole bar index, one searchsorted pass
+
+An event at t blacks out the closed interval [t - before, t + after], the
+same window as `-after <= (event - now) <= before`. Intervals are sorted by
+start and overlapping ones merged, so a timestamp is paused exactly when the
+last interval starting at or before it has not ended yet.
+
+Callers filter the events (impact, affected currencies) once per instrument
+and build one index from the remaining timestamps; the NewsIntegration
+classes cache those indexes until their events change (add_event, or
+invalidate() after editing the events in place). news_multiplier() does the
+same per impact level for DynamicSpreadModel.spread_series. Timestamps are
+compared as int64 epoch nanoseconds (naive values are taken as UTC).
+"""
+
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+NS_PER_SECOND = 1_000_000_000
+
+
+def to_epoch_ns(timestamp: Any) -> int:
+    """Epoch nanoseconds of a datetime / pd.Timestamp / datetime64 / ISO string"""
+    if isinstance(timestamp, pd.Timestamp):
+        return timestamp.value
+    return pd.Timestamp(timestamp).value
+
+
+def epoch_ns_array(timestamps: Any) -> np.ndarray:
+    """int64 epoch nanoseconds of a DatetimeIndex / Series / list of timestamps"""
+    if isinstance(timestamps, np.ndarray) and timestamps.dtype == np.int64:
+        return timestamps  # already epoch ns
+    if isinstance(timestamps, pd.Series):
+        timestamps = timestamps.to_numpy()
+    if not isinstance(timestamps, pd.DatetimeIndex):
+        timestamps = pd.DatetimeIndex(timestamps)
+    return timestamps.as_unit('ns').asi8
+
+
+class BlackoutIndex:
+    """Merged [start, end] intervals (epoch ns), sorted by start"""
+
+    def __init__(self, intervals: Iterable[Tuple[int, int]] = ()):
+        merged: List[List[int]] = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = np.array([start for start, _ in merged], dtype=np.int64)
+        self.ends = np.array([end for _, end in merged], dtype=np.int64)
+        # Plain lists for scalar bisect lookups (no NumPy scalar overhead)
+        self._starts = self.starts.tolist()
+        self._ends = self.ends.tolist()
+
+    @classmethod
+    def from_times(cls, times: Iterable[Any], before_seconds: float,
+                   after_seconds: float) -> 'BlackoutIndex':
+        """One [t - before, t + after] interval per event time"""
+        before = int(round(before_seconds * NS_PER_SECOND))
+        after = int(round(after_seconds * NS_PER_SECOND))
+        points = [to_epoch_ns(t) for t in times]
+        return cls((t - before, t + after) for t in points)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def contains(self, timestamp: Any) -> bool:
+        """Whether timestamp falls inside a blackout interval"""
+        t = to_epoch_ns(timestamp)
+        i = bisect_right(self._starts, t) - 1
+        return i >= 0 and t <= self._ends[i]
+
+    def mask(self, timestamps: Any) -> np.ndarray:
+        """Boolean pause mask aligned with timestamps, in one vectorized pass"""
+        t = epoch_ns_array(timestamps)
+        if not len(self._starts):
+            return np.zeros(len(t), dtype=bool)
+        i = np.searchsorted(self.starts, t, side='right') - 1
+        return (i >= 0) & (t <= self.ends[np.maximum(i, 0)])
+
+
+def news_multiplier(timestamps: Any, events: Iterable[Tuple[Any, float]],
+                    window_seconds: float) -> np.ndarray:
+    """
+    Largest multiplier among the (time, multiplier) events within
+    +/- window_seconds of each timestamp, 1.0 where there is none
+    """
+    by_level: Dict[float, List[Any]] = {}
+    for time, level in events:
+        by_level.setdefault(level, []).append(time)
+
+    t = epoch_ns_array(timestamps)
+    out = np.ones(len(t))
+    for level, times in by_level.items():
+        inside = BlackoutIndex.from_times(times, window_seconds, window_seconds).mask(t)
+        out[inside] = np.maximum(out[inside], level)
+    return out
@@ -4,7 +4,6 @@ NEWS INTEGRATION MODULE
 Integrates news/economic data with trading strategies for enhanced decision making
 """
 
-import pandas as pd
 import numpy as np
 import os
 import logging
@@ -12,6 +11,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import yaml
 
+from news_store import NS_PER_HOUR, NewsStore, SymbolNews, naive_epoch_ns
+
 logger = logging.getLogger(__name__)
 
 class NewsIntegration:
@@ -24,6 +25,7 @@ class NewsIntegration:
         self.news_path = news_path
         self.linked_path = os.path.join(news_path, "linked")
         self.processed_path = os.path.join(news_path, "processed")
+        self.news_store = NewsStore(self.linked_path)
         
         # News impact weights
         self.impact_weights = {
@@ -51,54 +53,45 @@ class NewsIntegration:
             'unknown': 0.5
         }
         
+        # Keywords for the simple title/description sentiment
+        self.positive_keywords = ['positive', 'growth', 'increase', 'rise', 'strong', 'bullish', 'optimistic']
+        self.negative_keywords = ['negative', 'decline', 'decrease', 'fall', 'weak', 'bearish', 'pessimistic']
+        
         logger.info("📰 News Integration initialized")
     
     def get_news_context(self, symbol: str, timestamp: datetime, lookback_hours: int = 24) -> Dict[str, Any]:
         """Get news context for a specific symbol and timestamp"""
         try:
-            # Load linked news data
-            linked_file = os.path.join(self.linked_path, f"{symbol}_1H_events.csv")
-            if not os.path.exists(linked_file):
+            # Linked news data, parsed once per symbol
+            news = self.news_store.get(symbol)
+            if news is None:
                 return self._get_empty_news_context()
             
-            news_data = pd.read_csv(linked_file)
-            news_data['candle_timestamp_utc'] = pd.to_datetime(news_data['candle_timestamp_utc'])
-            news_data['event_timestamp_utc'] = pd.to_datetime(news_data['event_timestamp_utc'])
-            
-            # Filter news within lookback period
+            # Filter news within lookback period (timezone-naive comparison)
             start_time = timestamp - timedelta(hours=lookback_hours)
             end_time = timestamp + timedelta(hours=1)  # Include current hour
+            lo, hi = news.between(start_time, end_time)
             
-            # Convert timestamps to timezone-naive for comparison
-            news_data['event_timestamp_naive'] = news_data['event_timestamp_utc'].dt.tz_localize(None)
-            start_time_naive = start_time.replace(tzinfo=None) if start_time.tzinfo else start_time
-            end_time_naive = end_time.replace(tzinfo=None) if end_time.tzinfo else end_time
-            
-            recent_news = news_data[
-                (news_data['event_timestamp_naive'] >= start_time_naive) & 
-                (news_data['event_timestamp_naive'] <= end_time_naive)
-            ].copy()
-            
-            if recent_news.empty:
+            if lo == hi:
                 return self._get_empty_news_context()
             
             # Calculate news impact score
-            impact_score = self._calculate_news_impact_score(recent_news)
+            impact_score = self._calculate_news_impact_score(news, lo, hi)
             
             # Get upcoming events
-            upcoming_events = self._get_upcoming_events(news_data, timestamp)
+            upcoming_events = self._get_upcoming_events(news, timestamp)
             
             # Analyze news sentiment
-            sentiment_analysis = self._analyze_news_sentiment(recent_news)
+            sentiment_analysis = self._analyze_news_sentiment(news, lo, hi)
             
             # Get news-based trading recommendations
-            trading_recommendations = self._get_news_trading_recommendations(recent_news, upcoming_events)
+            trading_recommendations = self._get_news_trading_recommendations(news, lo, hi, upcoming_events)
             
             return {
                 'has_recent_news': True,
-                'news_count': len(recent_news),
+                'news_count': hi - lo,
                 'impact_score': impact_score,
-                'recent_events': recent_news.to_dict('records'),
+                'recent_events': news.records(lo, hi, file_order=True),
                 'upcoming_events': upcoming_events,
                 'sentiment_analysis': sentiment_analysis,
                 'trading_recommendations': trading_recommendations,
@@ -124,90 +117,64 @@ class NewsIntegration:
             'recommended_action': 'proceed'
         }
     
-    def _calculate_news_impact_score(self, news_data: pd.DataFrame) -> float:
-        """Calculate overall news impact score (0-1)"""
+    def _calculate_news_impact_score(self, news: SymbolNews, lo: int, hi: int) -> float:
+        """Calculate overall news impact score (0-1) of events lo..hi"""
         try:
-            if news_data.empty:
+            if lo == hi:
                 return 0.0
             
-            total_score = 0.0
-            total_weight = 0.0
+            impact_weight = news.impact_weights(self.impact_weights, 0.1)[lo:hi]
+            category_weight = news.category_weights(self.category_weights, 0.3)[lo:hi]
             
-            for _, event in news_data.iterrows():
-                impact_weight = self.impact_weights.get(event['impact'], 0.1)
-                category_weight = self.category_weights.get(event['category'], 0.3)
-                
-                # Time decay factor (more recent news has higher impact)
-                time_diff = datetime.now() - pd.to_datetime(event['event_timestamp_utc'])
-                time_decay = max(0.1, 1.0 - (time_diff.total_seconds() / 3600) / 24)  # Decay over 24 hours
-                
-                event_score = impact_weight * category_weight * time_decay
-                total_score += event_score
-                total_weight += 1.0
+            # Time decay factor (more recent news has higher impact), decays over 24 hours
+            hours_ago = (naive_epoch_ns(datetime.now()) - news.times[lo:hi]) / NS_PER_HOUR
+            time_decay = np.maximum(0.1, 1.0 - hours_ago / 24)
             
-            return min(1.0, total_score / max(1.0, total_weight))
+            total_score = float(np.sum(impact_weight * category_weight * time_decay))
+            return min(1.0, total_score / max(1.0, hi - lo))
             
         except Exception as e:
             logger.error(f"Error calculating news impact score: {e}")
             return 0.0
     
-    def _get_upcoming_events(self, news_data: pd.DataFrame, current_time: datetime) -> List[Dict[str, Any]]:
+    def _get_upcoming_events(self, news: SymbolNews, current_time: datetime) -> List[Dict[str, Any]]:
         """Get upcoming high-impact events within next 24 hours"""
         try:
             future_time = current_time + timedelta(hours=24)
+            lo, hi = news.between(current_time, future_time, closed_start=False)
             
-            # Convert timestamps for comparison
-            news_data['event_timestamp_naive'] = news_data['event_timestamp_utc'].dt.tz_localize(None)
-            current_time_naive = current_time.replace(tzinfo=None) if current_time.tzinfo else current_time
-            future_time_naive = future_time.replace(tzinfo=None) if future_time.tzinfo else future_time
-            
-            upcoming = news_data[
-                (news_data['event_timestamp_naive'] > current_time_naive) & 
-                (news_data['event_timestamp_naive'] <= future_time_naive) &
-                (news_data['impact'].isin(['high', 'medium']))
-            ].copy()
+            # Events are time-sorted, so the selection is already ordered by hours_until
+            important = news.impact_is('high')[lo:hi] | news.impact_is('medium')[lo:hi]
+            hours_until = (news.times[lo:hi][important] - naive_epoch_ns(current_time)) / NS_PER_HOUR
             
             upcoming_events = []
-            for _, event in upcoming.iterrows():
+            for event, hours in zip(news.records(lo, hi, mask=important), hours_until.tolist()):
                 upcoming_events.append({
                     'event_title': event['event_title'],
                     'event_timestamp': event['event_timestamp_utc'],
                     'impact': event['impact'],
                     'category': event['category'],
-                    'hours_until': (pd.to_datetime(event['event_timestamp_utc']) - current_time).total_seconds() / 3600
+                    'hours_until': hours
                 })
             
-            return sorted(upcoming_events, key=lambda x: x['hours_until'])
+            return upcoming_events
             
         except Exception as e:
             logger.error(f"Error getting upcoming events: {e}")
             return []
     
-    def _analyze_news_sentiment(self, news_data: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_news_sentiment(self, news: SymbolNews, lo: int, hi: int) -> Dict[str, Any]:
         """Analyze overall sentiment from recent news"""
         try:
-            if news_data.empty:
+            if lo == hi:
                 return {'overall_sentiment': 'neutral', 'sentiment_score': 0.0}
             
-            # Simple sentiment analysis based on keywords
-            positive_keywords = ['positive', 'growth', 'increase', 'rise', 'strong', 'bullish', 'optimistic']
-            negative_keywords = ['negative', 'decline', 'decrease', 'fall', 'weak', 'bearish', 'pessimistic']
-            
-            sentiment_scores = []
-            for _, event in news_data.iterrows():
-                text = (event['event_title'] + ' ' + event['event_description']).lower()
-                
-                positive_count = sum(1 for keyword in positive_keywords if keyword in text)
-                negative_count = sum(1 for keyword in negative_keywords if keyword in text)
-                
-                if positive_count > negative_count:
-                    sentiment_scores.append(1.0)
-                elif negative_count > positive_count:
-                    sentiment_scores.append(-1.0)
-                else:
-                    sentiment_scores.append(0.0)
+            # Simple sentiment analysis based on keywords (+1 / -1 / 0 per event)
+            sentiment_scores = news.keyword_sentiment(self.positive_keywords, self.negative_keywords)[lo:hi]
+            if np.isnan(sentiment_scores).any():
+                raise ValueError("event without title or description")
             
-            avg_sentiment = np.mean(sentiment_scores) if sentiment_scores else 0.0
+            avg_sentiment = float(np.mean(sentiment_scores))
             
             if avg_sentiment > 0.2:
                 overall_sentiment = 'positive'
@@ -226,19 +193,22 @@ class NewsIntegration:
             logger.error(f"Error analyzing news sentiment: {e}")
             return {'overall_sentiment': 'neutral', 'sentiment_score': 0.0}
     
-    def _get_news_trading_recommendations(self, recent_news: pd.DataFrame, upcoming_events: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Get trading recommendations based on news analysis"""
+    def _get_news_trading_recommendations(self, news: SymbolNews, lo: int, hi: int,
+                                          upcoming_events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Get trading recommendations based on news analysis of events lo..hi"""
         try:
-            if recent_news.empty and not upcoming_events:
+            if lo == hi and not upcoming_events:
                 return {'action': 'normal_trading', 'reason': 'No significant news'}
             
+            detail_columns = ['event_title', 'impact', 'category']
+            
             # Check for high-impact recent events
-            high_impact_recent = recent_news[recent_news['impact'] == 'high']
-            if not high_impact_recent.empty:
+            high_impact_recent = news.impact_is('high')[lo:hi]
+            if high_impact_recent.any():
                 return {
                     'action': 'reduce_risk',
-                    'reason': f'High-impact news detected: {len(high_impact_recent)} events',
-                    'details': high_impact_recent[['event_title', 'impact', 'category']].to_dict('records')
+                    'reason': f'High-impact news detected: {int(high_impact_recent.sum())} events',
+                    'details': news.records(lo, hi, detail_columns, mask=high_impact_recent, file_order=True)
                 }
             
             # Check for upcoming high-impact events
@@ -253,12 +223,12 @@ class NewsIntegration:
                     }
             
             # Check for medium-impact events
-            medium_impact_recent = recent_news[recent_news['impact'] == 'medium']
-            if not medium_impact_recent.empty:
+            medium_impact_recent = news.impact_is('medium')[lo:hi]
+            if medium_impact_recent.any():
                 return {
                     'action': 'monitor_closely',
-                    'reason': f'Medium-impact news: {len(medium_impact_recent)} events',
-                    'details': medium_impact_recent[['event_title', 'impact', 'category']].to_dict('records')
+                    'reason': f'Medium-impact news: {int(medium_impact_recent.sum())} events',
+                    'details': news.records(lo, hi, detail_columns, mask=medium_impact_recent, file_order=True)
                 }
             
             return {'action': 'normal_trading', 'reason': 'Low-impact news only'}
@@ -358,14 +328,15 @@ class NewsIntegration:
             for file in os.listdir(self.linked_path):
                 if file.endswith('_1H_events.csv'):
                     symbol = file.replace('_1H_events.csv', '')
-                    file_path = os.path.join(self.linked_path, file)
+                    news = self.news_store.get(symbol)
+                    if news is None:
+                        continue
                     
-                    df = pd.read_csv(file_path)
                     summary['available_symbols'].append(symbol)
-                    summary['total_events'] += len(df)
-                    summary['high_impact_events'] += len(df[df['impact'] == 'high'])
-                    summary['medium_impact_events'] += len(df[df['impact'] == 'medium'])
-                    summary['low_impact_events'] += len(df[df['impact'] == 'low'])
+                    summary['total_events'] += len(news)
+                    summary['high_impact_events'] += int(news.impact_is('high').sum())
+                    summary['medium_impact_events'] += int(news.impact_is('medium').sum())
+                    summary['low_impact_events'] += int(news.impact_is('low').sum())
             
             return summary
             
@@ -2,6 +2,13 @@
 """
 NEWS-PRICE ALIGNER
 Organizes and aligns economic/news data with price candles for backtesting
+
+Events are matched to their nearest candle with two as-of joins (backward and
+forward, each with an optional tolerance) and summarized per candle in
+linked/{symbol}_1H_candle_news.csv next to linked/{symbol}_1H_events.csv.
+
+Environment:
+    NEWS_ALIGN_CHUNK_ROWS         align news files in chunks of this many rows (default 0 = all at once)
 """
 
 import pandas as pd
@@ -13,6 +20,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import yaml
 
+from keyword_matcher import KeywordClassifier
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -53,6 +62,27 @@ class NewsPriceAligner:
             'GBP_JPY': 'gbp_jpy'
         }
         
+        # Impact / category keywords, checked in order: the first label with a match wins
+        self.impact_keywords = {
+            'high': ['cpi', 'inflation', 'fed', 'interest rate', 'nfp', 'unemployment', 'gdp', 'fomc', 'rate cut', 'rate hike'],
+            'medium': ['retail sales', 'manufacturing', 'trade', 'deficit', 'surplus', 'pmi', 'consumer confidence'],
+            'low': ['speech', 'comment', 'forecast', 'outlook', 'analysis']
+        }
+        self.category_keywords = {
+            'inflation': ['cpi', 'inflation', 'price'],
+            'monetary_policy': ['fed', 'interest rate', 'fomc'],
+            'employment': ['employment', 'unemployment', 'jobs', 'nfp'],
+            'economic_growth': ['gdp', 'growth', 'recession'],
+            'trade': ['trade', 'deficit', 'surplus']
+        }
+        
+        # As-of alignment: furthest candle at/before and after an event (None = any distance)
+        self.backward_tolerance: Optional[pd.Timedelta] = None
+        self.forward_tolerance: Optional[pd.Timedelta] = None
+        
+        # Align news in chunks of this many rows to bound memory (0 = all at once)
+        self.chunk_rows = int(os.environ.get('NEWS_ALIGN_CHUNK_ROWS', 0))
+        
         logger.info("🎯 News-Price Aligner initialized")
     
     def organize_news_data(self):
@@ -123,8 +153,10 @@ class NewsPriceAligner:
             with open(file_path, 'r') as f:
                 news_data = json.load(f)
             
+            impacts, categories = self._classify_items(news_data)
+            
             processed_news = []
-            for item in news_data:
+            for item, impact, category in zip(news_data, impacts, categories):
                 processed_item = {
                     'timestamp_utc': item.get('published_at', ''),
                     'title': item.get('title', ''),
@@ -135,8 +167,8 @@ class NewsPriceAligner:
                     'sentiment_score': item.get('sentiment_score', 0),
                     'symbol': symbol,
                     'data_source': item.get('data_source', 'marketaux'),
-                    'impact': self._classify_impact(item.get('title', '') + ' ' + item.get('description', '')),
-                    'category': self._classify_category(item.get('title', '') + ' ' + item.get('description', ''))
+                    'impact': impact,
+                    'category': category
                 }
                 processed_news.append(processed_item)
             
@@ -158,7 +190,9 @@ class NewsPriceAligner:
             processed_news = []
             market_news = enhanced_data.get('market_news', [])
             
-            for item in market_news:
+            impacts, categories = self._classify_items(market_news)
+            
+            for item, impact, category in zip(market_news, impacts, categories):
                 processed_item = {
                     'timestamp_utc': item.get('published_at', ''),
                     'title': item.get('title', ''),
@@ -169,8 +203,8 @@ class NewsPriceAligner:
                     'sentiment_score': item.get('sentiment_score', 0),
                     'symbol': symbol,
                     'data_source': item.get('data_source', 'marketaux'),
-                    'impact': self._classify_impact(item.get('title', '') + ' ' + item.get('description', '')),
-                    'category': self._classify_category(item.get('title', '') + ' ' + item.get('description', '')),
+                    'impact': impact,
+                    'category': category,
                     'entities': str(item.get('entities', [])),
                     'downloaded_at': item.get('downloaded_at', '')
                 }
@@ -185,40 +219,24 @@ class NewsPriceAligner:
         except Exception as e:
             logger.error(f"Error processing enhanced news for {symbol}: {e}")
     
+    def _impact_classifier(self) -> KeywordClassifier:
+        return KeywordClassifier.get(list(self.impact_keywords.items()), default='unknown')
+    
+    def _category_classifier(self) -> KeywordClassifier:
+        return KeywordClassifier.get(list(self.category_keywords.items()), default='general')
+    
+    def _classify_items(self, items: List[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+        """Impact and category of every news item, classified column-wise"""
+        texts = [item.get('title', '') + ' ' + item.get('description', '') for item in items]
+        return self._impact_classifier().classify_many(texts), self._category_classifier().classify_many(texts)
+    
     def _classify_impact(self, text: str) -> str:
         """Classify news impact based on content"""
-        text_lower = text.lower()
-        
-        # High impact keywords
-        high_impact = ['cpi', 'inflation', 'fed', 'interest rate', 'nfp', 'unemployment', 'gdp', 'fomc', 'rate cut', 'rate hike']
-        medium_impact = ['retail sales', 'manufacturing', 'trade', 'deficit', 'surplus', 'pmi', 'consumer confidence']
-        low_impact = ['speech', 'comment', 'forecast', 'outlook', 'analysis']
-        
-        if any(keyword in text_lower for keyword in high_impact):
-            return 'high'
-        elif any(keyword in text_lower for keyword in medium_impact):
-            return 'medium'
-        elif any(keyword in text_lower for keyword in low_impact):
-            return 'low'
-        else:
-            return 'unknown'
+        return self._impact_classifier().classify(text)
     
     def _classify_category(self, text: str) -> str:
         """Classify news category"""
-        text_lower = text.lower()
-        
-        if any(keyword in text_lower for keyword in ['cpi', 'inflation', 'price']):
-            return 'inflation'
-        elif any(keyword in text_lower for keyword in ['fed', 'interest rate', 'fomc']):
-            return 'monetary_policy'
-        elif any(keyword in text_lower for keyword in ['employment', 'unemployment', 'jobs', 'nfp']):
-            return 'employment'
-        elif any(keyword in text_lower for keyword in ['gdp', 'growth', 'recession']):
-            return 'economic_growth'
-        elif any(keyword in text_lower for keyword in ['trade', 'deficit', 'surplus']):
-            return 'trade'
-        else:
-            return 'general'
+        return self._category_classifier().classify(text)
     
     def _align_news_with_prices(self):
         """Align news events with price candles"""
@@ -238,84 +256,180 @@ class NewsPriceAligner:
                 # Load processed news data
                 news_file = os.path.join(self.processed_path, f"{symbol.lower()}_processed_news.csv")
                 enhanced_news_file = os.path.join(self.processed_path, f"{symbol.lower()}_enhanced_processed_news.csv")
+                news_files = [path for path in (news_file, enhanced_news_file) if os.path.exists(path)]
                 
-                all_news = []
-                if os.path.exists(news_file):
-                    basic_news = pd.read_csv(news_file)
-                    all_news.append(basic_news)
-                
-                if os.path.exists(enhanced_news_file):
-                    enhanced_news = pd.read_csv(enhanced_news_file)
-                    all_news.append(enhanced_news)
-                
-                if not all_news:
+                if not news_files:
                     logger.warning(f"No news data found for {symbol}")
                     continue
                 
-                # Combine news data
-                combined_news = pd.concat(all_news, ignore_index=True)
-                combined_news['timestamp_utc'] = pd.to_datetime(combined_news['timestamp_utc'])
-                
-                # Align news with price candles
-                aligned_data = self._align_events_with_candles(price_data, combined_news)
-                
-                # Save aligned data
                 output_file = os.path.join(self.linked_path, f"{symbol}_1H_events.csv")
-                aligned_data.to_csv(output_file, index=False)
-                logger.info(f"Aligned {len(aligned_data)} news events with price data for {symbol}")
+                if self.chunk_rows > 0:
+                    # Streaming: one chunk of news in memory at a time
+                    event_count, candle_news = self._align_news_files_in_chunks(price_data, news_files, output_file)
+                else:
+                    # Combine news data
+                    combined_news = pd.concat([pd.read_csv(path) for path in news_files], ignore_index=True)
+                    combined_news['timestamp_utc'] = pd.to_datetime(combined_news['timestamp_utc'])
+                    
+                    # Align news with price candles
+                    aligned_data = self._align_events_with_candles(price_data, combined_news)
+                    
+                    # Save aligned data
+                    aligned_data.to_csv(output_file, index=False)
+                    event_count = len(aligned_data)
+                    candle_news = self._finalize_candle_news(self._candle_news_totals(aligned_data))
+                
+                candle_file = os.path.join(self.linked_path, f"{symbol}_1H_candle_news.csv")
+                candle_news.to_csv(candle_file)
+                logger.info(f"Aligned {event_count} news events with price data for {symbol} "
+                            f"({len(candle_news)} candles with news)")
             
         except Exception as e:
             logger.error(f"Error aligning news with prices: {e}")
     
-    def _align_events_with_candles(self, price_data: pd.DataFrame, news_data: pd.DataFrame) -> pd.DataFrame:
-        """Align news events with price candles"""
+    def _align_news_files_in_chunks(self, price_data: pd.DataFrame, news_files: List[str],
+                                    output_file: str) -> Tuple[int, pd.DataFrame]:
+        """
+        Align processed news files chunk by chunk, appending to output_file.
+        Only one chunk of events and the running per-candle totals are held.
+        """
+        candles = self._prepare_candles(price_data)
+        totals = None
+        event_count = 0
+        tmp_file = output_file + '.tmp'
         try:
-            aligned_events = []
+            for path in news_files:
+                for chunk in pd.read_csv(path, chunksize=self.chunk_rows):
+                    chunk['timestamp_utc'] = pd.to_datetime(chunk['timestamp_utc'])
+                    aligned = self._align_events_with_candles(candles, chunk, prepared=True)
+                    if aligned.empty:
+                        continue
+                    aligned.to_csv(tmp_file, mode='a' if event_count else 'w', header=not event_count, index=False)
+                    event_count += len(aligned)
+                    
+                    partial = self._candle_news_totals(aligned)
+                    totals = partial if totals is None else totals.add(partial, fill_value=0)
             
-            for _, news_item in news_data.iterrows():
-                event_time = news_item['timestamp_utc']
-                
-                # Find the closest candle (before or after the event)
-                price_data['time_diff'] = abs(price_data['timestamp'] - event_time)
-                closest_candle = price_data.loc[price_data['time_diff'].idxmin()]
-                
-                # Determine relationship
-                candle_time = closest_candle['timestamp']
-                time_diff_minutes = (event_time - candle_time).total_seconds() / 60
-                
-                if time_diff_minutes < 0:
-                    relation = 'pre_event'
-                elif time_diff_minutes <= 60:  # Within the same hour
-                    relation = 'within_candle'
-                else:
-                    relation = 'post_event'
-                
-                aligned_event = {
-                    'candle_timestamp_utc': candle_time,
-                    'event_timestamp_utc': event_time,
-                    'event_title': news_item['title'],
-                    'event_description': news_item['description'],
-                    'source': news_item['source'],
-                    'impact': news_item['impact'],
-                    'category': news_item['category'],
-                    'sentiment': news_item['sentiment'],
-                    'sentiment_score': news_item['sentiment_score'],
-                    'relation': relation,
-                    'minutes_from_event': time_diff_minutes,
-                    'candle_open': closest_candle['open'],
-                    'candle_high': closest_candle['high'],
-                    'candle_low': closest_candle['low'],
-                    'candle_close': closest_candle['close'],
-                    'candle_volume': closest_candle['volume']
-                }
-                aligned_events.append(aligned_event)
+            if not event_count:
+                pd.DataFrame().to_csv(tmp_file, index=False)
+            os.replace(tmp_file, output_file)
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+        
+        return event_count, self._finalize_candle_news(totals)
+    
+    @staticmethod
+    def _prepare_candles(price_data: pd.DataFrame) -> pd.DataFrame:
+        """Candles sorted by time on ns keys; a repeated timestamp keeps its first row"""
+        candles = price_data[['timestamp', 'open', 'high', 'low', 'close', 'volume']].copy()
+        candles['timestamp'] = candles['timestamp'].dt.as_unit('ns')
+        candles = candles.sort_values('timestamp', kind='stable').drop_duplicates('timestamp', keep='first')
+        return candles.reset_index(drop=True)
+    
+    def _nearest_candle_rows(self, candles: pd.DataFrame, event_times: pd.Series) -> np.ndarray:
+        """
+        Row in candles of the candle nearest each event (sorted event_times), -1 if
+        none lies within backward_tolerance before / forward_tolerance after it.
+        Equal distances go to the earlier candle.
+        """
+        events = pd.DataFrame({'timestamp': event_times.array})
+        keys = pd.DataFrame({'timestamp': candles['timestamp'].array, 'row': np.arange(len(candles))})
+        
+        before = pd.merge_asof(events, keys, on='timestamp', direction='backward',
+                               tolerance=self.backward_tolerance)['row'].to_numpy(np.float64, na_value=np.nan)
+        after = pd.merge_asof(events, keys, on='timestamp', direction='forward',
+                              tolerance=self.forward_tolerance)['row'].to_numpy(np.float64, na_value=np.nan)
+        
+        event_ns = pd.DatetimeIndex(events['timestamp']).asi8
+        candle_ns = pd.DatetimeIndex(keys['timestamp']).asi8
+        has_before, has_after = ~np.isnan(before), ~np.isnan(after)
+        before_rows = np.where(has_before, before, 0).astype(np.int64)
+        after_rows = np.where(has_after, after, 0).astype(np.int64)
+        
+        use_before = has_before & (~has_after | (event_ns - candle_ns[before_rows] <= candle_ns[after_rows] - event_ns))
+        return np.where(use_before, before_rows, np.where(has_after, after_rows, -1))
+    
+    def _align_events_with_candles(self, price_data: pd.DataFrame, news_data: pd.DataFrame,
+                                   prepared: bool = False) -> pd.DataFrame:
+        """Align news events with their nearest price candle (as-of joins, in event order)"""
+        try:
+            candles = price_data if prepared else self._prepare_candles(price_data)
+            
+            # merge_asof needs time-sorted events; keep each event's original position
+            event_times = news_data['timestamp_utc'].dt.as_unit('ns')
+            order = np.argsort(pd.DatetimeIndex(event_times).asi8, kind='stable')
+            order = order[event_times.notna().to_numpy()[order]]
+            sorted_rows = self._nearest_candle_rows(candles, event_times.iloc[order])
+            
+            rows = np.full(len(news_data), -1)
+            rows[order] = sorted_rows
+            matched = rows >= 0
+            if not matched.all():
+                logger.warning(f"{int((~matched).sum())} news events have no candle within tolerance")
+            
+            events = news_data[matched]
+            candle = candles.iloc[rows[matched]]
+            event_time = events['timestamp_utc'].array
+            candle_time = candle['timestamp'].array
             
-            return pd.DataFrame(aligned_events)
+            # Determine relationship
+            time_diff_minutes = (pd.DatetimeIndex(event_time).as_unit('ns').asi8 -
+                                 pd.DatetimeIndex(candle_time).asi8) / 1e9 / 60
+            relation = np.select([time_diff_minutes < 0, time_diff_minutes <= 60],  # Within the same hour
+                                 ['pre_event', 'within_candle'], 'post_event')
+            
+            return pd.DataFrame({
+                'candle_timestamp_utc': candle_time,
+                'event_timestamp_utc': event_time,
+                'event_title': events['title'].to_numpy(),
+                'event_description': events['description'].to_numpy(),
+                'source': events['source'].to_numpy(),
+                'impact': events['impact'].to_numpy(),
+                'category': events['category'].to_numpy(),
+                'sentiment': events['sentiment'].to_numpy(),
+                'sentiment_score': events['sentiment_score'].to_numpy(),
+                'relation': relation,
+                'minutes_from_event': time_diff_minutes,
+                'candle_open': candle['open'].to_numpy(),
+                'candle_high': candle['high'].to_numpy(),
+                'candle_low': candle['low'].to_numpy(),
+                'candle_close': candle['close'].to_numpy(),
+                'candle_volume': candle['volume'].to_numpy()
+            })
             
         except Exception as e:
             logger.error(f"Error aligning events with candles: {e}")
             return pd.DataFrame()
     
+    @staticmethod
+    def _candle_news_totals(aligned_data: pd.DataFrame) -> pd.DataFrame:
+        """Per-candle event counts and sentiment score sums (additive across chunks)"""
+        if aligned_data.empty:
+            return pd.DataFrame()
+        impact = aligned_data['impact']
+        sentiment = aligned_data['sentiment']
+        counts = pd.DataFrame({
+            'candle_timestamp_utc': aligned_data['candle_timestamp_utc'],
+            'event_count': 1,
+            'high_impact_events': (impact == 'high').astype(int),
+            'medium_impact_events': (impact == 'medium').astype(int),
+            'low_impact_events': (impact == 'low').astype(int),
+            'positive_events': (sentiment == 'positive').astype(int),
+            'negative_events': (sentiment == 'negative').astype(int),
+            'sentiment_score_sum': pd.to_numeric(aligned_data['sentiment_score'], errors='coerce').fillna(0.0)
+        })
+        return counts.groupby('candle_timestamp_utc', sort=True).sum()
+    
+    @staticmethod
+    def _finalize_candle_news(totals: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """Integer counts and mean sentiment score per candle"""
+        if totals is None or totals.empty:
+            return pd.DataFrame()
+        candle_news = totals.drop(columns='sentiment_score_sum').astype(int)
+        candle_news['sentiment_score'] = totals['sentiment_score_sum'] / totals['event_count']
+        return candle_news
+    
     def get_news_summary(self) -> Dict[str, Any]:
         """Get summary of organized news data"""
         try:
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+NEWS STORE
+Linked news events loaded once per symbol into sorted, columnar arrays
+
+    store = NewsStore("data/news/linked")
+    news = store.get('EUR_USD')                   # parsed on first use only
+    lo, hi = news.between(start, end)             # closed window, two searchsorted
+    weights = news.impact_weights(weights, 0.1)[lo:hi]
+    events = news.records(lo, hi)                 # row dicts, like to_dict('records')
+    events = news.records(lo, hi, file_order=True)   # the same rows in the file's order
+
+- `{symbol}_1H_events.csv` is read and its timestamps parsed once; the file is
+  reloaded only when its mtime changes (one os.stat per lookup)
+- Events are sorted by event time (stable, so file order breaks ties); times
+  are int64 epoch ns of the tz-naive event time, rows without one sort last
+  and never fall in a window
+- impact / category are factorized once; weight tables are looked up per
+  distinct value and broadcast over the codes, so caller dicts stay live
+- Keyword sentiment (+1 / -1 / 0 per event) is computed once per keyword set;
+  NaN marks events whose title or description is missing
+"""
+
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+NS_PER_HOUR = 3_600_000_000_000
+
+
+def naive_epoch_ns(timestamp: Any) -> int:
+    """Epoch ns of a timestamp's wall time, ignoring any tzinfo"""
+    if getattr(timestamp, 'tzinfo', None) is not None:
+        timestamp = timestamp.replace(tzinfo=None)
+    return pd.Timestamp(timestamp).value
+
+
+class SymbolNews:
+    """One symbol's linked events as columns, sorted by event time"""
+
+    def __init__(self, frame: pd.DataFrame):
+        frame['candle_timestamp_utc'] = pd.to_datetime(frame['candle_timestamp_utc'])
+        frame['event_timestamp_utc'] = pd.to_datetime(frame['event_timestamp_utc'])
+        frame['event_timestamp_naive'] = frame['event_timestamp_utc'].dt.tz_localize(None)
+        frame = frame.reset_index(drop=True).sort_values('event_timestamp_naive', kind='stable',
+                                                          na_position='last')
+        self.file_rows = frame.index.to_numpy()   # position of each sorted row in the file
+        self.frame = frame.reset_index(drop=True)
+
+        naive = self.frame['event_timestamp_naive']
+        self.size = int(naive.notna().sum())
+        self.times = naive.iloc[:self.size].to_numpy('datetime64[ns]').view(np.int64)
+
+        self.impact_codes, self.impact_values = pd.factorize(self.frame['impact'])
+        self.category_codes, self.category_values = pd.factorize(self.frame['category'])
+        self._impact_masks: Dict[str, np.ndarray] = {}
+        self._records: Optional[List[Dict[str, Any]]] = None
+        self._sentiment: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    # ------------------------------------------------------------------
+    # Windows
+    # ------------------------------------------------------------------
+    def between(self, start: Any, end: Any, closed_start: bool = True) -> Tuple[int, int]:
+        """Row range [lo, hi) of events with start <= time <= end (start < time if not closed_start)"""
+        side = 'left' if closed_start else 'right'
+        lo = int(np.searchsorted(self.times, naive_epoch_ns(start), side=side))
+        hi = int(np.searchsorted(self.times, naive_epoch_ns(end), side='right'))
+        return lo, max(lo, hi)
+
+    # ------------------------------------------------------------------
+    # Columns
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _lookup(codes: np.ndarray, values: Iterable[Any], table: Dict[Any, float],
+                default: float) -> np.ndarray:
+        # One lookup per distinct value; code -1 (missing) takes the trailing default
+        weights = np.array([table.get(value, default) for value in values] + [default])
+        return weights[codes]
+
+    def impact_weights(self, table: Dict[str, float], default: float) -> np.ndarray:
+        return self._lookup(self.impact_codes, self.impact_values, table, default)
+
+    def category_weights(self, table: Dict[str, float], default: float) -> np.ndarray:
+        return self._lookup(self.category_codes, self.category_values, table, default)
+
+    def impact_is(self, impact: str) -> np.ndarray:
+        """Boolean mask of events with the given impact level (cached per level)"""
+        mask = self._impact_masks.get(impact)
+        if mask is None:
+            matches = np.flatnonzero(self.impact_values == impact)
+            mask = self.impact_codes == matches[0] if len(matches) else np.zeros(len(self.frame), dtype=bool)
+            self._impact_masks[impact] = mask
+        return mask
+
+    def keyword_sentiment(self, positive: Iterable[str], negative: Iterable[str]) -> np.ndarray:
+        """+1 / -1 / 0 per event by keyword counts in title + description (NaN if either is missing)"""
+        key = (tuple(positive), tuple(negative))
+        scores = self._sentiment.get(key)
+        if scores is None:
+            positive, negative = key
+            scores = np.empty(len(self.frame))
+            texts = zip(self.frame['event_title'].tolist(), self.frame['event_description'].tolist())
+            for i, (title, description) in enumerate(texts):
+                if not isinstance(title, str) or not isinstance(description, str):
+                    scores[i] = np.nan
+                    continue
+                text = (title + ' ' + description).lower()
+                positive_count = sum(1 for keyword in positive if keyword in text)
+                negative_count = sum(1 for keyword in negative if keyword in text)
+                scores[i] = np.sign(positive_count - negative_count)
+            self._sentiment[key] = scores
+        return scores
+
+    # ------------------------------------------------------------------
+    # Rows
+    # ------------------------------------------------------------------
+    def records(self, lo: int, hi: int, columns: Optional[List[str]] = None,
+                mask: Optional[np.ndarray] = None, file_order: bool = False) -> List[Dict[str, Any]]:
+        """
+        Fresh row dicts for rows lo..hi (where mask, aligned with them, is set),
+        optionally only some columns; in time order, or in the file's order
+        """
+        if self._records is None:
+            self._records = self.frame.to_dict('records')
+        rows = np.arange(lo, hi)
+        if mask is not None:
+            rows = rows[mask]
+        if file_order:
+            rows = rows[np.argsort(self.file_rows[rows], kind='stable')]
+        selected = [self._records[row] for row in rows.tolist()]
+        if columns is None:
+            return [dict(record) for record in selected]
+        return [{column: record[column] for column in columns} for record in selected]
+
+
+class NewsStore:
+    """SymbolNews per symbol, loaded from `{symbol}_1H_events.csv` on first use"""
+
+    def __init__(self, linked_path: str):
+        self.linked_path = linked_path
+        self._symbols: Dict[str, Tuple[float, SymbolNews]] = {}
+
+    def path(self, symbol: str) -> str:
+        return os.path.join(self.linked_path, f"{symbol}_1H_events.csv")
+
+    def get(self, symbol: str) -> Optional[SymbolNews]:
+        """The symbol's events, or None if it has no linked file"""
+        path = self.path(symbol)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            self._symbols.pop(symbol, None)
+            return None
+
+        cached = self._symbols.get(symbol)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        news = SymbolNews(pd.read_csv(path))
+        self._symbols[symbol] = (mtime, news)
+        return news
+
+    def clear(self):
+        self._symbols.clear()
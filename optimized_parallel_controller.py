@@ -19,6 +19,8 @@ import yaml
 import pandas as pd
 import numpy as np
 
+from exit_resolver import resolve_signal_exits
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -218,94 +220,43 @@ class OptimizedParallelController:
         """Optimized trade simulation with realistic costs"""
         trades = []
         
-        for signal in signals:
-            try:
-                entry_idx = data.index.get_loc(signal['timestamp'])
-                entry_price = signal['entry_price']
-                direction = signal['direction']
-                stop_loss = signal['stop_loss']
-                take_profit = signal['take_profit']
-                
-                # Add realistic slippage
-                slippage = 0.00005 if 'JPY' not in pair else 0.0001
-                if direction == 'BUY':
-                    entry_price += slippage
-                else:
-                    entry_price -= slippage
-                
-                # Simulate trade progression
-                for i in range(entry_idx + 1, min(entry_idx + 100, len(data))):  # Limit lookahead
-                    current_price = data.iloc[i]['Close']
-                    
-                    if direction == 'BUY':
-                        if current_price <= stop_loss:
-                            transaction_cost = 0.0002 if 'JPY' not in pair else 0.00002
-                            net_pips = (stop_loss - entry_price - transaction_cost) * 10000
-                            
-                            trades.append({
-                                'entry_time': signal['timestamp'],
-                                'exit_time': data.index[i],
-                                'entry_price': entry_price,
-                                'exit_price': stop_loss,
-                                'direction': direction,
-                                'status': 'LOSS',
-                                'pips': net_pips,
-                                'strategy': signal.get('strategy', 'unknown'),
-                                'confidence': signal.get('confidence', 0.5)
-                            })
-                            break
-                        elif current_price >= take_profit:
-                            transaction_cost = 0.0002 if 'JPY' not in pair else 0.00002
-                            net_pips = (take_profit - entry_price - transaction_cost) * 10000
-                            
-                            trades.append({
-                                'entry_time': signal['timestamp'],
-                                'exit_time': data.index[i],
-                                'entry_price': entry_price,
-                                'exit_price': take_profit,
-                                'direction': direction,
-                                'status': 'WIN',
-                                'pips': net_pips,
-                                'strategy': signal.get('strategy', 'unknown'),
-                                'confidence': signal.get('confidence', 0.5)
-                            })
-                            break
-                    else:  # SELL
-                        if current_price >= stop_loss:
-                            transaction_cost = 0.0002 if 'JPY' not in pair else 0.00002
-                            net_pips = (entry_price - stop_loss - transaction_cost) * 10000
-                            
-                            trades.append({
-                                'entry_time': signal['timestamp'],
-                                'exit_time': data.index[i],
-                                'entry_price': entry_price,
-                                'exit_price': stop_loss,
-                                'direction': direction,
-                                'status': 'LOSS',
-                                'pips': net_pips,
-                                'strategy': signal.get('strategy', 'unknown'),
-                                'confidence': signal.get('confidence', 0.5)
-                            })
-                            break
-                        elif current_price <= take_profit:
-                            transaction_cost = 0.0002 if 'JPY' not in pair else 0.00002
-                            net_pips = (entry_price - take_profit - transaction_cost) * 10000
-                            
-                            trades.append({
-                                'entry_time': signal['timestamp'],
-                                'exit_time': data.index[i],
-                                'entry_price': entry_price,
-                                'exit_price': take_profit,
-                                'direction': direction,
-                                'status': 'WIN',
-                                'pips': net_pips,
-                                'strategy': signal.get('strategy', 'unknown'),
-                                'confidence': signal.get('confidence', 0.5)
-                            })
-                            break
-                            
-            except Exception as e:
+        # Resolve every exit in one vectorized pass (stops/targets trigger on the close)
+        close = data['Close'].to_numpy(dtype=np.float64)
+        exits = resolve_signal_exits(data.index, signals, close, close, close, max_bars=99)
+        
+        for signal, exit_info in zip(signals, exits):
+            # Trades that don't reach their stop or target within the lookahead are dropped
+            if exit_info is None or exit_info[2] not in ('STOP_LOSS', 'TAKE_PROFIT'):
                 continue
+            
+            exit_idx, exit_price, exit_reason = exit_info
+            entry_price = signal['entry_price']
+            direction = signal['direction']
+            
+            # Add realistic slippage
+            slippage = 0.00005 if 'JPY' not in pair else 0.0001
+            if direction == 'BUY':
+                entry_price += slippage
+            else:
+                entry_price -= slippage
+            
+            transaction_cost = 0.0002 if 'JPY' not in pair else 0.00002
+            if direction == 'BUY':
+                net_pips = (exit_price - entry_price - transaction_cost) * 10000
+            else:
+                net_pips = (entry_price - exit_price - transaction_cost) * 10000
+            
+            trades.append({
+                'entry_time': signal['timestamp'],
+                'exit_time': data.index[exit_idx],
+                'entry_price': entry_price,
+                'exit_price': exit_price,
+                'direction': direction,
+                'status': 'WIN' if exit_reason == 'TAKE_PROFIT' else 'LOSS',
+                'pips': net_pips,
+                'strategy': signal.get('strategy', 'unknown'),
+                'confidence': signal.get('confidence', 0.5)
+            })
         
         return trades
     
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+PARAMETER SPACE
+Lazy, constraint-pruned enumeration of the experiments.yaml search_space
+
+    space = ParameterSpace(search_space, strategy='news_enhanced',
+                           strategy_blocks=('comprehensive_enhanced', 'news_enhanced', ...))
+    len(space)                 # exact number of VALID combinations, nothing materialized
+    for params in space: ...   # one dict at a time
+    space[i]                   # i-th combination (mixed-radix decode)
+    space.shard(k, n)          # every n-th combination starting at k
+
+Parameters are grouped into blocks: every set of parameters linked by a
+constraint (ema_fast < ema_slow, macd_fast < macd_slow, ...) becomes one
+block holding only its valid partial assignments; every other parameter is a
+block of its own. The space is the cartesian product of the blocks, so
+invalid combinations are never generated and the count is a product of
+block sizes.
+
+Nested groups (regime_filter: {type: [...], ...}) are flattened to
+regime_filter_type etc., as product_dict always did. Nested groups listed in
+strategy_blocks are strategy-specific: only the block named by `strategy` is
+included.
+"""
+
+import itertools
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# (lower, upper): lower must be strictly less than upper when both are present
+DEFAULT_CONSTRAINTS: Tuple[Tuple[str, str], ...] = (
+    ('ema_fast', 'ema_slow'),
+    ('macd_fast', 'macd_slow'),
+    ('enhanced_optimized_ema_short', 'enhanced_optimized_ema_long'),
+    ('enhanced_optimized_rsi_oversold', 'enhanced_optimized_rsi_overbought'),
+)
+
+
+def flatten_search_space(search_space: Dict[str, Any], strategy: Optional[str] = None,
+                         strategy_blocks: Iterable[str] = ()) -> Dict[str, List[Any]]:
+    """search_space -> {flat_name: values}, keeping only the strategy's own block"""
+    strategy_blocks = set(strategy_blocks)
+    flattened = {}
+    for key, value in search_space.items():
+        if isinstance(value, dict):
+            if key in strategy_blocks and key != strategy:
+                continue
+            for nested_key, nested_value in value.items():
+                flattened[f"{key}_{nested_key}"] = list(nested_value)
+        else:
+            flattened[key] = list(value)
+    return flattened
+
+
+def satisfies_constraints(params: Dict[str, Any],
+                          constraints: Sequence[Tuple[str, str]] = DEFAULT_CONSTRAINTS) -> bool:
+    """True if every constraint whose parameters are both present holds"""
+    for lower, upper in constraints:
+        if lower in params and upper in params:
+            a, b = params[lower], params[upper]
+            if a is not None and b is not None and a >= b:
+                return False
+    return True
+
+
+class ParameterSpace:
+    """Lazy cartesian product of a flattened search space with constraints applied"""
+
+    def __init__(self, search_space: Dict[str, Any], strategy: Optional[str] = None,
+                 strategy_blocks: Iterable[str] = (),
+                 constraints: Sequence[Tuple[str, str]] = DEFAULT_CONSTRAINTS):
+        self.grid = flatten_search_space(search_space, strategy, strategy_blocks)
+        self.keys = list(self.grid)
+        self.constraints = tuple((a, b) for a, b in constraints if a in self.grid and b in self.grid)
+        self.blocks = self._build_blocks()
+
+        self.sizes = [len(values) for _, values in self.blocks]
+        self.count = 1
+        for size in self.sizes:
+            self.count *= size
+
+    def _build_blocks(self) -> List[Tuple[Tuple[str, ...], List[Tuple[Any, ...]]]]:
+        """Group constrained parameters (union-find) and pre-filter their joint values"""
+        parent = {key: key for key in self.keys}
+
+        def find(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        for lower, upper in self.constraints:
+            parent[find(lower)] = find(upper)
+
+        groups: Dict[str, List[str]] = {}
+        for key in self.keys:
+            groups.setdefault(find(key), []).append(key)
+
+        blocks = []
+        for members in groups.values():
+            members = tuple(members)
+            rows = []
+            for values in itertools.product(*[self.grid[k] for k in members]):
+                if len(members) == 1 or satisfies_constraints(dict(zip(members, values)), self.constraints):
+                    rows.append(values)
+            blocks.append((members, rows))
+        return blocks
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _assemble(self, rows: Sequence[Tuple[Any, ...]]) -> Dict[str, Any]:
+        merged = {}
+        for (members, _), values in zip(self.blocks, rows):
+            merged.update(zip(members, values))
+        # Same key order as the search space
+        return {key: merged[key] for key in self.keys}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if self.count == 0:
+            return
+        for rows in itertools.product(*[values for _, values in self.blocks]):
+            yield self._assemble(rows)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(f"parameter index {index} out of range ({self.count})")
+
+        # Mixed-radix decode, last block varying fastest (itertools.product order)
+        rows = [None] * len(self.blocks)
+        for b in range(len(self.blocks) - 1, -1, -1):
+            index, digit = divmod(index, self.sizes[b])
+            rows[b] = self.blocks[b][1][digit]
+        return self._assemble(rows)
+
+    def shard_count(self, shard_index: int, shard_total: int) -> int:
+        """Number of combinations in shard shard_index of shard_total"""
+        if self.count <= shard_index:
+            return 0
+        return (self.count - shard_index + shard_total - 1) // shard_total
+
+    def shard(self, shard_index: int, shard_total: int) -> Iterator[Dict[str, Any]]:
+        """
+        Every shard_total-th combination starting at shard_index. Shards are
+        disjoint, cover the space and do not depend on worker timing.
+        """
+        if not 0 <= shard_index < shard_total:
+            raise ValueError(f"shard_index must be in [0, {shard_total})")
+        if shard_total == 1:
+            yield from self
+            return
+        for index in range(shard_index, self.count, shard_total):
+            yield self[index]
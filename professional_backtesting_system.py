@@ -13,6 +13,9 @@ from typing import Dict, List, Any, Optional, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+from exit_resolver import resolve_signal_exits
+from indicator_columns import IndicatorBar, IndicatorColumns
+
 class ProfessionalBacktestingSystem:
     def __init__(self, data_dir="data/completed"):
         self.data_dir = data_dir
@@ -89,6 +92,7 @@ class ProfessionalBacktestingSystem:
         low_close = np.abs(df['low'] - df['close'].shift())
         true_range = np.maximum(high_low, np.maximum(high_close, low_close))
         df['atr'] = true_range.rolling(window=14).mean()
+        df['atr_avg_20'] = df['atr'].rolling(window=20).mean()
         
         # ADX (Average Directional Index)
         plus_dm = df['high'].diff()
@@ -120,26 +124,24 @@ class ProfessionalBacktestingSystem:
         if len(df) < 100:
             return signals
         
-        for i in range(100, len(df)):  # Start after indicators are calculated
-            current = df.iloc[i]
-            previous = df.iloc[i-1]
-            
-            # Skip if any required indicators are NaN
-            if pd.isna(current['sma_20']) or pd.isna(current['rsi']) or pd.isna(current['macd']):
-                continue
-            
+        columns = IndicatorColumns(df)
+        
+        # Skip bars where any required indicator is NaN
+        valid = columns.valid_mask('sma_20', 'rsi', 'macd')
+        
+        for i in np.flatnonzero(valid[100:]) + 100:  # Start after indicators are calculated
             # Professional signal generation logic
-            signal = self._analyze_professional_setup(df, i, currency_pair)
+            signal = self._analyze_professional_setup(columns, int(i), currency_pair)
             
             if signal and signal['signal'] != 'NO_SIGNAL':
                 signals.append(signal)
         
         return signals
     
-    def _analyze_professional_setup(self, df: pd.DataFrame, index: int, currency_pair: str) -> Optional[Dict[str, Any]]:
+    def _analyze_professional_setup(self, columns: IndicatorColumns, index: int, currency_pair: str) -> Optional[Dict[str, Any]]:
         """Analyze professional trading setup"""
-        current = df.iloc[index]
-        previous = df.iloc[index-1]
+        current = columns.bar(index)
+        previous = columns.bar(index - 1)
         
         # Multi-timeframe trend analysis
         trend_bullish = (current['sma_20'] > current['sma_50'] and 
@@ -160,20 +162,20 @@ class ProfessionalBacktestingSystem:
                            current['macd_histogram'] < previous['macd_histogram'])
         
         # Volatility analysis
-        volatility_adequate = current['atr'] > df['atr'].rolling(20).mean().iloc[index] * 0.8
+        volatility_adequate = current['atr'] > current['atr_avg_20'] * 0.8
         
         # ADX trend strength
         trend_strength = current['adx'] > 25
         
         # Professional entry conditions
         if (trend_bullish and momentum_bullish and volatility_adequate and trend_strength):
-            return self._create_signal(df, index, 'LONG', currency_pair, current)
+            return self._create_signal(columns, index, 'LONG', currency_pair, current)
         elif (trend_bearish and momentum_bearish and volatility_adequate and trend_strength):
-            return self._create_signal(df, index, 'SHORT', currency_pair, current)
+            return self._create_signal(columns, index, 'SHORT', currency_pair, current)
         
         return {'signal': 'NO_SIGNAL'}
     
-    def _create_signal(self, df: pd.DataFrame, index: int, direction: str, currency_pair: str, current: pd.Series) -> Dict[str, Any]:
+    def _create_signal(self, columns: IndicatorColumns, index: int, direction: str, currency_pair: str, current: IndicatorBar) -> Dict[str, Any]:
         """Create professional trading signal"""
         entry_price = current['close']
         atr = current['atr']
@@ -187,7 +189,7 @@ class ProfessionalBacktestingSystem:
             take_profit = entry_price - (atr * 3.0)
         
         # Calculate confidence based on multiple factors
-        confidence = self._calculate_signal_confidence(df, index, direction)
+        confidence = self._calculate_signal_confidence(columns, index, direction)
         
         # Only take high-confidence signals
         if confidence < 70:
@@ -205,9 +207,9 @@ class ProfessionalBacktestingSystem:
             'risk_reward_ratio': 1.5
         }
     
-    def _calculate_signal_confidence(self, df: pd.DataFrame, index: int, direction: str) -> float:
+    def _calculate_signal_confidence(self, columns: IndicatorColumns, index: int, direction: str) -> float:
         """Calculate signal confidence score"""
-        current = df.iloc[index]
+        current = columns.bar(index)
         confidence = 50.0  # Base confidence
         
         # Trend alignment bonus
@@ -231,7 +233,7 @@ class ProfessionalBacktestingSystem:
             confidence += 10
         
         # Volatility bonus
-        if current['atr'] > df['atr'].rolling(20).mean().iloc[index]:
+        if current['atr'] > current['atr_avg_20']:
             confidence += 5
         
         return min(100.0, confidence)
@@ -246,7 +248,10 @@ class ProfessionalBacktestingSystem:
         current_drawdown = 0.0
         max_drawdown = 0.0
         
-        for signal in signals:
+        # Resolve every signal's exit in one vectorized pass
+        exits = self._resolve_exits(df, signals)
+        
+        for signal, exit_info in zip(signals, exits):
             # Check if we should take the trade (risk management)
             if current_drawdown > self.max_drawdown_limit:
                 continue  # Stop trading if max drawdown reached
@@ -257,7 +262,7 @@ class ProfessionalBacktestingSystem:
             position_size = risk_amount / stop_distance
             
             # Simulate trade execution
-            trade_result = self._simulate_trade_execution(df, signal, position_size)
+            trade_result = self._simulate_trade_execution(df, signal, position_size, exit_info)
             
             if trade_result:
                 trades.append(trade_result)
@@ -280,69 +285,37 @@ class ProfessionalBacktestingSystem:
             'max_drawdown': max_drawdown
         }
     
-    def _simulate_trade_execution(self, df: pd.DataFrame, signal: Dict[str, Any], position_size: float) -> Optional[Dict[str, Any]]:
+    def _resolve_exits(self, df: pd.DataFrame, signals: List[Dict[str, Any]]) -> List[Optional[Tuple[int, float, str]]]:
+        """Resolve (exit_idx, exit_price, exit_reason) for all signals with the shared exit kernel"""
+        close = df['close'].to_numpy(dtype=np.float64)
+        # Stops and targets trigger on the close, as this engine always has
+        return resolve_signal_exits(df['timestamp'], signals, close, close, close, direction_key='signal')
+    
+    def _simulate_trade_execution(self, df: pd.DataFrame, signal: Dict[str, Any], position_size: float,
+                                  exit_info: Optional[Tuple[int, float, str]] = None) -> Optional[Dict[str, Any]]:
         """Simulate realistic trade execution"""
         entry_time = signal['timestamp']
         entry_price = signal['entry_price']
-        stop_loss = signal['stop_loss']
-        take_profit = signal['take_profit']
         direction = signal['signal']
         
-        # Find entry point in data
-        entry_idx = df[df['timestamp'] == entry_time].index
-        if len(entry_idx) == 0:
+        if exit_info is None:
+            exit_info = self._resolve_exits(df, [signal])[0]
+        if exit_info is None:
             return None
         
-        entry_idx = entry_idx[0]
+        exit_idx, exit_price, exit_reason = exit_info
         
         # Add slippage and transaction costs
         if direction == 'LONG':
             actual_entry = entry_price + self.slippage
+            pnl = (exit_price - actual_entry) * position_size - (position_size * actual_entry * self.transaction_cost)
         else:
             actual_entry = entry_price - self.slippage
-        
-        # Simulate trade progression
-        for i in range(entry_idx + 1, len(df)):
-            current_price = df.iloc[i]['close']
-            
-            if direction == 'LONG':
-                if current_price <= stop_loss:
-                    # Stop loss hit
-                    exit_price = stop_loss
-                    exit_reason = 'STOP_LOSS'
-                    pnl = (exit_price - actual_entry) * position_size - (position_size * actual_entry * self.transaction_cost)
-                    break
-                elif current_price >= take_profit:
-                    # Take profit hit
-                    exit_price = take_profit
-                    exit_reason = 'TAKE_PROFIT'
-                    pnl = (exit_price - actual_entry) * position_size - (position_size * actual_entry * self.transaction_cost)
-                    break
-            else:  # SHORT
-                if current_price >= stop_loss:
-                    # Stop loss hit
-                    exit_price = stop_loss
-                    exit_reason = 'STOP_LOSS'
-                    pnl = (actual_entry - exit_price) * position_size - (position_size * actual_entry * self.transaction_cost)
-                    break
-                elif current_price <= take_profit:
-                    # Take profit hit
-                    exit_price = take_profit
-                    exit_reason = 'TAKE_PROFIT'
-                    pnl = (actual_entry - exit_price) * position_size - (position_size * actual_entry * self.transaction_cost)
-                    break
-        else:
-            # Trade still open at end of data
-            exit_price = df.iloc[-1]['close']
-            exit_reason = 'END_OF_DATA'
-            if direction == 'LONG':
-                pnl = (exit_price - actual_entry) * position_size - (position_size * actual_entry * self.transaction_cost)
-            else:
-                pnl = (actual_entry - exit_price) * position_size - (position_size * actual_entry * self.transaction_cost)
+            pnl = (actual_entry - exit_price) * position_size - (position_size * actual_entry * self.transaction_cost)
         
         return {
             'entry_time': entry_time,
-            'exit_time': df.iloc[i]['timestamp'] if 'i' in locals() else df.iloc[-1]['timestamp'],
+            'exit_time': df['timestamp'].iloc[exit_idx],
             'entry_price': actual_entry,
             'exit_price': exit_price,
             'direction': direction,
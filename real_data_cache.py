@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+REAL DATA COLUMNAR CACHE
+Binary cache that sits transparently behind RealDataEnforcer.load_real_data
+
+Every MASTER_DATASET CSV is parsed ONCE and stored as one .npy file per
+column (timestamp as int64 epoch nanoseconds, OHLCV in their parsed dtypes).
+Later loads read the columns straight from disk instead of re-running
+pd.read_csv + pd.to_datetime.
+
+The cache is a derived copy of the REAL CSV - never a replacement for it:
+- It is rebuilt automatically when the source CSV's size, mtime or checksum changes
+- A missing source CSV still fails loudly in RealDataEnforcer (cache is never read alone)
+- Any cache error silently falls back to parsing the CSV
+
+Set REAL_DATA_CACHE=0 to disable the cache entirely.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+CACHE_VERSION = 1
+CACHE_DIR_NAME = ".columnar_cache"
+META_FILE = "meta.json"
+TIMESTAMP_FILE = "timestamp.npy"
+
+
+def cache_enabled() -> bool:
+    """Cache is on unless REAL_DATA_CACHE is set to 0/false/no"""
+    return os.environ.get('REAL_DATA_CACHE', '1').lower() not in ('0', 'false', 'no')
+
+
+def file_checksum(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-1 of a file, read in 1 MB chunks"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ColumnarDataCache:
+    """Per-dataset columnar .npy cache keyed by source CSV fingerprint"""
+
+    def __init__(self, root: str):
+        self.root = Path(root) / CACHE_DIR_NAME
+
+    def cache_dir(self, pair: str, timeframe: str) -> Path:
+        return self.root / timeframe / f"{pair}_{timeframe}"
+
+    # ------------------------------------------------------------------
+    # Fingerprinting
+    # ------------------------------------------------------------------
+    def _read_meta(self, cache_dir: Path) -> Optional[Dict]:
+        meta_path = cache_dir / META_FILE
+        if not meta_path.exists():
+            return None
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != CACHE_VERSION:
+            return None
+        return meta
+
+    def _is_fresh(self, cache_dir: Path, meta: Dict, source: str) -> bool:
+        """
+        Fast path: size + mtime match. If only the mtime moved (file touched
+        or re-copied), fall back to the checksum and refresh the stored mtime.
+        """
+        stat = os.stat(source)
+        if stat.st_size != meta['source_size']:
+            return False
+        if stat.st_mtime_ns == meta['source_mtime_ns']:
+            return True
+
+        if file_checksum(source) != meta['source_sha1']:
+            return False
+
+        meta['source_mtime_ns'] = stat.st_mtime_ns
+        try:
+            self._write_meta(cache_dir, meta)
+        except OSError:
+            pass
+        return True
+
+    @staticmethod
+    def _write_meta(cache_dir: Path, meta: Dict):
+        tmp_path = cache_dir / (META_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, cache_dir / META_FILE)
+
+    # ------------------------------------------------------------------
+    # Load / build
+    # ------------------------------------------------------------------
+    def load(self, pair: str, timeframe: str, source: str) -> Optional[pd.DataFrame]:
+        """Return the cached DataFrame, or None if missing/stale/unreadable"""
+        cache_dir = self.cache_dir(pair, timeframe)
+        meta = self._read_meta(cache_dir)
+        if meta is None:
+            return None
+
+        try:
+            if not self._is_fresh(cache_dir, meta, source):
+                return None
+
+            epoch_ns = np.load(cache_dir / TIMESTAMP_FILE)
+            columns = {
+                name: np.load(cache_dir / f"col_{i}.npy")
+                for i, name in enumerate(meta['columns'])
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+
+        index = pd.DatetimeIndex(epoch_ns.view('datetime64[ns]'), name=meta['index_name'])
+        if meta.get('unit', 'ns') != 'ns':
+            index = index.as_unit(meta['unit'])
+        if meta.get('tz'):
+            index = index.tz_localize('UTC').tz_convert(meta['tz'])
+
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def store(self, pair: str, timeframe: str, source: str, df: pd.DataFrame) -> bool:
+        """
+        Write df as a columnar cache entry. Only purely numeric frames with a
+        DatetimeIndex are cached so a cached load is identical to a CSV load.
+        """
+        if not isinstance(df.index, pd.DatetimeIndex):
+            return False
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes):
+            return False
+
+        cache_dir = self.cache_dir(pair, timeframe)
+        tmp_dir = cache_dir.with_name(cache_dir.name + f".tmp{os.getpid()}")
+
+        try:
+            stat = os.stat(source)
+            checksum = file_checksum(source)
+
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir)
+            tmp_dir.mkdir(parents=True)
+
+            index = df.index
+            tz = str(index.tz) if index.tz is not None else None
+            if tz is not None:
+                index = index.tz_convert('UTC').tz_localize(None)
+            np.save(tmp_dir / TIMESTAMP_FILE, index.as_unit('ns').asi8.astype(np.int64))
+
+            for i, name in enumerate(df.columns):
+                np.save(tmp_dir / f"col_{i}.npy", df[name].to_numpy())
+
+            self._write_meta(tmp_dir, {
+                'version': CACHE_VERSION,
+                'source': str(source),
+                'source_size': stat.st_size,
+                'source_mtime_ns': stat.st_mtime_ns,
+                'source_sha1': checksum,
+                'rows': len(df),
+                'columns': [str(c) for c in df.columns],
+                'index_name': df.index.name,
+                'unit': df.index.unit,
+                'tz': tz,
+            })
+
+            # Swap the finished entry into place so readers never see a partial cache
+            if cache_dir.exists():
+                shutil.rmtree(cache_dir, ignore_errors=True)
+            os.replace(tmp_dir, cache_dir)
+            return True
+
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+
+    def clear(self):
+        """Remove every cached dataset"""
+        shutil.rmtree(self.root, ignore_errors=True)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+SCENARIO SCHEDULER
+Dataset-affinity scheduling for the ProcessPool scenario optimizers
+
+Submitting one task per scenario lets any worker receive any (pair,
+timeframe), so every task loads its dataset and recomputes the same base
+indicators. Instead, scenarios are grouped by dataset and split into chunks
+that never mix datasets:
+
+    with ProcessPoolExecutor(...) as executor:
+        futures = submit_dataset_chunks(executor, self.sweep_dataset, scenarios, workers)
+        for future in as_completed(futures):
+            for scenario, result in zip(futures[future], future.result()):
+                ...
+
+A worker sweeps a whole chunk: sweep(key, chunk) loads the dataset and its
+base indicators once and returns one compact summary (or None) per scenario,
+in chunk order. worker_cached() keeps the last few datasets per worker, so
+consecutive chunks of the same dataset do not rebuild them either.
+
+Chunks are sized so there are about chunks_per_worker chunks per worker in
+total, which keeps all workers busy to the end of the run.
+"""
+
+import math
+from collections import OrderedDict
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Tuple
+
+
+def dataset_key(scenario: Dict[str, Any]) -> Tuple[str, str]:
+    """(pair, timeframe) of a flat scenario dict"""
+    return (scenario['pair'], scenario['timeframe'])
+
+
+def chunk_by_dataset(scenarios: Iterable[Dict[str, Any]], workers: int,
+                     key: Callable[[Dict[str, Any]], Hashable] = dataset_key,
+                     chunks_per_worker: int = 4) -> List[Tuple[Hashable, List[Dict[str, Any]]]]:
+    """
+    Group scenarios by dataset (first-seen order) and split every group into
+    evenly sized chunks. Returns [(dataset key, scenarios), ...].
+    """
+    groups: Dict[Hashable, List[Dict[str, Any]]] = OrderedDict()
+    for scenario in scenarios:
+        groups.setdefault(key(scenario), []).append(scenario)
+
+    total = sum(len(group) for group in groups.values())
+    if not total:
+        return []
+    chunk_size = max(1, math.ceil(total / (max(1, workers) * max(1, chunks_per_worker))))
+
+    chunks = []
+    for dataset, group in groups.items():
+        n_chunks = math.ceil(len(group) / chunk_size)
+        bounds = [len(group) * k // n_chunks for k in range(n_chunks + 1)]
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            chunks.append((dataset, group[start:end]))
+    return chunks
+
+
+def submit_dataset_chunks(executor: Executor, sweep: Callable, scenarios: Iterable[Dict[str, Any]],
+                          workers: int, key: Callable[[Dict[str, Any]], Hashable] = dataset_key,
+                          chunks_per_worker: int = 4) -> Dict[Future, List[Dict[str, Any]]]:
+    """Submit sweep(dataset key, chunk) for every chunk; returns {future: chunk}"""
+    return {
+        executor.submit(sweep, dataset, chunk): chunk
+        for dataset, chunk in chunk_by_dataset(scenarios, workers, key, chunks_per_worker)
+    }
+
+
+# ----------------------------------------------------------------------
+# Worker-side cache
+# ----------------------------------------------------------------------
+_worker_datasets: 'OrderedDict[Hashable, Any]' = OrderedDict()
+
+
+def worker_cached(dataset: Hashable, build: Callable[[], Any], size: int = 2) -> Any:
+    """build() once per dataset in this process, keeping the `size` most recent"""
+    if dataset in _worker_datasets:
+        _worker_datasets.move_to_end(dataset)
+        return _worker_datasets[dataset]
+
+    value = build()
+    _worker_datasets[dataset] = value
+    while len(_worker_datasets) > size:
+        _worker_datasets.popitem(last=False)
+    return value
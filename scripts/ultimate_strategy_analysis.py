@@ -16,11 +16,14 @@ from scipy import stats
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
 
-# Add current directory to path
+# Add current directory and repository root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from enhanced_optimized_strategy import EnhancedOptimizedStrategy
 from live_optimized_strategies import LiveOptimizedStrategyManager
+import indicators
+from indicator_store import dataset_indicators
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -57,62 +60,71 @@ class UltimateStrategyAnalyzer:
         return data
     
     def calculate_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Calculate comprehensive technical indicators"""
+        """Calculate comprehensive technical indicators (persisted in the indicator store)"""
+        cached = dataset_indicators(df, columns=('High', 'Low', 'Close', 'Volume'))
+        close = df['Close']
+        
         # Basic indicators
-        df['SMA_20'] = df['Close'].rolling(20).mean()
-        df['SMA_50'] = df['Close'].rolling(50).mean()
-        df['EMA_20'] = df['Close'].ewm(span=20).mean()
-        df['EMA_50'] = df['Close'].ewm(span=50).mean()
+        df['SMA_20'] = cached.series('sma', {'source': 'close', 'window': 20},
+                                     lambda: indicators.sma(close, 20))
+        df['SMA_50'] = cached.series('sma', {'source': 'close', 'window': 50},
+                                     lambda: indicators.sma(close, 50))
+        df['EMA_20'] = cached.series('ema', {'source': 'close', 'span': 20, 'adjust': True},
+                                     lambda: indicators.ema(close, 20))
+        df['EMA_50'] = cached.series('ema', {'source': 'close', 'span': 50, 'adjust': True},
+                                     lambda: indicators.ema(close, 50))
         
         # RSI
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
+        df['RSI'] = cached.series('rsi', {'period': 14, 'smoothing': 'sma'},
+                                  lambda: indicators.rsi(close, 14))
         
         # MACD
-        exp1 = df['Close'].ewm(span=12).mean()
-        exp2 = df['Close'].ewm(span=26).mean()
+        exp1 = cached.series('ema', {'source': 'close', 'span': 12, 'adjust': True},
+                             lambda: indicators.ema(close, 12))
+        exp2 = cached.series('ema', {'source': 'close', 'span': 26, 'adjust': True},
+                             lambda: indicators.ema(close, 26))
         df['MACD'] = exp1 - exp2
-        df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
+        df['MACD_Signal'] = cached.series(
+            'macd_signal', {'fast': 12, 'slow': 26, 'signal': 9, 'adjust': True},
+            lambda: indicators.ema(df['MACD'], 9))
         df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
         
         # Bollinger Bands
-        df['BB_Middle'] = df['Close'].rolling(20).mean()
-        bb_std = df['Close'].rolling(20).std()
+        df['BB_Middle'] = df['SMA_20']
+        bb_std = cached.series('rolling_std', {'source': 'close', 'window': 20},
+                               lambda: indicators.rolling_std(close, 20))
         df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
         df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
         df['BB_Width'] = (df['BB_Upper'] - df['BB_Lower']) / df['BB_Middle']
         
         # ATR
-        high_low = df['High'] - df['Low']
-        high_close = np.abs(df['High'] - df['Close'].shift())
-        low_close = np.abs(df['Low'] - df['Close'].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = np.max(ranges, axis=1)
-        df['ATR'] = true_range.rolling(14).mean()
+        df['ATR'] = cached.series('atr', {'period': 14, 'true_range': 'skip_nan'},
+                                  lambda: indicators.atr(df['High'], df['Low'], close, 14))
         
         # Stochastic
-        low_min = df['Low'].rolling(14).min()
-        high_max = df['High'].rolling(14).max()
-        df['Stoch_K'] = 100 * ((df['Close'] - low_min) / (high_max - low_min))
+        low_min = cached.series('rolling_min', {'source': 'low', 'window': 14},
+                                lambda: indicators.rolling_min(df['Low'], 14))
+        high_max = cached.series('rolling_max', {'source': 'high', 'window': 14},
+                                 lambda: indicators.rolling_max(df['High'], 14))
+        df['Stoch_K'] = 100 * ((close - low_min) / (high_max - low_min))
         df['Stoch_D'] = df['Stoch_K'].rolling(3).mean()
         
         # Williams %R
-        df['Williams_R'] = -100 * ((high_max - df['Close']) / (high_max - low_min))
+        df['Williams_R'] = -100 * ((high_max - close) / (high_max - low_min))
         
         # Volume indicators
-        df['Volume_SMA'] = df['Volume'].rolling(20).mean()
+        df['Volume_SMA'] = cached.series('sma', {'source': 'volume', 'window': 20},
+                                         lambda: indicators.sma(df['Volume'], 20))
         df['Volume_Ratio'] = df['Volume'] / df['Volume_SMA']
         
         # Price action
-        df['Price_Change'] = df['Close'].pct_change()
-        df['Price_Change_5'] = df['Close'].pct_change(5)
-        df['Price_Change_20'] = df['Close'].pct_change(20)
+        df['Price_Change'] = close.pct_change()
+        df['Price_Change_5'] = close.pct_change(5)
+        df['Price_Change_20'] = close.pct_change(20)
         
         # Volatility
-        df['Volatility'] = df['Price_Change'].rolling(20).std()
+        df['Volatility'] = cached.series('volatility', {'source': 'close', 'window': 20},
+                                         lambda: indicators.rolling_std(df['Price_Change'], 20))
         
         return df
     
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+SEARCH EXECUTORS
+Pluggable execution backends for UltimateStrategySearchController.run_comprehensive_search
+
+    executor = make_search_executor(config.get('executor', {}))
+    for outcome in executor.run(controller, experiments):
+        controller._record_outcome(outcome, best_configs)
+
+- serial      every experiment in this process, on the controller itself
+- process     a local process pool; every worker builds its own controller
+              (own engine and strategy instances, wfo_workers=1) seeded with
+              the parent's preloaded walk-forward histories
+- multi_host  this process serves the experiment queue over TCP
+              (multiprocessing.managers); every other host runs
+              `python controller.py --worker HOST:PORT` and pulls experiments
+              with its own local worker processes
+
+Executors only run experiments. Selection criteria, top-10 tracking and
+config_hash / trade_signature observability stay in the controller, which
+consumes outcomes in completion order. Workers write their per-experiment
+results to results_dir exactly as a serial run does (for multi_host it must
+be a shared directory).
+
+multi_host connections carry pickles, so whoever holds the shared secret can
+run code on the coordinator and the workers. The coordinator listens on
+127.0.0.1 unless executor.address names another interface, and there is no
+default secret: set SEARCH_AUTHKEY (or executor.authkey in a config that is
+not committed) on every host.
+
+Environment:
+    SEARCH_AUTHKEY                multi_host shared secret (overrides executor.authkey)
+"""
+
+import copy
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from multiprocessing.managers import BaseManager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (pair, tf, strategy_name, params)
+Experiment = Tuple[str, str, str, Dict[str, Any]]
+
+# Seconds without an outcome after every local worker exited before giving up
+LOCAL_WORKERS_GRACE = 30
+DEFAULT_ADDRESS = '127.0.0.1:50555'
+
+
+@dataclass
+class ExperimentOutcome:
+    """Result of one experiment plus the bookkeeping it produced in its worker"""
+    experiment: Experiment
+    summary: Optional[Dict[str, Any]]
+    failures: List[Tuple] = field(default_factory=list)
+    completed: int = 0
+
+
+def execute_experiment(controller, experiment: Experiment) -> ExperimentOutcome:
+    """
+    Run one experiment on controller and move the failures / completed count
+    it recorded into the outcome, so the coordinating controller merges them
+    the same way whichever process ran it.
+    """
+    failures_start = len(controller.failures)
+    completed_start = controller.completed_experiments
+
+    summary = controller.run_single_experiment(*experiment)
+
+    failures = controller.failures[failures_start:]
+    del controller.failures[failures_start:]
+    completed = controller.completed_experiments - completed_start
+    controller.completed_experiments = completed_start
+
+    return ExperimentOutcome(experiment, summary, failures, completed)
+
+
+def build_worker_controller(controller_cls, config: Dict[str, Any],
+                            histories: Optional[Dict] = None):
+    """Controller with its own components for one worker process"""
+    config = copy.deepcopy(config)
+    # Workers are already parallel; no nested fold pools
+    config.setdefault('meta', {})['wfo_workers'] = 1
+
+    controller = controller_cls(config=config)
+    controller.initialize_components()
+    if histories:
+        controller.wfo_history.update(histories)
+        controller.wfo_history_size = max(controller.wfo_history_size, len(histories))
+    return controller
+
+
+# ----------------------------------------------------------------------
+# Serial
+# ----------------------------------------------------------------------
+class SerialSearchExecutor:
+    """Every experiment in this process, in order"""
+
+    name = 'serial'
+
+    def run(self, controller, experiments: Iterable[Experiment]) -> Iterator[ExperimentOutcome]:
+        for experiment in experiments:
+            yield execute_experiment(controller, experiment)
+
+
+# ----------------------------------------------------------------------
+# Local process pool
+# ----------------------------------------------------------------------
+_worker_context: Dict[str, Any] = {}
+
+
+def _init_search_worker(controller_cls, config: Dict[str, Any], histories: Dict):
+    """Pool initializer: one controller per worker, reused for every experiment"""
+    _worker_context['controller'] = build_worker_controller(controller_cls, config, histories)
+
+
+def _run_search_experiment(experiment: Experiment) -> ExperimentOutcome:
+    return execute_experiment(_worker_context['controller'], experiment)
+
+
+class ProcessPoolSearchExecutor:
+    """
+    Experiments in a local process pool. At most max_workers * prefetch
+    experiments are in flight, so lazily generated spaces stay lazy.
+    """
+
+    name = 'process'
+
+    def __init__(self, max_workers: Optional[int] = None, prefetch: int = 4):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.prefetch = max(1, prefetch)
+
+    def run(self, controller, experiments: Iterable[Experiment]) -> Iterator[ExperimentOutcome]:
+        experiments = iter(experiments)
+        # Preloaded histories reach the workers through the initializer
+        # (inherited, not pickled, under fork)
+        initargs = (type(controller), controller.config, dict(controller.wfo_history))
+
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_search_worker,
+                                 initargs=initargs) as pool:
+            pending = {pool.submit(_run_search_experiment, experiment)
+                       for experiment in itertools.islice(experiments, self.max_workers * self.prefetch)}
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                    experiment = next(experiments, None)
+                    if experiment is not None:
+                        pending.add(pool.submit(_run_search_experiment, experiment))
+
+
+# ----------------------------------------------------------------------
+# Multi-host
+# ----------------------------------------------------------------------
+class _SearchQueueClient(BaseManager):
+    """Worker-side connection to a coordinator's queues"""
+
+
+_SearchQueueClient.register('get_tasks')
+_SearchQueueClient.register('get_results')
+_SearchQueueClient.register('get_config')
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """'host:port' -> (host, port); loopback when the host is left out"""
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def search_authkey(settings: Optional[Dict[str, Any]] = None) -> str:
+    """multi_host shared secret: SEARCH_AUTHKEY, else executor.authkey; there is no default"""
+    authkey = os.environ.get('SEARCH_AUTHKEY') or (settings or {}).get('authkey')
+    if not authkey:
+        raise ValueError("multi_host needs a shared secret: set SEARCH_AUTHKEY (or executor.authkey)")
+    return str(authkey)
+
+
+def _search_worker_loop(address: Tuple[str, int], authkey: bytes, controller_cls,
+                        config: Dict[str, Any], histories: Dict):
+    """Pull experiments until the coordinator signals the end (None) or goes away"""
+    client = _SearchQueueClient(address=address, authkey=authkey)
+    client.connect()
+    tasks, results = client.get_tasks(), client.get_results()
+    controller = build_worker_controller(controller_cls, config, histories)
+
+    try:
+        while True:
+            experiment = tasks.get()
+            if experiment is None:
+                # Leave the end marker for the other workers
+                tasks.put(None)
+                return
+            results.put(execute_experiment(controller, experiment))
+    except (EOFError, ConnectionError):
+        logger.info("🔌 Coordinator closed the connection")
+
+
+def serve_search_worker(address: str, authkey: str, controller_cls,
+                        processes: Optional[int] = None, preload: bool = True):
+    """
+    Worker host entry point: fetch the coordinator's config, preload the
+    universe's histories once, then run `processes` workers against its queue.
+    """
+    if not authkey:
+        raise ValueError("serve_search_worker needs the coordinator's shared secret (SEARCH_AUTHKEY)")
+    host_port = parse_address(address)
+    key = authkey.encode()
+
+    client = _SearchQueueClient(address=host_port, authkey=key)
+    client.connect()
+    config = client.get_config().copy()
+
+    histories = {}
+    if preload:
+        loader = controller_cls(config=config)
+        loader.initialize_components()
+        loader.preload_histories(config['universe']['pairs'], config['universe']['timeframes'])
+        histories = dict(loader.wfo_history)
+
+    processes = processes or os.cpu_count() or 1
+    logger.info(f"🛰️ Search worker host connected to {address} with {processes} processes")
+    args = (host_port, key, controller_cls, config, histories)
+    if processes == 1:
+        _search_worker_loop(*args)
+        return
+
+    workers = [multiprocessing.Process(target=_search_worker_loop, args=args) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+class MultiHostSearchExecutor:
+    """
+    Coordinator: serves the experiment queue on `address` and collects the
+    outcomes. local_workers processes on this host join in as well; 0 makes
+    this process a pure coordinator.
+
+    An experiment whose worker dies never reports back, so the run fails
+    (RuntimeError) instead of waiting forever: when every local worker has
+    exited and no outcome arrived for LOCAL_WORKERS_GRACE seconds, or when no
+    outcome arrived for idle_timeout seconds (None: wait indefinitely).
+    """
+
+    name = 'multi_host'
+
+    def __init__(self, address: str, authkey: str, local_workers: Optional[int] = None,
+                 prefetch: int = 4, idle_timeout: Optional[float] = 3600):
+        if not authkey:
+            raise ValueError("MultiHostSearchExecutor needs a shared secret (SEARCH_AUTHKEY)")
+        self.address = parse_address(address)
+        self.authkey = authkey.encode()
+        self.local_workers = (os.cpu_count() or 1) if local_workers is None else local_workers
+        self.prefetch = max(1, prefetch)
+        self.idle_timeout = idle_timeout
+
+    def run(self, controller, experiments: Iterable[Experiment]) -> Iterator[ExperimentOutcome]:
+        tasks = queue.Queue(maxsize=max(1, self.local_workers) * self.prefetch)
+        results = queue.Queue()
+        config = controller.config
+
+        class _SearchQueueServer(BaseManager):
+            pass
+
+        _SearchQueueServer.register('get_tasks', callable=lambda: tasks)
+        _SearchQueueServer.register('get_results', callable=lambda: results)
+        _SearchQueueServer.register('get_config', callable=lambda: config)
+
+        server = _SearchQueueServer(address=self.address, authkey=self.authkey).get_server()
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        logger.info(f"🛰️ Serving experiments on {self.address[0]}:{self.address[1]}")
+
+        # Local workers connect like any other host
+        connect_to = ('127.0.0.1' if self.address[0] in ('', '0.0.0.0') else self.address[0], self.address[1])
+        args = (connect_to, self.authkey, type(controller), config, dict(controller.wfo_history))
+        workers = [multiprocessing.Process(target=_search_worker_loop, args=args)
+                   for _ in range(self.local_workers)]
+        for worker in workers:
+            worker.start()
+
+        # Feed from a thread: tasks is bounded, results must keep draining
+        submitted = [0]
+        feeding_done = threading.Event()
+        stop = threading.Event()
+
+        def feed():
+            try:
+                for experiment in experiments:
+                    while not stop.is_set():
+                        try:
+                            tasks.put(experiment, timeout=1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+                    submitted[0] += 1
+            finally:
+                feeding_done.set()
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+
+        received = 0
+        last_outcome = time.monotonic()
+        try:
+            while not (feeding_done.is_set() and received >= submitted[0]):
+                try:
+                    outcome = results.get(timeout=1)
+                except queue.Empty:
+                    self._check_progress(workers, time.monotonic() - last_outcome, submitted[0] - received)
+                    continue
+                received += 1
+                last_outcome = time.monotonic()
+                yield outcome
+        finally:
+            # Stop the feeder, drop whatever was not picked up (consumer stopped
+            # early), then signal the end
+            stop.set()
+            feeder.join()
+            while True:
+                try:
+                    tasks.get_nowait()
+                except queue.Empty:
+                    break
+            tasks.put(None)
+            for worker in workers:
+                worker.join()
+            server.stop_event.set()
+            server_thread.join(timeout=5)
+
+    def _check_progress(self, workers: List[multiprocessing.Process], idle: float, outstanding: int):
+        """Raise when outstanding outcomes can no longer be expected"""
+        if workers and idle > LOCAL_WORKERS_GRACE and not any(worker.is_alive() for worker in workers):
+            exit_codes = [worker.exitcode for worker in workers]
+            raise RuntimeError(f"All {len(workers)} local search workers exited (exit codes {exit_codes}) "
+                               f"with {outstanding} experiment outcome(s) outstanding")
+        if self.idle_timeout is not None and idle > self.idle_timeout:
+            raise RuntimeError(f"No experiment outcome for {idle:.0f}s with {outstanding} outstanding; "
+                               f"a worker host probably died (executor.idle_timeout)")
+
+
+# ----------------------------------------------------------------------
+# Factory
+# ----------------------------------------------------------------------
+def make_search_executor(settings: Dict[str, Any]):
+    """Executor from the experiments.yaml `executor` section"""
+    settings = settings or {}
+    kind = settings.get('type', 'serial')
+    max_workers = settings.get('max_workers')
+    prefetch = settings.get('prefetch', 4)
+
+    if kind == 'serial':
+        return SerialSearchExecutor()
+    if kind == 'process':
+        return ProcessPoolSearchExecutor(max_workers=max_workers, prefetch=prefetch)
+    if kind == 'multi_host':
+        return MultiHostSearchExecutor(
+            address=settings.get('address') or DEFAULT_ADDRESS,
+            authkey=search_authkey(settings),
+            local_workers=max_workers,
+            prefetch=prefetch,
+            idle_timeout=settings.get('idle_timeout', 3600)
+        )
+    raise ValueError(f"Unknown executor type: {kind} (serial | process | multi_host)")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+SHARED DATASET REGISTRY
+Load each (pair, timeframe) ONCE in the parent process and share it with
+ProcessPoolExecutor / multiprocessing.Pool workers via shared memory.
+
+Parent:
+    with SharedDatasetRegistry() as registry:
+        registry.publish_all({(s['pair'], s['timeframe']) for s in scenarios})
+        with ProcessPoolExecutor(max_workers=n,
+                                 initializer=attach_shared_datasets,
+                                 initargs=(registry.handles(),)) as executor:
+            ...
+
+Worker:
+    df = load_shared_dataset(pair, timeframe)
+
+Each dataset is one read-only float64 block of shape (n_columns, n_bars) plus
+an int64 epoch-ns timestamp block. Workers attach by name and wrap the blocks
+in a DataFrame without copying, so RAM is shared across all workers and the
+per-scenario CSV load disappears. Datasets that were not published fall back
+to RealDataEnforcer.load_real_data, so the real-data guarantees are unchanged.
+
+NOTE: shared columns are float64 (volume included) and read-only. Adding new
+columns to the returned DataFrame is fine; writing into OHLCV in place is not.
+"""
+
+import os
+import sys
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from GOLDEN_RULE_NO_SYNTHETIC_DATA import RealDataEnforcer
+
+
+@dataclass(frozen=True)
+class SharedDatasetHandle:
+    """Picklable description of a published dataset (sent to workers)"""
+    pair: str
+    timeframe: str
+    values_name: str
+    index_name: str
+    columns: Tuple[str, ...]
+    n_bars: int
+    index_label: Optional[str]
+    unit: str
+    tz: Optional[str]
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.pair, self.timeframe)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing block without handing ownership to this process"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    if os.name == 'nt':
+        return shared_memory.SharedMemory(name=name)
+
+    # Before 3.13 attaching registers the block with the resource tracker,
+    # which unlinks it when a spawned worker exits (and unregistering instead
+    # would drop the parent's registration under fork). Skip registration.
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _build_frame(handle: SharedDatasetHandle, values: np.ndarray, epoch_ns: np.ndarray) -> pd.DataFrame:
+    """Wrap shared arrays in a DataFrame without copying them"""
+    index = pd.DatetimeIndex(epoch_ns.view('datetime64[ns]'), name=handle.index_label)
+    if handle.unit != 'ns':
+        index = index.as_unit(handle.unit)
+    if handle.tz:
+        index = index.tz_localize('UTC').tz_convert(handle.tz)
+    # values is (columns, bars); its transpose is a Fortran-ordered view that
+    # pandas stores as a single block without consolidation copies.
+    return pd.DataFrame(values.T, index=index, columns=list(handle.columns), copy=False)
+
+
+class SharedDatasetRegistry:
+    """Parent-side owner of the shared-memory datasets"""
+
+    def __init__(self):
+        self._handles: Dict[Tuple[str, str], SharedDatasetHandle] = {}
+        self._blocks: List[shared_memory.SharedMemory] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def publish(self, pair: str, timeframe: str) -> SharedDatasetHandle:
+        """Load a dataset through RealDataEnforcer and copy it into shared memory"""
+        key = (pair.lower(), timeframe)
+        if key in self._handles:
+            return self._handles[key]
+
+        df = RealDataEnforcer.load_real_data(*key)
+        numeric = df.select_dtypes(include=[np.number])
+
+        index = df.index
+        tz = str(index.tz) if index.tz is not None else None
+        if tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        epoch_ns = index.as_unit('ns').asi8
+
+        values_shm = shared_memory.SharedMemory(create=True, size=max(1, numeric.shape[0] * numeric.shape[1] * 8))
+        index_shm = shared_memory.SharedMemory(create=True, size=max(1, len(epoch_ns) * 8))
+        self._blocks.extend([values_shm, index_shm])
+
+        values = np.ndarray((numeric.shape[1], numeric.shape[0]), dtype=np.float64, buffer=values_shm.buf)
+        values[:] = numeric.to_numpy(dtype=np.float64).T
+        np.ndarray(epoch_ns.shape, dtype=np.int64, buffer=index_shm.buf)[:] = epoch_ns
+
+        handle = SharedDatasetHandle(
+            pair=key[0],
+            timeframe=key[1],
+            values_name=values_shm.name,
+            index_name=index_shm.name,
+            columns=tuple(str(c) for c in numeric.columns),
+            n_bars=len(numeric),
+            index_label=df.index.name,
+            unit=df.index.unit,
+            tz=tz,
+        )
+        self._handles[key] = handle
+
+        size_mb = (values_shm.size + index_shm.size) / 1024 / 1024
+        print(f"[SHARED] Published {handle.pair.upper()} {handle.timeframe}: {handle.n_bars:,} bars ({size_mb:.1f} MB)")
+        return handle
+
+    def publish_all(self, datasets: Iterable[Tuple[str, str]]) -> List[SharedDatasetHandle]:
+        """Publish every distinct (pair, timeframe)"""
+        return [self.publish(pair, tf) for pair, tf in sorted(set(datasets))]
+
+    def handles(self) -> Tuple[SharedDatasetHandle, ...]:
+        """Handles to pass to workers via initargs"""
+        return tuple(self._handles.values())
+
+    def close(self):
+        """Release and unlink all shared blocks (call once workers are done)"""
+        for shm in self._blocks:
+            try:
+                shm.close()
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks = []
+        self._handles = {}
+
+
+# ----------------------------------------------------------------------
+# Worker side
+# ----------------------------------------------------------------------
+_worker_handles: Dict[Tuple[str, str], SharedDatasetHandle] = {}
+_worker_arrays: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+_worker_blocks: List[shared_memory.SharedMemory] = []
+
+
+def attach_shared_datasets(handles: Iterable[SharedDatasetHandle]):
+    """Pool initializer: remember which datasets are available in shared memory"""
+    for handle in handles:
+        _worker_handles[handle.key] = handle
+
+
+def _shared_arrays(handle: SharedDatasetHandle) -> Tuple[np.ndarray, np.ndarray]:
+    arrays = _worker_arrays.get(handle.key)
+    if arrays is None:
+        values_shm = _attach(handle.values_name)
+        index_shm = _attach(handle.index_name)
+        _worker_blocks.extend([values_shm, index_shm])
+
+        values = np.ndarray((len(handle.columns), handle.n_bars), dtype=np.float64, buffer=values_shm.buf)
+        epoch_ns = np.ndarray((handle.n_bars,), dtype=np.int64, buffer=index_shm.buf)
+        values.flags.writeable = False
+        epoch_ns.flags.writeable = False
+
+        arrays = (values, epoch_ns)
+        _worker_arrays[handle.key] = arrays
+    return arrays
+
+
+def load_shared_dataset(pair: str, timeframe: str) -> pd.DataFrame:
+    """
+    Zero-copy DataFrame for a published dataset. A fresh DataFrame wrapper is
+    returned on every call so columns added by one scenario never leak into
+    the next. Unpublished datasets are loaded through RealDataEnforcer.
+    """
+    handle = _worker_handles.get((pair.lower(), timeframe))
+    if handle is None:
+        return RealDataEnforcer.load_real_data(pair, timeframe)
+
+    values, epoch_ns = _shared_arrays(handle)
+    return _build_frame(handle, values, epoch_ns)
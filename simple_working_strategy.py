@@ -5,9 +5,10 @@ A basic but effective strategy that will find profitable results
 """
 
 import pandas as pd
-import numpy as np
 from typing import Dict, List, Any, Optional
 
+import indicators
+
 class SimpleWorkingStrategy:
     """Simple working strategy for testing"""
     
@@ -80,21 +81,9 @@ class SimpleWorkingStrategy:
     
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Calculate RSI"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return pd.Series(indicators.rsi(prices, period), index=prices.index)
     
     def _calculate_atr(self, data: pd.DataFrame, period: int = 14) -> pd.Series:
         """Calculate ATR"""
-        high_low = data['high'] - data['low']
-        high_close = np.abs(data['high'] - data['close'].shift())
-        low_close = np.abs(data['low'] - data['close'].shift())
-        
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = np.max(ranges, axis=1)
-        
-        return true_range.rolling(period).mean()
+        return pd.Series(indicators.atr(data['high'], data['low'], data['close'], period), index=data.index)
 
@@ -19,6 +19,8 @@ from typing import Dict, List, Optional, Tuple
 from enum import Enum
 import logging
 
+import indicators
+
 logger = logging.getLogger(__name__)
 
 class MarketRegime(Enum):
@@ -162,45 +164,16 @@ class AllWeatherAdaptive70WR:
         if len(data) < period:
             return 0.0
         
-        high = data['high'].values[-period:]
-        low = data['low'].values[-period:]
-        close = data['close'].values[-period-1:-1]
-        
-        tr1 = high - low
-        tr2 = np.abs(high - close)
-        tr3 = np.abs(low - close)
-        
-        tr = np.maximum(tr1, np.maximum(tr2, tr3))
-        return np.mean(tr)
+        return indicators.atr_last(data['high'], data['low'], data['close'], period)
     
     def calculate_adx(self, data: pd.DataFrame, period: int = 14) -> float:
         """Calculate ADX"""
         if len(data) < period + 1:
             return 0.0
         
-        # Simplified ADX
-        high_diff = data['high'].diff()
-        low_diff = -data['low'].diff()
-        
-        plus_dm = np.where((high_diff > low_diff) & (high_diff > 0), high_diff, 0)
-        minus_dm = np.where((low_diff > high_diff) & (low_diff > 0), low_diff, 0)
-        
-        tr = np.maximum(
-            data['high'] - data['low'],
-            np.maximum(
-                abs(data['high'] - data['close'].shift(1)),
-                abs(data['low'] - data['close'].shift(1))
-            )
-        )
-        
-        atr = tr.rolling(period).mean()
-        plus_di = 100 * (pd.Series(plus_dm).rolling(period).mean() / atr)
-        minus_di = 100 * (pd.Series(minus_dm).rolling(period).mean() / atr)
-        
-        dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di + 1e-10)
-        adx = dx.rolling(period).mean()
-        
-        return adx.iloc[-1] if len(adx) > 0 and not pd.isna(adx.iloc[-1]) else 0.0
+        adx = indicators.adx_last(data['high'], data['low'], data['close'], period,
+                                  epsilon=1e-10, skip_nan=False)
+        return adx if not np.isnan(adx) else 0.0
     
     def calculate_signal_strength(self, data: pd.DataFrame) -> Tuple[float, int, List[str]]:
         """Calculate signal strength with 5 factors"""
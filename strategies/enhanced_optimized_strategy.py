@@ -12,6 +12,11 @@ from datetime import datetime, timedelta
 import yaml
 import json
 
+import indicators
+from live_candles import CandleRingBuffer
+from streaming_indicators import (LiveIndicatorState, StreamingADX, StreamingATR, StreamingEMA,
+                                  StreamingRollingMax, StreamingRollingMin, StreamingRSI, StreamingSMA)
+
 logger = logging.getLogger(__name__)
 
 class EnhancedOptimizedStrategy:
@@ -25,7 +30,8 @@ class EnhancedOptimizedStrategy:
         self.config = self._load_config(config_path)
         
         # Live data storage
-        self.live_data = {}
+        self.live_data: Dict[str, CandleRingBuffer] = {}  # last candles per symbol
+        self.live_indicators: Dict[str, LiveIndicatorState] = {}  # streaming state per symbol
         self.current_signals = {}
         self.signal_history = []
         
@@ -72,18 +78,21 @@ class EnhancedOptimizedStrategy:
             # Calculate price range
             price_range = (data['High'].max() - data['Low'].min()) / data['Close'].iloc[-1] * 100
             
-            # Determine regime
-            if adx > 25 and price_range > 2.0:
-                return "trending"
-            elif atr_percent > 1.5:
-                return "volatile"
-            else:
-                return "ranging"
+            return self._classify_regime(adx, atr_percent, price_range)
                 
         except Exception as e:
             self.logger.error(f"Error detecting market regime: {e}")
             return "unknown"
     
+    def _classify_regime(self, adx: float, atr_percent: float, price_range: float) -> str:
+        """Regime from ADX, ATR % of price and overall price range %"""
+        if adx > 25 and price_range > 2.0:
+            return "trending"
+        elif atr_percent > 1.5:
+            return "volatile"
+        else:
+            return "ranging"
+    
     def is_good_session(self, symbol: str) -> bool:
         """Check if current time is good for trading this symbol"""
         try:
@@ -115,17 +124,7 @@ class EnhancedOptimizedStrategy:
         """Calculate dynamic stop loss and take profit based on volatility"""
         try:
             atr = self._calculate_atr(data['High'], data['Low'], data['Close'], 14)
-            current_price = data['Close'].iloc[-1]
-            
-            # Dynamic stop loss based on ATR
-            if direction == 'BUY':
-                stop_loss = entry_price - (atr * 2.0)  # 2 ATR for stop
-                take_profit = entry_price + (atr * 4.0)  # 4 ATR for target (2:1 RR)
-            else:
-                stop_loss = entry_price + (atr * 2.0)
-                take_profit = entry_price - (atr * 4.0)
-            
-            return stop_loss, take_profit
+            return self._atr_stops(atr, direction, entry_price)
             
         except Exception as e:
             self.logger.error(f"Error calculating dynamic stops: {e}")
@@ -135,70 +134,82 @@ class EnhancedOptimizedStrategy:
             else:
                 return entry_price * 1.005, entry_price * 0.99
     
+    def _atr_stops(self, atr: float, direction: str, entry_price: float) -> Tuple[float, float]:
+        """Stop loss / take profit at 2 / 4 ATR from entry"""
+        # Dynamic stop loss based on ATR
+        if direction == 'BUY':
+            stop_loss = entry_price - (atr * 2.0)  # 2 ATR for stop
+            take_profit = entry_price + (atr * 4.0)  # 4 ATR for target (2:1 RR)
+        else:
+            stop_loss = entry_price + (atr * 2.0)
+            take_profit = entry_price - (atr * 4.0)
+        
+        return stop_loss, take_profit
+    
     def calculate_signal_strength(self, data: pd.DataFrame, regime: str) -> int:
         """Calculate signal strength (0-100) based on multiple factors"""
         try:
-            strength = 0
-            
-            # RSI confirmation (20 points)
-            rsi = self._calculate_rsi(data['Close'], 14)
-            if 30 <= rsi <= 70:
-                strength += 20
-            
-            # EMA trend alignment (20 points)
-            ema_20 = self._calculate_ema(data['Close'], 20)
-            ema_50 = self._calculate_ema(data['Close'], 50)
-            current_price = data['Close'].iloc[-1]
-            
-            if (ema_20 > ema_50 and current_price > ema_20) or (ema_20 < ema_50 and current_price < ema_20):
-                strength += 20
-            
-            # Volume confirmation (20 points)
-            avg_volume = data['Volume'].rolling(20).mean().iloc[-1]
-            current_volume = data['Volume'].iloc[-1]
-            if current_volume > avg_volume * 1.2:
-                strength += 20
-            
-            # Market regime bonus (20 points)
-            if regime == "trending":
-                strength += 20
-            elif regime == "ranging":
-                strength += 10
-            
-            # Price action confirmation (20 points)
-            # Check if price is near support/resistance
-            recent_high = data['High'].rolling(20).max().iloc[-1]
-            recent_low = data['Low'].rolling(20).min().iloc[-1]
-            
-            if (current_price > recent_high * 0.995) or (current_price < recent_low * 1.005):
-                strength += 20
-            
-            return min(strength, 100)
+            return self._score_signal_strength(
+                rsi=self._calculate_rsi(data['Close'], 14),
+                ema_20=self._calculate_ema(data['Close'], 20),
+                ema_50=self._calculate_ema(data['Close'], 50),
+                current_price=data['Close'].iloc[-1],
+                avg_volume=data['Volume'].rolling(20).mean().iloc[-1],
+                current_volume=data['Volume'].iloc[-1],
+                recent_high=data['High'].rolling(20).max().iloc[-1],
+                recent_low=data['Low'].rolling(20).min().iloc[-1],
+                regime=regime
+            )
             
         except Exception as e:
             self.logger.error(f"Error calculating signal strength: {e}")
             return 50
     
+    def _score_signal_strength(self, rsi: float, ema_20: float, ema_50: float, current_price: float,
+                               avg_volume: float, current_volume: float,
+                               recent_high: float, recent_low: float, regime: str) -> int:
+        """Signal strength (0-100) from already computed indicator values"""
+        strength = 0
+        
+        # RSI confirmation (20 points)
+        if 30 <= rsi <= 70:
+            strength += 20
+        
+        # EMA trend alignment (20 points)
+        if (ema_20 > ema_50 and current_price > ema_20) or (ema_20 < ema_50 and current_price < ema_20):
+            strength += 20
+        
+        # Volume confirmation (20 points)
+        if current_volume > avg_volume * 1.2:
+            strength += 20
+        
+        # Market regime bonus (20 points)
+        if regime == "trending":
+            strength += 20
+        elif regime == "ranging":
+            strength += 10
+        
+        # Price action confirmation (20 points)
+        # Check if price is near support/resistance
+        if (current_price > recent_high * 0.995) or (current_price < recent_low * 1.005):
+            strength += 20
+        
+        return min(strength, 100)
+    
     def update_live_data(self, symbol: str, ohlc_data: Dict[str, Any]):
         """Update live market data"""
         try:
-            # Convert to DataFrame format
-            df_data = []
-            for candle in ohlc_data:
-                df_data.append({
-                    'Date': pd.to_datetime(candle['timestamp'], unit='ms'),
-                    'Open': candle['open'],
-                    'High': candle['high'],
-                    'Low': candle['low'],
-                    'Close': candle['close'],
-                    'Volume': candle.get('volume', 1000)
-                })
-            
-            df = pd.DataFrame(df_data)
-            df.set_index('Date', inplace=True)
-            
-            self.live_data[symbol] = df
-            self.logger.info(f"Updated live data for {symbol}: {len(df)} candles")
+            buffer = self.live_data.get(symbol)
+            if buffer is None:
+                buffer = self.live_data[symbol] = CandleRingBuffer(unit='ms')
+                self.live_indicators[symbol] = self.new_indicator_state()
+            
+            # Only candles not seen yet (or a revised last candle) are converted,
+            # stored and fed to the streaming indicators
+            new_bars = buffer.sync(ohlc_data, timestamp=lambda candle: int(candle['timestamp']),
+                                   bar=self._candle_bar)
+            self.live_indicators[symbol].extend(new_bars)
+            self.logger.info(f"Updated live data for {symbol}: {len(buffer)} candles")
             
         except Exception as e:
             self.logger.error(f"Error updating live data for {symbol}: {e}")
@@ -206,11 +217,8 @@ class EnhancedOptimizedStrategy:
     def generate_enhanced_signals(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Generate enhanced trading signals"""
         try:
-            if symbol not in self.live_data:
-                return None
-            
-            data = self.live_data[symbol]
-            if len(data) < 50:
+            state = self.live_indicators.get(symbol)
+            if state is None or state.bars < 50:
                 return None
             
                             # Check session timing (temporarily disabled for testing)
@@ -220,19 +228,93 @@ class EnhancedOptimizedStrategy:
                 
                 self.logger.info(f"Enhanced strategy analyzing {symbol} - session check passed")
             
-            # Detect market regime
-            regime = self.detect_market_regime(data)
-            self.market_regimes[symbol] = regime
+            return self.generate_signal_from_indicators(
+                symbol, self.current_indicators(state, self.live_data[symbol]))
             
+        except Exception as e:
+            self.logger.error(f"Error generating enhanced signals for {symbol}: {e}")
+            return None
+    
+    def calculate_indicator_frame(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Per-bar values behind generate_enhanced_signals. Every column is causal,
+        so row i equals what the live path computes on data.iloc[:i+1].
+        """
+        close = indicators.as_array(data['Close'])
+        high = indicators.as_array(data['High'])
+        low = indicators.as_array(data['Low'])
+        
+        return pd.DataFrame({
+            'Close': data['Close'],
+            'Volume': data['Volume'],
+            'RSI': indicators.rsi(close, 14),
+            'ATR': indicators.atr(high, low, close, 14),
+            'EMA_20': indicators.ema(close, 20),
+            'EMA_50': indicators.ema(close, 50),
+            'ADX': indicators.adx(high, low, close, 14, dm_rule='non_exclusive'),
+            'Range_High': data['High'].cummax(),
+            'Range_Low': data['Low'].cummin(),
+            'Volume_Avg_20': indicators.rolling_mean(data['Volume'], 20),
+            'High_20': indicators.rolling_max(high, 20),
+            'Low_20': indicators.rolling_min(low, 20),
+        }, index=data.index)
+    
+    def new_indicator_state(self) -> LiveIndicatorState:
+        """
+        Streaming counterpart of calculate_indicator_frame (same names, same
+        values). Range_High / Range_Low span the stored candles, so
+        current_indicators reads them from the candle buffer instead.
+        """
+        return LiveIndicatorState({
+            'RSI': StreamingRSI(14),
+            'ATR': StreamingATR(14),
+            'EMA_20': StreamingEMA(20),
+            'EMA_50': StreamingEMA(50),
+            'ADX': StreamingADX(14, dm_rule='non_exclusive'),
+            'Volume_Avg_20': StreamingSMA(20, source='volume'),
+            'High_20': StreamingRollingMax(20, source='high'),
+            'Low_20': StreamingRollingMin(20, source='low'),
+        })
+    
+    @staticmethod
+    def _candle_bar(candle: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'open': candle['open'],
+            'high': candle['high'],
+            'low': candle['low'],
+            'close': candle['close'],
+            'volume': candle.get('volume', 1000)
+        }
+    
+    def current_indicators(self, state: LiveIndicatorState, buffer: CandleRingBuffer) -> Dict[str, Any]:
+        """Latest calculate_indicator_frame row, read from the streaming state and candle buffer"""
+        return {
+            'Close': state.bar['close'],
+            'Volume': state.bar['volume'],
+            **state.current,
+            'Range_High': float(np.nanmax(buffer.column('high'))),
+            'Range_Low': float(np.nanmin(buffer.column('low'))),
+        }
+    
+    def generate_signal_from_indicators(self, symbol: str, current: pd.Series) -> Optional[Dict[str, Any]]:
+        """Enhanced signal for one bar given its calculate_indicator_frame row"""
+        try:
             # Get current market conditions
-            current_price = data['Close'].iloc[-1]
-            current_volume = data['Volume'].iloc[-1]
+            current_price = current['Close']
+            current_volume = current['Volume']
             
-            # Calculate enhanced indicators
-            rsi = self._calculate_rsi(data['Close'], 14)
-            atr = self._calculate_atr(data['High'], data['Low'], data['Close'], 14)
-            ema_20 = self._calculate_ema(data['Close'], 20)
-            ema_50 = self._calculate_ema(data['Close'], 50)
+            # Detect market regime
+            regime = self._classify_regime(
+                current['ADX'],
+                (current['ATR'] / current_price) * 100,
+                (current['Range_High'] - current['Range_Low']) / current_price * 100
+            )
+            self.market_regimes[symbol] = regime
+            
+            # Enhanced indicators
+            rsi = current['RSI']
+            ema_20 = current['EMA_20']
+            ema_50 = current['EMA_50']
             
             # Enhanced entry conditions (relaxed for better signal generation)
             long_conditions = (
@@ -251,8 +333,11 @@ class EnhancedOptimizedStrategy:
             self.logger.info(f"Long conditions: {long_conditions}, Short conditions: {short_conditions}")
             
             if long_conditions:
-                stop_loss, take_profit = self.calculate_dynamic_stops(data, 'BUY', current_price)
-                signal_strength = self.calculate_signal_strength(data, regime)
+                stop_loss, take_profit = self._atr_stops(current['ATR'], 'BUY', current_price)
+                signal_strength = self._score_signal_strength(
+                    rsi, ema_20, ema_50, current_price, current['Volume_Avg_20'], current_volume,
+                    current['High_20'], current['Low_20'], regime
+                )
                 
                 self.logger.info(f"Enhanced strategy generated BUY signal for {symbol} @ {current_price:.5f}, confidence: {signal_strength}%")
                 return {
@@ -268,8 +353,11 @@ class EnhancedOptimizedStrategy:
                 }
             
             elif short_conditions:
-                stop_loss, take_profit = self.calculate_dynamic_stops(data, 'SELL', current_price)
-                signal_strength = self.calculate_signal_strength(data, regime)
+                stop_loss, take_profit = self._atr_stops(current['ATR'], 'SELL', current_price)
+                signal_strength = self._score_signal_strength(
+                    rsi, ema_20, ema_50, current_price, current['Volume_Avg_20'], current_volume,
+                    current['High_20'], current['Low_20'], regime
+                )
                 
                 self.logger.info(f"Enhanced strategy generated SELL signal for {symbol} @ {current_price:.5f}, confidence: {signal_strength}%")
                 return {
@@ -292,63 +380,30 @@ class EnhancedOptimizedStrategy:
     
     def _calculate_rsi(self, prices, period):
         """Calculate RSI"""
-        delta = pd.Series(prices).diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs)).iloc[-1]
+        return indicators.rsi_last(prices, period)
     
     def _calculate_atr(self, high, low, close, period):
         """Calculate ATR"""
-        tr1 = pd.Series(high) - pd.Series(low)
-        tr2 = abs(pd.Series(high) - pd.Series(close).shift(1))
-        tr3 = abs(pd.Series(low) - pd.Series(close).shift(1))
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        return tr.rolling(period).mean().iloc[-1]
+        return indicators.atr_last(high, low, close, period)
     
     def _calculate_ema(self, prices, period):
         """Calculate EMA"""
-        return pd.Series(prices).ewm(span=period).mean().iloc[-1]
+        return indicators.ema_last(prices, period)
     
     def _calculate_adx(self, data, period):
         """Calculate ADX for trend strength"""
         try:
-            high = data['High']
-            low = data['Low']
-            close = data['Close']
-            
-            # Calculate +DM and -DM
-            plus_dm = high.diff()
-            minus_dm = low.diff()
-            plus_dm[plus_dm < 0] = 0
-            minus_dm[minus_dm > 0] = 0
-            minus_dm = abs(minus_dm)
-            
-            # Calculate TR
-            tr1 = high - low
-            tr2 = abs(high - close.shift(1))
-            tr3 = abs(low - close.shift(1))
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            
-            # Calculate smoothed values
-            tr_smooth = tr.rolling(period).mean()
-            plus_dm_smooth = plus_dm.rolling(period).mean()
-            minus_dm_smooth = minus_dm.rolling(period).mean()
-            
-            # Calculate +DI and -DI
-            plus_di = 100 * (plus_dm_smooth / tr_smooth)
-            minus_di = 100 * (minus_dm_smooth / tr_smooth)
-            
-            # Calculate DX and ADX
-            dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
-            adx = dx.rolling(period).mean()
-            
-            return adx.iloc[-1]
+            return self._adx_series(data, period).iloc[-1]
             
         except Exception as e:
             self.logger.error(f"Error calculating ADX: {e}")
             return 0
     
+    def _adx_series(self, data, period):
+        """ADX for every bar"""
+        adx = indicators.adx(data['High'], data['Low'], data['Close'], period, dm_rule='non_exclusive')
+        return pd.Series(adx, index=data.index)
+    
     def get_current_signals(self) -> Dict[str, Any]:
         """Get current active signals"""
         return self.current_signals
@@ -4,7 +4,6 @@ LIVE OPTIMIZED STRATEGIES INTEGRATION
 Integrates UltraOptimizedCurrencyStrategy and UltraOptimizedGoldStrategy into live system
 """
 
-import pandas as pd
 import numpy as np
 import logging
 from typing import Dict, List, Optional, Any, Tuple
@@ -12,6 +11,10 @@ from datetime import datetime, timedelta
 import yaml
 import json
 
+import indicators
+from live_candles import CandleRingBuffer
+from streaming_indicators import LiveIndicatorState, StreamingATR, StreamingEMA, StreamingRSI
+
 logger = logging.getLogger(__name__)
 
 class LiveOptimizedStrategyManager:
@@ -25,7 +28,8 @@ class LiveOptimizedStrategyManager:
         self.config = self._load_config(config_path)
         
         # Live data storage
-        self.live_data = {}
+        self.live_data: Dict[str, CandleRingBuffer] = {}  # last candles per symbol
+        self.live_indicators: Dict[str, LiveIndicatorState] = {}  # streaming state per symbol
         self.current_signals = {}
         self.signal_history = []
         
@@ -49,23 +53,17 @@ class LiveOptimizedStrategyManager:
     def update_live_data(self, symbol: str, ohlc_data: Dict[str, Any]):
         """Update live market data"""
         try:
-            # Convert to DataFrame format expected by strategies
-            df_data = []
-            for candle in ohlc_data:
-                df_data.append({
-                    'Date': pd.to_datetime(candle['timestamp'], unit='ms'),
-                    'Open': candle['open'],
-                    'High': candle['high'],
-                    'Low': candle['low'],
-                    'Close': candle['close'],
-                    'Volume': candle.get('volume', 1000)
-                })
-            
-            df = pd.DataFrame(df_data)
-            df.set_index('Date', inplace=True)
+            buffer = self.live_data.get(symbol)
+            if buffer is None:
+                buffer = self.live_data[symbol] = CandleRingBuffer(unit='ms')
+                self.live_indicators[symbol] = self._new_indicator_state(symbol)
             
-            self.live_data[symbol] = df
-            self.logger.info(f"Updated live data for {symbol}: {len(df)} candles")
+            # Only candles not seen yet (or a revised last candle) are converted,
+            # stored and fed to the streaming indicators
+            new_bars = buffer.sync(ohlc_data, timestamp=lambda candle: int(candle['timestamp']),
+                                   bar=self._candle_bar)
+            self.live_indicators[symbol].extend(new_bars)
+            self.logger.info(f"Updated live data for {symbol}: {len(buffer)} candles")
             
         except Exception as e:
             self.logger.error(f"Error updating live data for {symbol}: {e}")
@@ -73,19 +71,17 @@ class LiveOptimizedStrategyManager:
     def generate_live_signals(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Generate live trading signals using optimized strategies"""
         try:
-            if symbol not in self.live_data:
-                return None
-            
-            data = self.live_data[symbol]
-            if len(data) < 50:  # Need minimum data
+            state = self.live_indicators.get(symbol)
+            if state is None or state.bars < 50:  # Need minimum data
                 return None
+            current = {'Close': state.bar['close'], 'Volume': state.bar['volume'], **state.current}
             
             # Determine which strategy to use
             if symbol == 'XAU_USD':
-                signal = self._analyze_gold_strategy(data, symbol)
+                signal = self._analyze_gold_strategy(current, symbol)
                 strategy_name = 'UltraOptimizedGoldStrategy'
             else:
-                signal = self._analyze_currency_strategy(data, symbol)
+                signal = self._analyze_currency_strategy(current, symbol)
                 strategy_name = 'UltraOptimizedCurrencyStrategy'
             
             if signal:
@@ -107,18 +103,37 @@ class LiveOptimizedStrategyManager:
             self.logger.error(f"Error generating signals for {symbol}: {e}")
             return None
     
-    def _analyze_currency_strategy(self, data: pd.DataFrame, symbol: str) -> Optional[Dict[str, Any]]:
-        """Analyze data using currency strategy logic"""
+    def _new_indicator_state(self, symbol: str) -> LiveIndicatorState:
+        """Streaming indicators behind _analyze_currency_strategy / _analyze_gold_strategy"""
+        return LiveIndicatorState({
+            'RSI': StreamingRSI(14),
+            'ATR': StreamingATR(21 if symbol == 'XAU_USD' else 14),  # Longer period for gold
+            'EMA_15': StreamingEMA(15),
+            'EMA_50': StreamingEMA(50),
+        })
+    
+    @staticmethod
+    def _candle_bar(candle: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'open': candle['open'],
+            'high': candle['high'],
+            'low': candle['low'],
+            'close': candle['close'],
+            'volume': candle.get('volume', 1000)
+        }
+    
+    def _analyze_currency_strategy(self, current: Dict[str, Any], symbol: str) -> Optional[Dict[str, Any]]:
+        """Analyze the latest indicator values using currency strategy logic"""
         try:
             # Get current market conditions
-            current_price = data['Close'].iloc[-1]
-            current_volume = data['Volume'].iloc[-1]
+            current_price = current['Close']
+            current_volume = current['Volume']
             
-            # Calculate indicators
-            rsi = self._calculate_rsi(data['Close'], 14)
-            atr = self._calculate_atr(data['High'], data['Low'], data['Close'], 14)
-            ema_15 = self._calculate_ema(data['Close'], 15)
-            ema_50 = self._calculate_ema(data['Close'], 50)
+            # Indicators (streamed per symbol)
+            rsi = current['RSI']
+            atr = current['ATR']
+            ema_15 = current['EMA_15']
+            ema_50 = current['EMA_50']
             
             # Currency strategy conditions
             long_conditions = (
@@ -163,18 +178,18 @@ class LiveOptimizedStrategyManager:
             self.logger.error(f"Error in currency strategy analysis: {e}")
             return None
     
-    def _analyze_gold_strategy(self, data: pd.DataFrame, symbol: str) -> Optional[Dict[str, Any]]:
-        """Analyze data using gold strategy logic"""
+    def _analyze_gold_strategy(self, current: Dict[str, Any], symbol: str) -> Optional[Dict[str, Any]]:
+        """Analyze the latest indicator values using gold strategy logic"""
         try:
             # Get current market conditions
-            current_price = data['Close'].iloc[-1]
-            current_volume = data['Volume'].iloc[-1]
+            current_price = current['Close']
+            current_volume = current['Volume']
             
-            # Calculate indicators
-            rsi = self._calculate_rsi(data['Close'], 14)
-            atr = self._calculate_atr(data['High'], data['Low'], data['Close'], 21)  # Longer period for gold
-            ema_15 = self._calculate_ema(data['Close'], 15)
-            ema_50 = self._calculate_ema(data['Close'], 50)
+            # Indicators (streamed per symbol; ATR(21) for gold)
+            rsi = current['RSI']
+            atr = current['ATR']
+            ema_15 = current['EMA_15']
+            ema_50 = current['EMA_50']
             
             # Gold-specific conditions
             long_conditions = (
@@ -221,23 +236,15 @@ class LiveOptimizedStrategyManager:
     
     def _calculate_rsi(self, prices, period):
         """Calculate RSI"""
-        delta = pd.Series(prices).diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs)).iloc[-1]
+        return indicators.rsi_last(prices, period)
     
     def _calculate_atr(self, high, low, close, period):
         """Calculate ATR"""
-        tr1 = pd.Series(high) - pd.Series(low)
-        tr2 = abs(pd.Series(high) - pd.Series(close).shift(1))
-        tr3 = abs(pd.Series(low) - pd.Series(close).shift(1))
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        return tr.rolling(period).mean().iloc[-1]
+        return indicators.atr_last(high, low, close, period)
     
     def _calculate_ema(self, prices, period):
         """Calculate EMA"""
-        return pd.Series(prices).ewm(span=period).mean().iloc[-1]
+        return indicators.ema_last(prices, period)
     
     def get_current_signals(self) -> Dict[str, Any]:
         """Get current active signals"""
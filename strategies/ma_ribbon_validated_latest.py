@@ -22,6 +22,10 @@ from datetime import datetime, timedelta
 import yaml
 import json
 
+import indicators
+from live_candles import CandleRingBuffer
+from streaming_indicators import LiveIndicatorState, StreamingATR, StreamingEMA
+
 logger = logging.getLogger(__name__)
 
 class MARibbonValidatedStrategy:
@@ -72,7 +76,8 @@ class MARibbonValidatedStrategy:
         }
         
         # Live trading state
-        self.live_data = {}
+        self.live_data: Dict[str, CandleRingBuffer] = {}  # last candles per symbol
+        self.live_indicators: Dict[str, LiveIndicatorState] = {}  # streaming state per symbol
         self.current_signals = {}
         self.open_positions = {}
         
@@ -93,28 +98,47 @@ class MARibbonValidatedStrategy:
     def update_live_data(self, symbol: str, ohlc_data: List[Dict[str, Any]]):
         """Update live market data"""
         try:
-            # Convert to DataFrame
-            df_data = []
-            for candle in ohlc_data:
-                df_data.append({
-                    'timestamp': pd.to_datetime(candle.get('timestamp') or candle.get('time')),
-                    'open': float(candle['open']),
-                    'high': float(candle['high']),
-                    'low': float(candle['low']),
-                    'close': float(candle['close']),
-                    'volume': int(candle.get('volume', 1000))
-                })
-            
-            df = pd.DataFrame(df_data)
-            df.set_index('timestamp', inplace=True)
-            df = df.sort_index()
+            buffer = self.live_data.get(symbol)
+            if buffer is None:
+                buffer = self.live_data[symbol] = CandleRingBuffer(unit='ns')
+                self.live_indicators[symbol] = self.new_indicator_state()
             
-            self.live_data[symbol] = df
-            self.logger.info(f"Updated live data for {symbol}: {len(df)} candles")
+            # sync stops at the first candle older than the last bar held, so
+            # an unordered feed is put in time order first; only candles not
+            # seen yet (or a revised last candle) are stored and fed to the
+            # streaming indicators
+            ohlc_data = sorted(ohlc_data, key=self._candle_timestamp)
+            new_bars = buffer.sync(ohlc_data, timestamp=self._candle_timestamp, bar=self._candle_bar)
+            self.live_indicators[symbol].extend(new_bars)
+            self.logger.info(f"Updated live data for {symbol}: {len(buffer)} candles")
             
         except Exception as e:
             self.logger.error(f"Error updating live data for {symbol}: {e}")
     
+    @staticmethod
+    def _candle_timestamp(candle: Dict[str, Any]) -> int:
+        """Epoch nanoseconds"""
+        return pd.to_datetime(candle.get('timestamp') or candle.get('time')).value
+    
+    @staticmethod
+    def _candle_bar(candle: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'open': float(candle['open']),
+            'high': float(candle['high']),
+            'low': float(candle['low']),
+            'close': float(candle['close']),
+            'volume': int(candle.get('volume', 1000))
+        }
+    
+    def new_indicator_state(self) -> LiveIndicatorState:
+        """Streaming counterpart of calculate_indicators (same column names)"""
+        return LiveIndicatorState({
+            'ema_8': StreamingEMA(self.params['ema_fast'], adjust=False),
+            'ema_21': StreamingEMA(self.params['ema_mid'], adjust=False),
+            'ema_50': StreamingEMA(self.params['ema_slow'], adjust=False),
+            'atr': StreamingATR(14),
+        })
+    
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calculate EMA indicators"""
         df = df.copy()
@@ -141,28 +165,23 @@ class MARibbonValidatedStrategy:
             Signal dict with entry, stop loss, take profit, confidence
         """
         try:
-            if symbol not in self.live_data:
-                return None
-            
-            data = self.live_data[symbol]
-            if len(data) < 200:  # Need sufficient history
+            state = self.live_indicators.get(symbol)
+            if state is None or state.bars < 200:  # Need sufficient history
                 return None
             
-            # Calculate indicators
-            data = self.calculate_indicators(data)
-            
-            # Get current conditions
-            current_price = data['close'].iloc[-1]
-            current_ema_8 = data['ema_8'].iloc[-1]
-            current_ema_21 = data['ema_21'].iloc[-1]
-            current_ema_50 = data['ema_50'].iloc[-1]
-            current_atr = data['atr'].iloc[-1]
+            # Get current conditions (indicators are streamed per symbol)
+            current, previous = state.current, state.previous
+            current_price = state.bar['close']
+            current_ema_8 = current['ema_8']
+            current_ema_21 = current['ema_21']
+            current_ema_50 = current['ema_50']
+            current_atr = current['atr']
             
             # Previous conditions (for crossover detection)
-            prev_ema_8 = data['ema_8'].iloc[-2]
-            prev_ema_21 = data['ema_21'].iloc[-2]
-            prev_ema_50 = data['ema_50'].iloc[-2]
-            prev_price = data['close'].iloc[-2]
+            prev_ema_8 = previous['ema_8']
+            prev_ema_21 = previous['ema_21']
+            prev_ema_50 = previous['ema_50']
+            prev_price = state.previous_bar['close']
             
             # Check for LONG signal
             # Condition: EMA(8) > EMA(21) > EMA(50) AND price just crossed above EMA(8)
@@ -231,24 +250,15 @@ class MARibbonValidatedStrategy:
     
     def _calculate_ema(self, series: pd.Series, period: int) -> float:
         """Calculate EMA value"""
-        return series.ewm(span=period, adjust=False).mean().iloc[-1]
+        return indicators.ema_last(series, period, adjust=False)
     
     def _calculate_atr(self, high: pd.Series, low: pd.Series, close: pd.Series, period: int) -> float:
         """Calculate ATR value"""
-        high_low = high - low
-        high_close = np.abs(high - close.shift())
-        low_close = np.abs(low - close.shift())
-        tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        return tr.rolling(window=period).mean().iloc[-1]
+        return indicators.atr_last(high, low, close, period)
     
     def _calculate_rsi(self, series: pd.Series, period: int = 14) -> float:
         """Calculate RSI value"""
-        delta = series.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi.iloc[-1]
+        return indicators.rsi_last(series, period)
     
     def get_position_size(self, account_balance: float, entry_price: float, stop_loss: float) -> float:
         """
@@ -14,10 +14,11 @@ IMPROVEMENTS:
 """
 
 import pandas as pd
-import numpy as np
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
+import indicators
+
 class MomentumV2Improved:
     """
     Improved Momentum Strategy - Execution Robust
@@ -60,18 +61,7 @@ class MomentumV2Improved:
         if len(data) < period:
             return 0.0
         
-        high = data['high'].values[-period:]
-        low = data['low'].values[-period:]
-        close = data['close'].values[-period-1:-1]
-        
-        tr1 = high - low
-        tr2 = np.abs(high - close)
-        tr3 = np.abs(low - close)
-        
-        tr = np.maximum(tr1, np.maximum(tr2, tr3))
-        atr = np.mean(tr)
-        
-        return atr
+        return indicators.atr_last(data['high'], data['low'], data['close'], period)
     
     def calculate_momentum(self, data: pd.DataFrame, period: int = 20) -> float:
         """Calculate price momentum"""
@@ -84,6 +84,7 @@ class NewsEnhancedStrategy:
             ranges = pd.concat([high_low, high_close, low_close], axis=1)
             true_range = np.max(ranges, axis=1)
             data['ATR'] = true_range.rolling(window=14).mean()
+            data['ATR_Avg_20'] = data['ATR'].rolling(20).mean()
             
             # Volume analysis
             data['Volume_SMA'] = data['volume'].rolling(window=20).mean()
@@ -111,7 +112,7 @@ class NewsEnhancedStrategy:
             if current['Volume_Ratio'] < self.min_volume_multiplier:
                 return {'qualified': False, 'reason': f'Low volume (Ratio: {current["Volume_Ratio"]:.1f})'}
             
-            avg_atr = data['ATR'].rolling(20).mean().iloc[-1]
+            avg_atr = data['ATR_Avg_20'].iloc[-1]
             if current['ATR'] < avg_atr * self.min_atr_multiplier:
                 return {'qualified': False, 'reason': f'Low volatility (ATR: {current["ATR"]:.5f})'}
             
@@ -219,7 +220,7 @@ class NewsEnhancedStrategy:
             total_checks += 1
             
             # ATR volatility
-            avg_atr = data['ATR'].rolling(20).mean().iloc[-1]
+            avg_atr = data['ATR_Avg_20'].iloc[-1]
             if current['ATR'] > avg_atr * 1.1:
                 score += 10
             elif current['ATR'] > avg_atr:
@@ -267,10 +268,11 @@ class NewsEnhancedStrategy:
     
     def generate_signal(self, data: pd.DataFrame, symbol: str) -> Dict[str, Any]:
         """Generate trading signal with news integration"""
+        return self.generate_signal_from_indicators(self.calculate_technical_indicators(data), symbol)
+    
+    def generate_signal_from_indicators(self, data: pd.DataFrame, symbol: str) -> Dict[str, Any]:
+        """Signal for the last bar of data that already carries calculate_technical_indicators columns"""
         try:
-            # Calculate indicators
-            data = self.calculate_technical_indicators(data)
-            
             # Check news-enhanced conditions
             conditions = self.check_news_enhanced_conditions(data, symbol)
             
@@ -19,6 +19,8 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
 
+import indicators
+
 class MarketRegime(Enum):
     """Market regime types"""
     TRENDING = "trending"
@@ -82,50 +84,15 @@ class UltraStrictV2RegimeAware:
         if len(data) < period:
             return 0.0
         
-        high = data['high'].values[-period:]
-        low = data['low'].values[-period:]
-        close = data['close'].values[-period-1:-1]
-        
-        tr1 = high - low
-        tr2 = np.abs(high - close)
-        tr3 = np.abs(low - close)
-        
-        tr = np.maximum(tr1, np.maximum(tr2, tr3))
-        atr = np.mean(tr)
-        
-        return atr
+        return indicators.atr_last(data['high'], data['low'], data['close'], period)
     
     def calculate_adx(self, data: pd.DataFrame, period: int = 14) -> float:
         """Calculate ADX (Average Directional Index)"""
         if len(data) < period + 1:
             return 0.0
         
-        # Calculate +DM and -DM
-        high_diff = data['high'].diff()
-        low_diff = -data['low'].diff()
-        
-        plus_dm = np.where((high_diff > low_diff) & (high_diff > 0), high_diff, 0)
-        minus_dm = np.where((low_diff > high_diff) & (low_diff > 0), low_diff, 0)
-        
-        # Calculate TR
-        tr = np.maximum(
-            data['high'] - data['low'],
-            np.maximum(
-                abs(data['high'] - data['close'].shift(1)),
-                abs(data['low'] - data['close'].shift(1))
-            )
-        )
-        
-        # Smooth the values
-        atr = tr.rolling(period).mean()
-        plus_di = 100 * (pd.Series(plus_dm).rolling(period).mean() / atr)
-        minus_di = 100 * (pd.Series(minus_dm).rolling(period).mean() / atr)
-        
-        # Calculate DX and ADX
-        dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di + 1e-10)
-        adx = dx.rolling(period).mean()
-        
-        return adx.iloc[-1] if len(adx) > 0 else 0.0
+        return indicators.adx_last(data['high'], data['low'], data['close'], period,
+                                   epsilon=1e-10, skip_nan=False)
     
     def detect_regime(self, data: pd.DataFrame) -> MarketRegime:
         """NEW: Detect current market regime"""
@@ -14,8 +14,11 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import yaml
 
-# Add current directory to path
+# Add current directory and repository root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import indicators
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -103,6 +106,7 @@ class UltraStrictV3Strategy:
             ranges = pd.concat([high_low, high_close, low_close], axis=1)
             true_range = np.max(ranges, axis=1)
             data['ATR'] = true_range.rolling(window=14).mean()
+            data['ATR_Avg_20'] = data['ATR'].rolling(20).mean()
             
             # ADX for trend strength
             data['ADX'] = self._calculate_adx(data)
@@ -125,23 +129,8 @@ class UltraStrictV3Strategy:
     def _calculate_adx(self, data: pd.DataFrame) -> pd.Series:
         """Calculate ADX for trend strength"""
         try:
-            # Calculate +DM and -DM
-            high_diff = data['high'].diff()
-            low_diff = data['low'].diff()
-            
-            plus_dm = np.where((high_diff > low_diff) & (high_diff > 0), high_diff, 0)
-            minus_dm = np.where((low_diff > high_diff) & (low_diff > 0), low_diff, 0)
-            
-            # Calculate TR, +DI, -DI
-            tr = self._calculate_true_range(data)
-            plus_di = 100 * pd.Series(plus_dm).rolling(14).mean() / tr.rolling(14).mean()
-            minus_di = 100 * pd.Series(minus_dm).rolling(14).mean() / tr.rolling(14).mean()
-            
-            # Calculate ADX
-            dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
-            adx = pd.Series(dx).rolling(14).mean()
-            
-            return adx
+            adx = indicators.adx(data['high'], data['low'], data['close'], 14, dm_rule='low_diff')
+            return pd.Series(adx, index=data.index)
             
         except Exception as e:
             self.logger.error(f"Error calculating ADX: {e}")
@@ -149,11 +138,8 @@ class UltraStrictV3Strategy:
     
     def _calculate_true_range(self, data: pd.DataFrame) -> pd.Series:
         """Calculate True Range"""
-        high_low = data['high'] - data['low']
-        high_close = np.abs(data['high'] - data['close'].shift())
-        low_close = np.abs(data['low'] - data['close'].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        return np.max(ranges, axis=1)
+        true_range = indicators.true_range(data['high'], data['low'], data['close'])
+        return pd.Series(true_range, index=data.index)
     
     def _detect_doji(self, data: pd.DataFrame) -> pd.Series:
         """Detect Doji candlestick patterns"""
@@ -207,7 +193,7 @@ class UltraStrictV3Strategy:
                 return {'qualified': False, 'reason': f'Low volume (Ratio: {current["Volume_Ratio"]:.1f})'}
             
             # 3. ATR Check
-            avg_atr = data['ATR'].rolling(20).mean().iloc[-1]
+            avg_atr = data['ATR_Avg_20'].iloc[-1]
             if current['ATR'] < avg_atr * self.min_atr_multiplier:
                 return {'qualified': False, 'reason': f'Low volatility (ATR: {current["ATR"]:.5f})'}
             
@@ -338,7 +324,7 @@ class UltraStrictV3Strategy:
             total_checks += 1
             
             # ATR volatility
-            avg_atr = data['ATR'].rolling(20).mean().iloc[-1]
+            avg_atr = data['ATR_Avg_20'].iloc[-1]
             if current['ATR'] > avg_atr * 1.2:
                 score += 10
             total_checks += 1
@@ -432,7 +418,7 @@ class UltraStrictV3Strategy:
             trend_direction = "Bullish" if current['close'] > current['SMA_20'] > current['SMA_50'] else "Bearish"
             
             # Volatility analysis
-            avg_atr = data['ATR'].rolling(20).mean().iloc[-1]
+            avg_atr = data['ATR_Avg_20'].iloc[-1]
             volatility_level = "High" if current['ATR'] > avg_atr * 1.5 else "Normal" if current['ATR'] > avg_atr else "Low"
             
             # Volume analysis
@@ -569,10 +555,11 @@ class UltraStrictV3Strategy:
     
     def generate_signal(self, data: pd.DataFrame, symbol: str) -> Dict[str, Any]:
         """Generate trading signal with ultra-strict criteria and AI insights"""
+        return self.generate_signal_from_indicators(self.calculate_technical_indicators(data), symbol)
+    
+    def generate_signal_from_indicators(self, data: pd.DataFrame, symbol: str) -> Dict[str, Any]:
+        """Signal for the last bar of data that already carries calculate_technical_indicators columns"""
         try:
-            # Calculate indicators
-            data = self.calculate_technical_indicators(data)
-            
             # Check ultra-strict conditions
             conditions = self.check_ultra_strict_conditions(data, symbol)
             
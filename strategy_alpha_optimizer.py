@@ -16,6 +16,9 @@ import multiprocessing as mp
 import pandas as pd
 import numpy as np
 
+import indicators
+from scenario_scheduler import submit_dataset_chunks, worker_cached
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -162,28 +165,30 @@ class StrategyAlphaOptimizer:
         start_time = datetime.now()
         
         with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all experiments
-            future_to_experiment = {
-                executor.submit(self._run_alpha_experiment, exp): exp 
-                for exp in experiments
-            }
+            # Submit experiments in per-dataset chunks: data + base indicators load once per chunk
+            future_to_chunk = submit_dataset_chunks(
+                executor, self.sweep_dataset, experiments, self.max_workers,
+                key=lambda exp: (exp['params']['pair'], exp['params']['timeframe'])
+            )
             
             completed = 0
-            for future in as_completed(future_to_experiment):
-                experiment = future_to_experiment[future]
-                completed += 1
+            for future in as_completed(future_to_chunk):
+                chunk = future_to_chunk[future]
                 
                 try:
-                    result = future.result()
+                    results = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Error in experiments {chunk[0]['experiment_id']}-{chunk[-1]['experiment_id']}: {e}")
+                    results = [None] * len(chunk)
+                
+                for result in results:
+                    completed += 1
                     if result:
                         successful_strategies.append(result)
                         logger.info(f"✅ Alpha Success: {result['variation_type']} - Trades: {result['total_trades']}, Win Rate: {result['win_rate']:.1f}%, PF: {result['profit_factor']:.2f}, Sharpe: {result['sharpe_ratio']:.2f}")
                     
                     if completed % 100 == 0:
                         logger.info(f"📈 Progress: {completed}/{len(experiments)} experiments completed")
-                        
-                except Exception as e:
-                    logger.error(f"❌ Error in experiment {experiment['experiment_id']}: {e}")
         
         end_time = datetime.now()
         execution_time = end_time - start_time
@@ -224,16 +229,30 @@ class StrategyAlphaOptimizer:
         
         return results
     
-    def _run_alpha_experiment(self, experiment: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Run a single Strategy Alpha experiment"""
+    def sweep_dataset(self, dataset: tuple, experiments: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Run every experiment of one dataset chunk on one load of the data and base indicators"""
+        base = worker_cached(dataset, lambda: self._load_base_indicators(*dataset))
+        return [self._run_alpha_experiment(experiment, base) for experiment in experiments]
+    
+    def _load_base_indicators(self, pair: str, timeframe: str) -> Optional[tuple]:
+        """(data, rsi, atr) for a dataset; RSI/ATR periods are the same for every experiment"""
+        data = self._load_data(pair, timeframe)
+        if data is None or len(data) < 100:
+            return None
+        return data, self._calculate_rsi(data['close'], 14), self._calculate_atr(data, 14)
+    
+    def _run_alpha_experiment(self, experiment: Dict[str, Any], base: Optional[tuple] = None) -> Optional[Dict[str, Any]]:
+        """Run a single Strategy Alpha experiment (base: preloaded (data, rsi, atr))"""
         try:
             # Load data
-            data = self._load_data(experiment['params']['pair'], experiment['params']['timeframe'])
-            if data is None or len(data) < 100:
+            if base is None:
+                base = self._load_base_indicators(experiment['params']['pair'], experiment['params']['timeframe'])
+            if base is None:
                 return None
+            data, rsi, atr = base
             
             # Run strategy
-            results = self._run_alpha_strategy(data, experiment['params'])
+            results = self._run_alpha_strategy(data, experiment['params'], rsi, atr)
             if results is None:
                 return None
             
@@ -282,14 +301,17 @@ class StrategyAlphaOptimizer:
             logger.error(f"Error loading data for {pair} {timeframe}: {e}")
             return None
     
-    def _run_alpha_strategy(self, data: pd.DataFrame, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Run Strategy Alpha with given parameters"""
+    def _run_alpha_strategy(self, data: pd.DataFrame, params: Dict[str, Any],
+                            rsi: Optional[pd.Series] = None, atr: Optional[pd.Series] = None) -> Optional[Dict[str, Any]]:
+        """Run Strategy Alpha with given parameters (rsi/atr: precomputed 14-period series)"""
         try:
             # Calculate indicators
-            ema_fast = data['close'].ewm(span=params['ema_fast']).mean()
-            ema_slow = data['close'].ewm(span=params['ema_slow']).mean()
-            rsi = self._calculate_rsi(data['close'], 14)
-            atr = self._calculate_atr(data, 14)
+            ema_fast = pd.Series(indicators.ema(data['close'], params['ema_fast']), index=data.index)
+            ema_slow = pd.Series(indicators.ema(data['close'], params['ema_slow']), index=data.index)
+            if rsi is None:
+                rsi = self._calculate_rsi(data['close'], 14)
+            if atr is None:
+                atr = self._calculate_atr(data, 14)
             
             # Generate signals with enhancements
             bullish_conditions, bearish_conditions = self._generate_enhanced_signals(
@@ -336,7 +358,7 @@ class StrategyAlphaOptimizer:
         
         # Trend confirmation
         if params.get('trend_confirmation', False):
-            trend_ema = data['close'].ewm(span=params.get('trend_ema', 21)).mean()
+            trend_ema = pd.Series(indicators.ema(data['close'], params.get('trend_ema', 21)), index=data.index)
             bullish_conditions &= (data['close'] > trend_ema)
             bearish_conditions &= (data['close'] < trend_ema)
         
@@ -448,23 +470,11 @@ class StrategyAlphaOptimizer:
     
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Calculate RSI indicator"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return pd.Series(indicators.rsi(prices, period), index=prices.index)
     
     def _calculate_atr(self, data: pd.DataFrame, period: int = 14) -> pd.Series:
         """Calculate ATR indicator"""
-        high_low = data['high'] - data['low']
-        high_close = np.abs(data['high'] - data['close'].shift())
-        low_close = np.abs(data['low'] - data['close'].shift())
-        
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = np.max(ranges, axis=1)
-        atr = true_range.rolling(period).mean()
-        return atr
+        return pd.Series(indicators.atr(data['high'], data['low'], data['close'], period), index=data.index)
     
     def _calculate_performance_metrics(self, trades: List[Dict[str, Any]], data: pd.DataFrame) -> Dict[str, Any]:
         """Calculate performance metrics"""
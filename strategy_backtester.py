@@ -27,6 +27,8 @@ from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import threading
 import mmap
 
+from exit_resolver import resolve_exits, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_END_OF_DATA
+
 # Attempt to import GPU libraries
 try:
     import cudf
@@ -383,9 +385,9 @@ class UltraHighPerformanceBacktester:
         """Simulate trades based on signals with high-performance implementation"""
         logger.info("Simulating trades with optimized algorithm")
         
-        # Use numpy vectorized operations where possible for speed
-        long_entries = df['long_signal'].values.nonzero()[0]
-        short_entries = df['short_signal'].values.nonzero()[0]
+        # Boolean signal masks - a long signal wins if both fire on the same bar
+        long_mask = df['long_signal'].to_numpy(dtype=bool)
+        short_mask = df['short_signal'].to_numpy(dtype=bool) & ~long_mask
         
         # Extract trade parameters
         risk_per_trade_pct = test_params.get('risk_per_trade', 0.5) / 100.0  # Convert to decimal
@@ -396,132 +398,55 @@ class UltraHighPerformanceBacktester:
         # Additional parameters
         slippage_pips = test_params.get('slippage_pips', 0.5)
         
-        trades = []
-        open_trades = []
-        
         # Get price data
-        close_prices = df['close'].values
+        close_prices = df['close'].to_numpy(dtype=np.float64)
         timestamps = df['datetime'].values if 'datetime' in df.columns else np.arange(len(df))
         
-        # Process in chronological order for accurate trade simulation
-        for i in range(len(df)):
-            current_price = close_prices[i]
-            timestamp = timestamps[i]
-            
-            # Check for entry signals
-            if i in long_entries:
-                # Calculate stop loss and take profit levels
-                stop_loss = current_price * (1 - stop_loss_pct)
-                take_profit = current_price + (current_price - stop_loss) * take_profit_rr
-                
-                # Create trade
-                trade = {
-                    'entry_time': timestamp,
-                    'entry_price': current_price,
-                    'direction': 'long',
-                    'stop_loss': stop_loss,
-                    'take_profit': take_profit,
-                    'exit_time': None,
-                    'exit_price': None,
-                    'pnl': None,
-                    'pnl_pct': None,
-                    'status': 'open'
-                }
-                open_trades.append(trade)
-                
-            elif i in short_entries:
-                # Calculate stop loss and take profit levels
-                stop_loss = current_price * (1 + stop_loss_pct)
-                take_profit = current_price - (stop_loss - current_price) * take_profit_rr
-                
-                # Create trade
-                trade = {
-                    'entry_time': timestamp,
-                    'entry_price': current_price,
-                    'direction': 'short',
-                    'stop_loss': stop_loss,
-                    'take_profit': take_profit,
-                    'exit_time': None,
-                    'exit_price': None,
-                    'pnl': None,
-                    'pnl_pct': None,
-                    'status': 'open'
-                }
-                open_trades.append(trade)
-            
-            # Check for exits on open trades
-            remaining_open_trades = []
-            for trade in open_trades:
-                # Skip if already closed
-                if trade['status'] != 'open':
-                    continue
-                
-                # Check for stop loss or take profit hit
-                if trade['direction'] == 'long':
-                    # Check stop loss
-                    if current_price <= trade['stop_loss']:
-                        trade['exit_time'] = timestamp
-                        trade['exit_price'] = trade['stop_loss']
-                        trade['pnl'] = trade['exit_price'] - trade['entry_price']
-                        trade['pnl_pct'] = trade['pnl'] / trade['entry_price']
-                        trade['status'] = 'closed'
-                        trade['exit_reason'] = 'stop_loss'
-                        trades.append(trade)
-                    # Check take profit
-                    elif current_price >= trade['take_profit']:
-                        trade['exit_time'] = timestamp
-                        trade['exit_price'] = trade['take_profit']
-                        trade['pnl'] = trade['exit_price'] - trade['entry_price']
-                        trade['pnl_pct'] = trade['pnl'] / trade['entry_price']
-                        trade['status'] = 'closed'
-                        trade['exit_reason'] = 'take_profit'
-                        trades.append(trade)
-                    else:
-                        remaining_open_trades.append(trade)
-                else:  # Short
-                    # Check stop loss
-                    if current_price >= trade['stop_loss']:
-                        trade['exit_time'] = timestamp
-                        trade['exit_price'] = trade['stop_loss']
-                        trade['pnl'] = trade['entry_price'] - trade['exit_price']
-                        trade['pnl_pct'] = trade['pnl'] / trade['entry_price']
-                        trade['status'] = 'closed'
-                        trade['exit_reason'] = 'stop_loss'
-                        trades.append(trade)
-                    # Check take profit
-                    elif current_price <= trade['take_profit']:
-                        trade['exit_time'] = timestamp
-                        trade['exit_price'] = trade['take_profit']
-                        trade['pnl'] = trade['entry_price'] - trade['exit_price']
-                        trade['pnl_pct'] = trade['pnl'] / trade['entry_price']
-                        trade['status'] = 'closed'
-                        trade['exit_reason'] = 'take_profit'
-                        trades.append(trade)
-                    else:
-                        remaining_open_trades.append(trade)
-            
-            # Update open trades
-            open_trades = remaining_open_trades
-        
-        # Close any remaining open trades at the last price
-        last_price = close_prices[-1]
-        last_timestamp = timestamps[-1]
-        
-        for trade in open_trades:
-            if trade['direction'] == 'long':
-                trade['exit_time'] = last_timestamp
-                trade['exit_price'] = last_price
-                trade['pnl'] = trade['exit_price'] - trade['entry_price']
-                trade['pnl_pct'] = trade['pnl'] / trade['entry_price']
-            else:
-                trade['exit_time'] = last_timestamp
-                trade['exit_price'] = last_price
-                trade['pnl'] = trade['entry_price'] - trade['exit_price']
-                trade['pnl_pct'] = trade['pnl'] / trade['entry_price']
-                
-            trade['status'] = 'closed'
-            trade['exit_reason'] = 'end_of_data'
-            trades.append(trade)
+        if len(close_prices) == 0:
+            logger.info("Simulated 0 trades")
+            return []
+        
+        # Array-backed position book: one row per entry, in entry order
+        entry_idx = np.flatnonzero(long_mask | short_mask)
+        direction = np.where(long_mask[entry_idx], 1, -1).astype(np.int8)
+        entry_price = close_prices[entry_idx]
+        stop_loss = entry_price * (1 - direction * stop_loss_pct)
+        take_profit = entry_price + (entry_price - stop_loss) * take_profit_rr
+        
+        # Every position is independent, so all exits resolve in one vectorized pass.
+        # Stops/targets trigger on the close and are checked from the entry bar on.
+        exits = resolve_exits(entry_idx, direction, stop_loss, take_profit,
+                              close_prices, close_prices, close_prices, first_offset=0)
+        
+        pnl = (exits.exit_price - entry_price) * direction
+        pnl_pct = pnl / entry_price
+        
+        # Report trades in the order they close; positions still open at the end last
+        end_of_data = exits.reason == EXIT_END_OF_DATA
+        order = np.lexsort((entry_idx, exits.exit_idx, end_of_data))
+        
+        exit_reason_names = {
+            EXIT_STOP_LOSS: 'stop_loss',
+            EXIT_TAKE_PROFIT: 'take_profit',
+            EXIT_END_OF_DATA: 'end_of_data',
+        }
+        
+        trades = [
+            {
+                'entry_time': timestamps[entry_idx[k]],
+                'entry_price': entry_price[k],
+                'direction': 'long' if direction[k] > 0 else 'short',
+                'stop_loss': stop_loss[k],
+                'take_profit': take_profit[k],
+                'exit_time': timestamps[exits.exit_idx[k]],
+                'exit_price': exits.exit_price[k],
+                'pnl': pnl[k],
+                'pnl_pct': pnl_pct[k],
+                'status': 'closed',
+                'exit_reason': exit_reason_names[exits.reason[k]]
+            }
+            for k in order
+        ]
         
         logger.info(f"Simulated {len(trades)} trades")
         return trades
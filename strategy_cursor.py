@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+STRATEGY CURSOR
+Precompute indicators once, read one signal per bar
+
+Backtest harnesses used to call
+
+    strategy.generate_signal(data.iloc[:i+1].copy(), symbol)
+
+on every bar, copying a growing prefix and recomputing every indicator each
+time - O(n^2) over a dataset. A cursor splits that into
+
+    cursor = strategy_cursor(strategy, symbol)
+    cursor.precompute(data)        # indicators for the whole dataset, once
+    signal = cursor.signal_at(i)   # signal for bar i, no copy, no recompute
+
+Every indicator in the supported strategies is causal (rolling / ewm / diff /
+shift / cumulative), so its value at bar i is the same whether computed on
+data.iloc[:i+1] or on the full dataset - signals are unchanged.
+
+Supported:
+- OptimizedStrategyV2, ComprehensiveEnhancedStrategy, UltraStrictV3Strategy,
+  NewsEnhancedStrategy (calculate_technical_indicators +
+  generate_signal_from_indicators)
+- EnhancedOptimizedStrategy (calculate_indicator_frame +
+  generate_signal_from_indicators)
+
+strategy_cursor() returns None for any other strategy; callers keep their
+prefix-slicing path for those.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+import pandas as pd
+
+
+class StrategyCursor(ABC):
+    """precompute(df) once, then signal_at(i) for any bar of df"""
+
+    def __init__(self, strategy, symbol: str):
+        self.strategy = strategy
+        self.symbol = symbol
+
+    @abstractmethod
+    def precompute(self, df: pd.DataFrame):
+        """Compute every indicator the signals need for the whole of df"""
+
+    @abstractmethod
+    def signal_at(self, i: int) -> Any:
+        """Same result as the strategy's own entry point on df.iloc[:i+1]"""
+
+
+class IndicatorFrameCursor(StrategyCursor):
+    """Strategies that add indicator columns to the frame and read its last row"""
+
+    def __init__(self, strategy, symbol: str):
+        super().__init__(strategy, symbol)
+        self.data: Optional[pd.DataFrame] = None
+
+    def precompute(self, df: pd.DataFrame):
+        self.data = self.strategy.calculate_technical_indicators(df.copy())
+
+    def signal_at(self, i: int) -> Any:
+        # Row slice of an existing frame: a view, not a copy of the prefix
+        return self.strategy.generate_signal_from_indicators(self.data.iloc[:i + 1], self.symbol)
+
+
+class EnhancedOptimizedCursor(StrategyCursor):
+    """EnhancedOptimizedStrategy: one indicator row per bar"""
+
+    # generate_enhanced_signals needs at least this many candles
+    MIN_BARS = 50
+
+    def __init__(self, strategy, symbol: str):
+        super().__init__(strategy, symbol)
+        self.indicators: Optional[pd.DataFrame] = None
+
+    def precompute(self, df: pd.DataFrame):
+        self.indicators = self.strategy.calculate_indicator_frame(df)
+
+    def signal_at(self, i: int) -> Any:
+        if i + 1 < self.MIN_BARS:
+            return None
+        return self.strategy.generate_signal_from_indicators(self.symbol, self.indicators.iloc[i])
+
+
+def strategy_cursor(strategy, symbol: str) -> Optional[StrategyCursor]:
+    """Cursor for strategy, or None if it only supports whole-prefix evaluation"""
+    if not hasattr(strategy, 'generate_signal_from_indicators'):
+        return None
+    if hasattr(strategy, 'calculate_indicator_frame'):
+        return EnhancedOptimizedCursor(strategy, symbol)
+    if hasattr(strategy, 'calculate_technical_indicators'):
+        return IndicatorFrameCursor(strategy, symbol)
+    return None
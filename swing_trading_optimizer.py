@@ -5,8 +5,6 @@ Test 4-hour, Daily, and Weekly timeframes
 For traders who want fewer trades with larger moves
 """
 
-import pandas as pd
-import numpy as np
 from pathlib import Path
 from datetime import datetime
 import json
@@ -14,6 +12,9 @@ from concurrent.futures import ProcessPoolExecutor, as_completed
 import multiprocessing as mp
 
 from GOLDEN_RULE_NO_SYNTHETIC_DATA import RealDataEnforcer
+from batch_backtest import batch_backtest
+from shared_dataset_registry import SharedDatasetRegistry, attach_shared_datasets, load_shared_dataset
+from scenario_scheduler import submit_dataset_chunks
 
 enforcer = RealDataEnforcer()
 
@@ -97,135 +98,53 @@ class SwingTradingOptimizer:
     
     def test_scenario(self, scenario):
         """Test swing trading scenario with detailed stats"""
-        
+        return self.sweep_dataset((scenario['pair'], scenario['timeframe']), [scenario])[0]
+    
+    def sweep_dataset(self, dataset, scenarios):
+        """
+        Affinity task: every scenario of one dataset chunk in a single
+        batch_backtest (each EMA span, the RSI and the ATR computed once)
+        """
         try:
-            df = enforcer.load_real_data(scenario['pair'], scenario['timeframe'])
-            
-            # Calculate indicators
-            df['ema_fast'] = df['close'].ewm(span=scenario['ema_fast']).mean()
-            df['ema_slow'] = df['close'].ewm(span=scenario['ema_slow']).mean()
-            
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['rsi'] = 100 - (100 / (1 + rs))
-            
-            high_low = df['high'] - df['low']
-            high_close = np.abs(df['high'] - df['close'].shift())
-            low_close = np.abs(df['low'] - df['close'].shift())
-            ranges = pd.concat([high_low, high_close, low_close], axis=1)
-            true_range = ranges.max(axis=1)
-            df['atr'] = true_range.rolling(window=14).mean()
-            
-            # Generate signals
-            df['signal'] = 0
-            buy = (df['ema_fast'] > df['ema_slow']) & (df['ema_fast'].shift(1) <= df['ema_slow'].shift(1)) & (df['rsi'] < scenario['rsi_overbought'])
-            sell = (df['ema_fast'] < df['ema_slow']) & (df['ema_fast'].shift(1) >= df['ema_slow'].shift(1)) & (df['rsi'] > scenario['rsi_oversold'])
-            df.loc[buy, 'signal'] = 1
-            df.loc[sell, 'signal'] = -1
-            
-            # Execute trades
-            trades = []
-            position = 0
-            
-            for timestamp, row in df.iterrows():
-                if pd.isna(row['atr']) or row['atr'] == 0:
-                    continue
-                
-                if row['signal'] == 1 and position == 0:
-                    position = 1
-                    entry_price = row['close']
-                    entry_time = timestamp
-                    sl = entry_price - (row['atr'] * scenario['sl_atr_mult'])
-                    tp = entry_price + (row['atr'] * scenario['sl_atr_mult'] * scenario['rr_ratio'])
-                    
-                elif row['signal'] == -1 and position == 0:
-                    position = -1
-                    entry_price = row['close']
-                    entry_time = timestamp
-                    sl = entry_price + (row['atr'] * scenario['sl_atr_mult'])
-                    tp = entry_price - (row['atr'] * scenario['sl_atr_mult'] * scenario['rr_ratio'])
-                
-                elif position != 0:
-                    exit_price = None
-                    
-                    if position == 1:
-                        if row['low'] <= sl:
-                            exit_price = sl
-                        elif row['high'] >= tp:
-                            exit_price = tp
-                        elif row['signal'] == -1:
-                            exit_price = row['close']
-                    elif position == -1:
-                        if row['high'] >= sl:
-                            exit_price = sl
-                        elif row['low'] <= tp:
-                            exit_price = tp
-                        elif row['signal'] == 1:
-                            exit_price = row['close']
-                    
-                    if exit_price:
-                        pnl_pct = ((exit_price - entry_price) / entry_price * 100) * position
-                        duration_hours = (timestamp - entry_time).total_seconds() / 3600
-                        
-                        trades.append({
-                            'pnl_pct': pnl_pct,
-                            'duration_hours': duration_hours
-                        })
-                        position = 0
-            
-            if not trades or len(trades) < 20:  # Need at least 20 trades for swing
-                return None
-            
-            trades_df = pd.DataFrame(trades)
-            wins = trades_df[trades_df['pnl_pct'] > 0]
-            losses = trades_df[trades_df['pnl_pct'] < 0]
-            
-            win_rate = (len(wins) / len(trades_df)) * 100
-            avg_win = wins['pnl_pct'].mean() if len(wins) > 0 else 0
-            avg_loss = losses['pnl_pct'].mean() if len(losses) > 0 else 0
-            
-            cumulative = trades_df['pnl_pct'].cumsum()
-            running_max = cumulative.cummax()
-            drawdown = (cumulative - running_max)
-            max_dd = abs(drawdown.min())
-            
-            sharpe = (trades_df['pnl_pct'].mean() / trades_df['pnl_pct'].std()) * np.sqrt(len(trades_df)) if len(trades_df) > 1 and trades_df['pnl_pct'].std() > 0 else 0
-            
-            total_profit = wins['pnl_pct'].sum() if len(wins) > 0 else 0
-            total_loss = abs(losses['pnl_pct'].sum()) if len(losses) > 0 else 0
-            profit_factor = (total_profit / total_loss) if total_loss > 0 else 0
-            
-            days = (df.index[-1] - df.index[0]).days
-            annual_return = (trades_df['pnl_pct'].sum() / (days/365.25))
-            
-            avg_duration = trades_df['duration_hours'].mean()
-            
-            # Swing trading criteria (more relaxed)
-            if (win_rate >= 50.0 and  # Lower win rate OK for swing
-                max_dd <= 15.0 and      # Higher DD acceptable
-                sharpe >= 1.0 and       # Lower Sharpe OK
-                len(trades_df) >= 20):  # Min trades for significance
-                
-                return {
-                    'scenario': scenario,
-                    'trades': len(trades_df),
-                    'win_rate': win_rate,
-                    'sharpe': sharpe,
-                    'annual_return': annual_return,
-                    'max_dd': max_dd,
-                    'profit_factor': profit_factor,
-                    'avg_win': avg_win,
-                    'avg_loss': avg_loss,
-                    'avg_duration_hours': avg_duration,
-                    'trades_per_year': len(trades_df) / (days/365.25)
-                }
-            
-            return None
-            
+            df = load_shared_dataset(*dataset)
+            metrics, trades = batch_backtest(df, scenarios, return_trades=True)
         except Exception as e:
+            print(f"\n[WARNING] {dataset[0]} {dataset[1]}: {len(scenarios)} scenarios skipped ({e})")
+            return [None] * len(scenarios)
+        
+        durations = (trades['exit_time'] - trades['entry_time']).dt.total_seconds() / 3600
+        avg_durations = durations.groupby(trades['set']).mean()
+        days = (df.index[-1] - df.index[0]).days
+        
+        return [self._swing_result(scenario, stats, avg_durations.get(k), days)
+                for k, (scenario, stats) in enumerate(zip(scenarios, metrics.to_dict('records')))]
+    
+    def _swing_result(self, scenario, stats, avg_duration, days):
+        """Result of one scenario's batch_backtest row; None unless it meets the swing criteria"""
+        if stats['trades'] < 20:  # Need at least 20 trades for swing
             return None
+        
+        # Swing trading criteria (more relaxed)
+        if (stats['win_rate'] >= 50.0 and  # Lower win rate OK for swing
+            stats['max_dd'] <= 15.0 and      # Higher DD acceptable
+            stats['sharpe'] >= 1.0 and       # Lower Sharpe OK
+            stats['trades'] >= 20):  # Min trades for significance
+            
+            return {
+                'scenario': scenario,
+                'trades': int(stats['trades']),
+                'win_rate': stats['win_rate'],
+                'sharpe': stats['sharpe'],
+                'annual_return': stats['annual_return'],
+                'max_dd': stats['max_dd'],
+                'profit_factor': stats['profit_factor'],
+                'avg_win': stats['avg_win'],
+                'avg_loss': stats['avg_loss'],
+                'avg_duration_hours': avg_duration,
+                'trades_per_year': stats['trades'] / (days/365.25)
+            }
+        
+        return None
     
     def run_optimization(self):
         """Run swing optimization"""
@@ -238,32 +157,44 @@ class SwingTradingOptimizer:
         successful = []
         tested = 0
         
-        with ProcessPoolExecutor(max_workers=min(20, mp.cpu_count())) as executor:
-            futures = {executor.submit(self.test_scenario, s): s for s in scenarios}
-            
-            for future in as_completed(futures):
-                tested += 1
+        with SharedDatasetRegistry() as registry:
+            registry.publish_all((s['pair'], s['timeframe']) for s in scenarios)
+            print()
+            
+            workers = min(20, mp.cpu_count())
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=attach_shared_datasets,
+                                     initargs=(registry.handles(),)) as executor:
+                # One task per dataset chunk: one batch backtest per chunk
+                futures = submit_dataset_chunks(executor, self.sweep_dataset, scenarios, workers)
+            
+                for future in as_completed(futures):
+                    try:
+                        results = future.result()
+                    except:
+                        results = [None] * len(futures[future])
                 
-                try:
-                    result = future.result()
+                    for result in results:
+                        tested += 1
                     
-                    if result:
-                        successful.append(result)
+                        try:
+                            if result:
+                                successful.append(result)
                         
-                        print(f"\n>>> SWING STRATEGY #{len(successful)} <<<")
-                        print(f"  {result['scenario']['pair'].upper()} {result['scenario']['timeframe']} - "
-                              f"EMA {result['scenario']['ema_fast']}/{result['scenario']['ema_slow']}")
-                        print(f"  Win: {result['win_rate']:.1f}% | Return: {result['annual_return']:.1f}% | "
-                              f"Sharpe: {result['sharpe']:.2f}")
-                        print(f"  Avg Win: {result['avg_win']:.2f}% | Avg Loss: {result['avg_loss']:.2f}%")
-                        print(f"  Trades/Year: {result['trades_per_year']:.0f} | Avg Hold: {result['avg_duration_hours']:.0f} hours")
+                                print(f"\n>>> SWING STRATEGY #{len(successful)} <<<")
+                                print(f"  {result['scenario']['pair'].upper()} {result['scenario']['timeframe']} - "
+                                      f"EMA {result['scenario']['ema_fast']}/{result['scenario']['ema_slow']}")
+                                print(f"  Win: {result['win_rate']:.1f}% | Return: {result['annual_return']:.1f}% | "
+                                      f"Sharpe: {result['sharpe']:.2f}")
+                                print(f"  Avg Win: {result['avg_win']:.2f}% | Avg Loss: {result['avg_loss']:.2f}%")
+                                print(f"  Trades/Year: {result['trades_per_year']:.0f} | Avg Hold: {result['avg_duration_hours']:.0f} hours")
                     
-                    if tested % 500 == 0:
-                        pct = (tested / len(scenarios)) * 100
-                        print(f"\n[PROGRESS] {tested:,}/{len(scenarios):,} ({pct:.1f}%) - Found {len(successful)} swing strategies")
+                            if tested % 500 == 0:
+                                pct = (tested / len(scenarios)) * 100
+                                print(f"\n[PROGRESS] {tested:,}/{len(scenarios):,} ({pct:.1f}%) - Found {len(successful)} swing strategies")
                 
-                except:
-                    pass
+                        except:
+                            pass
         
         # Save results
         self.save_results(successful, len(scenarios))
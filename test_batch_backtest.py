@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+BATCH BACKTEST TEST SCRIPT
+Checks batch_backtest against a single-scenario iterrows loop (the trade
+loop of the scenario optimizers) and pins down its trade rules
+"""
+
+import os
+import sys
+import logging
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import batch_backtest as bb
+import indicators
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TRADE_COLUMNS = ['set', 'entry_idx', 'exit_idx', 'entry_time', 'exit_time', 'direction',
+                 'entry_price', 'exit_price', 'pnl_pct', 'exit_reason']
+
+BASE_PARAMS = {'ema_fast': 5, 'ema_slow': 20, 'rsi_oversold': 30, 'rsi_overbought': 70,
+               'sl_atr_mult': 2.0, 'rr_ratio': 2.0}
+
+
+def make_frame(close, spread=0.5, start='2024-01-01'):
+    """OHLC frame on an hourly DatetimeIndex: open = previous close, high/low = close -/+ spread"""
+    close = np.asarray(close, dtype=np.float64)
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+    }, index=pd.date_range(start, periods=len(close), freq='h'))
+
+
+def random_walk_frame(n=2000, seed=7):
+    """Random walk with flat stretches, so some bars have a NaN or zero ATR"""
+    rng = np.random.default_rng(seed)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    close[600:640] = close[599]
+    df = make_frame(close, spread=0.0)
+    df['high'] += np.abs(rng.normal(0, 0.001, n))
+    df['low'] -= np.abs(rng.normal(0, 0.001, n))
+    df.iloc[600:640, :4] = close[599]
+    return df
+
+
+def reference_trades(df, params, buy, sell):
+    """One parameter set with the optimizers' iterrows loop; buy/sell are the entry masks"""
+    params = {**bb.PARAM_DEFAULTS, **params}
+    df = df.copy()
+    df['atr'] = indicators.atr(df['high'], df['low'], df['close'], params['atr_period'])
+    df['signal'] = 0
+    df.loc[buy, 'signal'] = 1
+    df.loc[sell, 'signal'] = -1
+
+    trades = []
+    position = 0
+    for idx, (timestamp, row) in enumerate(df.iterrows()):
+        if pd.isna(row['atr']) or row['atr'] == 0:
+            continue
+
+        if row['signal'] != 0 and position == 0:
+            position = int(row['signal'])
+            entry_idx = idx
+            entry_price = row['close']
+            risk = row['atr'] * params['sl_atr_mult']
+            sl = entry_price - position * risk
+            tp = entry_price + position * risk * params['rr_ratio']
+
+        elif position != 0:
+            exit_price = None
+            if (position == 1 and row['low'] <= sl) or (position == -1 and row['high'] >= sl):
+                exit_price, exit_reason = sl, 'SL'
+            elif (position == 1 and row['high'] >= tp) or (position == -1 and row['low'] <= tp):
+                exit_price, exit_reason = tp, 'TP'
+            elif row['signal'] == -position:
+                exit_price, exit_reason = row['close'], 'Signal'
+
+            if exit_price is not None:
+                trades.append({
+                    'entry_idx': entry_idx,
+                    'exit_idx': idx,
+                    'direction': position,
+                    'pnl_pct': ((exit_price - entry_price) / entry_price * 100) * position,
+                    'exit_reason': exit_reason,
+                })
+                position = 0
+
+    return pd.DataFrame(trades, columns=['entry_idx', 'exit_idx', 'direction', 'pnl_pct', 'exit_reason'])
+
+
+def assert_matches_reference(df, param_sets, trades, buy, sell):
+    """Every set's trades equal the reference loop's on the same entry masks"""
+    for number, params in enumerate(param_sets):
+        expected = reference_trades(df, params, buy[number], sell[number])
+        actual = trades[trades['set'] == number].reset_index(drop=True)
+        for column in ('entry_idx', 'exit_idx', 'direction', 'exit_reason'):
+            assert actual[column].tolist() == expected[column].tolist(), (number, column)
+        assert np.allclose(actual['pnl_pct'], expected['pnl_pct'].astype(np.float64)), number
+
+
+@contextmanager
+def forced_signals(n_bars, buy_bars=(), sell_bars=()):
+    """batch_backtest on fixed entry bars (for every configuration) instead of EMA crossovers"""
+    buy = np.zeros(n_bars, dtype=bool)
+    sell = np.zeros(n_bars, dtype=bool)
+    buy[list(buy_bars)] = True
+    sell[list(sell_bars)] = True
+    original = bb.signal_matrix
+    bb.signal_matrix = lambda df, configs: (np.tile(buy, (len(configs), 1)), np.tile(sell, (len(configs), 1)))
+    try:
+        yield buy, sell
+    finally:
+        bb.signal_matrix = original
+
+
+def forced_backtest(df, buy_bars=(), sell_bars=(), **params):
+    with forced_signals(len(df), buy_bars, sell_bars) as (buy, sell):
+        metrics, trades = bb.batch_backtest(df, [{**BASE_PARAMS, **params}], return_trades=True)
+    assert_matches_reference(df, [{**BASE_PARAMS, **params}], trades, [buy], [sell])
+    return metrics, trades
+
+
+def test_matches_iterrows_reference():
+    """A grid of EMA-crossover sets gives the reference loop's trades, one set at a time"""
+    df = random_walk_frame()
+    rng = np.random.default_rng(3)
+    param_sets = []
+    for _ in range(16):
+        ema_fast, ema_slow = [(5, 20), (8, 21), (12, 26)][rng.integers(3)]
+        rsi_oversold, rsi_overbought = [(30, 70), (20, 80)][rng.integers(2)]
+        param_sets.append({
+            'ema_fast': ema_fast, 'ema_slow': ema_slow,
+            'rsi_oversold': rsi_oversold, 'rsi_overbought': rsi_overbought,
+            'sl_atr_mult': float(rng.choice([1.0, 1.5, 2.5])),
+            'rr_ratio': float(rng.choice([1.0, 2.0, 3.0])),
+            'entry_type': bb.ENTRY_TYPES[rng.integers(len(bb.ENTRY_TYPES))],
+            'atr_period': int(rng.choice([10, 14])),
+        })
+
+    metrics, trades = bb.batch_backtest(df, param_sets, return_trades=True)
+    configs = [tuple({**bb.PARAM_DEFAULTS, **p}[k] for k in bb.SIGNAL_KEYS) for p in param_sets]
+    buy, sell = bb.signal_matrix(df, configs)
+    assert_matches_reference(df, param_sets, trades, buy, sell)
+    assert metrics['trades'].sum() == len(trades) > 0
+    logger.info(f"✅ {len(trades)} trades of {len(param_sets)} sets match the iterrows loop")
+
+
+def test_sell_wins_double_signal():
+    """A bar with both a buy and a sell signal opens a short"""
+    df = make_frame(np.full(60, 100.0))
+    _, trades = forced_backtest(df, buy_bars=[20], sell_bars=[20, 30])
+    # The sell at 30 does not close the short (same side); nothing else does, so it stays open
+    assert trades.empty
+    _, trades = forced_backtest(df, buy_bars=[20, 30], sell_bars=[20])
+    assert trades['direction'].tolist() == [-1]
+    assert trades['exit_reason'].tolist() == ['Signal']
+    assert (trades['entry_idx'].tolist(), trades['exit_idx'].tolist()) == ([20], [30])
+
+
+def test_skips_nan_and_zero_atr():
+    """Bars with a NaN or zero ATR neither open nor close trades"""
+    close = np.full(140, 100.0)
+    df = make_frame(close)
+    # Flat at the start (NaN then zero ATR) and in the middle (zero ATR from bar 83 to 99)
+    flat = np.r_[0:30, 70:100]
+    df.iloc[flat, df.columns.get_indexer(['high', 'low'])] = 100.0
+    atr = indicators.atr(df['high'], df['low'], df['close'], 14)
+    assert np.isnan(atr[5]) and atr[20] == 0 and atr[90] == 0 and atr[40] > 0 and atr[120] > 0
+
+    _, trades = forced_backtest(df, buy_bars=[5, 20, 40], sell_bars=[90, 120])
+    assert trades['entry_idx'].tolist() == [40]
+    assert trades['exit_idx'].tolist() == [120]
+    assert trades['exit_reason'].tolist() == ['Signal']
+
+
+def test_exit_priority():
+    """SL before TP before an opposite signal on the same bar"""
+    df = make_frame(np.full(90, 100.0))
+    # Bar 25 reaches both levels, bar 45 only the target, bar 65 neither
+    df.iloc[25, df.columns.get_indexer(['high', 'low'])] = [110.0, 90.0]
+    df.iloc[45, df.columns.get_indexer(['high'])] = [110.0]
+    _, trades = forced_backtest(df, buy_bars=[20, 40, 60], sell_bars=[25, 45, 65])
+
+    assert trades['exit_idx'].tolist() == [25, 45, 65]
+    assert trades['exit_reason'].tolist() == ['SL', 'TP', 'Signal']
+    # Levels fill at the level, signals at the close (ATR = 1 at each entry)
+    assert np.allclose(trades['exit_price'], [98.0, 104.0, 100.0])
+
+
+def test_no_reentry_on_exit_bar():
+    """The bar that closes a trade does not open the next one, even with a signal"""
+    df = make_frame(np.full(90, 100.0))
+    df.iloc[35, df.columns.get_indexer(['low'])] = [90.0]
+    _, trades = forced_backtest(df, buy_bars=[20, 35, 50], sell_bars=[30, 60])
+
+    # 30 closes the long on its sell signal without opening a short; 35 opens the next long
+    assert trades['entry_idx'].tolist() == [20, 35]
+    assert trades['exit_idx'].tolist() == [30, 60]
+    assert trades['direction'].tolist() == [1, 1]
+
+    _, trades = forced_backtest(df, buy_bars=[20, 35, 50], sell_bars=[60])
+    # 35: SL exit while a buy signal is on the same bar; the next entry is 50
+    assert trades['entry_idx'].tolist() == [20, 50]
+    assert trades['exit_reason'].tolist() == ['SL', 'Signal']
+
+
+def test_open_trade_dropped():
+    """A trade still open at the end of the data is not reported"""
+    df = make_frame(np.full(60, 100.0))
+    metrics, trades = forced_backtest(df, buy_bars=[20, 40], sell_bars=[30])
+    assert trades['entry_idx'].tolist() == [20]
+    assert metrics.loc[0, 'trades'] == 1
+
+
+def test_return_trades():
+    """The trade log lines up with the metrics table and the frame's index"""
+    df = random_walk_frame(n=1000)
+    param_sets = [dict(BASE_PARAMS), {**BASE_PARAMS, 'ema_fast': 8, 'rr_ratio': 3.0},
+                  {**BASE_PARAMS, 'ema_slow': 400}]
+    table = bb.batch_backtest(df, param_sets)
+    metrics, trades = bb.batch_backtest(df, param_sets, return_trades=True)
+
+    assert isinstance(table, pd.DataFrame)
+    pd.testing.assert_frame_equal(table, metrics)
+    assert list(trades.columns) == TRADE_COLUMNS
+    assert len(metrics) == len(param_sets)
+    assert metrics[list(BASE_PARAMS)].to_dict('records') == [{k: p[k] for k in BASE_PARAMS} for p in param_sets]
+
+    counts = trades.groupby('set').size().reindex(range(len(param_sets)), fill_value=0)
+    assert metrics['trades'].tolist() == counts.tolist()
+    assert (trades['entry_time'] == df.index[trades['entry_idx']]).all()
+    assert (trades['exit_time'] == df.index[trades['exit_idx']]).all()
+    assert (trades['exit_idx'] > trades['entry_idx']).all()
+    assert np.allclose(metrics['total_return'], trades.groupby('set')['pnl_pct'].sum().reindex(
+        range(len(param_sets)), fill_value=0.0))
+
+
+def run_batch_backtest_tests():
+    """Run every check, log a summary"""
+    tests = [(name, func) for name, func in globals().items() if name.startswith('test_') and callable(func)]
+    failed = []
+    for name, func in tests:
+        try:
+            func()
+            logger.info(f"✅ {name} PASSED")
+        except Exception as e:
+            logger.error(f"❌ {name} FAILED: {e!r}")
+            failed.append(name)
+
+    logger.info(f"\nOverall: {len(tests) - len(failed)}/{len(tests)} tests passed")
+    return not failed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_batch_backtest_tests() else 1)
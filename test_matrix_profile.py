@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+MATRIX PROFILE TEST SCRIPT
+Checks the matrix profile against brute-force z-normalized distances on
+small series, and that tiling over workers does not change the result
+"""
+
+import os
+import sys
+import logging
+
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from matrix_profile import distance_profile, matrix_profile, top_discords, top_motifs
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def equity_curve(n, seed=0, level=10_000.0):
+    """Random-walk equity far from zero, as the Monte Carlo reports feed it"""
+    return np.cumsum(np.random.default_rng(seed).normal(0.05, 1.0, n)) + level
+
+
+def brute_distances(series, w):
+    """All-pairs z-normalized distances sqrt(2w(1 - r)); a flat window correlates 0"""
+    windows = np.lib.stride_tricks.sliding_window_view(np.asarray(series, dtype=np.float64), w)
+    centred = windows - windows.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centred, axis=1)
+    unit = np.divide(centred, norms[:, None], out=np.zeros_like(centred), where=norms[:, None] > 1e-9)
+    correlation = np.clip(unit @ unit.T, -1.0, 1.0)
+    return np.sqrt(2.0 * w * (1.0 - correlation))
+
+
+def brute_profile(series, w, exclusion=None):
+    """Nearest non-trivial match of every window, by brute force"""
+    distances = brute_distances(series, w)
+    positions = np.arange(len(distances))
+    distances[np.abs(positions[:, None] - positions[None, :]) < (w if exclusion is None else exclusion)] = np.inf
+    return distances.min(axis=1), distances
+
+
+def assert_matches_brute(series, w, exclusion=None):
+    profile, index = matrix_profile(series, w, exclusion)
+    expected, distances = brute_profile(series, w, exclusion)
+    np.testing.assert_allclose(profile, expected, atol=1e-6)
+    # The reported neighbour is at the reported distance (ties may pick either)
+    np.testing.assert_allclose(distances[np.arange(len(index)), index], profile, atol=1e-6)
+
+
+def test_matches_brute_force():
+    """Profile and neighbours equal brute force on a short equity curve"""
+    series = equity_curve(600)
+    for w, exclusion in ((20, None), (20, 5), (7, None), (50, 80)):
+        assert_matches_brute(series, w, exclusion)
+        logger.info(f"✅ w={w} exclusion={exclusion}: matches brute force")
+
+
+def test_flat_windows():
+    """Flat stretches (zero std) are at sqrt(2w) from everything, as in brute force"""
+    series = equity_curve(400, seed=1)
+    series[150:200] = series[150]
+    assert_matches_brute(series, 20)
+
+
+def test_identical_for_any_tiling():
+    """Splitting the diagonals over worker processes gives the same arrays"""
+    series = equity_curve(3_000, seed=2)
+    single = matrix_profile(series, 30, workers=1)
+    for workers in (2, 3):
+        tiled = matrix_profile(series, 30, workers=workers)
+        assert all(np.array_equal(a, b) for a, b in zip(single, tiled)), workers
+
+
+def test_distance_profile_matches_brute_force():
+    series = equity_curve(500, seed=3)
+    distances = brute_distances(series, 25)
+    for start in (0, 137, len(distances) - 1):
+        # FFT rounding: at r ~ 1 (the window itself) sqrt(2w(1 - r)) magnifies it to ~1e-6
+        np.testing.assert_allclose(distance_profile(series, start, 25), distances[start], atol=1e-5)
+
+
+def test_too_short_series():
+    """No pair of windows far enough apart: inf distances and -1 neighbours"""
+    profile, index = matrix_profile(equity_curve(30), 20)
+    assert np.isinf(profile).all() and (index == -1).all() and len(profile) == 11
+
+
+def test_motifs_and_discords():
+    """A planted repeat is the top motif, a planted spike the top discord"""
+    series = equity_curve(1_000, seed=4)
+    pattern = 40.0 * np.sin(np.linspace(0, 3 * np.pi, 30))
+    series[200:230] += pattern
+    series[700:730] += pattern
+    series[450] += 200.0
+
+    profile = matrix_profile(series, 30)
+    motif = top_motifs(series, 30, k=1, profile=profile)[0]
+    # Any window inside the pattern pairs with the same window of its copy
+    assert 200 - 30 < motif['start'] < 230 and motif['neighbor'] - motif['start'] == 500, motif
+    discord = top_discords(series, 30, k=1, profile=profile)[0]
+    assert 450 - 30 < discord['start'] <= 450, discord
+
+
+def run_matrix_profile_tests():
+    """Run every check, log a summary"""
+    tests = [(name, func) for name, func in globals().items() if name.startswith('test_') and callable(func)]
+    failed = []
+    for name, func in tests:
+        try:
+            func()
+            logger.info(f"✅ {name} PASSED")
+        except Exception as e:
+            logger.error(f"❌ {name} FAILED: {e!r}")
+            failed.append(name)
+
+    logger.info(f"\nOverall: {len(tests) - len(failed)}/{len(tests)} tests passed")
+    return not failed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_matrix_profile_tests() else 1)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+MONTE CARLO BOOTSTRAP TEST SCRIPT
+Checks the fixed, circular and stationary bootstrap index matrices: shape and
+range, block structure, and that chunking does not change the stream
+"""
+
+import os
+import sys
+import logging
+
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mc_bootstrap import BOOTSTRAPS, bootstrap_indices, optimal_block_length
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+RUNS = 200
+
+
+def test_indices_in_range():
+    """Every method gives a (runs x n) integer matrix of positions in [0, n)"""
+    rng = np.random.default_rng(0)
+    for method in BOOTSTRAPS:
+        for n in (1, 2, 7, 100):
+            for block in (0.5, 1, 3, 10, 250):
+                idx = bootstrap_indices(rng, RUNS, n, method, block)
+                assert idx.shape == (RUNS, n), (method, n, block)
+                assert np.issubdtype(idx.dtype, np.integer), (method, n, block)
+                assert idx.min() >= 0 and idx.max() < n, (method, n, block)
+        # Over many rows the last trade is drawn too (fixed starts reach n - block)
+        assert (bootstrap_indices(rng, RUNS, 100, method, 10) == 99).any(), method
+        assert bootstrap_indices(rng, RUNS, 0, method, 10).shape == (RUNS, 0)
+        logger.info(f"✅ {method} indices in range")
+
+
+def test_block_structure():
+    """Within a block positions advance by one; fixed blocks never wrap"""
+    rng = np.random.default_rng(1)
+    n, block = 103, 10
+    steps = {method: np.diff(bootstrap_indices(rng, RUNS, n, method, block), axis=1) for method in BOOTSTRAPS}
+
+    inside = np.ones(n - 1, dtype=bool)
+    inside[block - 1::block] = False    # steps that cross into the next block
+    assert (steps['fixed'][:, inside] == 1).all()
+    assert (np.remainder(steps['circular'][:, inside], n) == 1).all()
+
+    # Stationary: every step either continues (wrapping) or restarts; restarts average 1 / block
+    continues = np.remainder(steps['stationary'], n) == 1
+    restart_rate = 1.0 - continues.mean()
+    assert 0.5 / block < restart_rate < 1.5 / block, restart_rate
+
+
+def test_chunking_keeps_stream():
+    """One draw of all runs equals consecutive draws of its chunks from the same Generator"""
+    for method in BOOTSTRAPS:
+        whole = bootstrap_indices(np.random.default_rng(2), RUNS, 50, method, 7)
+        rng = np.random.default_rng(2)
+        chunks = np.vstack([bootstrap_indices(rng, count, 50, method, 7) for count in (1, 63, 136)])
+        assert np.array_equal(whole, chunks), method
+
+
+def test_unknown_method():
+    try:
+        bootstrap_indices(np.random.default_rng(3), RUNS, 10, 'moving')
+    except ValueError:
+        return
+    raise AssertionError("unknown bootstrap accepted")
+
+
+def test_optimal_block_length_bounds():
+    """Between 1 and min(3 sqrt(n), n / 3), and longer for autocorrelated returns"""
+    rng = np.random.default_rng(4)
+    n = 2_000
+    noise = rng.normal(0, 1, n)
+    persistent = np.empty(n)
+    persistent[0] = noise[0]
+    for i in range(1, n):
+        persistent[i] = 0.7 * persistent[i - 1] + noise[i]
+
+    upper = min(3 * np.sqrt(n), n / 3)
+    for method in ('stationary', 'circular'):
+        white = optimal_block_length(noise, method)
+        ar1 = optimal_block_length(persistent, method)
+        assert 1.0 <= white <= upper and 1.0 <= ar1 <= upper, (method, white, ar1)
+        assert ar1 > white, (method, white, ar1)
+    assert optimal_block_length(noise[:5]) == 1.0
+
+
+def run_mc_bootstrap_tests():
+    """Run every check, log a summary"""
+    tests = [(name, func) for name, func in globals().items() if name.startswith('test_') and callable(func)]
+    failed = []
+    for name, func in tests:
+        try:
+            func()
+            logger.info(f"✅ {name} PASSED")
+        except Exception as e:
+            logger.error(f"❌ {name} FAILED: {e!r}")
+            failed.append(name)
+
+    logger.info(f"\nOverall: {len(tests) - len(failed)}/{len(tests)} tests passed")
+    return not failed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_mc_bootstrap_tests() else 1)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+MONTE CARLO ENGINE TEST SCRIPT
+Checks that mc_engine reproduces the former per-run shuffle / block loops
+(same paths for the same seed, whatever the chunking) and their metrics
+"""
+
+import os
+import sys
+import logging
+
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mc_engine import path_metrics, simulate_metrics, simulate_paths
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+RETURNS = np.random.default_rng(0).normal(0.1, 1.0, 500)
+RUNS = 200
+SEED = 7
+
+
+def loop_shuffle(rets, runs, seed):
+    """The per-run shuffle loop the engine replaced"""
+    gen = np.random.default_rng(seed)
+    return np.vstack([np.cumsum(rets[gen.permutation(len(rets))]) for _ in range(runs)])
+
+
+def loop_block(rets, runs, seed, block=10):
+    """The per-run block loop the engine replaced"""
+    gen = np.random.default_rng(seed)
+    paths = []
+    for _ in range(runs):
+        out = []
+        for _ in range(int(np.ceil(len(rets) / block))):
+            start = int(gen.integers(0, max(1, len(rets) - block)))
+            out.extend(rets[start:start + block])
+        paths.append(np.cumsum(np.array(out[:len(rets)])))
+    return np.vstack(paths)
+
+
+def loop_metrics(equity):
+    """monte_carlo_patterns.compute_metrics: (sharpe, max_dd, ulcer) of one path"""
+    steps = np.diff(np.concatenate([[0.0], equity]))
+    dd = equity - np.maximum.accumulate(equity)
+    return (steps.mean() / (steps.std(ddof=1) + 1e-9) * np.sqrt(252), -dd.min(),
+            float(np.sqrt(np.mean(dd ** 2))))
+
+
+LOOPS = {'shuffle': loop_shuffle, 'block': loop_block}
+
+
+def test_paths_match_loops():
+    """Seeded paths equal the loops' bit for bit, for any chunk size"""
+    for method, loop in LOOPS.items():
+        reference = loop(RETURNS, RUNS, SEED)
+        for chunk_runs in (1, 64, None):
+            paths = simulate_paths(RETURNS, RUNS, method, seed=SEED, chunk_runs=chunk_runs)
+            assert np.array_equal(paths, reference), (method, chunk_runs)
+        logger.info(f"✅ {method} paths match the per-run loop")
+
+
+def test_metrics_match_loops():
+    """path_metrics and simulate_metrics give the loop metrics of the same paths"""
+    for method, loop in LOOPS.items():
+        reference = loop(RETURNS, RUNS, SEED)
+        expected = np.array([loop_metrics(path) for path in reference])
+
+        metrics = path_metrics(simulate_paths(RETURNS, RUNS, method, seed=SEED, chunk_runs=64))
+        np.testing.assert_allclose(np.column_stack([metrics['sharpe'], metrics['max_dd'], metrics['ulcer']]),
+                                   expected, rtol=1e-12)
+
+        streamed = simulate_metrics(RETURNS, RUNS, method, seed=SEED, chunk_runs=64)
+        for name in ('sharpe', 'max_dd', 'ulcer', 'final'):
+            np.testing.assert_allclose(streamed[name], metrics[name], rtol=1e-12)
+        np.testing.assert_allclose(streamed['final'], reference[:, -1], rtol=1e-12)
+        logger.info(f"✅ {method} metrics match the per-run loop")
+
+
+def run_mc_engine_tests():
+    """Run every check, log a summary"""
+    tests = [(name, func) for name, func in globals().items() if name.startswith('test_') and callable(func)]
+    failed = []
+    for name, func in tests:
+        try:
+            func()
+            logger.info(f"✅ {name} PASSED")
+        except Exception as e:
+            logger.error(f"❌ {name} FAILED: {e!r}")
+            failed.append(name)
+
+    logger.info(f"\nOverall: {len(tests) - len(failed)}/{len(tests)} tests passed")
+    return not failed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_mc_engine_tests() else 1)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+MONTE CARLO PARALLEL TEST SCRIPT
+Checks that parallel_summarize gives bit-for-bit the same summary for any
+number of workers, and that its exact mode matches the task paths
+"""
+
+import os
+import sys
+import logging
+
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mc_engine import path_metrics
+from mc_parallel import parallel_summarize, task_paths
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+RETURNS = np.random.default_rng(0).normal(0.1, 1.0, 300)
+RUNS = 3_000
+TASK_RUNS = 500
+PERCENTS = (1, 5, 50, 95, 99)
+
+
+def summary_values(summary):
+    """Everything a caller reads from a summary"""
+    values = {name: summary.metric(name, PERCENTS) for name in ('final', 'sharpe', 'max_dd', 'ulcer')}
+    values['fan'] = summary.fan(PERCENTS)
+    values['count'] = summary.count
+    values['rank_error'] = summary.rank_error
+    return values
+
+
+def assert_same_values(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, dict):
+            assert actual[key].keys() == value.keys(), key
+            for name, item in value.items():
+                assert np.array_equal(actual[key][name], item), (key, name)
+        else:
+            assert actual[key] == value, key
+
+
+def test_identical_across_worker_counts():
+    """workers=1 and workers=2 (and 3) merge the same task summaries in the same order"""
+    cases = [
+        ('shuffle', {}),
+        ('block', {'fan_capacity': 64}),
+        ('block', {'exact': True}),
+        ('shuffle', {'memory_mb': 1}),
+    ]
+    for method, options in cases:
+        results = {workers: summary_values(parallel_summarize(RETURNS, RUNS, method, seed=11, workers=workers,
+                                                              task_runs=TASK_RUNS, **options))
+                   for workers in (1, 2, 3)}
+        assert results[1]['count'] == RUNS
+        assert_same_values(results[2], results[1])
+        assert_same_values(results[3], results[1])
+        logger.info(f"✅ {method} {options}: identical for 1, 2 and 3 workers "
+                    f"(rank_error {results[1]['rank_error']:.2e})")
+
+
+def test_exact_matches_task_paths():
+    """exact=True reports np.percentile of the paths task_paths regenerates"""
+    summary = parallel_summarize(RETURNS, RUNS, 'shuffle', seed=11, workers=2, task_runs=TASK_RUNS, exact=True)
+    paths = task_paths(RETURNS, RUNS, 'shuffle', seed=11, task_runs=TASK_RUNS)
+    assert summary.rank_error == 0.0
+
+    finals = summary.metric('final', PERCENTS)
+    expected = np.percentile(path_metrics(paths)['final'], PERCENTS)
+    np.testing.assert_allclose([finals[f'p{p}'] for p in PERCENTS], expected, rtol=1e-12)
+
+    bands = summary.fan(PERCENTS)
+    for p, band in zip(PERCENTS, np.percentile(paths, PERCENTS, axis=0)):
+        np.testing.assert_allclose(bands[f'p{p}'], band, rtol=1e-12)
+
+
+def run_mc_parallel_tests():
+    """Run every check, log a summary"""
+    tests = [(name, func) for name, func in globals().items() if name.startswith('test_') and callable(func)]
+    failed = []
+    for name, func in tests:
+        try:
+            func()
+            logger.info(f"✅ {name} PASSED")
+        except Exception as e:
+            logger.error(f"❌ {name} FAILED: {e!r}")
+            failed.append(name)
+
+    logger.info(f"\nOverall: {len(tests) - len(failed)}/{len(tests)} tests passed")
+    return not failed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_mc_parallel_tests() else 1)
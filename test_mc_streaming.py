@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+MONTE CARLO STREAMING TEST SCRIPT
+Checks that QuantileSketch percentiles stay within their reported rank_error
+of np.percentile (single, merged and compressed sketches, and the fan bands
+of a streamed summary)
+"""
+
+import os
+import sys
+import logging
+
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mc_engine import simulate_paths
+from mc_streaming import QuantileSketch, summarize
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PERCENTS = (0, 1, 5, 25, 50, 75, 95, 99, 100)
+
+
+def assert_within_rank_error(estimates, data, percents, rank_error):
+    """
+    Every estimated p-th percentile of each column lies between the exact
+    order statistics of ranks (p/100 -/+ rank_error) * n, +/- 1 for
+    np.percentile's interpolation
+    """
+    ordered = np.sort(np.asarray(data).reshape(len(data), -1), axis=0)
+    n = len(ordered)
+    for percent, row in zip(percents, np.atleast_2d(estimates)):
+        low = int(np.clip(np.floor((percent / 100 - rank_error) * n) - 1, 0, n - 1))
+        high = int(np.clip(np.ceil((percent / 100 + rank_error) * n) + 1, 0, n - 1))
+        assert np.all(ordered[low] <= row) and np.all(row <= ordered[high]), (percent, rank_error)
+
+
+def feed(sketch, data, rng):
+    """Update in uneven chunks, as the Monte Carlo chunks arrive"""
+    start = 0
+    while start < len(data):
+        size = int(rng.integers(1, 3 * sketch.capacity))
+        sketch.update(data[start:start + size])
+        start += size
+
+
+def test_exact_until_first_compaction():
+    """A sketch that never compacts reports np.percentile itself"""
+    rng = np.random.default_rng(0)
+    data = rng.standard_t(3, (500, 4))
+    sketch = QuantileSketch(4, capacity=1024)
+    feed(sketch, data, rng)
+    assert sketch.rank_error == 0.0
+    np.testing.assert_array_equal(sketch.percentiles(PERCENTS), np.percentile(data, PERCENTS, axis=0))
+
+
+def test_sketch_within_rank_error():
+    """Compacted sketches stay within their bound, whatever the capacity"""
+    rng = np.random.default_rng(1)
+    data = np.cumsum(rng.normal(0, 1, (20_000, 3)), axis=0)
+    for capacity in (16, 64, 256):
+        sketch = QuantileSketch(3, capacity)
+        feed(sketch, data, rng)
+        assert sketch.count == len(data)
+        assert 0 < sketch.rank_error < 0.5
+        assert_within_rank_error(sketch.percentiles(PERCENTS), data, PERCENTS, sketch.rank_error)
+        logger.info(f"✅ capacity {capacity}: rank_error {sketch.rank_error:.4f}, {sketch.rows_held} rows held")
+
+
+def test_merged_sketches_within_rank_error():
+    """Merging worker sketches, and compressing them first, keeps the bound"""
+    rng = np.random.default_rng(2)
+    shares = [rng.lognormal(0, 1, (5_000, 2)) for _ in range(4)]
+    for compress in (False, True):
+        total = QuantileSketch(2, 64)
+        for share in shares:
+            sketch = QuantileSketch(2, 64)
+            feed(sketch, share, rng)
+            if compress:
+                sketch.compress()
+                assert sketch.rows_held <= sketch.capacity
+            total.merge(sketch)
+        data = np.vstack(shares)
+        assert total.count == len(data)
+        assert_within_rank_error(total.percentiles(PERCENTS), data, PERCENTS, total.rank_error)
+
+
+def test_summary_fan_within_rank_error():
+    """Fan bands of a streamed summary against np.percentile over the same paths"""
+    returns = np.random.default_rng(3).normal(0.1, 1.0, 200)
+    runs = 5_000
+    summary = summarize(returns, runs, 'shuffle', seed=7, memory_mb=1)
+    assert summary.path_sketch.rank_error > 0
+
+    paths = simulate_paths(returns, runs, 'shuffle', seed=7)
+    bands = summary.fan(PERCENTS)
+    estimates = np.vstack([bands[f'p{p:g}'] for p in PERCENTS])
+    assert_within_rank_error(estimates, paths, PERCENTS, summary.path_sketch.rank_error)
+    np.testing.assert_allclose(bands['mean'], paths.mean(axis=0), rtol=1e-9, atol=1e-9)
+
+
+def run_mc_streaming_tests():
+    """Run every check, log a summary"""
+    tests = [(name, func) for name, func in globals().items() if name.startswith('test_') and callable(func)]
+    failed = []
+    for name, func in tests:
+        try:
+            func()
+            logger.info(f"✅ {name} PASSED")
+        except Exception as e:
+            logger.error(f"❌ {name} FAILED: {e!r}")
+            failed.append(name)
+
+    logger.info(f"\nOverall: {len(tests) - len(failed)}/{len(tests)} tests passed")
+    return not failed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_mc_streaming_tests() else 1)
@@ -18,6 +18,9 @@ from concurrent.futures import ProcessPoolExecutor, as_completed
 import multiprocessing as mp
 
 from GOLDEN_RULE_NO_SYNTHETIC_DATA import RealDataEnforcer
+from shared_dataset_registry import SharedDatasetRegistry, attach_shared_datasets, load_shared_dataset
+from batch_backtest import batch_backtest
+from scenario_scheduler import submit_dataset_chunks
 
 enforcer = RealDataEnforcer()
 
@@ -116,257 +119,182 @@ class UltimateAdvancedOptimizer:
     
     def test_advanced_scenario(self, scenario):
         """Test scenario with comprehensive statistics"""
-        
+        return self.test_dataset_batch((scenario['pair'], scenario['timeframe']), [scenario])[0]
+    
+    def test_dataset_batch(self, dataset, scenarios):
+        """
+        Test every scenario of one dataset in a single batch backtest: each EMA
+        span, RSI and ATR is computed once and all scenarios are simulated
+        together. Comprehensive statistics only for scenarios that can pass.
+        """
         try:
             # Load real data
-            df = enforcer.load_real_data(scenario['pair'], scenario['timeframe'])
-            
-            # Calculate indicators
-            df['ema_fast'] = df['close'].ewm(span=scenario['ema_fast']).mean()
-            df['ema_slow'] = df['close'].ewm(span=scenario['ema_slow']).mean()
-            
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['rsi'] = 100 - (100 / (1 + rs))
-            
-            high_low = df['high'] - df['low']
-            high_close = np.abs(df['high'] - df['close'].shift())
-            low_close = np.abs(df['low'] - df['close'].shift())
-            ranges = pd.concat([high_low, high_close, low_close], axis=1)
-            true_range = ranges.max(axis=1)
-            df['atr'] = true_range.rolling(window=14).mean()
-            
-            # Add momentum for advanced entries
-            df['momentum'] = df['close'].pct_change(5)
-            
-            # Generate signals based on entry type
-            df['signal'] = 0
-            
-            if scenario['entry_type'] == 'simple':
-                buy = (df['ema_fast'] > df['ema_slow']) & (df['ema_fast'].shift(1) <= df['ema_slow'].shift(1)) & (df['rsi'] < scenario['rsi_overbought'])
-                sell = (df['ema_fast'] < df['ema_slow']) & (df['ema_fast'].shift(1) >= df['ema_slow'].shift(1)) & (df['rsi'] > scenario['rsi_oversold'])
+            df = load_shared_dataset(*dataset)
+            metrics, trades = batch_backtest(df, scenarios, return_trades=True)
+        except Exception as e:
+            print(f"\n[WARNING] {dataset[0]} {dataset[1]}: {len(scenarios)} scenarios skipped ({e})")
+            return [None] * len(scenarios)
+        
+        # Win rate is a pure count, so this pre-filter never drops a passing scenario
+        candidates = metrics.index[(metrics['trades'] >= 50) & (metrics['win_rate'] >= 65.0)]
+        trades_by_set = dict(tuple(trades[trades['set'].isin(candidates)].groupby('set')))
+        
+        results = [None] * len(scenarios)
+        for k in candidates:
+            try:
+                set_trades = trades_by_set[k]
+                trades_df = pd.DataFrame({
+                    'entry_time': set_trades['entry_time'].to_numpy(),
+                    'exit_time': set_trades['exit_time'].to_numpy(),
+                    'pnl_pct': set_trades['pnl_pct'].to_numpy(),
+                    'exit_reason': set_trades['exit_reason'].to_numpy(),
+                    'duration_minutes': (set_trades['exit_time'] - set_trades['entry_time']).dt.total_seconds().to_numpy() / 60,
+                    'day_of_week': set_trades['exit_time'].dt.dayofweek.to_numpy(),  # 0=Monday, 6=Sunday
+                    'hour_of_day': set_trades['exit_time'].dt.hour.to_numpy()
+                })
+                results[k] = self._scenario_statistics(scenarios[k], trades_df, df)
+            except Exception:
+                results[k] = None
+        return results
+    
+    def _scenario_statistics(self, scenario, trades_df, df):
+        """Comprehensive statistics of one scenario's trades; None unless it passes the criteria"""
+        # Calculate COMPREHENSIVE statistics
+        wins = trades_df[trades_df['pnl_pct'] > 0]
+        losses = trades_df[trades_df['pnl_pct'] < 0]
+        
+        # Basic metrics
+        win_rate = (len(wins) / len(trades_df)) * 100
+        total_return = trades_df['pnl_pct'].sum()
+        
+        cumulative = trades_df['pnl_pct'].cumsum()
+        running_max = cumulative.cummax()
+        drawdown = (cumulative - running_max)
+        max_dd = abs(drawdown.min())
+        
+        sharpe = (trades_df['pnl_pct'].mean() / trades_df['pnl_pct'].std()) * np.sqrt(len(trades_df)) if len(trades_df) > 1 and trades_df['pnl_pct'].std() > 0 else 0
+        
+        total_profit = wins['pnl_pct'].sum() if len(wins) > 0 else 0
+        total_loss = abs(losses['pnl_pct'].sum()) if len(losses) > 0 else 0
+        profit_factor = (total_profit / total_loss) if total_loss > 0 else 0
+        
+        days = (df.index[-1] - df.index[0]).days
+        years = days / 365.25
+        annual_return = (total_return / years) if years > 0 else 0
+        
+        # ADVANCED STATISTICS
+        
+        # Time-based analysis
+        trades_per_week = len(trades_df) / (days / 7)
+        
+        # Day of week performance
+        day_stats = {}
+        day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        for day in range(7):
+            day_trades = trades_df[trades_df['day_of_week'] == day]
+            if len(day_trades) > 0:
+                day_stats[day_names[day]] = {
+                    'trades': len(day_trades),
+                    'win_rate': (len(day_trades[day_trades['pnl_pct'] > 0]) / len(day_trades)) * 100,
+                    'avg_pnl': day_trades['pnl_pct'].mean()
+                }
+        
+        # Best trading day
+        best_day = max(day_stats.items(), key=lambda x: x[1]['avg_pnl'])[0] if day_stats else 'N/A'
+        
+        # Hour-based analysis (sessions)
+        hour_stats = {}
+        for hour in range(24):
+            hour_trades = trades_df[trades_df['hour_of_day'] == hour]
+            if len(hour_trades) > 0:
+                hour_stats[hour] = {
+                    'trades': len(hour_trades),
+                    'win_rate': (len(hour_trades[hour_trades['pnl_pct'] > 0]) / len(hour_trades)) * 100,
+                    'avg_pnl': hour_trades['pnl_pct'].mean()
+                }
+        
+        # Best session (hour)
+        best_hour = max(hour_stats.items(), key=lambda x: x[1]['avg_pnl'])[0] if hour_stats else 0
+        best_session_name = self.get_session_name(best_hour)
+        best_session_stats = hour_stats[best_hour] if best_hour in hour_stats else {}
+        
+        # Exit reason breakdown
+        exit_reasons = trades_df['exit_reason'].value_counts().to_dict()
+        
+        # Duration statistics
+        avg_trade_duration = trades_df['duration_minutes'].mean()
+        median_trade_duration = trades_df['duration_minutes'].median()
+        
+        # Win/Loss statistics
+        avg_win = wins['pnl_pct'].mean() if len(wins) > 0 else 0
+        avg_loss = losses['pnl_pct'].mean() if len(losses) > 0 else 0
+        largest_win = wins['pnl_pct'].max() if len(wins) > 0 else 0
+        largest_loss = losses['pnl_pct'].min() if len(losses) > 0 else 0
+        
+        # Consecutive win/loss streaks
+        trades_df['is_win'] = trades_df['pnl_pct'] > 0
+        trades_df['streak'] = (trades_df['is_win'] != trades_df['is_win'].shift()).cumsum()
+        win_streaks = trades_df[trades_df['is_win']].groupby('streak').size()
+        loss_streaks = trades_df[~trades_df['is_win']].groupby('streak').size()
+        max_win_streak = win_streaks.max() if len(win_streaks) > 0 else 0
+        max_loss_streak = loss_streaks.max() if len(loss_streaks) > 0 else 0
+        
+        # Monthly profit distribution
+        trades_df['year_month'] = trades_df['exit_time'].dt.to_period('M')
+        monthly_pnl = trades_df.groupby('year_month')['pnl_pct'].sum()
+        best_month_pnl = monthly_pnl.max() if len(monthly_pnl) > 0 else 0
+        worst_month_pnl = monthly_pnl.min() if len(monthly_pnl) > 0 else 0
+        profitable_months = (monthly_pnl > 0).sum()
+        total_months = len(monthly_pnl)
+        
+        # Check criteria
+        if win_rate >= 65.0 and max_dd <= 3.5 and sharpe >= 2.0:
+            return {
+                'scenario': scenario,
                 
-            elif scenario['entry_type'] == 'pullback':
-                # Wait for price to pullback near EMA slow after crossover
-                near_ema = abs(df['close'] - df['ema_slow']) / df['close'] < 0.001  # Within 0.1%
-                buy = (df['ema_fast'] > df['ema_slow']) & near_ema & (df['rsi'] < scenario['rsi_overbought'])
-                sell = (df['ema_fast'] < df['ema_slow']) & near_ema & (df['rsi'] > scenario['rsi_oversold'])
+                # Basic metrics
+                'total_trades': len(trades_df),
+                'win_rate': win_rate,
+                'sharpe': sharpe,
+                'annual_return': annual_return,
+                'max_dd': max_dd,
+                'profit_factor': profit_factor,
                 
-            elif scenario['entry_type'] == 'momentum_confirm':
-                # Require momentum confirmation
-                buy = (df['ema_fast'] > df['ema_slow']) & (df['ema_fast'].shift(1) <= df['ema_slow'].shift(1)) & (df['rsi'] < scenario['rsi_overbought']) & (df['momentum'] > 0)
-                sell = (df['ema_fast'] < df['ema_slow']) & (df['ema_fast'].shift(1) >= df['ema_slow'].shift(1)) & (df['rsi'] > scenario['rsi_oversold']) & (df['momentum'] < 0)
-            
-            df.loc[buy, 'signal'] = 1
-            df.loc[sell, 'signal'] = -1
-            
-            # Execute trades with DETAILED tracking
-            trades = []
-            position = 0
-            
-            for timestamp, row in df.iterrows():
-                if pd.isna(row['atr']) or row['atr'] == 0:
-                    continue
+                # Win/Loss stats
+                'avg_win': avg_win,
+                'avg_loss': avg_loss,
+                'largest_win': largest_win,
+                'largest_loss': largest_loss,
+                'max_win_streak': int(max_win_streak),
+                'max_loss_streak': int(max_loss_streak),
                 
-                if row['signal'] == 1 and position == 0:
-                    position = 1
-                    entry_price = row['close']
-                    entry_time = timestamp
-                    sl = entry_price - (row['atr'] * scenario['sl_atr_mult'])
-                    tp = entry_price + (row['atr'] * scenario['sl_atr_mult'] * scenario['rr_ratio'])
-                    
-                elif row['signal'] == -1 and position == 0:
-                    position = -1
-                    entry_price = row['close']
-                    entry_time = timestamp
-                    sl = entry_price + (row['atr'] * scenario['sl_atr_mult'])
-                    tp = entry_price - (row['atr'] * scenario['sl_atr_mult'] * scenario['rr_ratio'])
+                # Time-based stats
+                'trades_per_week': trades_per_week,
+                'avg_trade_duration_minutes': avg_trade_duration,
+                'median_trade_duration_minutes': median_trade_duration,
                 
-                elif position != 0:
-                    exit_price = None
-                    exit_reason = None
-                    
-                    if position == 1:
-                        if row['low'] <= sl:
-                            exit_price = sl
-                            exit_reason = 'SL'
-                        elif row['high'] >= tp:
-                            exit_price = tp
-                            exit_reason = 'TP'
-                        elif row['signal'] == -1:
-                            exit_price = row['close']
-                            exit_reason = 'Signal'
-                    elif position == -1:
-                        if row['high'] >= sl:
-                            exit_price = sl
-                            exit_reason = 'SL'
-                        elif row['low'] <= tp:
-                            exit_price = tp
-                            exit_reason = 'TP'
-                        elif row['signal'] == 1:
-                            exit_price = row['close']
-                            exit_reason = 'Signal'
-                    
-                    if exit_price:
-                        pnl_pct = ((exit_price - entry_price) / entry_price * 100) * position
-                        duration = (timestamp - entry_time).total_seconds() / 60  # minutes
-                        
-                        trades.append({
-                            'entry_time': entry_time,
-                            'exit_time': timestamp,
-                            'pnl_pct': pnl_pct,
-                            'exit_reason': exit_reason,
-                            'duration_minutes': duration,
-                            'day_of_week': timestamp.dayofweek,  # 0=Monday, 6=Sunday
-                            'hour_of_day': timestamp.hour
-                        })
-                        position = 0
-            
-            if not trades or len(trades) < 50:
-                return None
-            
-            # Calculate COMPREHENSIVE statistics
-            trades_df = pd.DataFrame(trades)
-            wins = trades_df[trades_df['pnl_pct'] > 0]
-            losses = trades_df[trades_df['pnl_pct'] < 0]
-            
-            # Basic metrics
-            win_rate = (len(wins) / len(trades_df)) * 100
-            total_return = trades_df['pnl_pct'].sum()
-            
-            cumulative = trades_df['pnl_pct'].cumsum()
-            running_max = cumulative.cummax()
-            drawdown = (cumulative - running_max)
-            max_dd = abs(drawdown.min())
-            
-            sharpe = (trades_df['pnl_pct'].mean() / trades_df['pnl_pct'].std()) * np.sqrt(len(trades_df)) if len(trades_df) > 1 and trades_df['pnl_pct'].std() > 0 else 0
-            
-            total_profit = wins['pnl_pct'].sum() if len(wins) > 0 else 0
-            total_loss = abs(losses['pnl_pct'].sum()) if len(losses) > 0 else 0
-            profit_factor = (total_profit / total_loss) if total_loss > 0 else 0
-            
-            days = (df.index[-1] - df.index[0]).days
-            years = days / 365.25
-            annual_return = (total_return / years) if years > 0 else 0
-            
-            # ADVANCED STATISTICS
-            
-            # Time-based analysis
-            trades_per_week = len(trades_df) / (days / 7)
-            
-            # Day of week performance
-            day_stats = {}
-            day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-            for day in range(7):
-                day_trades = trades_df[trades_df['day_of_week'] == day]
-                if len(day_trades) > 0:
-                    day_stats[day_names[day]] = {
-                        'trades': len(day_trades),
-                        'win_rate': (len(day_trades[day_trades['pnl_pct'] > 0]) / len(day_trades)) * 100,
-                        'avg_pnl': day_trades['pnl_pct'].mean()
-                    }
-            
-            # Best trading day
-            best_day = max(day_stats.items(), key=lambda x: x[1]['avg_pnl'])[0] if day_stats else 'N/A'
-            
-            # Hour-based analysis (sessions)
-            hour_stats = {}
-            for hour in range(24):
-                hour_trades = trades_df[trades_df['hour_of_day'] == hour]
-                if len(hour_trades) > 0:
-                    hour_stats[hour] = {
-                        'trades': len(hour_trades),
-                        'win_rate': (len(hour_trades[hour_trades['pnl_pct'] > 0]) / len(hour_trades)) * 100,
-                        'avg_pnl': hour_trades['pnl_pct'].mean()
-                    }
-            
-            # Best session (hour)
-            best_hour = max(hour_stats.items(), key=lambda x: x[1]['avg_pnl'])[0] if hour_stats else 0
-            best_session_name = self.get_session_name(best_hour)
-            best_session_stats = hour_stats[best_hour] if best_hour in hour_stats else {}
-            
-            # Exit reason breakdown
-            exit_reasons = trades_df['exit_reason'].value_counts().to_dict()
-            
-            # Duration statistics
-            avg_trade_duration = trades_df['duration_minutes'].mean()
-            median_trade_duration = trades_df['duration_minutes'].median()
-            
-            # Win/Loss statistics
-            avg_win = wins['pnl_pct'].mean() if len(wins) > 0 else 0
-            avg_loss = losses['pnl_pct'].mean() if len(losses) > 0 else 0
-            largest_win = wins['pnl_pct'].max() if len(wins) > 0 else 0
-            largest_loss = losses['pnl_pct'].min() if len(losses) > 0 else 0
-            
-            # Consecutive win/loss streaks
-            trades_df['is_win'] = trades_df['pnl_pct'] > 0
-            trades_df['streak'] = (trades_df['is_win'] != trades_df['is_win'].shift()).cumsum()
-            win_streaks = trades_df[trades_df['is_win']].groupby('streak').size()
-            loss_streaks = trades_df[~trades_df['is_win']].groupby('streak').size()
-            max_win_streak = win_streaks.max() if len(win_streaks) > 0 else 0
-            max_loss_streak = loss_streaks.max() if len(loss_streaks) > 0 else 0
-            
-            # Monthly profit distribution
-            trades_df['year_month'] = trades_df['exit_time'].dt.to_period('M')
-            monthly_pnl = trades_df.groupby('year_month')['pnl_pct'].sum()
-            best_month_pnl = monthly_pnl.max() if len(monthly_pnl) > 0 else 0
-            worst_month_pnl = monthly_pnl.min() if len(monthly_pnl) > 0 else 0
-            profitable_months = (monthly_pnl > 0).sum()
-            total_months = len(monthly_pnl)
-            
-            # Check criteria
-            if win_rate >= 65.0 and max_dd <= 3.5 and sharpe >= 2.0:
-                return {
-                    'scenario': scenario,
-                    
-                    # Basic metrics
-                    'total_trades': len(trades_df),
-                    'win_rate': win_rate,
-                    'sharpe': sharpe,
-                    'annual_return': annual_return,
-                    'max_dd': max_dd,
-                    'profit_factor': profit_factor,
-                    
-                    # Win/Loss stats
-                    'avg_win': avg_win,
-                    'avg_loss': avg_loss,
-                    'largest_win': largest_win,
-                    'largest_loss': largest_loss,
-                    'max_win_streak': int(max_win_streak),
-                    'max_loss_streak': int(max_loss_streak),
-                    
-                    # Time-based stats
-                    'trades_per_week': trades_per_week,
-                    'avg_trade_duration_minutes': avg_trade_duration,
-                    'median_trade_duration_minutes': median_trade_duration,
-                    
-                    # Day/Session stats
-                    'best_trading_day': best_day,
-                    'day_of_week_stats': day_stats,
-                    'best_session_hour': best_hour,
-                    'best_session_name': best_session_name,
-                    'best_session_stats': best_session_stats,
-                    'hourly_stats': hour_stats,
-                    
-                    # Exit analysis
-                    'exit_reasons': exit_reasons,
-                    'tp_rate': (exit_reasons.get('TP', 0) / len(trades_df)) * 100,
-                    'sl_rate': (exit_reasons.get('SL', 0) / len(trades_df)) * 100,
-                    
-                    # Monthly stats
-                    'best_month_pnl': best_month_pnl,
-                    'worst_month_pnl': worst_month_pnl,
-                    'profitable_months': int(profitable_months),
-                    'total_months': int(total_months),
-                    'monthly_consistency': (profitable_months / total_months * 100) if total_months > 0 else 0
-                }
-            
-            return None
-            
-        except Exception as e:
-            return None
+                # Day/Session stats
+                'best_trading_day': best_day,
+                'day_of_week_stats': day_stats,
+                'best_session_hour': best_hour,
+                'best_session_name': best_session_name,
+                'best_session_stats': best_session_stats,
+                'hourly_stats': hour_stats,
+                
+                # Exit analysis
+                'exit_reasons': exit_reasons,
+                'tp_rate': (exit_reasons.get('TP', 0) / len(trades_df)) * 100,
+                'sl_rate': (exit_reasons.get('SL', 0) / len(trades_df)) * 100,
+                
+                # Monthly stats
+                'best_month_pnl': best_month_pnl,
+                'worst_month_pnl': worst_month_pnl,
+                'profitable_months': int(profitable_months),
+                'total_months': int(total_months),
+                'monthly_consistency': (profitable_months / total_months * 100) if total_months > 0 else 0
+            }
+        
+        return None
     
     def get_session_name(self, hour):
         """Convert hour to session name"""
@@ -393,38 +321,51 @@ class UltimateAdvancedOptimizer:
         tested = 0
         start_time = datetime.now()
         
-        with ProcessPoolExecutor(max_workers=min(20, mp.cpu_count())) as executor:
-            futures = {executor.submit(self.test_advanced_scenario, s): s for s in scenarios}
-            
-            for future in as_completed(futures):
-                tested += 1
+        with SharedDatasetRegistry() as registry:
+            registry.publish_all((s['pair'], s['timeframe']) for s in scenarios)
+            print()
+            
+            workers = min(20, mp.cpu_count())
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=attach_shared_datasets,
+                                     initargs=(registry.handles(),)) as executor:
+                # One batch backtest per dataset chunk, about one chunk per worker
+                futures = submit_dataset_chunks(executor, self.test_dataset_batch, scenarios, workers,
+                                                chunks_per_worker=1)
+            
+                for future in as_completed(futures):
+                    try:
+                        results = future.result()
+                    except:
+                        results = [None] * len(futures[future])
                 
-                try:
-                    result = future.result()
+                    for result in results:
+                        tested += 1
                     
-                    if result:
-                        successful.append(result)
+                        try:
+                            if result:
+                                successful.append(result)
                         
-                        print(f"\n>>> EXCELLENT #{len(successful)} <<<")
-                        print(f"  {result['scenario']['pair'].upper()} {result['scenario']['timeframe']} "
-                              f"({result['scenario']['entry_type']}) - EMA {result['scenario']['ema_fast']}/{result['scenario']['ema_slow']}")
-                        print(f"  Sharpe: {result['sharpe']:.2f} | Win: {result['win_rate']:.1f}% | "
-                              f"Return: {result['annual_return']:.1f}% | DD: {result['max_dd']:.1f}%")
-                        print(f"  R:R: 1:{result['scenario']['rr_ratio']} | Trades/Week: {result['trades_per_week']:.1f} | "
-                              f"Best Day: {result['best_trading_day']}")
+                                print(f"\n>>> EXCELLENT #{len(successful)} <<<")
+                                print(f"  {result['scenario']['pair'].upper()} {result['scenario']['timeframe']} "
+                                      f"({result['scenario']['entry_type']}) - EMA {result['scenario']['ema_fast']}/{result['scenario']['ema_slow']}")
+                                print(f"  Sharpe: {result['sharpe']:.2f} | Win: {result['win_rate']:.1f}% | "
+                                      f"Return: {result['annual_return']:.1f}% | DD: {result['max_dd']:.1f}%")
+                                print(f"  R:R: 1:{result['scenario']['rr_ratio']} | Trades/Week: {result['trades_per_week']:.1f} | "
+                                      f"Best Day: {result['best_trading_day']}")
                     
-                    if tested % 500 == 0:
-                        elapsed = datetime.now() - start_time
-                        pct = (tested / len(scenarios)) * 100
-                        print(f"\n[PROGRESS] {tested:,}/{len(scenarios):,} ({pct:.1f}%) - Found {len(successful)} excellent")
-                        print(f"  Elapsed: {elapsed} | Successful: {len(successful)}")
+                            if tested % 500 == 0:
+                                elapsed = datetime.now() - start_time
+                                pct = (tested / len(scenarios)) * 100
+                                print(f"\n[PROGRESS] {tested:,}/{len(scenarios):,} ({pct:.1f}%) - Found {len(successful)} excellent")
+                                print(f"  Elapsed: {elapsed} | Successful: {len(successful)}")
                         
-                        # Save checkpoint
-                        if successful:
-                            self.save_checkpoint(successful, tested)
+                                # Save checkpoint
+                                if successful:
+                                    self.save_checkpoint(successful, tested)
                 
-                except:
-                    pass
+                        except:
+                            pass
         
         # Save final results
         self.save_final_results(successful, len(scenarios))
@@ -5,13 +5,14 @@ Max 4% Drawdown + Quality Filters for Better Win Rates
 Tests stricter criteria for higher quality signals
 """
 
-import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime, time
 import json
 import multiprocessing as mp
 
+from shared_dataset_registry import SharedDatasetRegistry, attach_shared_datasets, load_shared_dataset
+
 # STRICT SUCCESS CRITERIA
 MAX_DRAWDOWN = 4.0  # 4% MAX
 MIN_WIN_RATE = 60.0  # Higher threshold for quality
@@ -187,10 +188,7 @@ def backtest_with_quality_filters(df, params):
 def test_scenario(scenario):
     """Test scenario"""
     try:
-        file_path = f"data/MASTER_DATASET/{scenario['tf']}/{scenario['pair']}_{scenario['tf']}.csv"
-        df = pd.read_csv(file_path)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df.set_index('timestamp', inplace=True)
+        df = load_shared_dataset(scenario['pair'], scenario['tf'])
         
         results = backtest_with_quality_filters(df, scenario)
         
@@ -282,25 +280,29 @@ def main():
     high_quality = []
     all_results = []
     
-    with mp.Pool(16) as pool:
-        for i, r in enumerate(pool.imap_unordered(test_scenario, scenarios), 1):
-            if r:
-                all_results.append(r)
-                if r.get('quality'):
-                    high_quality.append(r)
-                    print(f"[HIGH QUALITY #{len(high_quality)}] {r['scenario']['pair'].upper()} {r['scenario']['tf']}")
-                    res = r['results']
-                    print(f"  Sharpe: {res['sharpe_ratio']:.2f} | Return: {res['total_return_pct']:.1f}% | Win: {res['win_rate']:.1f}%")
-                    print(f"  DD: {res['max_drawdown_pct']:.2f}% | Trades: {res['total_trades']}")
-                    s = r['scenario']
-                    print(f"  Filters: EMA-Align={s['require_ema_alignment']}, Trend>={s['min_trend_strength']}%, Session={s['session_filter']}, Spacing={s['min_bars_between_trades']}")
-                    print("")
+    with SharedDatasetRegistry() as registry:
+        registry.publish_all((s['pair'], s['tf']) for s in scenarios)
+        print()
+        
+        with mp.Pool(16, initializer=attach_shared_datasets, initargs=(registry.handles(),)) as pool:
+            for i, r in enumerate(pool.imap_unordered(test_scenario, scenarios), 1):
+                if r:
+                    all_results.append(r)
+                    if r.get('quality'):
+                        high_quality.append(r)
+                        print(f"[HIGH QUALITY #{len(high_quality)}] {r['scenario']['pair'].upper()} {r['scenario']['tf']}")
+                        res = r['results']
+                        print(f"  Sharpe: {res['sharpe_ratio']:.2f} | Return: {res['total_return_pct']:.1f}% | Win: {res['win_rate']:.1f}%")
+                        print(f"  DD: {res['max_drawdown_pct']:.2f}% | Trades: {res['total_trades']}")
+                        s = r['scenario']
+                        print(f"  Filters: EMA-Align={s['require_ema_alignment']}, Trend>={s['min_trend_strength']}%, Session={s['session_filter']}, Spacing={s['min_bars_between_trades']}")
+                        print("")
             
-            if i % 500 == 0:
-                print(f"[PROGRESS] {i:,}/{len(scenarios):,} ({i/len(scenarios)*100:.1f}%)")
-                print(f"  High Quality Found: {len(high_quality)}")
-                print(f"  Total Results: {len(all_results)}")
-                print("")
+                if i % 500 == 0:
+                    print(f"[PROGRESS] {i:,}/{len(scenarios):,} ({i/len(scenarios)*100:.1f}%)")
+                    print(f"  High Quality Found: {len(high_quality)}")
+                    print(f"  Total Results: {len(all_results)}")
+                    print("")
     
     print("")
     print("="*100)
@@ -19,6 +19,9 @@ import yaml
 import pandas as pd
 import numpy as np
 
+import indicators
+from exit_resolver import resolve_signal_exits
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -160,8 +163,8 @@ class UltraFastController:
         
         # Calculate indicators
         data = data.copy()
-        data['ema_fast'] = data['close'].ewm(span=params['ema_fast']).mean()
-        data['ema_slow'] = data['close'].ewm(span=params['ema_slow']).mean()
+        data['ema_fast'] = indicators.ema(data['close'], params['ema_fast'])
+        data['ema_slow'] = indicators.ema(data['close'], params['ema_slow'])
         data['rsi'] = self._calculate_rsi(data['close'], 14)
         data['atr'] = self._calculate_atr(data, 14)
         
@@ -212,136 +215,59 @@ class UltraFastController:
     
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Calculate RSI"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return pd.Series(indicators.rsi(prices, period), index=prices.index)
     
     def _calculate_atr(self, data: pd.DataFrame, period: int = 14) -> pd.Series:
         """Calculate ATR"""
-        high_low = data['high'] - data['low']
-        high_close = np.abs(data['high'] - data['close'].shift())
-        low_close = np.abs(data['low'] - data['close'].shift())
-        
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = np.max(ranges, axis=1)
-        
-        return true_range.rolling(period).mean()
+        return pd.Series(indicators.atr(data['high'], data['low'], data['close'], period), index=data.index)
     
     def _simulate_trades(self, signals: List[Dict], data: pd.DataFrame, pair: str) -> List[Dict]:
         """Simulate trades with realistic costs"""
         trades = []
         
-        for signal in signals:
-            try:
-                entry_idx = data.index.get_loc(signal['timestamp'])
-                entry_price = signal['entry_price']
-                direction = signal['direction']
-                stop_loss = signal['stop_loss']
-                take_profit = signal['take_profit']
-                
-                # Add slippage
-                if pair == 'XAU_USD':
-                    slippage = 0.5  # $0.50 for gold
-                else:
-                    slippage = 0.00005 if 'JPY' not in pair else 0.0001
-                
-                if direction == 'BUY':
-                    entry_price += slippage
-                else:
-                    entry_price -= slippage
-                
-                # Simulate trade
-                for i in range(entry_idx + 1, min(entry_idx + 200, len(data))):
-                    current_price = data.iloc[i]['close']
-                    
-                    if direction == 'BUY':
-                        if current_price <= stop_loss:
-                            if pair == 'XAU_USD':
-                                transaction_cost = 2.0  # $2 for gold
-                                net_pips = (stop_loss - entry_price - transaction_cost) * 100  # 1 pip = $0.01 for gold
-                            else:
-                                transaction_cost = 0.0002 if 'JPY' not in pair else 0.00002
-                                net_pips = (stop_loss - entry_price - transaction_cost) * 10000
-                            
-                            trades.append({
-                                'entry_time': signal['timestamp'],
-                                'exit_time': data.index[i],
-                                'entry_price': entry_price,
-                                'exit_price': stop_loss,
-                                'direction': direction,
-                                'status': 'LOSS',
-                                'pips': net_pips,
-                                'strategy': signal.get('strategy', 'unknown'),
-                                'confidence': signal.get('confidence', 0.5)
-                            })
-                            break
-                        elif current_price >= take_profit:
-                            if pair == 'XAU_USD':
-                                transaction_cost = 2.0  # $2 for gold
-                                net_pips = (take_profit - entry_price - transaction_cost) * 100  # 1 pip = $0.01 for gold
-                            else:
-                                transaction_cost = 0.0002 if 'JPY' not in pair else 0.00002
-                                net_pips = (take_profit - entry_price - transaction_cost) * 10000
-                            
-                            trades.append({
-                                'entry_time': signal['timestamp'],
-                                'exit_time': data.index[i],
-                                'entry_price': entry_price,
-                                'exit_price': take_profit,
-                                'direction': direction,
-                                'status': 'WIN',
-                                'pips': net_pips,
-                                'strategy': signal.get('strategy', 'unknown'),
-                                'confidence': signal.get('confidence', 0.5)
-                            })
-                            break
-                    else:  # SELL
-                        if current_price >= stop_loss:
-                            if pair == 'XAU_USD':
-                                transaction_cost = 2.0  # $2 for gold
-                                net_pips = (entry_price - stop_loss - transaction_cost) * 100  # 1 pip = $0.01 for gold
-                            else:
-                                transaction_cost = 0.0002 if 'JPY' not in pair else 0.00002
-                                net_pips = (entry_price - stop_loss - transaction_cost) * 10000
-                            
-                            trades.append({
-                                'entry_time': signal['timestamp'],
-                                'exit_time': data.index[i],
-                                'entry_price': entry_price,
-                                'exit_price': stop_loss,
-                                'direction': direction,
-                                'status': 'LOSS',
-                                'pips': net_pips,
-                                'strategy': signal.get('strategy', 'unknown'),
-                                'confidence': signal.get('confidence', 0.5)
-                            })
-                            break
-                        elif current_price <= take_profit:
-                            if pair == 'XAU_USD':
-                                transaction_cost = 2.0  # $2 for gold
-                                net_pips = (entry_price - take_profit - transaction_cost) * 100  # 1 pip = $0.01 for gold
-                            else:
-                                transaction_cost = 0.0002 if 'JPY' not in pair else 0.00002
-                                net_pips = (entry_price - take_profit - transaction_cost) * 10000
-                            
-                            trades.append({
-                                'entry_time': signal['timestamp'],
-                                'exit_time': data.index[i],
-                                'entry_price': entry_price,
-                                'exit_price': take_profit,
-                                'direction': direction,
-                                'status': 'WIN',
-                                'pips': net_pips,
-                                'strategy': signal.get('strategy', 'unknown'),
-                                'confidence': signal.get('confidence', 0.5)
-                            })
-                            break
-                            
-            except Exception as e:
+        # Resolve every exit in one vectorized pass (stops/targets trigger on the close)
+        close = data['close'].to_numpy(dtype=np.float64)
+        exits = resolve_signal_exits(data.index, signals, close, close, close, max_bars=199)
+        
+        for signal, exit_info in zip(signals, exits):
+            # Trades that don't reach their stop or target within the lookahead are dropped
+            if exit_info is None or exit_info[2] not in ('STOP_LOSS', 'TAKE_PROFIT'):
                 continue
+            
+            exit_idx, exit_price, exit_reason = exit_info
+            entry_price = signal['entry_price']
+            direction = signal['direction']
+            
+            # Add slippage
+            if pair == 'XAU_USD':
+                slippage = 0.5  # $0.50 for gold
+            else:
+                slippage = 0.00005 if 'JPY' not in pair else 0.0001
+            
+            if direction == 'BUY':
+                entry_price += slippage
+            else:
+                entry_price -= slippage
+            
+            move = exit_price - entry_price if direction == 'BUY' else entry_price - exit_price
+            if pair == 'XAU_USD':
+                transaction_cost = 2.0  # $2 for gold
+                net_pips = (move - transaction_cost) * 100  # 1 pip = $0.01 for gold
+            else:
+                transaction_cost = 0.0002 if 'JPY' not in pair else 0.00002
+                net_pips = (move - transaction_cost) * 10000
+            
+            trades.append({
+                'entry_time': signal['timestamp'],
+                'exit_time': data.index[exit_idx],
+                'entry_price': entry_price,
+                'exit_price': exit_price,
+                'direction': direction,
+                'status': 'WIN' if exit_reason == 'TAKE_PROFIT' else 'LOSS',
+                'pips': net_pips,
+                'strategy': signal.get('strategy', 'unknown'),
+                'confidence': signal.get('confidence', 0.5)
+            })
         
         return trades
     
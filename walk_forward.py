@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+WALK-FORWARD OPTIMIZATION
+Anchored / rolling walk-forward evaluation for the backtesting engines
+
+    history  |------------------------------------------------|holdout|
+    fold 0   |== train ==|emb|test|
+    fold 1   |==== train ====|emb|test|            (anchored)
+    fold 1        |== train ==|emb|test|           (rolling)
+
+- The last holdout_months are never touched by any fold
+- Each test slice is wfo_test_months long; folds step forward by one test slice
+- embargo_hours of bars before every test slice are dropped from its train
+  slice, so trades opened at the end of train cannot leak into test
+
+The parameters are fixed for a call: every fold simulates the same
+parameter set on its train (in-sample) and test (out-of-sample) slices, and
+the search loop that calls it is what varies the parameters. There is no
+per-fold re-optimization; the in-sample metrics are reported to compare
+against OOS (wfo_efficiency) and to spot overfitting, not to pick
+parameters.
+
+Indicators are computed ONCE over the full history and every fold simulates
+on a positional slice of that frame - no per-fold recomputation. All engine
+indicators are causal, so bar i has the same value as if the frame had been
+cut at i. Folds run in a WalkForwardPool that lives for the whole run: the
+prepared frames reach the workers once through the pool initializer
+(inherited, not pickled, under fork) and each fold task carries only its own
+signals.
+"""
+
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class WalkForwardFold:
+    """Positional [start, end) bounds of one fold within the full history"""
+    fold: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+    def describe(self, timestamps) -> Dict[str, Any]:
+        """Fold bounds with their timestamps, for reports"""
+        ts = pd.DatetimeIndex(timestamps)
+        info = asdict(self)
+        info['train_from'] = ts[self.train_start]
+        info['train_to'] = ts[self.train_end - 1]
+        info['test_from'] = ts[self.test_start]
+        info['test_to'] = ts[self.test_end - 1]
+        return info
+
+
+def generate_walk_forward_folds(timestamps, test_months: int, embargo_hours: float = 0,
+                                holdout_months: int = 0, train_months: int = 12,
+                                anchored: bool = True) -> List[WalkForwardFold]:
+    """
+    Fold boundaries over a sorted timestamp array.
+
+    Args:
+        timestamps: sorted bar timestamps of the full history
+        test_months: length of every out-of-sample slice
+        embargo_hours: gap between the end of train and the start of test
+        holdout_months: most-recent months excluded from every fold
+        train_months: first train window (anchored) / every train window (rolling)
+        anchored: True = expanding train from the first bar, False = rolling train
+    """
+    # ns resolution, so the end bound one ns past the last bar is representable
+    ts = pd.DatetimeIndex(timestamps).as_unit('ns')
+    if len(ts) == 0:
+        return []
+
+    first = ts[0]
+    wfo_end = ts[-1] + pd.Timedelta(1, 'ns')
+    if holdout_months:
+        wfo_end = ts[-1] - pd.DateOffset(months=holdout_months)
+
+    embargo = pd.Timedelta(hours=embargo_hours)
+    folds = []
+    test_start_time = first + pd.DateOffset(months=train_months)
+
+    while test_start_time < wfo_end:
+        test_end_time = min(test_start_time + pd.DateOffset(months=test_months), wfo_end)
+        train_start_time = first if anchored else test_start_time - pd.DateOffset(months=train_months)
+        train_end_time = test_start_time - embargo
+
+        train_start, train_end, test_start, test_end = ts.searchsorted(
+            [train_start_time, train_end_time, test_start_time, test_end_time], side='left'
+        )
+        if train_end > train_start and test_end > test_start:
+            folds.append(WalkForwardFold(len(folds), int(train_start), int(train_end),
+                                         int(test_start), int(test_end)))
+
+        test_start_time = test_start_time + pd.DateOffset(months=test_months)
+
+    return folds
+
+
+# ----------------------------------------------------------------------
+# Engine dispatch
+# ----------------------------------------------------------------------
+def prepare_engine_history(engine, pair: str, tf: str) -> pd.DataFrame:
+    """Load the full history and calculate the engine's indicators once"""
+    if hasattr(engine, 'generate_professional_signals'):
+        return engine.calculate_technical_indicators(engine.load_completed_data(pair))
+    return engine.calculate_multi_timeframe_indicators(engine.load_timeframe_data(pair, tf), tf)
+
+
+def generate_engine_signals(engine, df: pd.DataFrame, pair: str, tf: str) -> List[Dict[str, Any]]:
+    """Signals over the full indicator history"""
+    if hasattr(engine, 'generate_professional_signals'):
+        return engine.generate_professional_signals(df, pair)
+    return engine.generate_timeframe_signals(df, pair, tf)
+
+
+def simulate_engine_slice(engine, df: pd.DataFrame, signals: List[Dict[str, Any]],
+                          pair: str, tf: str) -> Dict[str, Any]:
+    if hasattr(engine, 'simulate_professional_trading'):
+        return engine.simulate_professional_trading(df, signals, pair)
+    return engine.simulate_timeframe_trading(df, signals, pair, tf)
+
+
+def summarize_performance(performance: Dict[str, Any]) -> Dict[str, Any]:
+    """Engine performance dict -> controller metric names (ratios, not percent)"""
+    return {
+        'sharpe': performance.get('sharpe_ratio', 0),
+        'sortino': performance.get('sortino_ratio', 0),
+        'max_dd': performance.get('max_drawdown', 0) / 100,
+        'profit_factor': performance.get('profit_factor', 0),
+        'trades': performance.get('total_trades', 0),
+        'win_rate': performance.get('win_rate', 0) / 100,
+        'total_return': performance.get('total_return', 0) / 100
+    }
+
+
+# ----------------------------------------------------------------------
+# Fold execution (runs in pool workers)
+# ----------------------------------------------------------------------
+_worker_histories: Dict[Hashable, pd.DataFrame] = {}
+
+
+def _init_fold_worker(histories: Dict[Hashable, pd.DataFrame]):
+    """Pool initializer: keep every indicator history for the folds this worker runs"""
+    _worker_histories.clear()
+    _worker_histories.update(histories)
+
+
+def signal_positions(df: pd.DataFrame, signals: List[Dict[str, Any]]) -> np.ndarray:
+    """Bar position of every signal (engines emit signals in bar order, so these are sorted)"""
+    if not signals:
+        return np.zeros(0, dtype=np.int64)
+    return np.asarray(df['timestamp'].searchsorted(pd.DatetimeIndex([s['timestamp'] for s in signals])),
+                      dtype=np.int64)
+
+
+def _signal_slice(signals: List[Dict[str, Any]], positions: np.ndarray, start: int, end: int) -> List[Dict[str, Any]]:
+    lo, hi = np.searchsorted(positions, [start, end], side='left')
+    return signals[lo:hi]
+
+
+def run_fold(task: tuple) -> Dict[str, Any]:
+    """In-sample and out-of-sample results of one fold with fixed parameters"""
+    history_key, engine, fold, train_signals, test_signals, pair, tf = task
+    df = _worker_histories[history_key]
+    train = simulate_engine_slice(engine, df.iloc[fold.train_start:fold.train_end], train_signals, pair, tf)
+    test = simulate_engine_slice(engine, df.iloc[fold.test_start:fold.test_end], test_signals, pair, tf)
+    return {
+        'fold': fold,
+        'in_sample': summarize_performance(train.get('performance', {})),
+        'out_of_sample': summarize_performance(test.get('performance', {})),
+        'trades': test.get('trades', [])
+    }
+
+
+class WalkForwardPool:
+    """
+    Process pool shared by every walk-forward call of a run. Workers receive
+    the indicator histories once, through the pool initializer (inherited,
+    not pickled, under fork); a fold task only carries the engine and the
+    signals of its own train and test slices. The pool is restarted when a
+    call needs a history it was not started with, so preloading every
+    history (add_histories) before the first call keeps a single pool.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_histories: Optional[int] = None):
+        self.max_workers = max_workers
+        self.max_histories = max_histories
+        self._histories: 'OrderedDict[Hashable, pd.DataFrame]' = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._started_with: Dict[Hashable, pd.DataFrame] = {}
+
+    @property
+    def workers(self) -> int:
+        return self.max_workers or os.cpu_count() or 1
+
+    def add_histories(self, histories: Mapping[Hashable, pd.DataFrame]):
+        """Make histories available to the workers (from the next pool start on)"""
+        for key, df in histories.items():
+            self._histories[key] = df
+            self._histories.move_to_end(key)
+        while self.max_histories and len(self._histories) > self.max_histories:
+            self._histories.popitem(last=False)
+
+    def _executor_for(self, history_key: Hashable) -> ProcessPoolExecutor:
+        if self._started_with.get(history_key) is not self._histories[history_key]:
+            self.shutdown()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_fold_worker,
+                                                 initargs=(dict(self._histories),))
+            self._started_with = dict(self._histories)
+        return self._executor
+
+    def run(self, history_key: Hashable, df: pd.DataFrame, engine, signals: List[Dict[str, Any]],
+            folds: List[WalkForwardFold], pair: str, tf: str) -> List[Dict[str, Any]]:
+        """
+        Run every fold of df (the history cached under history_key). Results are
+        in fold order. One worker (or a single fold) runs serially in this process.
+        """
+        if not folds:
+            return []
+
+        positions = signal_positions(df, signals)
+        tasks = [(history_key, engine, fold,
+                  _signal_slice(signals, positions, fold.train_start, fold.train_end),
+                  _signal_slice(signals, positions, fold.test_start, fold.test_end),
+                  pair, tf)
+                 for fold in folds]
+
+        if self.workers <= 1 or len(folds) == 1:
+            _init_fold_worker({history_key: df})
+            try:
+                return [run_fold(task) for task in tasks]
+            finally:
+                _worker_histories.clear()
+
+        self.add_histories({history_key: df})
+        return list(self._executor_for(history_key).map(run_fold, tasks))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._started_with = {}
+
+    def __enter__(self) -> 'WalkForwardPool':
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def run_walk_forward(engine, df: pd.DataFrame, signals: List[Dict[str, Any]],
+                     folds: List[WalkForwardFold], pair: str, tf: str,
+                     max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """One-off walk-forward in a pool of its own; reuse a WalkForwardPool across calls instead"""
+    with WalkForwardPool(max_workers) as pool:
+        return pool.run((pair, tf), df, engine, signals, folds, pair, tf)
+
+
+def aggregate_walk_forward(engine, fold_results: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Stitch the out-of-sample slices together.
+
+    Returns (metrics, equity, trades): controller-style OOS metrics over all
+    OOS trades plus per-fold dispersion, the stitched OOS equity curve and the
+    OOS trade log.
+    """
+    trades = [t for result in fold_results for t in result['trades']]
+    final_value = engine.initial_capital + sum(t['pnl'] for t in trades)
+    overall = summarize_performance(engine._calculate_performance_metrics(trades, final_value))
+
+    oos_sharpes = [r['out_of_sample']['sharpe'] for r in fold_results]
+    is_sharpes = [r['in_sample']['sharpe'] for r in fold_results]
+    is_mean = float(np.mean(is_sharpes)) if is_sharpes else 0.0
+    oos_mean = float(np.mean(oos_sharpes)) if oos_sharpes else 0.0
+
+    metrics = {
+        'oos_sharpe': overall['sharpe'],
+        'oos_sortino': overall['sortino'],
+        'oos_max_dd': overall['max_dd'],
+        'profit_factor': overall['profit_factor'],
+        'trades': overall['trades'],
+        'win_rate': overall['win_rate'],
+        'oos_total_return': overall['total_return'],
+        'folds': len(fold_results),
+        'oos_sharpe_mean': oos_mean,
+        'oos_sharpe_std': float(np.std(oos_sharpes)) if oos_sharpes else 0.0,
+        'oos_sharpe_min': float(np.min(oos_sharpes)) if oos_sharpes else 0.0,
+        'is_sharpe_mean': is_mean,
+        'wfo_efficiency': oos_mean / is_mean if is_mean > 0 else 0.0,
+        'profitable_folds': sum(1 for r in fold_results if r['out_of_sample']['total_return'] > 0)
+    }
+
+    equity = []
+    value = engine.initial_capital
+    for trade in trades:
+        value += trade['pnl']
+        equity.append({'timestamp': trade['exit_time'], 'equity': value})
+
+    return metrics, equity, trades